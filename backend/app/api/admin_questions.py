@@ -6,8 +6,13 @@ Endpoints for managing questions in the question bank
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from supabase import Client
 from app.core.auth import get_current_user, get_authenticated_client, is_admin
-from typing import List, Dict, Optional, Any
+from app.services.question_bulk_update import QuestionBulkUpdater
+from app.services.question_search import invalidate_question_search
+from typing import List, Dict, Optional, Any, Tuple
+from datetime import datetime
+from uuid import UUID
 from pydantic import BaseModel
+import base64
 
 
 router = APIRouter(prefix="/admin/questions", tags=["admin-questions"])
@@ -27,6 +32,38 @@ class QuestionUpdate(BaseModel):
     rationale: Optional[str] = None
 
 
+def _encode_cursor(question: Dict[str, Any]) -> str:
+    """Opaque keyset cursor for the position after a question"""
+    raw = f"{question['created_at']}|{question['id']}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Tuple[str, str]:
+    """(created_at, id) from a cursor; 400 if it wasn't made by _encode_cursor"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, question_id = raw.split("|", 1)
+        datetime.fromisoformat(created_at.replace("Z", "+00:00"))
+        return created_at, str(UUID(question_id))
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def _quote_filter_value(value: str) -> str:
+    """Double-quote a value inside a PostgREST or=() tree (commas, parentheses)"""
+    escaped = value.replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{escaped}"'
+
+
+def _after_cursor(created_at: str, question_id: str) -> str:
+    """Rows after (created_at, id) in newest-first order"""
+    created_at = _quote_filter_value(created_at)
+    return f"or(created_at.lt.{created_at},and(created_at.eq.{created_at},id.lt.{question_id}))"
+
+
 class BulkUpdate(BaseModel):
     """Model for bulk updating questions"""
     question_ids: List[str]
@@ -115,13 +152,21 @@ async def list_questions(
     has_png_in_stem: Optional[bool] = Query(None, description="Filter questions with PNG images in stem"),
     has_png_in_answers: Optional[bool] = Query(None, description="Filter questions with PNG images in answers"),
     limit: int = Query(20, description="Number of results per page", ge=1, le=100),
-    offset: int = Query(0, description="Offset for pagination", ge=0),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    offset: int = Query(0, description="Offset for pagination (ignored with cursor)", ge=0),
     user_id: str = Depends(get_current_user),
     db: Client = Depends(get_authenticated_client)
 ):
     """
-    List questions with filters and pagination.
+    List questions with filters and pagination, newest first.
     Admin only endpoint.
+
+    Every filter runs in the database (the PNG and empty-answer checks are
+    generated columns, see migration 042), so pages are always full. Pass
+    next_cursor back as cursor for the next page: keyset pagination on
+    (created_at, id) costs the same however deep the page. total is the
+    database's estimate for large results, and is only returned for offset
+    pages (the first page included).
     """
     try:
         user_is_admin = await is_admin(user_id, db)
@@ -132,9 +177,9 @@ async def list_questions(
                 detail="Admin access required"
             )
 
-        # Build query - get questions with topic info
+        # Build query - get questions with topic info, counting matches in the same request
         query = db.table('questions').select(
-            '*, topics(id, name, categories(id, name))'
+            '*, topics(id, name, categories(id, name))', count='estimated'
         )
 
         # Apply filters
@@ -156,93 +201,45 @@ async def list_questions(
         if topic_id:
             query = query.eq('topic_id', topic_id)
 
-        # Note: For search, we use Postgres text search operators for better performance
-        # ilike is faster than fetching all rows and filtering in Python
-
-        if search:
-            # Use database-level text search with ilike (case-insensitive LIKE)
-            # Search in stem OR external_id
-            search_pattern = f"%{search}%"
-
-            # Apply search at database level using OR condition
-            query = query.or_(
-                f"stem.ilike.{search_pattern},external_id.ilike.{search_pattern}"
-            )
-
-        # Apply empty answers filter at database level if needed
-        if has_empty_answers is not None:
-            # For empty answers, we still need Python filtering since it's JSONB array length check
-            # But we can optimize by only fetching limited results first
-            pass
-
-        # Execute query with pagination
-        result = query.order('created_at', desc=True).range(offset, offset + limit - 1).execute()
-        questions = result.data
-
-        # Helper function to check for PNG in stem
-        def check_png_in_stem(stem):
-            if not stem:
-                return False
-            return 'data:image/png' in str(stem)
-        
-        # Helper function to check for PNG in answer options
-        def check_png_in_answer_options(answer_options):
-            if not answer_options:
-                return False
-            answer_str = str(answer_options)
-            return 'data:image/png' in answer_str
-
-        # Post-process filters that require text content checking
         if has_empty_answers is not None:
-            if has_empty_answers:
-                questions = [q for q in questions if not q.get('correct_answer') or len(q.get('correct_answer', [])) == 0]
-            else:
-                questions = [q for q in questions if q.get('correct_answer') and len(q.get('correct_answer', [])) > 0]
-        
+            query = query.eq('has_empty_answers', has_empty_answers)
+
         if has_png_in_stem is not None:
-            if has_png_in_stem:
-                questions = [q for q in questions if check_png_in_stem(q.get('stem'))]
-            else:
-                questions = [q for q in questions if not check_png_in_stem(q.get('stem'))]
-        
-        if has_png_in_answers is not None:
-            if has_png_in_answers:
-                questions = [q for q in questions if check_png_in_answer_options(q.get('answer_options'))]
-            else:
-                questions = [q for q in questions if not check_png_in_answer_options(q.get('answer_options'))]
+            query = query.eq('has_png_in_stem', has_png_in_stem)
 
-        # Get total count (approximate - faster than exact count for large tables)
-        # For search queries, we get approximate count by just using the filter count
-        count_query = db.table('questions').select('id', count='exact')
+        if has_png_in_answers is not None:
+            query = query.eq('has_png_in_options', has_png_in_answers)
 
-        # Apply same filters to count query
-        if module:
-            count_query = count_query.eq('module', module)
-        if difficulty:
-            count_query = count_query.eq('difficulty', difficulty)
-        if question_type:
-            count_query = count_query.eq('question_type', question_type)
-        if is_active is not None:
-            count_query = count_query.eq('is_active', is_active)
-        if is_flagged is not None:
-            count_query = count_query.eq('is_flagged', is_flagged)
-        if topic_id:
-            count_query = count_query.eq('topic_id', topic_id)
+        # Search (stem OR external_id, trigram-indexed) and the keyset
+        # position are both OR conditions, so they are ANDed in one tree
+        conditions = []
         if search:
-            search_pattern = f"%{search}%"
-            count_query = count_query.or_(
-                f"stem.ilike.{search_pattern},external_id.ilike.{search_pattern}"
-            )
-
-        count_result = count_query.execute()
-        total_count = count_result.count if hasattr(count_result, 'count') else len(count_result.data)
+            pattern = _quote_filter_value(f"%{search}%")
+            conditions.append(f"or(stem.ilike.{pattern},external_id.ilike.{pattern})")
+        if cursor:
+            created_at, question_id = _decode_cursor(cursor)
+            conditions.append(_after_cursor(created_at, question_id))
+        if conditions:
+            query = query.or_(f"and({','.join(conditions)})")
+
+        # One extra row tells whether there is a next page
+        query = query.order('created_at', desc=True).order('id', desc=True)
+        if cursor:
+            result = query.limit(limit + 1).execute()
+        else:
+            result = query.range(offset, offset + limit).execute()
+
+        questions = result.data[:limit]
+        has_more = len(result.data) > limit
 
         return {
             'questions': questions,
-            'total': total_count,
+            # Rows after the cursor on cursor pages, so not a total
+            'total': result.count if not cursor else None,
             'limit': limit,
             'offset': offset,
-            'has_more': offset + len(questions) < total_count
+            'has_more': has_more,
+            'next_cursor': _encode_cursor(questions[-1]) if has_more else None
         }
 
     except HTTPException:
@@ -384,6 +381,7 @@ async def update_question(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Question not found"
             )
+        invalidate_question_search()
 
         return {
             'message': 'Question updated successfully',
@@ -431,20 +429,17 @@ async def bulk_update_questions(
                 detail="No updates provided"
             )
 
-        # Update all questions
-        success_count = 0
-        for question_id in bulk_data.question_ids:
-            try:
-                db.table('questions').update(bulk_data.updates).eq('id', question_id).execute()
-                success_count += 1
-            except Exception as e:
-                print(f"Failed to update question {question_id}: {e}")
-                continue
+        # One update request per chunk of ids, a few in flight at once
+        summary = await QuestionBulkUpdater(db).update_many(bulk_data.question_ids, bulk_data.updates)
+        success_count = summary['updated']
+        invalidate_question_search()
 
         return {
             'message': f'Successfully updated {success_count} of {len(bulk_data.question_ids)} questions',
             'success_count': success_count,
-            'total_requested': len(bulk_data.question_ids)
+            'total_requested': len(bulk_data.question_ids),
+            'failed_count': summary['failed'],
+            'chunks': summary['chunks']
         }
 
     except HTTPException:
@@ -496,6 +491,7 @@ async def toggle_question_flag(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Question not found"
             )
+        invalidate_question_search()
 
         return {
             'message': 'Question flag status updated successfully',
@@ -10,9 +10,13 @@ from app.services.analytics_service import AnalyticsService
 from app.services.bkt_service import BKTService
 from app.services.velocity_service import VelocityService
 from app.services.prediction_service import PredictionService
+from app.services.learner_analytics_service import LEARNER_ANALYTICS_SECTIONS, LearnerAnalyticsService
+from app.services.request_loader import RequestLoader, get_request_loader
 from app.core.auth import get_current_user, get_authenticated_client, is_admin
 from typing import List, Dict, Optional, Any
+from datetime import datetime, timezone
 from pydantic import BaseModel
+import re
 
 
 router = APIRouter(prefix="/analytics", tags=["analytics"])
@@ -52,6 +56,19 @@ class StudyTimeResponse(BaseModel):
     days_back: int
 
 
+def _completed_since(completed_at: str, cutoff: datetime) -> bool:
+    """Whether a Postgres timestamp is at or after cutoff (unparseable: no)"""
+    try:
+        # Fix malformed microseconds (e.g., .0955 -> .095500)
+        completed_at = re.sub(r'\.(\d{1,5})(\+|Z)', lambda m: f'.{m.group(1).ljust(6, "0")}{m.group(2)}', completed_at)
+        completed = datetime.fromisoformat(completed_at.replace('Z', '+00:00'))
+    except ValueError:
+        return False
+    if completed.tzinfo is None:
+        completed = completed.replace(tzinfo=timezone.utc)
+    return completed >= cutoff
+
+
 @router.get("/users/me/growth-curve", response_model=GrowthCurveResponse)
 async def get_user_growth_curve(
     skill_id: Optional[str] = Query(None, description="Optional skill ID to track"),
@@ -96,6 +113,62 @@ async def get_user_growth_curve(
         )
 
 
+@router.get("/users/me/dashboard")
+async def get_user_dashboard_analytics(
+    fields: Optional[str] = Query(
+        None,
+        description="Comma-separated sections to include: " + ", ".join(LEARNER_ANALYTICS_SECTIONS) + " (default all)"
+    ),
+    growth_days: int = Query(30, description="Days covered by the growth curve", ge=1, le=365),
+    exam_limit: int = Query(10, description="Maximum number of mock exams", ge=1, le=50),
+    user_id: str = Depends(get_current_user),
+    db: Client = Depends(get_authenticated_client),
+    loader: RequestLoader = Depends(get_request_loader)
+):
+    """
+    Get the dashboard's analytics in one call.
+    
+    Learning velocity, predictive scores, growth curve, skill heatmap and mock
+    exam performance, each shaped like its own endpoint's response, built from
+    a single load of the user's mastery, snapshots, study plan and exams.
+    Clients request only the sections they render.
+    
+    Args:
+        fields: Sections to include (default all)
+        growth_days: Days covered by the growth curve
+        exam_limit: Maximum number of mock exams
+        user_id: Authenticated user ID
+        db: Database client
+        loader: Request-scoped lookups shared by every section
+        
+    Returns:
+        The requested sections and when the user's mastery last changed
+    """
+    sections = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+    unknown = sorted(set(sections or []) - set(LEARNER_ANALYTICS_SECTIONS))
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}"
+        )
+    
+    try:
+        service = LearnerAnalyticsService(db, loader)
+        return await service.get_learner_analytics(
+            user_id,
+            sections=sections,
+            growth_days=growth_days,
+            exam_limit=exam_limit
+        )
+        
+    except Exception as e:
+        print(f"Error getting dashboard analytics: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to retrieve dashboard analytics: {str(e)}"
+        )
+
+
 @router.get("/users/me/skill-heatmap", response_model=SkillHeatmapResponse)
 async def get_user_skill_heatmap(
     user_id: str = Depends(get_current_user),
@@ -118,20 +191,7 @@ async def get_user_skill_heatmap(
         analytics_service = AnalyticsService(db)
         heatmap = await analytics_service.get_skill_heatmap(user_id=user_id)
         
-        # Calculate totals
-        total_skills = sum(len(cat["skills"]) for cat in heatmap.values())
-        all_masteries = [
-            skill["mastery"] 
-            for cat in heatmap.values() 
-            for skill in cat["skills"]
-        ]
-        avg_mastery = sum(all_masteries) / len(all_masteries) if all_masteries else 0
-        
-        return {
-            "heatmap": heatmap,
-            "total_skills": total_skills,
-            "avg_mastery": round(avg_mastery, 4)
-        }
+        return analytics_service.summarize_heatmap(heatmap)
         
     except Exception as e:
         print(f"Error getting skill heatmap: {e}")
@@ -894,40 +954,8 @@ async def get_user_mock_exam_performance(
     Returns recent completed exams with scores and completion dates.
     """
     try:
-        # Query only completed mock exams for the current user
-        exams_query = db.table("mock_exams").select(
-            "id, exam_type, total_score, math_score, rw_score, completed_at, status"
-        ).eq("user_id", user_id).eq("status", "completed").order(
-            "completed_at", desc=False
-        ).limit(limit)
-        
-        exams_result = exams_query.execute()
-        
-        # Format the response
-        recent_exams = []
-        for exam in exams_result.data:
-            completed_at = exam.get("completed_at")
-            # Convert datetime to string if it exists
-            if completed_at and hasattr(completed_at, 'isoformat'):
-                completed_at = completed_at.isoformat()
-            elif completed_at and isinstance(completed_at, str):
-                # Already a string, keep as is
-                pass
-            else:
-                completed_at = None
-                
-            recent_exams.append({
-                "exam_type": exam.get("exam_type", "full_length"),
-                "total_score": exam.get("total_score"),
-                "math_score": exam.get("math_score", 0),
-                "rw_score": exam.get("rw_score", 0),
-                "completed_at": completed_at
-            })
-        
-        return {
-            "recent_exams": recent_exams,
-            "total_count": len(recent_exams)
-        }
+        analytics_service = AnalyticsService(db)
+        return await analytics_service.get_mock_exam_performance(user_id, limit=limit)
 
     except Exception as e:
         print(f"Error getting mock exam performance: {e}")
@@ -941,7 +969,8 @@ async def get_user_mock_exam_performance(
 async def get_user_study_time(
     days_back: int = Query(7, description="Number of days to look back", ge=1, le=90),
     user_id: str = Depends(get_current_user),
-    db: Client = Depends(get_authenticated_client)
+    db: Client = Depends(get_authenticated_client),
+    loader: RequestLoader = Depends(get_request_loader)
 ):
     """
     Get user's total study time from practice sessions and mock exams.
@@ -954,6 +983,7 @@ async def get_user_study_time(
         days_back: Number of days to look back (default 7)
         user_id: Authenticated user ID
         db: Database client
+        loader: Request-scoped lookups (the user's sessions)
 
     Returns:
         total_minutes: Total study time in minutes
@@ -970,62 +1000,62 @@ async def get_user_study_time(
         total_minutes = 0
         sessions_count = 0
 
-        # Get user's study plan IDs
-        study_plans_result = db.table("study_plans").select("id").eq("user_id", user_id).execute()
-        user_study_plan_ids = {sp["id"] for sp in study_plans_result.data}
-
-        # Get completed practice sessions
-        if user_study_plan_ids:
-            sessions_result = db.table("practice_sessions").select(
-                "id, started_at, completed_at, study_plan_id"
-            ).eq("status", "completed").gte("completed_at", cutoff_date).execute()
+        # Completed practice sessions across the user's study plans
+        cutoff_dt = datetime.fromisoformat(cutoff_date)
+        recent_sessions = [
+            session for session in loader.sessions(user_id)
+            if session.get("status") == "completed" and session.get("completed_at")
+            and _completed_since(session["completed_at"], cutoff_dt)
+        ]
 
-            # Filter sessions by user's study plans
-            for session in sessions_result.data:
-                if session.get("study_plan_id") not in user_study_plan_ids:
-                    continue
+        # Sessions without a start time fall back to their questions' time
+        # spent, fetched for all of them at once
+        untimed_ids = [s["id"] for s in recent_sessions if not s.get("started_at")]
+        questions_by_session: Dict[str, List[Dict[str, Any]]] = {}
+        if untimed_ids:
+            questions_result = db.table("session_questions").select(
+                "session_id, time_spent_seconds"
+            ).in_("session_id", untimed_ids).execute()
+            for q in questions_result.data or []:
+                questions_by_session.setdefault(q["session_id"], []).append(q)
+
+        for session in recent_sessions:
+            started = session.get("started_at")
+            completed = session.get("completed_at")
 
-                started = session.get("started_at")
-                completed = session.get("completed_at")
+            if started and completed:
+                try:
+                    start_dt = datetime.fromisoformat(started.replace('Z', '+00:00'))
+                    complete_dt = datetime.fromisoformat(completed.replace('Z', '+00:00'))
+                    duration_minutes = (complete_dt - start_dt).total_seconds() / 60
 
-                if started and completed:
-                    try:
-                        start_dt = datetime.fromisoformat(started.replace('Z', '+00:00'))
-                        complete_dt = datetime.fromisoformat(completed.replace('Z', '+00:00'))
-                        duration_minutes = (complete_dt - start_dt).total_seconds() / 60
-
-                        # Sanity check: ignore sessions longer than 4 hours (likely data error)
-                        if 0 < duration_minutes <= 240:
-                            total_minutes += duration_minutes
-                            sessions_count += 1
-                    except Exception:
-                        continue
-                else:
-                    # Fallback: If we have completed_at but no started_at, use actual time_spent_seconds from questions
-                    if completed and not started:
-                        # Get actual time spent from questions
-                        questions_result = db.table("session_questions").select(
-                            "time_spent_seconds"
-                        ).eq("session_id", session.get("id")).execute()
-
-                        if questions_result.data:
-                            # Sum up actual time spent on all questions
-                            total_seconds = sum(
-                                q.get("time_spent_seconds", 0)
-                                for q in questions_result.data
-                                if q.get("time_spent_seconds") is not None
-                            )
-
-                            if total_seconds > 0:
-                                actual_minutes = total_seconds / 60
-                                total_minutes += actual_minutes
-                                sessions_count += 1
-                            else:
-                                # If no time_spent_seconds data, estimate based on question count
-                                question_count = len(questions_result.data)
-                                estimated_minutes = question_count * 2  # 2 min per question estimate
-                                total_minutes += estimated_minutes
-                                sessions_count += 1
+                    # Sanity check: ignore sessions longer than 4 hours (likely data error)
+                    if 0 < duration_minutes <= 240:
+                        total_minutes += duration_minutes
+                        sessions_count += 1
+                except Exception:
+                    continue
+            else:
+                # Fallback: completed_at but no started_at, use actual time_spent_seconds from questions
+                questions = questions_by_session.get(session["id"])
+                if questions:
+                    # Sum up actual time spent on all questions
+                    total_seconds = sum(
+                        q.get("time_spent_seconds", 0)
+                        for q in questions
+                        if q.get("time_spent_seconds") is not None
+                    )
+
+                    if total_seconds > 0:
+                        actual_minutes = total_seconds / 60
+                        total_minutes += actual_minutes
+                        sessions_count += 1
+                    else:
+                        # If no time_spent_seconds data, estimate based on question count
+                        question_count = len(questions)
+                        estimated_minutes = question_count * 2  # 2 min per question estimate
+                        total_minutes += estimated_minutes
+                        sessions_count += 1
 
         # Get completed mock exams
         # Note: We query all completed exams then filter by user_id due to a potential RLS issue
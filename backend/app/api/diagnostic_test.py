@@ -11,14 +11,42 @@ from app.models.diagnostic_test import (
     SubmitAnswerResponse,
     TopicMasteryInit,
     DiagnosticTestQuestionWithDetails,
+    AdaptiveNextQuestionResponse,
 )
 from app.services.diagnostic_test_service import DiagnosticTestService
 from app.core.auth import get_current_user, get_authenticated_client
-from typing import List
+from typing import List, Literal
 
 router = APIRouter(prefix="/diagnostic-test", tags=["diagnostic-test"])
 
 
+def _question_with_details(dtq: dict) -> dict:
+    """Shape a diagnostic_test_questions row (QUESTION_DETAIL_SELECT) for the client"""
+    question_data = dtq["questions"]
+    topic_data = question_data.get("topics", {})
+
+    return {
+        "diagnostic_question_id": dtq["id"],
+        "question": {
+            "id": question_data["id"],
+            "stimulus": question_data.get("stimulus"),
+            "stem": question_data["stem"],
+            "difficulty": question_data["difficulty"],
+            "question_type": question_data["question_type"],
+            "answer_options": question_data["answer_options"],
+            "correct_answer": question_data["correct_answer"],
+        },
+        "topic": topic_data,
+        "section": dtq["section"],
+        "display_order": dtq["display_order"],
+        "status": dtq["status"],
+        "user_answer": dtq.get("user_answer"),
+        "is_correct": dtq.get("is_correct"),
+        "is_marked_for_review": dtq.get("is_marked_for_review", False),
+        "answered_at": dtq.get("answered_at"),
+    }
+
+
 @router.post("/create", response_model=dict, status_code=status.HTTP_201_CREATED)
 async def create_diagnostic_test(
     request: CreateDiagnosticTestRequest,
@@ -28,6 +56,9 @@ async def create_diagnostic_test(
     """
     Create a new diagnostic test with 40 questions.
 
+    With adaptive=true no questions are assigned yet; fetch them one at a
+    time from /{test_id}/next-question.
+
     Args:
         request: Diagnostic test creation request
         user_id: User ID from authentication token
@@ -38,7 +69,7 @@ async def create_diagnostic_test(
     """
     try:
         service = DiagnosticTestService(db)
-        result = await service.create_diagnostic_test(user_id=user_id)
+        result = await service.create_diagnostic_test(user_id=user_id, adaptive=request.adaptive)
         return result
 
     except ValueError as e:
@@ -124,43 +155,13 @@ async def get_diagnostic_test(
         # Get all questions for the test
         questions_response = (
             db.table("diagnostic_test_questions")
-            .select(
-                "id, test_id, question_id, section, display_order, status, user_answer, "
-                "is_correct, is_marked_for_review, answered_at, "
-                "questions(id, stimulus, stem, difficulty, question_type, answer_options, correct_answer, topic_id, "
-                "topics(id, name, category_id, categories(id, name, section)))"
-            )
+            .select(DiagnosticTestService.QUESTION_DETAIL_SELECT)
             .eq("test_id", test_id)
             .order("display_order")
             .execute()
         )
 
-        questions = []
-        for dtq in questions_response.data:
-            # Extract nested data
-            question_data = dtq["questions"]
-            topic_data = question_data.get("topics", {})
-
-            questions.append({
-                "diagnostic_question_id": dtq["id"],
-                "question": {
-                    "id": question_data["id"],
-                    "stimulus": question_data.get("stimulus"),
-                    "stem": question_data["stem"],
-                    "difficulty": question_data["difficulty"],
-                    "question_type": question_data["question_type"],
-                    "answer_options": question_data["answer_options"],
-                    "correct_answer": question_data["correct_answer"],
-                },
-                "topic": topic_data,
-                "section": dtq["section"],
-                "display_order": dtq["display_order"],
-                "status": dtq["status"],
-                "user_answer": dtq.get("user_answer"),
-                "is_correct": dtq.get("is_correct"),
-                "is_marked_for_review": dtq.get("is_marked_for_review", False),
-                "answered_at": dtq.get("answered_at"),
-            })
+        questions = [_question_with_details(dtq) for dtq in questions_response.data]
 
         return {
             "test": test,
@@ -282,6 +283,52 @@ async def submit_answer(
         )
 
 
+@router.post("/{test_id}/next-question", response_model=AdaptiveNextQuestionResponse)
+async def next_adaptive_question(
+    test_id: str,
+    section: Literal["math", "reading_writing"],
+    user_id: str = Depends(get_current_user),
+    db: Client = Depends(get_authenticated_client),
+):
+    """
+    Get the next question of a section in an adaptive diagnostic test.
+
+    Call after each answer. Returns done=true once the section's ability
+    estimate is precise enough (or the section reached its maximum length).
+
+    Args:
+        test_id: Adaptive diagnostic test ID
+        section: math or reading_writing
+        user_id: User ID from authentication token
+        db: Database client
+
+    Returns:
+        Current ability estimate and the next question, if any
+    """
+    try:
+        service = DiagnosticTestService(db)
+        result = await service.next_adaptive_question(
+            test_id=test_id, user_id=user_id, section=section
+        )
+        if result["question"] is not None:
+            result["question"] = _question_with_details(result["question"])
+        return result
+
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail=str(e)
+        )
+    except PermissionError as e:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to select next question: {str(e)}",
+        )
+
+
 @router.post("/{test_id}/complete")
 async def complete_diagnostic_test(
     test_id: str,
@@ -356,42 +403,13 @@ async def get_diagnostic_test_results(
         # Get all questions with results
         questions_response = (
             db.table("diagnostic_test_questions")
-            .select(
-                "id, test_id, question_id, section, display_order, status, user_answer, "
-                "is_correct, is_marked_for_review, answered_at, "
-                "questions(id, stimulus, stem, difficulty, question_type, answer_options, correct_answer, topic_id, "
-                "topics(id, name, category_id, categories(id, name, section)))"
-            )
+            .select(DiagnosticTestService.QUESTION_DETAIL_SELECT)
             .eq("test_id", test_id)
             .order("display_order")
             .execute()
         )
 
-        questions = []
-        for dtq in questions_response.data:
-            question_data = dtq["questions"]
-            topic_data = question_data.get("topics", {})
-
-            questions.append({
-                "diagnostic_question_id": dtq["id"],
-                "question": {
-                    "id": question_data["id"],
-                    "stimulus": question_data.get("stimulus"),
-                    "stem": question_data["stem"],
-                    "difficulty": question_data["difficulty"],
-                    "question_type": question_data["question_type"],
-                    "answer_options": question_data["answer_options"],
-                    "correct_answer": question_data["correct_answer"],
-                },
-                "topic": topic_data,
-                "section": dtq["section"],
-                "display_order": dtq["display_order"],
-                "status": dtq["status"],
-                "user_answer": dtq.get("user_answer"),
-                "is_correct": dtq.get("is_correct"),
-                "is_marked_for_review": dtq.get("is_marked_for_review", False),
-                "answered_at": dtq.get("answered_at"),
-            })
+        questions = [_question_with_details(dtq) for dtq in questions_response.data]
 
         # Calculate statistics
         total_correct = sum(1 for q in questions_response.data if q.get("is_correct") is True)
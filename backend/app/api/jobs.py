@@ -0,0 +1,61 @@
+"""
+Background Jobs API
+Status of durable background jobs (see app/services/job_queue.py)
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from supabase import Client
+from app.core.auth import get_current_user, get_authenticated_client
+from app.services.job_queue import JobQueue
+from typing import Any, Dict, Optional
+from datetime import datetime
+from pydantic import BaseModel
+
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+class JobStatusResponse(BaseModel):
+    """Status of a background job"""
+    id: str
+    job_type: str
+    status: str  # queued, running, succeeded, failed
+    attempts: int
+    max_attempts: int
+    run_at: datetime
+    last_error: Optional[str] = None
+    result: Optional[Dict[str, Any]] = None
+    created_at: datetime
+    updated_at: datetime
+    completed_at: Optional[datetime] = None
+
+
+@router.get("/{job_id}", response_model=JobStatusResponse)
+async def get_job_status(
+    job_id: str,
+    user_id: str = Depends(get_current_user),
+    db: Client = Depends(get_authenticated_client),
+):
+    """
+    Get the status of one of the current user's background jobs.
+
+    Args:
+        job_id: Job ID returned by the endpoint that queued it
+        user_id: User ID from authentication token
+        db: Database client
+
+    Returns:
+        Job status, attempts, last error and result
+    """
+    try:
+        job = JobQueue(db).get(job_id)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to retrieve job: {str(e)}",
+        )
+
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+
+    return job
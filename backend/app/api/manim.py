@@ -1,12 +1,21 @@
 from fastapi import APIRouter, HTTPException, status, Depends, Request
-from fastapi.responses import FileResponse, Response
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from starlette.background import BackgroundTask
 from pydantic import BaseModel
-from typing import Optional
+from typing import Dict, Optional
 from pathlib import Path
+from email.utils import parsedate_to_datetime
 import httpx
 from supabase import Client
 from app.core.auth import get_current_user, get_authenticated_client
 from app.config import get_settings
+from app.core.http_clients import (
+    CircuitOpenError,
+    MANIM_GENERATE_TIMEOUT,
+    MANIM_LIST_TIMEOUT,
+    MANIM_VIDEO_TIMEOUT,
+    get_http_clients,
+)
 
 # Conditionally import manim service (only available on Railway)
 try:
@@ -20,6 +29,110 @@ except ImportError:
 router = APIRouter(prefix="/manim", tags=["manim"])
 settings = get_settings()
 
+MANIM_OUTPUT_DIR = Path(__file__).parent.parent.parent / "manim_output"
+
+# Headers forwarded to / from Railway when proxying video playback
+VIDEO_REQUEST_HEADERS = {"range", "if-range", "if-none-match", "if-modified-since"}
+VIDEO_RESPONSE_HEADERS = {
+    "content-length",
+    "content-range",
+    "accept-ranges",
+    "etag",
+    "last-modified",
+}
+
+# Railway responses that mean the service itself is unhealthy
+UPSTREAM_FAILURE_STATUSES = {502, 503, 504}
+
+
+async def _send_to_railway(
+    method: str, url: str, *, timeout: float, stream: bool = False, **kwargs
+) -> httpx.Response:
+    """Send a request to the Railway manim service through the shared client
+
+    Fails fast with 503 while Railway's circuit breaker is open. Connection
+    errors and gateway-level 5xx responses (Railway down or restarting) count
+    as failures; application errors such as a failed render do not.
+    """
+    clients = get_http_clients()
+    breaker = clients.railway_breaker
+    try:
+        breaker.check()
+    except CircuitOpenError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Manim service is temporarily unavailable: {str(e)}",
+        )
+
+    try:
+        request = clients.railway.build_request(method, url, timeout=timeout, **kwargs)
+        response = await clients.railway.send(request, stream=stream)
+    except httpx.HTTPError:
+        breaker.record_failure()
+        raise
+
+    if response.status_code in UPSTREAM_FAILURE_STATUSES:
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+    return response
+
+
+# filename -> path of locally rendered videos, so repeat requests skip the directory walk
+_video_index: Dict[str, Path] = {}
+
+
+def _resolve_local_video(filename: str) -> Optional[Path]:
+    """Find a locally rendered video by filename, using the index when possible"""
+    indexed = _video_index.get(filename)
+    if indexed is not None:
+        if indexed.is_file():
+            return indexed
+        # File was cleaned up after upload
+        del _video_index[filename]
+
+    output_dir = MANIM_OUTPUT_DIR.resolve()
+
+    # Path 1: Direct file
+    video_path = (output_dir / filename).resolve()
+
+    # Path 2: In media/videos structure
+    if not video_path.is_file():
+        scene_id = filename.replace(".mp4", "")
+        scene_video_dir = output_dir / "media" / "videos" / f"scene_{scene_id}" / "480p15"
+        mp4_files = list(scene_video_dir.glob("*.mp4")) if scene_video_dir.is_dir() else []
+        if not mp4_files:
+            return None
+        video_path = mp4_files[0].resolve()
+
+    # Never serve anything outside the output directory
+    if output_dir not in video_path.parents:
+        return None
+
+    _video_index[filename] = video_path
+    return video_path
+
+
+def _is_not_modified(http_request: Request, response: FileResponse) -> bool:
+    """Check If-None-Match / If-Modified-Since against the file's ETag and mtime"""
+    if_none_match = http_request.headers.get("if-none-match")
+    if if_none_match:
+        etag = response.headers.get("etag")
+        return etag is not None and (
+            if_none_match.strip() == "*"
+            or etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        )
+
+    if_modified_since = http_request.headers.get("if-modified-since")
+    last_modified = response.headers.get("last-modified")
+    if if_modified_since and last_modified:
+        try:
+            return parsedate_to_datetime(if_modified_since) >= parsedate_to_datetime(last_modified)
+        except (TypeError, ValueError):
+            return False
+
+    return False
+
 
 class ManimGenerateRequest(BaseModel):
     question: str
@@ -71,26 +184,27 @@ async def generate_video(
                     )
                 
                 try:
-                    async with httpx.AsyncClient(timeout=300.0) as client:
-                        # Forward authorization header
-                        headers = {"Content-Type": "application/json"}
-                        auth_header = http_request.headers.get("Authorization")
-                        if auth_header:
-                            headers["Authorization"] = auth_header
-                            print(f"Forwarding Authorization header to Railway: {auth_header[:50]}...")
-                        else:
-                            print("WARNING: No Authorization header found in request")
-                        
-                        print(f"Proxying request to Railway: {manim_url}/api/manim/generate")
-                        
-                        # Forward request to Railway
-                        response = await client.post(
-                            f"{manim_url}/api/manim/generate",
-                            json={"question": request.question.strip()},
-                            headers=headers,
-                        )
-                        response.raise_for_status()
-                        return response.json()
+                    # Forward authorization header
+                    headers = {"Content-Type": "application/json"}
+                    auth_header = http_request.headers.get("Authorization")
+                    if auth_header:
+                        headers["Authorization"] = auth_header
+                        print(f"Forwarding Authorization header to Railway: {auth_header[:50]}...")
+                    else:
+                        print("WARNING: No Authorization header found in request")
+                    
+                    print(f"Proxying request to Railway: {manim_url}/api/manim/generate")
+                    
+                    # Forward request to Railway over the shared keep-alive client
+                    response = await _send_to_railway(
+                        "POST",
+                        f"{manim_url}/api/manim/generate",
+                        timeout=MANIM_GENERATE_TIMEOUT,
+                        json={"question": request.question.strip()},
+                        headers=headers,
+                    )
+                    response.raise_for_status()
+                    return response.json()
                 except httpx.HTTPStatusError as e:
                     # Capture more details about the error
                     error_detail = f"Railway returned {e.response.status_code}"
@@ -176,21 +290,22 @@ async def list_user_videos(
                     )
                 
                 try:
-                    async with httpx.AsyncClient(timeout=30.0) as client:
-                        # Forward authorization header
-                        headers = {}
-                        auth_header = http_request.headers.get("Authorization")
-                        if auth_header:
-                            headers["Authorization"] = auth_header
-                        
-                        # Forward request to Railway
-                        response = await client.get(
-                            f"{manim_url}/api/manim/videos",
-                            params={"limit": limit},
-                            headers=headers,
-                        )
-                        response.raise_for_status()
-                        return response.json()
+                    # Forward authorization header
+                    headers = {}
+                    auth_header = http_request.headers.get("Authorization")
+                    if auth_header:
+                        headers["Authorization"] = auth_header
+                    
+                    # Forward request to Railway over the shared keep-alive client
+                    response = await _send_to_railway(
+                        "GET",
+                        f"{manim_url}/api/manim/videos",
+                        timeout=MANIM_LIST_TIMEOUT,
+                        params={"limit": limit},
+                        headers=headers,
+                    )
+                    response.raise_for_status()
+                    return response.json()
                 except httpx.HTTPStatusError as e:
                     # Capture more details about the error
                     error_detail = f"Railway returned {e.response.status_code}"
@@ -282,43 +397,59 @@ async def get_video(
                         detail=f"MANIM_SERVICE_URL is missing protocol (http:// or https://). Current value: {manim_url[:50]}",
                     )
                 
+                # Stream the upstream body chunk-by-chunk, forwarding Range and
+                # conditional headers so seeking doesn't re-transfer the whole file
                 try:
-                    async with httpx.AsyncClient(timeout=60.0, follow_redirects=True) as client:
-                        # Forward request to Railway
-                        response = await client.get(
-                            f"{manim_url}/api/manim/videos/{filename}",
-                        )
-                        response.raise_for_status()
-                        
-                        # Return the video response
-                        return Response(
-                            content=response.content,
-                            media_type="video/mp4",
-                            headers={
-                                "Content-Disposition": f'inline; filename="{filename}"',
-                                "Cache-Control": "public, max-age=3600",
-                            }
-                        )
-                except httpx.HTTPStatusError as e:
+                    upstream = await _send_to_railway(
+                        "GET",
+                        f"{manim_url}/api/manim/videos/{filename}",
+                        timeout=MANIM_VIDEO_TIMEOUT,
+                        stream=True,
+                        headers={
+                            name: value
+                            for name, value in http_request.headers.items()
+                            if name.lower() in VIDEO_REQUEST_HEADERS
+                        },
+                    )
+                except httpx.HTTPError as e:
+                    print(f"Error proxying video to Railway: {str(e)}")
+                    raise HTTPException(
+                        status_code=status.HTTP_502_BAD_GATEWAY,
+                        detail=f"Failed to connect to manim service: {str(e)}",
+                    )
+
+                if upstream.status_code >= 400 and upstream.status_code != 416:
                     # Capture more details about the error
-                    error_detail = f"Railway returned {e.response.status_code}"
+                    await upstream.aread()
+                    await upstream.aclose()
+                    error_detail = f"Railway returned {upstream.status_code}"
                     try:
-                        error_body = e.response.json()
+                        error_body = upstream.json()
                         if isinstance(error_body, dict) and "detail" in error_body:
                             error_detail = f"{error_detail}: {error_body['detail']}"
                     except:
-                        error_detail = f"{error_detail}: {e.response.text[:200]}"
+                        error_detail = f"{error_detail}: {upstream.text[:200]}"
                     print(f"Error proxying video to Railway: {error_detail}")
                     raise HTTPException(
                         status_code=status.HTTP_502_BAD_GATEWAY,
                         detail=f"Failed to connect to manim service: {error_detail}",
                     )
-                except httpx.HTTPError as e:
-                    print(f"Error proxying video to Railway: {str(e)}")
-                    raise HTTPException(
-                        status_code=status.HTTP_502_BAD_GATEWAY,
-                        detail=f"Failed to connect to manim service: {str(e)}",
-                    )
+
+                headers = {
+                    name: value
+                    for name, value in upstream.headers.items()
+                    if name.lower() in VIDEO_RESPONSE_HEADERS
+                }
+                headers["Content-Disposition"] = f'inline; filename="{filename}"'
+                headers["Cache-Control"] = "public, max-age=3600"
+
+                return StreamingResponse(
+                    upstream.aiter_raw(),
+                    status_code=upstream.status_code,
+                    media_type="video/mp4",
+                    headers=headers,
+                    background=BackgroundTask(upstream.aclose),
+                )
 
         # Serve local video files (Railway deployment)
         if not MANIM_AVAILABLE:
@@ -327,38 +458,31 @@ async def get_video(
                 detail="Manim service is not available. Please configure MANIM_SERVICE_URL or deploy to Railway.",
             )
         
-        output_dir = Path(__file__).parent.parent.parent / "manim_output"
-        
-        # Path 1: Direct file
-        video_path = output_dir / filename
-        
-        # Path 2: In media/videos structure
-        if not video_path.exists():
-            scene_id = filename.replace(".mp4", "")
-            video_path = (
-                output_dir
-                / "media"
-                / "videos"
-                / f"scene_{scene_id}"
-                / "480p15"
-            )
-            # Find any .mp4 file in this directory
-            if video_path.exists():
-                mp4_files = list(video_path.glob("*.mp4"))
-                if mp4_files:
-                    video_path = mp4_files[0]
-
-        if not video_path.exists():
+        video_path = _resolve_local_video(filename)
+        if video_path is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Video not found",
             )
 
-        return FileResponse(
+        # FileResponse handles Range / If-Range (206 partial content) itself
+        response = FileResponse(
             video_path,
             media_type="video/mp4",
             filename=filename,
+            stat_result=video_path.stat(),
+            headers={"Cache-Control": "public, max-age=3600"},
         )
+        if _is_not_modified(http_request, response):
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED,
+                headers={
+                    name: response.headers[name]
+                    for name in ("etag", "last-modified", "cache-control")
+                    if name in response.headers
+                },
+            )
+        return response
 
     except HTTPException:
         raise
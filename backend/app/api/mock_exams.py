@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
 from supabase import Client
-from app.db import get_db
+from app.db import get_db, get_service_client
+from app.config import get_settings
 from app.models.mock_exam import (
     CreateMockExamRequest,
     SubmitModuleAnswerRequest,
@@ -10,42 +11,49 @@ from app.models.mock_exam import (
     ModuleQuestionsResponse,
     SubmitAnswerResponse,
     MockExamResultsResponse,
-    ModuleResultDetail,
-    QuestionResultDetail,
-    CategoryPerformance,
     MockExamListItem,
     BatchSubmitResponse,
     BatchAnswerResult,
 )
 from app.services.mock_exam_service import MockExamService
+from app.services.job_queue import JobQueue, run_job_inline
+from app.services.job_handlers import MOCK_EXAM_FINALIZE
 from app.core.auth import get_current_user, get_authenticated_client
 from typing import List
 import asyncio
 
 router = APIRouter(prefix="/mock-exams", tags=["mock-exams"])
 
-async def background_complete_module(
+async def background_prepare_next_module(
     service: MockExamService,
     module_id: str,
     user_id: str,
-    time_remaining_seconds: int
 ):
-    """Background task to handle heavy module completion logic."""
+    """Background task to speculatively prepare module 2 while module 1 is in progress."""
     try:
-        await service.complete_module(
-            module_id=module_id,
-            user_id=user_id,
-            time_remaining_seconds=time_remaining_seconds,
+        await service.prepare_next_module_candidates(module_id=module_id, user_id=user_id)
+    except Exception as e:
+        print(f"Error preparing next module candidates for module {module_id}: {str(e)}")
+
+
+async def background_replenish_form_pool():
+    """Background task to top up pre-assembled module forms after an exam claims some."""
+    settings = get_settings()
+    try:
+        added = await MockExamService(get_service_client()).replenish_form_pool(
+            target_per_tier=settings.mock_exam_form_pool_target,
+            low_water=settings.mock_exam_form_pool_low_water,
         )
+        if added:
+            print(f"[MOCK EXAM] Replenished form pool: {added}")
     except Exception as e:
-        print(f"Error in background module completion for module {module_id}: {str(e)}")
-        # In a real system, you might want to log this to an error tracking service
-        # or update a status flag in the database so the frontend knows it failed.
+        print(f"Error replenishing mock exam form pool: {str(e)}")
 
 
 @router.post("/create", response_model=MockExamResponse, status_code=status.HTTP_201_CREATED)
 async def create_mock_exam(
     request: CreateMockExamRequest,
+    background_tasks: BackgroundTasks,
     user_id: str = Depends(get_current_user),
     db: Client = Depends(get_authenticated_client),
 ):
@@ -54,6 +62,7 @@ async def create_mock_exam(
 
     Args:
         request: Exam creation request with exam type
+        background_tasks: Used to replenish the form pool after the response
         user_id: User ID from authentication token
         db: Database client
 
@@ -65,6 +74,7 @@ async def create_mock_exam(
         result = await service.create_mock_exam(
             user_id=user_id, exam_type=request.exam_type
         )
+        background_tasks.add_task(background_replenish_form_pool)
         return result
 
     except ValueError as e:
@@ -96,7 +106,10 @@ async def list_mock_exams(
     try:
         response = (
             db.table("mock_exams")
-            .select("*")
+            .select(
+                "id, exam_type, status, started_at, completed_at, "
+                "total_score, math_score, rw_score, created_at"
+            )
             .eq("user_id", user_id)
             .order("created_at", desc=True)
             .execute()
@@ -182,15 +195,18 @@ async def get_mock_exam(
 async def start_module(
     exam_id: str,
     module_id: str,
+    background_tasks: BackgroundTasks,
     user_id: str = Depends(get_current_user),
     db: Client = Depends(get_authenticated_client),
 ):
     """
     Start a module, setting its status and start time.
+    Starting module 1 also prepares module 2's candidate forms in the background.
 
     Args:
         exam_id: Mock exam ID
         module_id: Module ID to start
+        background_tasks: FastAPI background tasks handler
         user_id: User ID from authentication token
         db: Database client
 
@@ -200,6 +216,10 @@ async def start_module(
     try:
         service = MockExamService(db)
         result = await service.start_module(module_id=module_id, user_id=user_id)
+        if result.get("module_number") == 1:
+            background_tasks.add_task(
+                background_prepare_next_module, service, module_id, user_id
+            )
         return result
 
     except ValueError as e:
@@ -344,7 +364,7 @@ async def submit_answer(
     """
     try:
         service = MockExamService(db)
-        is_correct, correct_answer = await service.submit_answer(
+        is_correct, correct_answer, junction_question_id = await service.submit_answer(
             module_id=module_id,
             question_id=question_id,
             user_answer=answer_data.user_answer,
@@ -353,17 +373,6 @@ async def submit_answer(
             user_id=user_id,
         )
 
-        # Get mock question id
-        meq_response = (
-            db.table("mock_exam_questions")
-            .select("id")
-            .eq("module_id", module_id)
-            .eq("question_id", question_id)
-            .execute()
-        )
-
-        junction_question_id = meq_response.data[0]["id"] if meq_response.data else None
-
         return {
             "is_correct": is_correct,
             "correct_answer": correct_answer,
@@ -465,8 +474,10 @@ async def complete_module(
     db: Client = Depends(get_authenticated_client),
 ):
     """
-    Complete a module and calculate score. Generates adaptive questions for next module.
-    Heavy processing is offloaded to a background task to ensure quick UI response.
+    Complete a module and calculate score. Commits the adaptive next module.
+    Module 2 is available when this returns. Once every module is done, exam
+    finalization (scaled scores, mastery updates) is queued as a durable job
+    whose progress can be followed at GET /jobs/{job_id}.
 
     Args:
         exam_id: Mock exam ID
@@ -477,29 +488,40 @@ async def complete_module(
         db: Database client
 
     Returns:
-        Status indicating completion is processing
+        Completion status, with the finalization job ID for the last module
     """
     try:
         service = MockExamService(db)
-        
-        # 1. Mark module as completing/completed synchronously to update UI state
-        # We'll use a specialized method or direct DB update if service.complete_module is too monolithic
-        # For now, we queue the whole thing.
-        # Ideally, we should update the status to 'completed' here so the frontend sees it as done.
-        # But complete_module likely does that. 
-        # Let's trust the background task for the heavy lifting.
-        
-        background_tasks.add_task(
-            background_complete_module,
-            service,
-            module_id,
-            user_id,
-            request.time_remaining_seconds
+
+        module = await service.complete_module(
+            module_id=module_id,
+            user_id=user_id,
+            time_remaining_seconds=request.time_remaining_seconds,
+            finalize=False,
         )
-        
+
+        exam_id = module["exam_id"]
+        if not service.all_modules_completed(exam_id):
+            return {
+                "status": "completed",
+                "message": "Module completed",
+            }
+
+        # Idempotent on the exam, so a retried completion doesn't finalize twice.
+        # Only the service role may enqueue; complete_module checked ownership
+        job = JobQueue(get_service_client()).enqueue(
+            MOCK_EXAM_FINALIZE,
+            payload={"exam_id": exam_id, "user_id": user_id},
+            job_key=f"{MOCK_EXAM_FINALIZE}:{exam_id}",
+            user_id=user_id,
+        )
+        # Start right away in this process; a worker retries it if this fails
+        background_tasks.add_task(run_job_inline, job["id"])
+
         return {
             "status": "processing",
-            "message": "Module completion started in background"
+            "message": "Module completed, exam finalization queued",
+            "job_id": job["id"],
         }
 
     except ValueError as e:
@@ -526,6 +548,9 @@ async def get_exam_results(
     """
     Get comprehensive results for a completed exam.
 
+    Completed exams serve the results document cached at finalization;
+    older or unfinished exams are assembled from a single nested query.
+
     Args:
         exam_id: Mock exam ID
         user_id: User ID from authentication token
@@ -535,182 +560,13 @@ async def get_exam_results(
         Exam results with detailed breakdown
     """
     try:
-        # Verify exam belongs to user
-        exam_response = (
-            db.table("mock_exams")
-            .select("*")
-            .eq("id", exam_id)
-            .eq("user_id", user_id)
-            .execute()
-        )
-
-        if not exam_response.data:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND, detail="Exam not found"
-            )
-
-        exam = exam_response.data[0]
-
-        # Get all modules with questions
-        modules_response = (
-            db.table("mock_exam_modules")
-            .select("*")
-            .eq("exam_id", exam_id)
-            .order("module_type")
-            .execute()
-        )
-
-        module_results = []
-        category_stats = {}
-        total_questions = 0
-        total_correct = 0
-
-        for module in modules_response.data:
-            # Get questions for this module
-            questions_response = (
-                db.table("mock_exam_questions")
-                .select(
-                    "*, questions(id, difficulty, question_type, correct_answer, answer_options, "
-                    "topics(name, categories(name, section)))"
-                )
-                .eq("module_id", module["id"])
-                .order("display_order")
-                .execute()
-            )
-
-            question_results = []
-            correct_in_module = 0
-
-            for meq in questions_response.data:
-                question = meq["questions"]
-                topic = question["topics"]
-                category = topic["categories"]
-
-                is_correct = meq.get("is_correct")
-                if is_correct is True:
-                    correct_in_module += 1
-                    total_correct += 1
-
-                total_questions += 1
-
-                # Track category performance
-                cat_key = f"{category['name']}_{category['section']}"
-                if cat_key not in category_stats:
-                    category_stats[cat_key] = {
-                        "category_name": category["name"],
-                        "section": category["section"],
-                        "total": 0,
-                        "correct": 0,
-                    }
-                category_stats[cat_key]["total"] += 1
-                if is_correct is True:
-                    category_stats[cat_key]["correct"] += 1
-
-                # Map UUIDs to labels for MC questions
-                user_answer = meq.get("user_answer")
-                correct_answer = question.get("correct_answer")
-
-                if question.get("question_type") == "mc" and question.get("answer_options"):
-                    options = question["answer_options"]
-                    # Normalize options to list of items
-                    if isinstance(options, dict):
-                        options_list = list(options.items()) # This might need adjustment based on actual dict structure
-                    elif isinstance(options, list):
-                        options_list = options
-                    else:
-                        options_list = []
-
-                    labels = ["A", "B", "C", "D", "E", "F"]
-                    
-                    # Helper to map ID to label
-                    def map_ids_to_labels(ids):
-                        if not ids: return ids
-                        mapped = []
-                        for ans_id in ids:
-                            # Try to find matching option
-                            found_label = None
-                            for idx, opt in enumerate(options_list):
-                                # Option structure can vary: {"id": ..., "content": ...} or [id, content]
-                                opt_id = None
-                                if isinstance(opt, dict):
-                                    opt_id = opt.get("id")
-                                elif isinstance(opt, list) and len(opt) > 0:
-                                    opt_id = opt[0]
-                                
-                                if str(opt_id) == str(ans_id):
-                                    if idx < len(labels):
-                                        found_label = labels[idx]
-                                    break
-                            
-                            if found_label:
-                                mapped.append(found_label)
-                            else:
-                                mapped.append(ans_id) # Fallback to original if not found
-                        return mapped
-
-                    if user_answer:
-                        user_answer = map_ids_to_labels(user_answer)
-                    
-                    # Correct answer might already be labels "A", "B", etc. or UUIDs. 
-                    # Usually correct_answer is stored as ["A"] for MC, but let's be safe.
-                    # If correct_answer looks like a UUID, map it. Otherwise assume it's a label.
-                    if correct_answer and len(correct_answer) > 0 and len(correct_answer[0]) > 5: # Simple heuristic for UUID
-                         correct_answer = map_ids_to_labels(correct_answer)
-
-
-                question_results.append(
-                    QuestionResultDetail(
-                        question_id=question["id"],
-                        topic_name=topic["name"],
-                        category_name=category["name"],
-                        difficulty=question["difficulty"],
-                        is_correct=is_correct,
-                        user_answer=user_answer,
-                        correct_answer=correct_answer,
-                        question_type=question["question_type"],
-                    )
-                )
-
-            module_results.append(
-                ModuleResultDetail(
-                    module_type=module["module_type"],
-                    module_number=module["module_number"],
-                    raw_score=module.get("raw_score", 0),
-                    total_questions=len(question_results),
-                    correct_count=correct_in_module,
-                    questions=question_results,
-                )
-            )
-
-        # Calculate category performance
-        category_performance = [
-            CategoryPerformance(
-                category_name=stats["category_name"],
-                section=stats["section"],
-                total_questions=stats["total"],
-                correct_answers=stats["correct"],
-                percentage=(stats["correct"] / stats["total"] * 100)
-                if stats["total"] > 0
-                else 0,
-            )
-            for stats in category_stats.values()
-        ]
+        service = MockExamService(db)
+        return await service.get_exam_results(exam_id=exam_id, user_id=user_id)
 
-        overall_percentage = (
-            (total_correct / total_questions * 100) if total_questions > 0 else 0
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail=str(e)
         )
-
-        return {
-            "exam": exam,
-            "modules": module_results,
-            "category_performance": category_performance,
-            "total_questions": total_questions,
-            "total_correct": total_correct,
-            "overall_percentage": overall_percentage,
-        }
-
-    except HTTPException:
-        raise
     except Exception as e:
         import traceback
         error_detail = f"Failed to retrieve exam results: {str(e)}\n{traceback.format_exc()}"
@@ -21,6 +21,8 @@ from app.services.answer_validation_service import AnswerValidationService
 from app.services.openai_service import openai_service
 from app.services.bkt_service import BKTService
 from app.services.analytics_service import AnalyticsService
+from app.services.profile_service import invalidate_profile_cache
+from app.services.request_loader import RequestLoader, get_request_loader
 from app.core.auth import get_current_user, get_authenticated_client
 
 
@@ -183,6 +185,8 @@ async def submit_answer(
         db.table("session_questions").update(update_data).eq(
             "id", sq["id"]
         ).execute()
+        # Questions answered on the profile
+        invalidate_profile_cache(user_id)
         
         # Update BKT mastery for this skill
         mastery_update = None
@@ -262,7 +266,7 @@ async def get_question_feedback(
 
         # Get session question with all details
         sq_response = db.table("session_questions").select(
-            "*, questions(id, stem, question_type, correct_answer, rationale), topics(name)"
+            "*, questions(id, stem, question_type, correct_answer, acceptable_answers, rationale), topics(name)"
         ).eq("session_id", session_id).eq("question_id", question_id).execute()
 
         if not sq_response.data:
@@ -288,7 +292,9 @@ async def get_question_feedback(
         # Determine if answer is correct
         user_answer = sq["user_answer"] or []
         correct_answer = question["correct_answer"] or []
-        is_correct = sorted(user_answer) == sorted(correct_answer)
+        is_correct = AnswerValidationService.validate_answer(
+            user_answer, correct_answer, question.get("acceptable_answers")
+        )
 
         # Generate feedback using OpenAI
         feedback_dict = await openai_service.generate_answer_feedback(
@@ -359,7 +365,7 @@ async def generate_session_feedback(
 
         # Get all answered questions in session (or specific ones if provided)
         query = db.table("session_questions").select(
-            "*, questions(id, stem, question_type, correct_answer, rationale), topics(name)"
+            "*, questions(id, stem, question_type, correct_answer, acceptable_answers, rationale), topics(name)"
         ).eq("session_id", session_id).eq("status", "answered")
 
         if request.question_ids:
@@ -405,7 +411,9 @@ async def generate_session_feedback(
             # Determine if answer is correct
             user_answer = sq["user_answer"] or []
             correct_answer = question["correct_answer"] or []
-            is_correct = sorted(user_answer) == sorted(correct_answer)
+            is_correct = AnswerValidationService.validate_answer(
+                user_answer, correct_answer, question.get("acceptable_answers")
+            )
 
             # Generate feedback using OpenAI
             feedback_dict = await openai_service.generate_answer_feedback(
@@ -483,7 +491,7 @@ async def generate_session_summary(
         
         # Get all session questions with details
         sq_response = db.table("session_questions").select(
-            "*, questions(id, stem, question_type, correct_answer, topic_id), topics(id, name)"
+            "*, questions(id, stem, question_type, correct_answer, acceptable_answers, topic_id), topics(id, name)"
         ).eq("session_id", session_id).execute()
         
         if not sq_response.data:
@@ -520,7 +528,9 @@ async def generate_session_summary(
                 # Check correctness
                 user_answer = sq.get("user_answer") or []
                 correct_answer = question.get("correct_answer") or []
-                is_correct = sorted(user_answer) == sorted(correct_answer)
+                is_correct = AnswerValidationService.validate_answer(
+                    user_answer, correct_answer, question.get("acceptable_answers")
+                )
                 
                 if is_correct:
                     correct_count += 1
@@ -675,6 +685,8 @@ async def complete_session(
             "status": "completed",
             "completed_at": "now()"
         }).eq("id", session_id).execute()
+        # Practice sessions on the profile
+        invalidate_profile_cache(user_id)
         
         # Create performance snapshot with validated session_id
         analytics_service = AnalyticsService(db)
@@ -1295,7 +1307,8 @@ async def add_similar_question(
 async def get_wrong_answers(
     limit: int = Query(50, description="Maximum number of wrong answers to return", ge=1, le=100),
     user_id: str = Depends(get_current_user),
-    db: Client = Depends(get_authenticated_client)
+    db: Client = Depends(get_authenticated_client),
+    loader: RequestLoader = Depends(get_request_loader)
 ):
     """
     Get questions that the user answered incorrectly across all practice sessions.
@@ -1304,26 +1317,17 @@ async def get_wrong_answers(
         limit: Maximum number of wrong answers to return
         user_id: User ID from authentication token
         db: Database client
+        loader: Request-scoped lookups (the user's sessions, topics)
         
     Returns:
         List of questions answered incorrectly with session context
     """
     try:
-        # Get the user's study plans (there might be multiple)
-        study_plan_response = db.table("study_plans").select("id").eq("user_id", user_id).order("created_at", desc=True).execute()
-        if not study_plan_response.data:
+        # Sessions across all of the user's study plans (in case they have multiple)
+        user_session_ids = loader.session_ids(user_id)
+        if not user_session_ids:
             return []
 
-        # Use all study plans for this user (in case they have multiple)
-        study_plan_ids = [sp["id"] for sp in study_plan_response.data]
-
-        # Get sessions that belong to these study plans
-        sessions_response = db.table("practice_sessions").select("id").in_("study_plan_id", study_plan_ids).execute()
-        if not sessions_response.data:
-            return []
-
-        user_session_ids = [s["id"] for s in sessions_response.data]
-
         # Get wrong answers from session_questions for user's sessions only
         wrong_answers_response = db.table("session_questions").select(
             "*"
@@ -1347,28 +1351,25 @@ async def get_wrong_answers(
             questions_response = db.table("questions").select("*").in_("id", question_ids).execute()
             questions_map = {q["id"]: q for q in questions_response.data} if questions_response.data else {}
 
-        # Fetch topics with categories
-        if topic_ids:
-            topics_response = db.table("topics").select("*, categories(name, section)").in_("id", topic_ids).execute()
-            if topics_response.data:
-                for topic in topics_response.data:
-                    topics_map[topic["id"]] = {
-                        "id": topic["id"],
-                        "name": topic.get("name"),
-                        "category_name": topic.get("categories", {}).get("name") if topic.get("categories") else None,
-                        "section": topic.get("categories", {}).get("section") if topic.get("categories") else None
-                    }
-
-        # Fetch sessions (without study_plans join since it doesn't have a name column)
-        if session_ids:
-            sessions_response = db.table("practice_sessions").select("*").in_("id", session_ids).execute()
-            if sessions_response.data:
-                for session in sessions_response.data:
-                    sessions_map[session["id"]] = {
-                        "id": session["id"],
-                        "created_at": session.get("created_at"),
-                        "study_plan_name": None  # study_plans table doesn't have a name column
-                    }
+        # Topics with categories
+        for topic in loader.topics(topic_ids).values():
+            topics_map[topic["id"]] = {
+                "id": topic["id"],
+                "name": topic.get("name"),
+                "category_name": topic.get("categories", {}).get("name") if topic.get("categories") else None,
+                "section": topic.get("categories", {}).get("section") if topic.get("categories") else None
+            }
+
+        # Sessions were already loaded with the user's session ids
+        user_sessions = loader.sessions_by_id(user_id)
+        for session_id in session_ids:
+            session = user_sessions.get(session_id)
+            if session:
+                sessions_map[session_id] = {
+                    "id": session["id"],
+                    "created_at": session.get("created_at"),
+                    "study_plan_name": None  # study_plans table doesn't have a name column
+                }
         
         # Format the response
         wrong_answers = []
@@ -1426,7 +1427,8 @@ async def get_wrong_answers(
 async def get_saved_questions(
     limit: int = Query(50, description="Maximum number of saved questions to return", ge=1, le=100),
     user_id: str = Depends(get_current_user),
-    db: Client = Depends(get_authenticated_client)
+    db: Client = Depends(get_authenticated_client),
+    loader: RequestLoader = Depends(get_request_loader)
 ):
     """
     Get questions that the user has saved/bookmarked for review.
@@ -1435,26 +1437,17 @@ async def get_saved_questions(
         limit: Maximum number of saved questions to return
         user_id: User ID from authentication token
         db: Database client
+        loader: Request-scoped lookups (the user's sessions, topics)
 
     Returns:
         List of saved questions with session context
     """
     try:
-        # Get ALL the user's study plans (user can have multiple)
-        study_plan_response = db.table("study_plans").select("id").eq("user_id", user_id).order("created_at", desc=True).execute()
-        if not study_plan_response.data:
+        # Sessions across ALL the user's study plans (user can have multiple)
+        user_session_ids = loader.session_ids(user_id)
+        if not user_session_ids:
             return []
 
-        # Use all study plans for this user
-        study_plan_ids = [sp["id"] for sp in study_plan_response.data]
-
-        # Get sessions that belong to ALL these study plans
-        sessions_response = db.table("practice_sessions").select("id").in_("study_plan_id", study_plan_ids).execute()
-        if not sessions_response.data:
-            return []
-
-        user_session_ids = [s["id"] for s in sessions_response.data]
-
         # Get saved questions from session_questions for user's sessions only
         saved_questions_response = db.table("session_questions").select(
             "*"
@@ -1478,28 +1471,25 @@ async def get_saved_questions(
             questions_response = db.table("questions").select("*").in_("id", question_ids).execute()
             questions_map = {q["id"]: q for q in questions_response.data} if questions_response.data else {}
 
-        # Fetch topics with categories
-        if topic_ids:
-            topics_response = db.table("topics").select("*, categories(name, section)").in_("id", topic_ids).execute()
-            if topics_response.data:
-                for topic in topics_response.data:
-                    topics_map[topic["id"]] = {
-                        "id": topic["id"],
-                        "name": topic.get("name"),
-                        "category_name": topic.get("categories", {}).get("name") if topic.get("categories") else None,
-                        "section": topic.get("categories", {}).get("section") if topic.get("categories") else None
-                    }
-
-        # Fetch sessions (without study_plans join since it doesn't have a name column)
-        if session_ids:
-            sessions_response = db.table("practice_sessions").select("*").in_("id", session_ids).execute()
-            if sessions_response.data:
-                for session in sessions_response.data:
-                    sessions_map[session["id"]] = {
-                        "id": session["id"],
-                        "created_at": session.get("created_at"),
-                        "study_plan_name": None  # study_plans table doesn't have a name column
-                    }
+        # Topics with categories
+        for topic in loader.topics(topic_ids).values():
+            topics_map[topic["id"]] = {
+                "id": topic["id"],
+                "name": topic.get("name"),
+                "category_name": topic.get("categories", {}).get("name") if topic.get("categories") else None,
+                "section": topic.get("categories", {}).get("section") if topic.get("categories") else None
+            }
+
+        # Sessions were already loaded with the user's session ids
+        user_sessions = loader.sessions_by_id(user_id)
+        for session_id in session_ids:
+            session = user_sessions.get(session_id)
+            if session:
+                sessions_map[session_id] = {
+                    "id": session["id"],
+                    "created_at": session.get("created_at"),
+                    "study_plan_name": None  # study_plans table doesn't have a name column
+                }
 
         # Format the response
         saved_questions = []
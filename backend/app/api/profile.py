@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from typing import Optional, List
+from typing import Optional, List, Tuple
 from datetime import date, datetime, timedelta
 from uuid import UUID
 import logging
@@ -14,7 +14,7 @@ from ..models.profile import (
     UserProfileStats,
     ProfileResponse
 )
-from ..core.auth import get_current_user, get_authenticated_client
+from ..core.auth import get_current_user, get_current_user_and_token, get_authenticated_client
 from ..services.profile_service import ProfileService
 from ..services.achievement_service import AchievementService
 from ..services.streak_service import StreakService
@@ -33,36 +33,14 @@ async def get_user_profile(
     Get complete user profile including preferences, streak, stats, and recent achievements
     """
     service = ProfileService(supabase)
-
-    # Get base profile
-    profile = await service.get_user_profile(user_id)
-    if not profile:
+    overview = await service.get_profile_overview(user_id)
+    if not overview:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User profile not found"
         )
 
-    # Get preferences
-    preferences = await service.get_user_preferences(user_id)
-
-    # Get streak
-    streak_service = StreakService(supabase)
-    streak = await streak_service.get_user_streak(user_id)
-
-    # Get stats
-    stats = await service.get_user_stats(user_id)
-
-    # Get recent achievements
-    achievement_service = AchievementService(supabase)
-    recent_achievements = await achievement_service.get_recent_achievements(user_id, limit=5)
-
-    return ProfileResponse(
-        profile=profile,
-        preferences=preferences,
-        streak=streak,
-        stats=stats,
-        recent_achievements=recent_achievements
-    )
+    return overview
 
 
 @router.patch("/profile", response_model=UserProfile)
@@ -108,12 +86,13 @@ async def update_user_profile(
 @router.post("/profile/photo")
 async def upload_profile_photo(
     file: UploadFile = File(...),
-    user_id: str = Depends(get_current_user),
+    user_and_token: Tuple[str, str] = Depends(get_current_user_and_token),
     supabase=Depends(get_authenticated_client)
 ):
     """
     Upload user profile photo
     """
+    user_id, token = user_and_token
     try:
         # Validate file type
         allowed_types = ["image/jpeg", "image/jpg", "image/png", "image/webp"]
@@ -123,23 +102,16 @@ async def upload_profile_photo(
                 detail="Invalid file type. Only JPEG, PNG, and WebP are allowed."
             )
 
-        # Read file content to check size
-        content = await file.read()
-        file_size = len(content)
-        
-        # Validate file size (max 5MB)
-        if file_size > 5 * 1024 * 1024:
+        # Validate file size (max 5MB) without reading the upload into memory
+        if file.size is not None and file.size > 5 * 1024 * 1024:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="File too large. Maximum size is 5MB."
             )
 
-        # Reset file pointer and update file object
-        await file.seek(0)
-
         service = ProfileService(supabase)
         try:
-            file_url = await service.upload_profile_photo(user_id, file)
+            file_url = await service.upload_profile_photo(user_id, file, access_token=token)
             if not file_url:
                 logger.error(f"Failed to upload profile photo for user {user_id}: Invalid file or upload failed")
                 raise HTTPException(
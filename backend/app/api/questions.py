@@ -3,9 +3,12 @@ Question Pool API
 Endpoints for browsing questions in the question bank (user-facing)
 """
 
+import asyncio
+
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from supabase import Client
 from app.core.auth import get_current_user, get_authenticated_client
+from app.services.question_search import QuestionSearchService
 from typing import List, Dict, Optional, Any
 from pydantic import BaseModel
 
@@ -33,6 +36,10 @@ class QuestionPoolResponse(BaseModel):
     limit: int
     offset: int
     has_more: bool
+    # Searches only: 'exact' (every word matched) or 'fuzzy' (similar words),
+    # and whether total stopped at the most matches a search ranks
+    match_type: Optional[str] = None
+    total_capped: bool = False
 
 
 @router.get("/browse")
@@ -41,7 +48,7 @@ async def browse_questions(
     difficulty: Optional[str] = Query(None, description="Filter by difficulty (E/M/H)"),
     topic_id: Optional[str] = Query(None, description="Filter by topic ID"),
     category_id: Optional[str] = Query(None, description="Filter by category ID"),
-    search: Optional[str] = Query(None, description="Search in question stem"),
+    search: Optional[str] = Query(None, description="Search stem, passage and explanation text"),
     limit: int = Query(20, description="Number of results per page", ge=1, le=100),
     offset: int = Query(0, description="Offset for pagination", ge=0),
     user_id: str = Depends(get_current_user),
@@ -51,13 +58,38 @@ async def browse_questions(
     Browse questions from the question bank.
     User-facing endpoint (not admin).
     
-    Returns active questions only with topic and category info.
+    Returns active questions only with topic and category info. With a
+    search, results are ranked by relevance and each has a highlighted
+    snippet (see app/services/question_search.py).
     """
     try:
-        # Build query - get active questions with topic info
+        if search and search.strip():
+            result = await asyncio.to_thread(
+                QuestionSearchService(db).search,
+                search,
+                section=section,
+                difficulty=difficulty,
+                topic_id=topic_id,
+                category_id=category_id,
+                limit=limit,
+                offset=offset
+            )
+            return QuestionPoolResponse(
+                questions=result['questions'],
+                total=result['total'],
+                limit=limit,
+                offset=offset,
+                has_more=offset + len(result['questions']) < result['total'],
+                match_type=result['match_type'],
+                total_capped=result['total_capped']
+            )
+
+        # Build query - get active questions with topic info, counted in the
+        # same request (the count follows the section and category joins)
         query = db.table('questions').select(
             'id, stem, stimulus, difficulty, question_type, answer_options, correct_answer, rationale, topic_id, '
-            'topics!inner(id, name, category_id, categories!inner(id, name, section))'
+            'topics!inner(id, name, category_id, categories!inner(id, name, section))',
+            count='exact'
         ).eq('is_active', True)
         
         # Apply section filter via join
@@ -76,11 +108,6 @@ async def browse_questions(
         if category_id:
             query = query.eq('topics.category_id', category_id)
         
-        # Apply search filter
-        if search:
-            search_pattern = f"%{search}%"
-            query = query.ilike('stem', search_pattern)
-        
         # Execute query with pagination
         result = query.order('difficulty').range(offset, offset + limit - 1).execute()
         questions = result.data
@@ -111,20 +138,7 @@ async def browse_questions(
                 } if category else None,
             })
         
-        # Get total count with same filters
-        count_query = db.table('questions').select('id', count='exact').eq('is_active', True)
-        
-        if difficulty:
-            count_query = count_query.eq('difficulty', difficulty)
-        if topic_id:
-            count_query = count_query.eq('topic_id', topic_id)
-        if search:
-            count_query = count_query.ilike('stem', f"%{search}%")
-        
-        # Note: section and category filters through joins work differently for count
-        # For simplicity, use length of filtered results as approximate count
-        count_result = count_query.execute()
-        total_count = count_result.count if hasattr(count_result, 'count') and count_result.count else len(count_result.data)
+        total_count = result.count if result.count is not None else offset + len(formatted_questions)
         
         return QuestionPoolResponse(
             questions=formatted_questions,
@@ -6,6 +6,8 @@ from app.models.study_plan import (
     StudyPlanResponse,
     CategoriesAndTopicsResponse,
 )
+from app.services.learner_analytics_service import invalidate_learner_analytics
+from app.services.profile_service import invalidate_profile_cache
 from app.services.study_plan_service import StudyPlanService
 from app.core.auth import get_current_user, get_authenticated_client
 
@@ -167,6 +169,8 @@ async def delete_study_plan(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="No active study plan found"
             )
+        invalidate_learner_analytics(user_id)
+        invalidate_profile_cache(user_id)
 
     except HTTPException:
         raise
@@ -1,13 +1,55 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from supabase import Client
 from pydantic import BaseModel, Field
-from typing import Optional, List, Literal
+from typing import Optional, List, Literal, Dict, Any
 from uuid import UUID
+import re
 from app.core.auth import get_current_user, get_authenticated_client
 from app.services.vocabulary_service import vocabulary_service
 
 router = APIRouter(prefix="/vocabulary", tags=["vocabulary"])
 
+# Words per bulk add request, and rows per upsert / lookup statement
+MAX_BULK_WORDS = 1000
+BULK_CHUNK_SIZE = 200
+
+
+def _normalize_word(word: str) -> str:
+    """Lower case, whitespace trimmed and collapsed, as the word_norm column (migration 044)"""
+    return " ".join(word.split()).lower()
+
+
+def _prefix_pattern(search: str) -> str:
+    """LIKE pattern for words starting with the search text (LIKE wildcards in it are dropped)"""
+    return re.sub(r"[%_*\\]", "", _normalize_word(search)) + "%"
+
+
+def _add_word(db: Client, row: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Insert a word unless the user already has it: one INSERT ... ON CONFLICT
+    DO NOTHING on the unique (user_id, word_norm) index.
+
+    Raises:
+        HTTPException: 400 if the word is blank, 409 if it already exists
+    """
+    if not row["word"]:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Word cannot be blank"
+        )
+
+    result = db.table("vocabulary_words").upsert(
+        row, on_conflict="user_id,word_norm", ignore_duplicates=True
+    ).execute()
+
+    if not result.data:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Word '{row['word']}' already exists in your vocabulary"
+        )
+
+    return result.data[0]
+
 
 # Request/Response Models
 class VocabularyWord(BaseModel):
@@ -51,6 +93,22 @@ class AddVocabFromPopularRequest(BaseModel):
     example_usage: Optional[str] = None
 
 
+class BulkVocabWord(BaseModel):
+    word: str = Field(..., min_length=1, max_length=100)
+    definition: Optional[str] = None
+    example_usage: Optional[str] = None
+
+
+class BulkAddVocabRequest(BaseModel):
+    words: List[BulkVocabWord] = Field(..., min_length=1, max_length=MAX_BULK_WORDS)
+
+
+class BulkAddVocabResponse(BaseModel):
+    added: List[VocabularyWord]
+    already_saved: List[str]
+    missing_definition: List[str]
+
+
 class UpdateVocabRequest(BaseModel):
     is_mastered: Optional[bool] = None
     definition: Optional[str] = None
@@ -73,7 +131,7 @@ async def get_user_vocabulary(
     db: Client = Depends(get_authenticated_client),
     mastered: Optional[bool] = Query(None, description="Filter by mastered status"),
     source: Optional[Literal["practice_session", "manual", "suggested"]] = Query(None, description="Filter by source"),
-    search: Optional[str] = Query(None, description="Search by word"),
+    search: Optional[str] = Query(None, description="Words starting with this text"),
     limit: int = Query(50, ge=1, le=100),
     offset: int = Query(0, ge=0)
 ):
@@ -81,7 +139,7 @@ async def get_user_vocabulary(
     Get the user's vocabulary words with optional filters.
     """
     try:
-        query = db.table("vocabulary_words").select("*", count="exact").eq("user_id", user_id)
+        query = db.table("vocabulary_words").select("*", count="estimated").eq("user_id", user_id)
         
         if mastered is not None:
             query = query.eq("is_mastered", mastered)
@@ -90,7 +148,8 @@ async def get_user_vocabulary(
             query = query.eq("source", source)
         
         if search:
-            query = query.ilike("word", f"%{search}%")
+            # Prefix range scan on the (user_id, word_norm) index
+            query = query.like("word_norm", _prefix_pattern(search))
         
         result = query.order("created_at", desc=True).range(offset, offset + limit - 1).execute()
         
@@ -116,32 +175,14 @@ async def add_vocab_manually(
     Add a new vocabulary word manually with user-provided definition.
     """
     try:
-        # Check if word already exists for this user (case-insensitive)
-        existing = db.table("vocabulary_words").select("id").eq("user_id", user_id).ilike("word", request.word).execute()
-        
-        if existing.data and len(existing.data) > 0:
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail=f"Word '{request.word}' already exists in your vocabulary"
-            )
-        
-        # Insert new vocabulary word
-        result = db.table("vocabulary_words").insert({
+        return _add_word(db, {
             "user_id": user_id,
-            "word": request.word.strip().lower(),
+            "word": _normalize_word(request.word),
             "definition": request.definition,
             "example_usage": request.example_usage,
             "source": "manual",
             "is_mastered": False
-        }).execute()
-        
-        if not result.data or len(result.data) == 0:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to create vocabulary word"
-            )
-        
-        return result.data[0]
+        })
         
     except HTTPException:
         raise
@@ -162,13 +203,16 @@ async def add_vocab_from_selection(
     Add a vocabulary word from text selection with AI-generated definition.
     """
     try:
-        # Check if word already exists for this user
-        existing = db.table("vocabulary_words").select("id").eq("user_id", user_id).ilike("word", request.word).execute()
+        word = _normalize_word(request.word)
+
+        # Skip the AI call for a word the user already has (a unique index lookup);
+        # the insert below still settles concurrent adds
+        existing = db.table("vocabulary_words").select("id").eq("user_id", user_id).eq("word_norm", word).execute()
         
-        if existing.data and len(existing.data) > 0:
+        if existing.data:
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
-                detail=f"Word '{request.word}' already exists in your vocabulary"
+                detail=f"Word '{word}' already exists in your vocabulary"
             )
         
         # Generate definition using AI
@@ -177,25 +221,16 @@ async def add_vocab_from_selection(
             context_sentence=request.context_sentence
         )
         
-        # Insert new vocabulary word
-        result = db.table("vocabulary_words").insert({
+        return _add_word(db, {
             "user_id": user_id,
-            "word": request.word.strip().lower(),
+            "word": word,
             "definition": ai_result.get("definition", "Definition not available"),
             "example_usage": ai_result.get("example_usage"),
             "context_sentence": request.context_sentence,
             "session_question_id": str(request.session_question_id) if request.session_question_id else None,
             "source": "practice_session",
             "is_mastered": False
-        }).execute()
-        
-        if not result.data or len(result.data) == 0:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to create vocabulary word"
-            )
-        
-        return result.data[0]
+        })
         
     except HTTPException:
         raise
@@ -216,32 +251,14 @@ async def add_vocab_from_popular(
     Add a vocabulary word from the popular SAT vocab list.
     """
     try:
-        # Check if word already exists for this user
-        existing = db.table("vocabulary_words").select("id").eq("user_id", user_id).ilike("word", request.word).execute()
-        
-        if existing.data and len(existing.data) > 0:
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail=f"Word '{request.word}' already exists in your vocabulary"
-            )
-        
-        # Insert new vocabulary word
-        result = db.table("vocabulary_words").insert({
+        return _add_word(db, {
             "user_id": user_id,
-            "word": request.word.strip().lower(),
+            "word": _normalize_word(request.word),
             "definition": request.definition,
             "example_usage": request.example_usage,
             "source": "suggested",
             "is_mastered": False
-        }).execute()
-        
-        if not result.data or len(result.data) == 0:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to create vocabulary word"
-            )
-        
-        return result.data[0]
+        })
         
     except HTTPException:
         raise
@@ -252,6 +269,76 @@ async def add_vocab_from_popular(
         )
 
 
+@router.post("/bulk", response_model=BulkAddVocabResponse)
+async def add_vocab_bulk(
+    request: BulkAddVocabRequest,
+    user_id: str = Depends(get_current_user),
+    db: Client = Depends(get_authenticated_client)
+):
+    """
+    Import a word list. Words without a definition take the popular SAT vocab
+    one; words the user already has are left unchanged.
+    """
+    try:
+        # First occurrence of each word wins
+        entries: Dict[str, BulkVocabWord] = {}
+        for entry in request.words:
+            word = _normalize_word(entry.word)
+            if word and word not in entries:
+                entries[word] = entry
+
+        # Definitions for the rest from the popular list, a chunk of words per lookup
+        undefined = [word for word, entry in entries.items() if not (entry.definition or "").strip()]
+        popular: Dict[str, Dict[str, Any]] = {}
+        for i in range(0, len(undefined), BULK_CHUNK_SIZE):
+            result = db.table("popular_sat_vocab").select("word_norm, definition, example_usage").in_(
+                "word_norm", undefined[i:i + BULK_CHUNK_SIZE]
+            ).execute()
+            popular.update({row["word_norm"]: row for row in result.data or []})
+
+        rows = []
+        missing_definition = []
+        for word, entry in entries.items():
+            if (entry.definition or "").strip():
+                definition, example_usage, source = entry.definition, entry.example_usage, "manual"
+            elif word in popular:
+                definition = popular[word]["definition"]
+                example_usage = entry.example_usage or popular[word].get("example_usage")
+                source = "suggested"
+            else:
+                missing_definition.append(word)
+                continue
+            rows.append({
+                "user_id": user_id,
+                "word": word,
+                "definition": definition,
+                "example_usage": example_usage,
+                "source": source,
+                "is_mastered": False
+            })
+
+        # Existing words are skipped by the unique (user_id, word_norm) index
+        added = []
+        for i in range(0, len(rows), BULK_CHUNK_SIZE):
+            result = db.table("vocabulary_words").upsert(
+                rows[i:i + BULK_CHUNK_SIZE], on_conflict="user_id,word_norm", ignore_duplicates=True
+            ).execute()
+            added.extend(result.data or [])
+
+        added_words = {row["word"] for row in added}
+        return BulkAddVocabResponse(
+            added=added,
+            already_saved=[row["word"] for row in rows if row["word"] not in added_words],
+            missing_definition=missing_definition
+        )
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to add vocabulary words: {str(e)}"
+        )
+
+
 @router.patch("/{word_id}", response_model=VocabularyWord)
 async def update_vocab_word(
     word_id: UUID,
@@ -331,7 +418,7 @@ async def get_popular_vocabulary(
     user_id: str = Depends(get_current_user),
     db: Client = Depends(get_authenticated_client),
     difficulty: Optional[Literal["E", "M", "H"]] = Query(None, description="Filter by difficulty"),
-    search: Optional[str] = Query(None, description="Search by word"),
+    search: Optional[str] = Query(None, description="Words starting with this text"),
     limit: int = Query(30, ge=1, le=100),
     offset: int = Query(0, ge=0)
 ):
@@ -339,13 +426,13 @@ async def get_popular_vocabulary(
     Get popular SAT vocabulary words.
     """
     try:
-        query = db.table("popular_sat_vocab").select("*", count="exact")
+        query = db.table("popular_sat_vocab").select("*", count="estimated")
         
         if difficulty is not None:
             query = query.eq("difficulty_level", difficulty)
         
         if search:
-            query = query.ilike("word", f"%{search}%")
+            query = query.like("word_norm", _prefix_pattern(search))
         
         result = query.order("frequency_rank").range(offset, offset + limit - 1).execute()
         
@@ -31,6 +31,75 @@ class Settings(BaseSettings):
     # When empty (Railway deployment), manim routes work directly
     manim_service_url: str = Field(default="", env="MANIM_SERVICE_URL")
 
+    # Manim worker pool (local rendering)
+    # Workers pre-import manim once and are recycled after N jobs or on memory growth.
+    # Set pool size to 0 to fall back to one `manim render` subprocess per attempt.
+    manim_worker_pool_size: int = Field(default=2, env="MANIM_WORKER_POOL_SIZE")
+    manim_worker_max_jobs: int = Field(default=20, env="MANIM_WORKER_MAX_JOBS")
+    manim_worker_max_rss_growth_mb: int = Field(default=512, env="MANIM_WORKER_MAX_RSS_GROWTH_MB")
+    manim_render_timeout: int = Field(default=120, env="MANIM_RENDER_TIMEOUT")
+
+    # Shared TTS audio cache for voiceovers (see app/services/tts_cache.py)
+    # Local disk LRU capped at tts_cache_max_mb (0 disables the cache);
+    # set tts_cache_bucket to also keep audio in a Supabase Storage bucket.
+    tts_cache_dir: str = Field(default="", env="TTS_CACHE_DIR")
+    tts_cache_max_mb: int = Field(default=512, env="TTS_CACHE_MAX_MB")
+    tts_cache_bucket: str = Field(default="", env="TTS_CACHE_BUCKET")
+
+    # Pre-assembled mock exam forms (see MockExamService.replenish_form_pool)
+    # Unclaimed forms kept per section and difficulty tier; a tier is refilled
+    # once it drops below the low-water mark.
+    mock_exam_form_pool_target: int = Field(default=20, env="MOCK_EXAM_FORM_POOL_TARGET")
+    mock_exam_form_pool_low_water: int = Field(default=10, env="MOCK_EXAM_FORM_POOL_LOW_WATER")
+
+    # Durable background jobs (see app/services/job_queue.py, run with `python -m app.worker`)
+    job_worker_concurrency: int = Field(default=4, env="JOB_WORKER_CONCURRENCY")
+    job_poll_interval_seconds: float = Field(default=1.0, env="JOB_POLL_INTERVAL_SECONDS")
+    job_lease_seconds: int = Field(default=300, env="JOB_LEASE_SECONDS")
+
+    # IRT calibration (see app/services/irt_calibration_service.py)
+    # Responses an item needs before its parameters are marked calibrated
+    irt_min_responses: int = Field(default=30, env="IRT_MIN_RESPONSES")
+
+    # Adaptive diagnostic tests (see app/services/adaptive_testing.py)
+    # A section stops once the ability SE is at or below the threshold (after
+    # the minimum number of items) or at its fixed-form length. The next item
+    # is drawn from the top_k most informative for exposure control.
+    diagnostic_cat_se_threshold: float = Field(default=0.45, env="DIAGNOSTIC_CAT_SE_THRESHOLD")
+    diagnostic_cat_min_items: int = Field(default=6, env="DIAGNOSTIC_CAT_MIN_ITEMS")
+    diagnostic_cat_top_k: int = Field(default=10, env="DIAGNOSTIC_CAT_TOP_K")
+
+    # Mock exam answer autosave (see app/services/answer_buffer.py)
+    # Seconds between bulk writes of buffered answer saves; 0 writes every
+    # save through. Only enable where one long-lived process serves exams.
+    answer_buffer_flush_seconds: float = Field(default=0.0, env="ANSWER_BUFFER_FLUSH_SECONDS")
+
+    # Composite /profile response cache (see ProfileService.get_profile_overview)
+    # Per process; writes through the profile, streak, achievement, snapshot
+    # and study plan services invalidate it. 0 disables caching.
+    profile_cache_ttl_seconds: int = Field(default=30, env="PROFILE_CACHE_TTL_SECONDS")
+
+    # Dashboard analytics cache (see app/services/learner_analytics_service.py)
+    # Per process and versioned by the user's last mastery update and latest
+    # snapshot; the TTL bounds staleness from study plan changes made through
+    # other processes. 0 disables caching.
+    learner_analytics_cache_ttl_seconds: int = Field(default=300, env="LEARNER_ANALYTICS_CACHE_TTL_SECONDS")
+
+    # Query counting (see app/core/query_count.py)
+    # Adds an X-Query-Count header (database requests made while serving the
+    # request) to every response, to catch N+1 regressions. Always on in debug.
+    query_count_header: bool = Field(default=False, env="QUERY_COUNT_HEADER")
+
+    # Population percentiles (see app/services/population_index.py)
+    # Seconds between reloads of the stored digests in each process; rebuild
+    # them with scripts/rebuild_population_index.py (cron) or its job.
+    population_index_refresh_seconds: int = Field(default=600, env="POPULATION_INDEX_REFRESH_SECONDS")
+
+    # Question pool search cache (see app/services/question_search.py)
+    # Top results of recent queries, per process; admin edits through this
+    # process clear it, edits elsewhere show up within the TTL. 0 disables caching.
+    question_search_cache_ttl_seconds: int = Field(default=300, env="QUESTION_SEARCH_CACHE_TTL_SECONDS")
+
     @field_validator("manim_service_url")
     @classmethod
     def validate_manim_service_url(cls, v: str) -> str:
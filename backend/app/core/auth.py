@@ -3,6 +3,7 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from supabase import Client, create_client
 from app.db import get_db
 from app.config import get_settings
+from app.core.query_count import track_queries
 from typing import Optional, Tuple
 
 security = HTTPBearer()
@@ -87,7 +88,7 @@ async def get_authenticated_client(
     # Set the auth token for this client
     client.postgrest.auth(token)
 
-    return client
+    return track_queries(client)
 
 
 async def get_current_user_optional(
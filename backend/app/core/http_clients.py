@@ -0,0 +1,187 @@
+"""Shared, long-lived HTTP clients for outbound calls.
+
+Opening an `httpx.AsyncClient` per request meant a fresh TCP + TLS handshake
+on every proxied Manim call and every Discord webhook. These clients are
+created once per process (lazily, so serverless cold starts still work),
+keep connections alive between requests, negotiate HTTP/2 when `h2` is
+installed and are closed on application shutdown.
+
+The Railway upstream is guarded by a circuit breaker: after repeated
+connection failures or 5xx responses, calls fail fast for a cool-down period
+instead of tying up requests until they time out.
+"""
+
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+
+# HTTP/2 is optional (requires httpx[http2]); fall back to HTTP/1.1 keep-alive
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Per-route timeouts (seconds)
+MANIM_GENERATE_TIMEOUT = 300.0
+MANIM_LIST_TIMEOUT = 30.0
+MANIM_VIDEO_TIMEOUT = 60.0
+WEBHOOK_TIMEOUT = 5.0
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because the upstream's circuit is open"""
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker (closed -> open -> half-open -> closed)"""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.times_opened = 0
+        # Start of the half-open trial call, while it is in flight
+        self.probe_started_at: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def check(self) -> None:
+        """Raise CircuitOpenError unless a call may go through
+
+        In half-open state a single trial call is let through and the others
+        fail fast; its result closes or re-opens the circuit. A trial that
+        never reports back (cancelled) is replaced after reset_timeout.
+        """
+        state = self.state
+        if state == "open":
+            retry_in = self.reset_timeout - (time.monotonic() - self.opened_at)
+            raise CircuitOpenError(f"Circuit open, retry in {retry_in:.0f}s")
+        if state == "half-open":
+            now = time.monotonic()
+            if self.probe_started_at is not None and now - self.probe_started_at < self.reset_timeout:
+                raise CircuitOpenError("Circuit half-open, trial request in progress")
+            self.probe_started_at = now
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self.probe_started_at = None
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self.probe_started_at = None
+        if self.state == "half-open" or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+            self.times_opened += 1
+
+
+class _ClientStats:
+    """Request counters collected through httpx event hooks"""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+
+    async def on_request(self, request: httpx.Request) -> None:
+        self.requests += 1
+
+    async def on_response(self, response: httpx.Response) -> None:
+        if response.status_code >= 500:
+            self.errors += 1
+
+
+def _pool_metrics(client: httpx.AsyncClient) -> Dict[str, Any]:
+    """Open/idle connection counts from the client's connection pool"""
+    pool = getattr(client._transport, "_pool", None)
+    connections = list(getattr(pool, "connections", []) or [])
+    return {
+        "open_connections": len(connections),
+        "idle_connections": sum(1 for c in connections if c.is_idle()),
+        "http2_connections": sum(1 for c in connections if "HTTP/2" in c.info()),
+    }
+
+
+class HTTPClients:
+    """Process-wide outbound clients: Railway (Manim proxy) and webhooks"""
+
+    def __init__(self):
+        self.railway_stats = _ClientStats()
+        self.webhook_stats = _ClientStats()
+        self.railway_breaker = CircuitBreaker()
+
+        self.railway = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            follow_redirects=True,
+            timeout=httpx.Timeout(MANIM_LIST_TIMEOUT, connect=10.0),
+            limits=httpx.Limits(
+                max_connections=50,
+                max_keepalive_connections=20,
+                keepalive_expiry=60.0,
+            ),
+            event_hooks={
+                "request": [self.railway_stats.on_request],
+                "response": [self.railway_stats.on_response],
+            },
+        )
+        self.webhooks = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            timeout=WEBHOOK_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=10,
+                max_keepalive_connections=5,
+                keepalive_expiry=60.0,
+            ),
+            event_hooks={
+                "request": [self.webhook_stats.on_request],
+                "response": [self.webhook_stats.on_response],
+            },
+        )
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "http2_available": HTTP2_AVAILABLE,
+            "railway": {
+                "requests": self.railway_stats.requests,
+                "server_errors": self.railway_stats.errors,
+                "circuit_state": self.railway_breaker.state,
+                "circuit_times_opened": self.railway_breaker.times_opened,
+                **_pool_metrics(self.railway),
+            },
+            "webhooks": {
+                "requests": self.webhook_stats.requests,
+                "server_errors": self.webhook_stats.errors,
+                **_pool_metrics(self.webhooks),
+            },
+        }
+
+    async def aclose(self) -> None:
+        await self.railway.aclose()
+        await self.webhooks.aclose()
+
+
+_clients: Optional[HTTPClients] = None
+
+
+def get_http_clients() -> HTTPClients:
+    """Shared clients, created on first use"""
+    global _clients
+    if _clients is None:
+        _clients = HTTPClients()
+    return _clients
+
+
+async def close_http_clients() -> None:
+    """Close shared clients (call from the app's shutdown handler)"""
+    global _clients
+    if _clients is not None:
+        await _clients.aclose()
+        _clients = None
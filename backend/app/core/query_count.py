@@ -0,0 +1,66 @@
+"""Per-request database query counting.
+
+Every Supabase client the app creates gets an httpx request hook on its
+PostgREST session that bumps a counter held in a context variable. The HTTP
+middleware in app.main starts a counter for each request and reports it in an
+X-Query-Count response header, so a handler that starts issuing one query per
+row (N+1) shows up in the browser's network tab rather than in production
+latency. Threads started with asyncio.to_thread or Starlette's threadpool copy
+the context, so queries run there count towards the same request.
+
+Only PostgREST (table/RPC) requests are counted, not auth or storage calls.
+"""
+
+from contextvars import ContextVar, Token
+from typing import List, Optional
+
+from supabase import Client
+
+# One-element list so copies of the context share the same counter
+_counter: ContextVar[Optional[List[int]]] = ContextVar("query_counter", default=None)
+
+
+def _count_query(request) -> None:
+    counter = _counter.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+def _install_hook(postgrest) -> None:
+    hooks = postgrest.session.event_hooks["request"]
+    if _count_query not in hooks:
+        hooks.append(_count_query)
+
+
+def track_queries(client: Client) -> Client:
+    """Install the counting hook on a client's PostgREST session (idempotent)
+
+    supabase-py drops its PostgREST client on sign-in, token refresh and
+    sign-out and builds a new one on next use, so the client's factory is
+    wrapped too: every rebuilt session gets the hook as well.
+    """
+    if not getattr(client, "_query_count_tracked", False):
+        build = client._init_postgrest_client
+
+        def build_tracked(*args, **kwargs):
+            postgrest = build(*args, **kwargs)
+            _install_hook(postgrest)
+            return postgrest
+
+        client._init_postgrest_client = build_tracked
+        client._query_count_tracked = True
+
+    _install_hook(client.postgrest)
+    return client
+
+
+def start_counting() -> Token:
+    """Start a fresh counter for the current request"""
+    return _counter.set([0])
+
+
+def stop_counting(token: Token) -> int:
+    """Stop the current request's counter and return its count"""
+    counter = _counter.get()
+    _counter.reset(token)
+    return counter[0] if counter else 0
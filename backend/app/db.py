@@ -1,5 +1,6 @@
 from supabase import create_client, Client
 from app.config import get_settings
+from app.core.query_count import track_queries
 from functools import lru_cache
 
 
@@ -14,7 +15,20 @@ def get_supabase_client() -> Client:
         settings.supabase_url,
         settings.supabase_anon_key
     )
-    return supabase
+    return track_queries(supabase)
+
+
+@lru_cache()
+def get_service_client() -> Client:
+    """
+    Supabase client authenticated with the service role key.
+    Bypasses RLS - only for background jobs that act on behalf of the system.
+    """
+    settings = get_settings()
+    return track_queries(create_client(
+        settings.supabase_url,
+        settings.supabase_service_role_key
+    ))
 
 
 def get_db() -> Client:
@@ -22,4 +36,5 @@ def get_db() -> Client:
     Dependency function for FastAPI endpoints.
     Returns the Supabase client.
     """
-    return get_supabase_client()
+    # Re-checked per request: auth calls on the shared client rebuild its PostgREST session
+    return track_queries(get_supabase_client())
@@ -1,11 +1,16 @@
-from fastapi import FastAPI, Request
+from fastapi import Depends, FastAPI, HTTPException, Request, status
+from supabase import Client
 from fastapi.middleware.cors import CORSMiddleware
 import os
 import sys
 import time
 import logging
-from app.api import study_plans, practice_sessions, auth, mock_exams, analytics, profile, ai_feedback, diagnostic_test, admin_questions, manim, webhooks, questions, vocabulary
+from app.api import study_plans, practice_sessions, auth, mock_exams, analytics, profile, ai_feedback, diagnostic_test, admin_questions, manim, webhooks, questions, vocabulary, jobs
 from app.config import get_settings
+from app.core.auth import get_current_user, get_authenticated_client, is_admin
+from app.core.http_clients import close_http_clients, get_http_clients
+from app.core.query_count import start_counting, stop_counting
+from app.services.answer_buffer import get_answer_buffer
 
 settings = get_settings()
 
@@ -55,12 +60,18 @@ async def log_requests(request: Request, call_next):
     if request.query_params:
         print(f"  Query params: {dict(request.query_params)}", flush=True)
 
-    # Process request
-    response = await call_next(request)
+    # Process request, counting the database queries it makes
+    query_count = start_counting()
+    try:
+        response = await call_next(request)
+    finally:
+        queries = stop_counting(query_count)
+    if settings.query_count_header or settings.debug:
+        response.headers["X-Query-Count"] = str(queries)
 
     # Log response
     duration = (time.time() - start_time) * 1000
-    print(f"← {response.status_code} {request.url.path} ({duration:.2f}ms)", flush=True)
+    print(f"← {response.status_code} {request.url.path} ({duration:.2f}ms, {queries} queries)", flush=True)
 
     return response
 
@@ -77,6 +88,7 @@ app.include_router(ai_feedback.router, prefix="/api")
 app.include_router(admin_questions.router, prefix="/api")
 app.include_router(questions.router, prefix="/api")
 app.include_router(vocabulary.router, prefix="/api")
+app.include_router(jobs.router, prefix="/api")
 
 # Include manim router
 # If MANIM_SERVICE_URL is set (Vercel), manim router will proxy requests to Railway
@@ -96,6 +108,35 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/health/http-clients")
+async def http_client_metrics(
+    user_id: str = Depends(get_current_user),
+    db: Client = Depends(get_authenticated_client)
+):
+    """Connection-pool and circuit-breaker metrics for outbound HTTP clients (admin only)"""
+    if not await is_admin(user_id, db):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
+    return get_http_clients().metrics()
+
+
+@app.on_event("startup")
+async def startup_event():
+    # Write-behind mock exam autosave, for single long-lived processes only
+    if settings.answer_buffer_flush_seconds > 0:
+        get_answer_buffer().start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    buffer = get_answer_buffer()
+    if buffer.running:
+        await buffer.stop()
+    await close_http_clients()
+
+
 if __name__ == "__main__":
     import uvicorn
 
@@ -10,6 +10,8 @@ import time
 import logging
 from app.api import manim
 from app.config import get_settings
+from app.core.http_clients import close_http_clients
+from app.services.manim_worker_pool import get_manim_worker_pool
 
 # Configure logging
 logging.basicConfig(
@@ -64,9 +66,23 @@ async def startup_event():
     port = os.getenv("PORT", "8000")
     host = os.getenv("API_HOST", "0.0.0.0")
     logger.info(f"🚀 Manim Service API starting on {host}:{port}")
+
+    # Warm render workers so the first request doesn't pay manim's import cost
+    pool = get_manim_worker_pool()
+    if pool is not None:
+        pool.start()
+
     logger.info("✅ Application ready to accept requests")
     print(f"✅ Server listening on {host}:{port}", flush=True)
 
+# Shutdown event - stop warm render workers and close shared HTTP clients
+@app.on_event("shutdown")
+async def shutdown_event():
+    pool = get_manim_worker_pool()
+    if pool is not None:
+        pool.shutdown()
+    await close_http_clients()
+
 # Only include manim router - all other routes handled by Vercel
 app.include_router(manim.router, prefix="/api")
 
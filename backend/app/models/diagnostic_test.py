@@ -11,6 +11,11 @@ class DiagnosticTestStatus(str, Enum):
     COMPLETED = "completed"
 
 
+class DiagnosticTestMode(str, Enum):
+    FIXED = "fixed"
+    ADAPTIVE = "adaptive"
+
+
 class DiagnosticQuestionStatus(str, Enum):
     NOT_STARTED = "not_started"
     ANSWERED = "answered"
@@ -19,7 +24,9 @@ class DiagnosticQuestionStatus(str, Enum):
 
 # Request Models
 class CreateDiagnosticTestRequest(BaseModel):
-    pass  # No parameters needed for creation
+    # Adaptive tests select questions one at a time and stop each section
+    # once the ability estimate is precise enough
+    adaptive: bool = False
 
 
 class SubmitDiagnosticAnswerRequest(BaseModel):
@@ -33,12 +40,17 @@ class DiagnosticTest(BaseModel):
     id: str
     user_id: str
     status: DiagnosticTestStatus
+    mode: DiagnosticTestMode = DiagnosticTestMode.FIXED
     started_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
     total_questions: int = 40
     total_correct: Optional[int] = None
     math_correct: Optional[int] = None
     rw_correct: Optional[int] = None
+    math_ability: Optional[float] = None
+    math_ability_se: Optional[float] = None
+    rw_ability: Optional[float] = None
+    rw_ability_se: Optional[float] = None
     created_at: datetime
     updated_at: datetime
 
@@ -84,6 +96,15 @@ class DiagnosticTestResponse(BaseModel):
     total_questions: int
 
 
+class AdaptiveNextQuestionResponse(BaseModel):
+    section: Literal["math", "reading_writing"]
+    done: bool  # Section finished; question is None
+    ability: float
+    standard_error: float
+    questions_answered: int
+    question: Optional[DiagnosticTestQuestionWithDetails] = None
+
+
 class TopicMasteryInit(BaseModel):
     topic_id: str
     topic_name: str
@@ -110,6 +131,7 @@ class DiagnosticTestResultsResponse(BaseModel):
 class DiagnosticTestListItem(BaseModel):
     id: str
     status: DiagnosticTestStatus
+    mode: DiagnosticTestMode = DiagnosticTestMode.FIXED
     started_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
     total_correct: Optional[int] = None
@@ -3,6 +3,7 @@ from datetime import datetime
 from uuid import UUID
 
 from ..models.profile import UserAchievement
+from .profile_service import invalidate_profile_cache
 
 
 class AchievementService:
@@ -149,6 +150,7 @@ class AchievementService:
         }
 
         response = self.db.table("user_achievements").insert(achievement_data).execute()
+        invalidate_profile_cache(user_id)
 
         if response.data:
             return UserAchievement(**response.data[0])
@@ -0,0 +1,202 @@
+"""
+Computerized adaptive testing (CAT) for the diagnostic test.
+
+Each section keeps a running ability estimate (EAP on a quadrature grid with a
+standard normal prior). The next item is the most informative one at the
+current estimate among items not yet given, picked at random from the top few
+("randomesque" exposure control) so the same handful of items isn't shown to
+every student. A section stops once the estimate's standard error falls below
+the configured threshold, or at its maximum length.
+
+Item parameters come from question_difficulty_params where an item is
+calibrated (see irt_calibration_service.py), otherwise from its E/M/H label.
+Per-section item indexes are kept in memory and refreshed periodically.
+"""
+
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from supabase import Client
+
+# Fallback 2PL parameters for items without calibration
+LABEL_DIFFICULTY = {"E": -1.0, "M": 0.0, "H": 1.0}
+DEFAULT_DISCRIMINATION = 1.0
+
+# EAP quadrature: 81 points on [-4, 4] with a N(0, 1) prior
+QUADRATURE = np.linspace(-4.0, 4.0, 81)
+PRIOR = np.exp(-0.5 * QUADRATURE ** 2)
+
+# Seconds an item index is reused before it is reloaded
+INDEX_TTL_SECONDS = 600
+
+# Rows per request when loading the pool (PostgREST returns at most 1000)
+INDEX_PAGE_SIZE = 1000
+
+# Guess rate used to turn P(correct) into a BKT mastery baseline
+GUESS_PROBABILITY = 0.25
+
+
+@dataclass
+class ItemIndex:
+    """Active items of one section with their 2PL parameters"""
+    question_ids: List[str]
+    topic_ids: List[str]
+    discrimination: np.ndarray
+    difficulty: np.ndarray
+    labels: List[str] = field(default_factory=list)  # E/M/H per item
+    position: Dict[str, int] = field(default_factory=dict)
+
+    def __post_init__(self):
+        self.position = {qid: i for i, qid in enumerate(self.question_ids)}
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Dict]) -> "ItemIndex":
+        """
+        Build from question rows carrying id, topic_id, difficulty and an
+        optional embedded question_difficulty_params record.
+        """
+        question_ids, topic_ids, labels, a, b = [], [], [], [], []
+        for row in rows:
+            params = row.get("question_difficulty_params")
+            if isinstance(params, list):
+                params = params[0] if params else None
+
+            question_ids.append(row["id"])
+            topic_ids.append(row["topic_id"])
+            labels.append(row.get("difficulty"))
+            if params and params.get("is_calibrated"):
+                a.append(float(params["discrimination_param"]))
+                b.append(float(params["difficulty_param"]))
+            else:
+                a.append(DEFAULT_DISCRIMINATION)
+                b.append(LABEL_DIFFICULTY.get(row.get("difficulty"), 0.0))
+
+        return cls(
+            question_ids=question_ids,
+            topic_ids=topic_ids,
+            discrimination=np.array(a, dtype=np.float64),
+            difficulty=np.array(b, dtype=np.float64),
+            labels=labels,
+        )
+
+    def params(self, question_ids: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """(a, b) for the given questions; unknown questions get default parameters"""
+        a = np.full(len(question_ids), DEFAULT_DISCRIMINATION)
+        b = np.zeros(len(question_ids))
+        for i, qid in enumerate(question_ids):
+            pos = self.position.get(qid)
+            if pos is not None:
+                a[i] = self.discrimination[pos]
+                b[i] = self.difficulty[pos]
+        return a, b
+
+    def information(self, theta: float) -> np.ndarray:
+        """Fisher information of every item at ability theta"""
+        p = 1.0 / (1.0 + np.exp(-self.discrimination * (theta - self.difficulty)))
+        return self.discrimination ** 2 * p * (1.0 - p)
+
+
+def estimate_ability(
+    discrimination: np.ndarray, difficulty: np.ndarray, correct: np.ndarray
+) -> Tuple[float, float]:
+    """
+    EAP ability estimate and its standard error (posterior SD).
+
+    Returns (0.0, 1.0), the prior, when there are no responses.
+    """
+    if len(correct) == 0:
+        return 0.0, 1.0
+
+    p = 1.0 / (1.0 + np.exp(-discrimination[:, None] * (QUADRATURE[None, :] - difficulty[:, None])))
+    y = np.asarray(correct, dtype=np.float64)[:, None]
+    log_likelihood = (y * np.log(p) + (1.0 - y) * np.log(1.0 - p)).sum(axis=0)
+    posterior = PRIOR * np.exp(log_likelihood - log_likelihood.max())
+    posterior /= posterior.sum()
+
+    theta = float((QUADRATURE * posterior).sum())
+    se = float(np.sqrt(((QUADRATURE - theta) ** 2 * posterior).sum()))
+    return theta, se
+
+
+def select_item(
+    index: ItemIndex,
+    theta: float,
+    administered: Set[str],
+    top_k: int = 5,
+    rng: Optional[random.Random] = None,
+) -> Optional[str]:
+    """
+    Pick the next question: one of the top_k most informative at theta that
+    hasn't been administered. Returns None when the section is exhausted.
+    """
+    information = index.information(theta)
+    for qid in administered:
+        pos = index.position.get(qid)
+        if pos is not None:
+            information[pos] = -1.0
+
+    available = int((information >= 0).sum())
+    if available == 0:
+        return None
+
+    k = min(top_k, available)
+    candidates = np.argpartition(-information, k - 1)[:k]
+    return index.question_ids[int((rng or random).choice(list(candidates)))]
+
+
+def should_stop(se: float, answered: int, se_threshold: float, min_items: int, max_items: int) -> bool:
+    if answered >= max_items:
+        return True
+    return answered >= min_items and se <= se_threshold
+
+
+def mastery_from_ability(theta: float, discrimination: np.ndarray, difficulty: np.ndarray) -> float:
+    """
+    Guess-adjusted expected proportion correct on a topic's items at theta,
+    on the same scale as the fixed-form baseline (observed - guess) / (1 - guess).
+    """
+    p = 1.0 / (1.0 + np.exp(-discrimination * (theta - difficulty)))
+    expected = float(p.mean()) if len(p) else 0.5
+    return max(0.01, min(0.99, (expected - GUESS_PROBABILITY) / (1.0 - GUESS_PROBABILITY)))
+
+
+_indexes: Dict[str, Tuple[float, ItemIndex]] = {}
+
+
+def get_item_index(db: Client, section: str) -> ItemIndex:
+    """Item index for a section, loaded once per INDEX_TTL_SECONDS per process"""
+    cached = _indexes.get(section)
+    if cached and time.monotonic() - cached[0] < INDEX_TTL_SECONDS:
+        return cached[1]
+
+    # Keyset pages on id until a short page: a single select would stop at the row cap
+    rows = []
+    last_id = None
+    while True:
+        query = (
+            db.table("questions")
+            .select(
+                "id, topic_id, difficulty, topics(categories(section)), "
+                "question_difficulty_params(difficulty_param, discrimination_param, is_calibrated)"
+            )
+            .eq("is_active", True)
+        )
+        if last_id is not None:
+            query = query.gt("id", last_id)
+        page = query.order("id").limit(INDEX_PAGE_SIZE).execute().data or []
+        rows.extend(
+            q for q in page
+            if ((q.get("topics") or {}).get("categories") or {}).get("section") == section
+        )
+        if len(page) < INDEX_PAGE_SIZE:
+            break
+        last_id = page[-1]["id"]
+    if not rows:
+        raise ValueError(f"No questions available for section: {section}")
+
+    index = ItemIndex.from_rows(rows)
+    _indexes[section] = (time.monotonic(), index)
+    return index
@@ -7,14 +7,23 @@ Handles performance snapshots, growth curves, and cognitive metrics.
 from typing import Dict, List, Optional
 from supabase import Client
 from datetime import datetime, timedelta
+from uuid import UUID
+import math
 import statistics
+from app.services.population_index import get_population_index
+from app.services.profile_service import invalidate_profile_cache
+from app.services.request_loader import RequestLoader
+from app.services.scoring_tables import get_scoring_tables
+from app.services.snapshot_series import load_snapshot_series
 
 
 class AnalyticsService:
     """Service for tracking and analyzing student performance over time."""
     
-    def __init__(self, db: Client):
+    def __init__(self, db: Client, loader: Optional[RequestLoader] = None):
         self.db = db
+        # Shared with other services in the request when the route passes one
+        self.loader = loader or RequestLoader(db)
     
     async def create_performance_snapshot(
         self,
@@ -154,7 +163,32 @@ class AnalyticsService:
                     snapshot_data['related_id'] = None
         
         response = self.db.table("user_performance_snapshots").insert(snapshot_data).execute()
+        invalidate_profile_cache(user_id)
+        self._observe_new_student(user_id, predicted_sat_math, predicted_sat_rw, skills_snapshot)
         return response.data[0]
+
+    def _observe_new_student(
+        self,
+        user_id: str,
+        predicted_sat_math: Optional[int],
+        predicted_sat_rw: Optional[int],
+        skills_snapshot: Dict[str, float]
+    ) -> None:
+        """
+        Add a student's first snapshot to the in-memory population percentiles.
+        Later snapshots replace an existing student's values, which waits for
+        the next rebuild.
+        """
+        try:
+            if len(load_snapshot_series(self.db, user_id)) != 1:
+                return
+            get_population_index(self.db).observe_student(
+                predicted_sat_math,
+                predicted_sat_rw,
+                statistics.mean(skills_snapshot.values()) if skills_snapshot else None
+            )
+        except Exception as e:
+            print(f"[POPULATION INDEX ERROR] Failed to add new student: {e}")
     
     async def get_growth_curve(
         self,
@@ -174,36 +208,52 @@ class AnalyticsService:
             List of snapshots with dates and mastery values
         """
         cutoff_date = datetime.now() - timedelta(days=days_back)
-        
-        query = self.db.table("user_performance_snapshots").select("*").eq(
-            "user_id", user_id
-        ).gte("created_at", cutoff_date.isoformat()).order("created_at")
-        
-        response = query.execute()
+        series = load_snapshot_series(self.db, user_id, self.loader).since(cutoff_date)
+        skill_masteries = self._get_skill_masteries(user_id, skill_id, cutoff_date) if skill_id else {}
         
         growth_data = []
-        for snapshot in response.data:
+        for created_at, snapshot_type, math_score, rw_score, efficiency, mastery in zip(
+            series.created_at, series.snapshot_type, series.math.tolist(), series.rw.tolist(),
+            series.efficiency.tolist(), series.mastery.tolist()
+        ):
             data_point = {
-                "date": snapshot["created_at"],
-                "snapshot_type": snapshot["snapshot_type"],
-                "predicted_sat_math": snapshot.get("predicted_sat_math"),
-                "predicted_sat_rw": snapshot.get("predicted_sat_rw"),
-                "cognitive_efficiency": snapshot.get("cognitive_efficiency_score")
+                "date": created_at,
+                "snapshot_type": snapshot_type,
+                "predicted_sat_math": None if math.isnan(math_score) else int(math_score),
+                "predicted_sat_rw": None if math.isnan(rw_score) else int(rw_score),
+                "cognitive_efficiency": None if math.isnan(efficiency) else efficiency
             }
             
-            # If tracking specific skill, extract from snapshot
-            if skill_id and snapshot.get("skills_snapshot"):
-                data_point["mastery"] = snapshot["skills_snapshot"].get(skill_id, 0)
-            else:
-                # Overall mastery (average across all skills)
-                if snapshot.get("skills_snapshot"):
-                    masteries = list(snapshot["skills_snapshot"].values())
-                    data_point["mastery"] = statistics.mean(masteries) if masteries else 0
+            # Snapshots without skill data have no mastery point
+            if not math.isnan(mastery):
+                if skill_id:
+                    data_point["mastery"] = skill_masteries.get(created_at, 0)
+                else:
+                    # Overall mastery (average across all skills)
+                    data_point["mastery"] = mastery
             
             growth_data.append(data_point)
         
         return growth_data
     
+    def _get_skill_masteries(self, user_id: str, skill_id: str, cutoff_date: datetime) -> Dict[str, float]:
+        """One skill's mastery per snapshot (keyed by created_at), read from the skills JSON"""
+        try:
+            skill_id = str(UUID(skill_id))
+        except ValueError:
+            # Not a topic id, so no snapshot has it
+            return {}
+        
+        response = self.db.table("user_performance_snapshots").select(
+            f"created_at, mastery:skills_snapshot->{skill_id}"
+        ).eq("user_id", user_id).gte("created_at", cutoff_date.isoformat()).execute()
+        
+        return {
+            row["created_at"]: float(row["mastery"])
+            for row in response.data or []
+            if row.get("mastery") is not None
+        }
+    
     async def get_skill_heatmap(self, user_id: str) -> Dict:
         """
         Get current mastery heatmap across all skills.
@@ -214,14 +264,10 @@ class AnalyticsService:
         Returns:
             Dictionary grouped by category with skill mastery data
         """
-        response = self.db.table("user_skill_mastery").select(
-            "*, topics(id, name, category_id, categories(id, name, section))"
-        ).eq("user_id", user_id).execute()
-        
         # Group by category
         heatmap = {}
         
-        for record in response.data:
+        for record in self.loader.mastery(user_id):
             topic = record["topics"]
             category = topic["categories"]
             category_name = category["name"]
@@ -245,6 +291,65 @@ class AnalyticsService:
         
         return heatmap
     
+    @staticmethod
+    def summarize_heatmap(heatmap: Dict) -> Dict:
+        """
+        Skill heatmap response: the heatmap with its skill count and average mastery.
+        
+        Args:
+            heatmap: Result of get_skill_heatmap
+            
+        Returns:
+            Dictionary with heatmap, total_skills and avg_mastery
+        """
+        all_masteries = [
+            skill["mastery"]
+            for cat in heatmap.values()
+            for skill in cat["skills"]
+        ]
+        avg_mastery = sum(all_masteries) / len(all_masteries) if all_masteries else 0
+        
+        return {
+            "heatmap": heatmap,
+            "total_skills": len(all_masteries),
+            "avg_mastery": round(avg_mastery, 4)
+        }
+    
+    async def get_mock_exam_performance(self, user_id: str, limit: int = 10) -> Dict:
+        """
+        Completed mock exams with scores and completion dates, for the dashboard chart.
+        
+        Args:
+            user_id: Student ID
+            limit: Maximum number of exams
+            
+        Returns:
+            Dictionary with recent_exams (oldest first) and total_count
+        """
+        recent_exams = [
+            {
+                "exam_type": exam.get("exam_type", "full_length"),
+                "total_score": exam.get("total_score"),
+                "math_score": exam.get("math_score", 0),
+                "rw_score": exam.get("rw_score", 0),
+                "completed_at": exam.get("completed_at") or None
+            }
+            for exam in self.get_completed_mock_exams(user_id, limit)
+        ]
+        
+        return {
+            "recent_exams": recent_exams,
+            "total_count": len(recent_exams)
+        }
+    
+    def get_completed_mock_exams(self, user_id: str, limit: int = 10) -> List[Dict]:
+        """The user's first `limit` completed mock exams, oldest first"""
+        return self.loader.load(("analytics_mock_exams", user_id, limit), lambda: self.db.table("mock_exams").select(
+            "id, exam_type, total_score, math_score, rw_score, completed_at, status"
+        ).eq("user_id", user_id).eq("status", "completed").order(
+            "completed_at", desc=False
+        ).limit(limit).execute().data or [])
+    
     async def get_recent_learning_events(
         self,
         user_id: str,
@@ -346,7 +451,8 @@ class AnalyticsService:
         """
         Convert IRT ability (theta) to SAT score.
         
-        Rough mapping: theta = 0 → 500, theta = 1 → 600, etc.
+        Looks theta up on the same scale the mock exam scoring tables are
+        equated to (see app/services/scoring_tables.py).
         
         Args:
             theta: Ability parameter (-3 to 3)
@@ -354,11 +460,7 @@ class AnalyticsService:
         Returns:
             Estimated SAT score (200-800)
         """
-        # Linear mapping: theta of 0 = 500, each +1 theta ≈ +100 points
-        score = 500 + (theta * 100)
-        
-        # Clamp to SAT range
-        return int(max(200, min(800, score)))
+        return get_scoring_tables().theta_score(theta)
     
     async def _calculate_cognitive_metrics(self, user_id: str) -> Dict:
         """
@@ -370,29 +472,16 @@ class AnalyticsService:
         Returns:
             Dictionary with avg_time, avg_confidence, efficiency
         """
-        cutoff_date = datetime.now() - timedelta(days=30)
-        
-        # Get recent answered questions with metrics
-        response = self.db.table("session_questions").select(
-            "time_spent_seconds, confidence_score, user_answer, questions(correct_answer)"
-        ).eq("status", "answered").gte(
-            "answered_at", cutoff_date.isoformat()
-        ).in_(
-            "session_id",
-            self.db.table("practice_sessions").select("id").eq(
-                "study_plan_id",
-                self.db.table("study_plans").select("id").eq("user_id", user_id).execute().data[0]["id"]
-            ).execute().data
-        ).execute()
-        
-        if not response.data:
+        recent_answers = self._get_recent_answers(user_id)
+        
+        if not recent_answers:
             return {"avg_time": None, "avg_confidence": None, "efficiency": None}
         
         times = []
         confidences = []
         efficiencies = []
         
-        for record in response.data:
+        for record in recent_answers:
             if record.get("time_spent_seconds"):
                 times.append(record["time_spent_seconds"])
             
@@ -428,41 +517,13 @@ class AnalyticsService:
         Returns:
             Dictionary with total_answered and total_correct
         """
-        cutoff_date = datetime.now() - timedelta(days=30)
-        
-        # This is a simplified version - in production you'd optimize this query
         try:
-            # Get user's study plan
-            plan_response = self.db.table("study_plans").select("id").eq(
-                "user_id", user_id
-            ).eq("is_active", True).execute()
-            
-            if not plan_response.data:
-                return {"total_answered": 0, "total_correct": 0}
+            recent_answers = self._get_recent_answers(user_id)
             
-            plan_id = plan_response.data[0]["id"]
-            
-            # Get sessions from this plan
-            sessions_response = self.db.table("practice_sessions").select("id").eq(
-                "study_plan_id", plan_id
-            ).execute()
-            
-            if not sessions_response.data:
-                return {"total_answered": 0, "total_correct": 0}
-            
-            session_ids = [s["id"] for s in sessions_response.data]
-            
-            # Get answered questions
-            questions_response = self.db.table("session_questions").select(
-                "user_answer, questions(correct_answer)"
-            ).in_("session_id", session_ids).eq(
-                "status", "answered"
-            ).gte("answered_at", cutoff_date.isoformat()).execute()
-            
-            total_answered = len(questions_response.data)
+            total_answered = len(recent_answers)
             total_correct = 0
             
-            for record in questions_response.data:
+            for record in recent_answers:
                 user_ans = record.get("user_answer", [])
                 correct_ans = record["questions"]["correct_answer"]
                 if user_ans and sorted(user_ans) == sorted(correct_ans):
@@ -475,6 +536,26 @@ class AnalyticsService:
         except Exception as e:
             print(f"Error getting performance stats: {e}")
             return {"total_answered": 0, "total_correct": 0}
+    
+    def _get_recent_answers(self, user_id: str) -> List[Dict]:
+        """
+        Questions answered in the active study plan's sessions in the last 30
+        days, with the columns both cognitive metrics and performance stats
+        use. Loaded once per request.
+        """
+        def fetch() -> List[Dict]:
+            session_ids = self.loader.session_ids(user_id, active_plan_only=True)
+            if not session_ids:
+                return []
+            cutoff_date = datetime.now() - timedelta(days=30)
+            response = self.db.table("session_questions").select(
+                "time_spent_seconds, confidence_score, user_answer, questions(correct_answer)"
+            ).in_("session_id", session_ids).eq(
+                "status", "answered"
+            ).gte("answered_at", cutoff_date.isoformat()).execute()
+            return response.data or []
+        
+        return self.loader.load(("analytics_recent_answers", user_id), fetch)
 
 
 
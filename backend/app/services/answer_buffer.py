@@ -0,0 +1,280 @@
+"""
+Write-behind buffer for mock exam answer autosave.
+
+The exam UI saves on every answer change and review toggle. Written through,
+each save costs an ownership check, a question lookup and an update. With the
+buffer running, the first save in a module loads the module once (ownership
+and every question's answer key, in one query) and later saves are checked in
+memory. Repeated saves of a question coalesce into one pending row, and all
+pending rows are written every few seconds in a single bulk upsert.
+
+complete_module flushes the module before it scores, so scoring always reads
+the final answers. Batch submissions write directly and supersede anything
+pending for the same questions.
+
+The buffer lives in the API process, so it is only started (from app.main's
+startup event) when ANSWER_BUFFER_FLUSH_SECONDS is set. That is only correct
+where a single long-lived process serves an exam, not on serverless
+deployments, where answers are written through as before.
+"""
+
+import asyncio
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from supabase import Client
+
+from app.config import get_settings
+from app.db import get_service_client
+from app.services.answer_validation_service import get_answer_matcher
+
+# Module state is dropped after this long without saves (timed modules are
+# well under an hour)
+MODULE_IDLE_SECONDS = 2 * 60 * 60
+
+
+@dataclass
+class _ModuleState:
+    """A module's owner, answer keys and unflushed answers"""
+    user_id: str
+    # question_id -> mock_exam_questions row with its answer key
+    questions: Dict[str, Dict[str, Any]]
+    # mock_exam_questions id -> row to upsert
+    pending: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    last_event: float = field(default_factory=time.monotonic)
+
+
+class AnswerBuffer:
+    """Coalesces answer saves per question and writes them in bulk"""
+
+    def __init__(self, flush_seconds: float, db_factory: Callable[[], Client] = get_service_client):
+        self.flush_seconds = flush_seconds
+        self.db_factory = db_factory
+        self.running = False
+        self.stats = {"events": 0, "coalesced": 0, "flushes": 0, "rows_written": 0}
+        self._modules: Dict[str, _ModuleState] = {}
+        self._lock = threading.Lock()
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task] = None
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        """Start the periodic flush on the running event loop"""
+        if self.running:
+            return
+        self.running = True
+        self._task = asyncio.get_running_loop().create_task(self._flush_periodically())
+
+    async def stop(self) -> None:
+        """Stop the periodic flush and write everything still pending"""
+        self.running = False
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _flush_periodically(self) -> None:
+        while self.running:
+            await asyncio.sleep(self.flush_seconds)
+            try:
+                await self.flush()
+            except Exception as e:
+                # Rows stay pending and are retried on the next tick
+                print(f"[ANSWER BUFFER ERROR] Periodic flush failed: {e}")
+            self._evict_idle()
+
+    # ------------------------------------------------------------------
+    # Saving answers
+    # ------------------------------------------------------------------
+
+    def record(
+        self,
+        db: Client,
+        module_id: str,
+        question_id: str,
+        user_id: str,
+        user_answer: List[str],
+        status: str,
+        is_marked_for_review: bool,
+    ) -> Tuple[bool, List[str], str]:
+        """
+        Accept an answer save for a later bulk write.
+
+        Args:
+            db: The user's client, used to load the module on its first save
+            module_id: Module ID
+            question_id: Question ID
+            user_id: User ID (must own the module)
+            user_answer: User's answer
+            status: Question status
+            is_marked_for_review: Whether question is marked for review
+
+        Returns:
+            Tuple of (is_correct, correct_answer, mock_exam_questions id)
+        """
+        state = self._modules.get(module_id)
+        if state is None:
+            state = self._load_module(db, module_id)
+            with self._lock:
+                state = self._modules.setdefault(module_id, state)
+
+        if state.user_id != user_id:
+            raise PermissionError("Module does not belong to user")
+
+        row = state.questions.get(question_id)
+        if row is None:
+            # The module's questions may have been assigned since it was loaded
+            fresh = self._load_module(db, module_id)
+            with self._lock:
+                state.questions = fresh.questions
+            row = state.questions.get(question_id)
+            if row is None:
+                raise ValueError("Question not found in module")
+
+        question = row["questions"]
+        is_correct = get_answer_matcher(
+            question.get("correct_answer", []), question.get("acceptable_answers")
+        ).matches(user_answer)
+
+        with self._lock:
+            self.stats["events"] += 1
+            if row["id"] in state.pending:
+                self.stats["coalesced"] += 1
+            state.pending[row["id"]] = {
+                "id": row["id"],
+                "module_id": module_id,
+                "question_id": question_id,
+                "display_order": row["display_order"],
+                "status": status,
+                "user_answer": user_answer,
+                "is_correct": is_correct,
+                "is_marked_for_review": is_marked_for_review,
+                "answered_at": datetime.utcnow().isoformat(),
+            }
+            state.last_event = time.monotonic()
+
+        return is_correct, question.get("correct_answer", []), row["id"]
+
+    async def supersede(self, module_id: str, question_ids: List[str]) -> None:
+        """
+        Drop pending saves of questions that are about to be written directly,
+        after any flush already in progress has landed.
+        """
+        state = self._modules.get(module_id)
+        if state is None:
+            return
+        async with self._get_flush_lock():
+            with self._lock:
+                for question_id in question_ids:
+                    row = state.questions.get(question_id)
+                    if row is not None:
+                        state.pending.pop(row["id"], None)
+
+    def _load_module(self, db: Client, module_id: str) -> _ModuleState:
+        """Ownership and every question's answer key in one query"""
+        response = (
+            db.table("mock_exam_modules")
+            .select(
+                "id, mock_exams!inner(user_id), "
+                "mock_exam_questions(id, question_id, display_order, "
+                "questions(correct_answer, acceptable_answers))"
+            )
+            .eq("id", module_id)
+            .execute()
+        )
+        if not response.data:
+            raise ValueError("Module not found")
+
+        module = response.data[0]
+        return _ModuleState(
+            user_id=module["mock_exams"]["user_id"],
+            questions={row["question_id"]: row for row in module.get("mock_exam_questions") or []},
+        )
+
+    # ------------------------------------------------------------------
+    # Flushing
+    # ------------------------------------------------------------------
+
+    async def flush(self, module_id: Optional[str] = None, forget: bool = False) -> int:
+        """
+        Write pending saves in one bulk upsert.
+
+        Args:
+            module_id: Only this module (default: every module)
+            forget: Also drop the module's state (after it is completed)
+
+        Returns:
+            Number of rows written
+        """
+        # Serialized so a module flush also waits for a periodic flush that
+        # already took its rows
+        async with self._get_flush_lock():
+            with self._lock:
+                module_ids = [module_id] if module_id else list(self._modules)
+                taken: Dict[str, Dict[str, Dict[str, Any]]] = {}
+                for mid in module_ids:
+                    state = self._modules.get(mid)
+                    if state is not None and state.pending:
+                        taken[mid] = state.pending
+                        state.pending = {}
+
+            rows = [row for pending in taken.values() for row in pending.values()]
+            if rows:
+                try:
+                    await asyncio.to_thread(self._upsert, rows)
+                except Exception:
+                    self._restore(taken)
+                    raise
+
+            with self._lock:
+                if rows:
+                    self.stats["flushes"] += 1
+                    self.stats["rows_written"] += len(rows)
+                if forget and module_id:
+                    self._modules.pop(module_id, None)
+            return len(rows)
+
+    def _get_flush_lock(self) -> asyncio.Lock:
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        return self._flush_lock
+
+    def _upsert(self, rows: List[Dict[str, Any]]) -> None:
+        self.db_factory().table("mock_exam_questions").upsert(rows).execute()
+
+    def _restore(self, taken: Dict[str, Dict[str, Dict[str, Any]]]) -> None:
+        """Put rows from a failed flush back, unless a newer save replaced them"""
+        with self._lock:
+            for mid, pending in taken.items():
+                state = self._modules.get(mid)
+                if state is None:
+                    continue
+                for row_id, row in pending.items():
+                    state.pending.setdefault(row_id, row)
+
+    def _evict_idle(self) -> None:
+        cutoff = time.monotonic() - MODULE_IDLE_SECONDS
+        with self._lock:
+            for mid in [m for m, s in self._modules.items() if not s.pending and s.last_event < cutoff]:
+                del self._modules[mid]
+
+
+_buffer: Optional[AnswerBuffer] = None
+
+
+def get_answer_buffer() -> AnswerBuffer:
+    """The process-wide buffer (not running unless started)"""
+    global _buffer
+    if _buffer is None:
+        _buffer = AnswerBuffer(get_settings().answer_buffer_flush_seconds)
+    return _buffer
@@ -1,10 +1,175 @@
-from typing import List, Optional
+"""
+Answer checking for every submission path (practice, mock exam, diagnostic).
+
+A question's answer key is compiled once into an AnswerMatcher: normalized
+strings for exact matches plus exact rational values for numeric
+(student-produced response) answers, so "2.6", "13/5" and "2.60" are the same
+answer and ".6" equals "0.6". Matchers are cached by answer key, so a
+submission only normalizes the user's answer and does a set lookup.
+
+Numeric answers follow the SAT entry rules: a fraction may be entered as its
+decimal equivalent, and a decimal too long for the entry field (5 characters,
+6 with a minus sign) may be truncated or rounded as long as it fills the
+field: for 2/3, ".6666", ".6667", "0.666" and "0.667" are correct but ".66"
+and "0.67" are not.
+"""
+
+import re
+from fractions import Fraction
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+# Plain decimals and integer fractions only: no exponents ("3e4" would
+# otherwise parse) and no decimals inside fractions, as on the SAT
+_NUMBER = re.compile(r"[+-]?(?:\d+\.?\d*|\.\d+)(?:/\d+)?")
+_THOUSANDS = re.compile(r"\d{1,3}(?:,\d{3})+(?:\.\d*)?")
+
+# Characters available for a student-produced response
+ENTRY_WIDTH = 5
+ENTRY_WIDTH_NEGATIVE = 6
+
+MATCHER_CACHE_SIZE = 8192
+# Distinct non-key numeric entries remembered per question
+VERDICT_CACHE_SIZE = 256
+
+
+def normalize_answers(answers: Any) -> List[str]:
+    """
+    Normalize a submitted or stored answer list by stripping whitespace and
+    lowercasing. A bare string counts as a one-answer list.
+    """
+    if not answers:
+        return []
+    if isinstance(answers, str):
+        return [answers.strip().lower()]
+    try:
+        return [str(a).strip().lower() for a in answers]
+    except TypeError:
+        return []
+
+
+def parse_number(answer: str) -> Optional[Fraction]:
+    """
+    Exact value of a normalized numeric answer ("2.6", "13/5", ".6", "-1/2",
+    "1,000", "3."), or None if it isn't one.
+    """
+    # Unicode minus, and trailing punctuation left over from rationale text
+    answer = answer.replace("−", "-").rstrip(".,")
+    if "," in answer:
+        if not _THOUSANDS.fullmatch(answer.lstrip("+-")):
+            return None
+        answer = answer.replace(",", "")
+    if not _NUMBER.fullmatch(answer):
+        return None
+    try:
+        return Fraction(answer)
+    except (ValueError, ZeroDivisionError):
+        return None
+
+
+def _approximates(answer: str, value: Fraction, target: Fraction) -> bool:
+    """
+    Whether a decimal answer is an allowed truncation or rounding of target:
+    it must fill the entry field and agree with target to its last digit.
+    """
+    if "/" in answer or "." not in answer:
+        return False
+    width = ENTRY_WIDTH_NEGATIVE if answer.startswith("-") else ENTRY_WIDTH
+    if len(answer.lstrip("+")) < width:
+        return False
+
+    scale = 10 ** len(answer.split(".", 1)[1])
+    scaled = target * scale
+    truncated = Fraction(int(scaled), scale)  # int() truncates toward zero
+    rounded = Fraction(round(scaled), scale)
+    return value == truncated or value == rounded
+
+
+class AnswerMatcher:
+    """A question's compiled answer key"""
+
+    __slots__ = ("exact", "single", "accepted", "numbers", "_verdicts")
+
+    def __init__(self, correct_answer: Any, acceptable_answers: Any = None):
+        correct = normalize_answers(correct_answer)
+        acceptable = normalize_answers(acceptable_answers)
+        parsed = {a: parse_number(a) for a in correct + acceptable}
+
+        # The whole correct list (multi-part answers) ...
+        self.exact: Tuple[str, ...] = tuple(correct)
+        self.single: Optional[str] = correct[0] if len(correct) == 1 else None
+        # ... or any single alternative. Numeric answers count on their own
+        # ("either 0 or 3"), both as written and by value
+        self.accepted: FrozenSet[str] = frozenset(
+            acceptable + [a for a in correct if parsed[a] is not None]
+        )
+        self.numbers: FrozenSet[Fraction] = frozenset(n for n in parsed.values() if n is not None)
+        # Verdicts for other numeric entries seen so far
+        self._verdicts: Dict[str, bool] = {}
+
+    def matches(self, user_answer: Any) -> bool:
+        """Whether a submitted answer is correct"""
+        if type(user_answer) is list and len(user_answer) == 1 and type(user_answer[0]) is str:
+            # Fast path: the usual single-answer submission
+            first = user_answer[0].strip().lower()
+            if first == self.single or first in self.accepted:
+                return True
+        else:
+            user = normalize_answers(user_answer)
+            if not user:
+                return not self.exact
+            if tuple(user) == self.exact:
+                return True
+            first = user[0]
+            if first in self.accepted:
+                return True
+
+        if not self.numbers:
+            return False
+
+        verdict = self._verdicts.get(first)
+        if verdict is None:
+            verdict = self._matches_number(first)
+            if len(self._verdicts) >= VERDICT_CACHE_SIZE:
+                self._verdicts.clear()
+            self._verdicts[first] = verdict
+        return verdict
+
+    def _matches_number(self, answer: str) -> bool:
+        value = parse_number(answer)
+        if value is None:
+            return False
+        if value in self.numbers:
+            return True
+        return any(_approximates(answer, value, target) for target in self.numbers)
+
+
+@lru_cache(maxsize=MATCHER_CACHE_SIZE)
+def _cached_matcher(correct_key: Any, acceptable_key: Any) -> AnswerMatcher:
+    return AnswerMatcher(correct_key, acceptable_key)
+
+
+def get_answer_matcher(correct_answer: Any, acceptable_answers: Any = None) -> AnswerMatcher:
+    """
+    Compiled matcher for an answer key, built once per distinct key.
+
+    Keying on the answer key itself (rather than the question id) means an
+    edited question gets a fresh matcher without any invalidation.
+    """
+    try:
+        return _cached_matcher(
+            tuple(correct_answer) if type(correct_answer) is list else correct_answer,
+            tuple(acceptable_answers) if type(acceptable_answers) is list else acceptable_answers,
+        )
+    except TypeError:
+        # Unhashable (malformed) key: compile without caching
+        return AnswerMatcher(correct_answer, acceptable_answers)
 
 
 class AnswerValidationService:
     """
     Service for validating user answers against correct answers.
-    Shared between practice sessions and mock exams.
+    Shared between practice sessions, mock exams and diagnostic tests.
     """
 
     @staticmethod
@@ -18,9 +183,7 @@ class AnswerValidationService:
         Returns:
             Normalized list of answers
         """
-        if not answer_list:
-            return []
-        return [str(a).strip().lower() for a in answer_list]
+        return normalize_answers(answer_list)
 
     @staticmethod
     def validate_answer(
@@ -39,20 +202,4 @@ class AnswerValidationService:
         Returns:
             True if answer is correct, False otherwise
         """
-        normalized_user = AnswerValidationService.normalize_answer(user_answer)
-        normalized_correct = AnswerValidationService.normalize_answer(correct_answer)
-        normalized_acceptable = (
-            AnswerValidationService.normalize_answer(acceptable_answers)
-            if acceptable_answers
-            else []
-        )
-
-        # Check exact match with correct answer
-        if normalized_user == normalized_correct:
-            return True
-
-        # Check if answer is in acceptable answers
-        if normalized_acceptable and len(normalized_user) > 0:
-            return normalized_user[0] in normalized_acceptable
-
-        return False
+        return get_answer_matcher(correct_answer, acceptable_answers).matches(user_answer)
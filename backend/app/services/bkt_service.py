@@ -5,7 +5,8 @@ Tracks student mastery of skills over time using Bayesian inference.
 Updates probability of mastery after each practice attempt.
 """
 
-from typing import Dict, Optional
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
 from supabase import Client
 from decimal import Decimal
 
@@ -60,27 +61,13 @@ class BKTService:
         mastery_record = await self._get_or_create_mastery(user_id, skill_id)
         
         current_mastery = float(mastery_record["mastery_probability"])
-        p_learn = float(mastery_record["learn_rate"])
-        p_guess = float(mastery_record["guess_probability"])
-        p_slip = float(mastery_record["slip_probability"])
-        
-        # Bayesian update based on evidence
-        if is_correct:
-            # P(L | correct) = P(L) * (1 - P(S)) / [P(L) * (1 - P(S)) + (1 - P(L)) * P(G)]
-            numerator = current_mastery * (1 - p_slip)
-            denominator = numerator + (1 - current_mastery) * p_guess
-            p_learned_given_evidence = numerator / denominator if denominator > 0 else current_mastery
-        else:
-            # P(L | incorrect) = P(L) * P(S) / [P(L) * P(S) + (1 - P(L)) * (1 - P(G))]
-            numerator = current_mastery * p_slip
-            denominator = numerator + (1 - current_mastery) * (1 - p_guess)
-            p_learned_given_evidence = numerator / denominator if denominator > 0 else current_mastery
-        
-        # Apply learning: opportunity to transition from not-learned to learned
-        new_mastery = p_learned_given_evidence + (1 - p_learned_given_evidence) * p_learn
-        
-        # Keep within bounds [0.01, 0.99] to avoid certainty
-        new_mastery = min(0.99, max(0.01, new_mastery))
+        new_mastery = self._bkt_step(
+            current_mastery,
+            is_correct,
+            p_learn=float(mastery_record["learn_rate"]),
+            p_guess=float(mastery_record["guess_probability"]),
+            p_slip=float(mastery_record["slip_probability"]),
+        )
         
         # Calculate learning velocity (change in mastery)
         velocity = new_mastery - current_mastery
@@ -90,11 +77,7 @@ class BKTService:
         correct_attempts = mastery_record["correct_attempts"] + (1 if is_correct else 0)
         
         # Detect plateau: low velocity + enough attempts
-        plateau_detected = False
-        if total_attempts >= 10:
-            # If velocity is very small (< 2% change), mark as plateau
-            if abs(velocity) < 0.02:
-                plateau_detected = True
+        plateau_detected = self._is_plateau(velocity, total_attempts)
         
         update_data = {
             "mastery_probability": round(new_mastery, 4),
@@ -159,6 +142,259 @@ class BKTService:
             "correct_attempts": correct_attempts
         }
     
+    @staticmethod
+    def _bkt_step(
+        current_mastery: float, is_correct: bool, p_learn: float, p_guess: float, p_slip: float
+    ) -> float:
+        """
+        One BKT update: condition P(L) on the answer, then apply learning.
+        
+        Returns:
+            New mastery probability, kept within [0.01, 0.99]
+        """
+        # Bayesian update based on evidence
+        if is_correct:
+            # P(L | correct) = P(L) * (1 - P(S)) / [P(L) * (1 - P(S)) + (1 - P(L)) * P(G)]
+            numerator = current_mastery * (1 - p_slip)
+            denominator = numerator + (1 - current_mastery) * p_guess
+        else:
+            # P(L | incorrect) = P(L) * P(S) / [P(L) * P(S) + (1 - P(L)) * (1 - P(G))]
+            numerator = current_mastery * p_slip
+            denominator = numerator + (1 - current_mastery) * (1 - p_guess)
+        p_learned_given_evidence = numerator / denominator if denominator > 0 else current_mastery
+        
+        # Apply learning: opportunity to transition from not-learned to learned
+        new_mastery = p_learned_given_evidence + (1 - p_learned_given_evidence) * p_learn
+        
+        # Keep within bounds [0.01, 0.99] to avoid certainty
+        return min(0.99, max(0.01, new_mastery))
+    
+    @staticmethod
+    def _is_plateau(velocity: float, total_attempts: int) -> bool:
+        """Plateau: enough attempts and mastery moving less than 2% per question."""
+        return total_attempts >= 10 and abs(velocity) < 0.02
+    
+    async def update_mastery_batch(self, user_id: str, responses: List[Dict]) -> List[Dict]:
+        """
+        Apply many answers at once, e.g. when finalizing a mock exam.
+        
+        Responses are grouped by skill and each skill's outcomes are run through
+        the same BKT recursion as update_mastery, in the order given. The result
+        matches calling update_mastery once per response, but costs one read,
+        one upsert and one learning_events insert in total.
+        
+        Args:
+            user_id: Student ID
+            responses: Ordered dicts with skill_id, is_correct and optionally
+                time_spent_seconds / confidence_score
+            
+        Returns:
+            One summary per skill with mastery_before (before the first response),
+            mastery_after, velocity (of the last response) and attempt counts
+        """
+        by_skill: Dict[str, List[Dict]] = {}
+        for response in responses:
+            by_skill.setdefault(response["skill_id"], []).append(response)
+        
+        if not by_skill:
+            return []
+        
+        existing = self._get_masteries(user_id, by_skill.keys())
+        now = datetime.utcnow().isoformat()
+        
+        rows = []
+        events = []
+        summaries = []
+        
+        for skill_id, skill_responses in by_skill.items():
+            record = existing.get(skill_id) or self._default_mastery_row(user_id, skill_id)
+            p_learn = float(record["learn_rate"])
+            p_guess = float(record["guess_probability"])
+            p_slip = float(record["slip_probability"])
+            
+            starting_mastery = float(record["mastery_probability"])
+            mastery = starting_mastery
+            total_attempts = record["total_attempts"] or 0
+            correct_attempts = record["correct_attempts"] or 0
+            velocity = float(record.get("learning_velocity") or 0)
+            plateau_detected = bool(record.get("plateau_flag"))
+            
+            for response in skill_responses:
+                is_correct = bool(response["is_correct"])
+                # Continue from the stored (4-decimal) value, as sequential updates would
+                current_mastery = round(mastery, 4)
+                mastery = self._bkt_step(current_mastery, is_correct, p_learn, p_guess, p_slip)
+                velocity = mastery - current_mastery
+                total_attempts += 1
+                correct_attempts += 1 if is_correct else 0
+                plateau_detected = self._is_plateau(velocity, total_attempts)
+                
+                events.append(self._event_row(
+                    user_id, skill_id, "mastery_updated", current_mastery, mastery,
+                    {
+                        "is_correct": is_correct,
+                        "velocity": round(velocity, 4),
+                        "time_spent_seconds": response.get("time_spent_seconds"),
+                        "confidence_score": response.get("confidence_score"),
+                    },
+                ))
+                if mastery >= 0.95 and current_mastery < 0.95:
+                    events.append(self._event_row(
+                        user_id, skill_id, "mastery_achieved", current_mastery, mastery,
+                        {"total_attempts": total_attempts},
+                    ))
+                if plateau_detected:
+                    events.append(self._event_row(
+                        user_id, skill_id, "plateau_detected", current_mastery, mastery,
+                        {"velocity": round(velocity, 4), "total_attempts": total_attempts},
+                    ))
+            
+            rows.append({
+                **self._mastery_columns(user_id, skill_id, record),
+                "mastery_probability": round(mastery, 4),
+                "learning_velocity": round(velocity, 4),
+                "total_attempts": total_attempts,
+                "correct_attempts": correct_attempts,
+                "plateau_flag": plateau_detected,
+                "last_practiced_at": now,
+            })
+            summaries.append({
+                "skill_id": skill_id,
+                "mastery_before": round(starting_mastery, 4),
+                "mastery_after": round(mastery, 4),
+                "velocity": round(velocity, 4),
+                "total_attempts": total_attempts,
+                "correct_attempts": correct_attempts,
+            })
+        
+        self._persist_batch(rows, events)
+        return summaries
+    
+    async def set_mastery_baselines(
+        self,
+        user_id: str,
+        baselines: Dict[str, Dict],
+        default_skill_ids: Iterable[str] = (),
+        default_priors: Optional[Dict[str, float]] = None,
+    ) -> None:
+        """
+        Set mastery baselines for many skills at once (diagnostic tests).
+        
+        Skills in baselines get the given mastery as both current mastery and
+        prior; their attempts are added to any the skill already has, and
+        existing BKT parameters are kept. Skills in default_skill_ids that have
+        no record yet are initialized with their prior from default_priors, or
+        the default prior; existing records of those skills are left alone.
+        Costs one read and one upsert in total.
+        
+        Args:
+            user_id: Student ID
+            baselines: {skill_id: {"mastery": float, "total_attempts": int, "correct_attempts": int}}
+                for skills with observed responses
+            default_skill_ids: Skills to initialize if the user has no record
+            default_priors: Initial mastery for some of default_skill_ids
+        """
+        existing = self._get_masteries(user_id)
+        default_priors = default_priors or {}
+        now = datetime.utcnow().isoformat()
+        
+        rows = []
+        for skill_id, baseline in baselines.items():
+            record = existing.get(skill_id) or self._default_mastery_row(user_id, skill_id)
+            mastery = round(baseline["mastery"], 4)
+            rows.append({
+                **self._mastery_columns(user_id, skill_id, record),
+                "mastery_probability": mastery,
+                "prior_knowledge": mastery,
+                "total_attempts": (record["total_attempts"] or 0) + baseline["total_attempts"],
+                "correct_attempts": (record["correct_attempts"] or 0) + baseline["correct_attempts"],
+                "last_practiced_at": now,
+            })
+        
+        for skill_id in default_skill_ids:
+            if skill_id not in baselines and skill_id not in existing:
+                record = self._default_mastery_row(user_id, skill_id)
+                if skill_id in default_priors:
+                    prior = round(default_priors[skill_id], 4)
+                    record["mastery_probability"] = prior
+                    record["prior_knowledge"] = prior
+                rows.append(self._mastery_columns(user_id, skill_id, record))
+        
+        self._persist_batch(rows, [])
+    
+    def _get_masteries(
+        self, user_id: str, skill_ids: Optional[Iterable[str]] = None
+    ) -> Dict[str, Dict]:
+        """Fetch a user's mastery records (optionally only some skills), keyed by skill."""
+        query = self.db.table("user_skill_mastery").select("*").eq("user_id", user_id)
+        if skill_ids is not None:
+            query = query.in_("skill_id", list(skill_ids))
+        return {row["skill_id"]: row for row in query.execute().data}
+    
+    def _default_mastery_row(self, user_id: str, skill_id: str) -> Dict:
+        return {
+            "user_id": user_id,
+            "skill_id": skill_id,
+            "mastery_probability": self.DEFAULT_PRIOR,
+            "prior_knowledge": self.DEFAULT_PRIOR,
+            "learn_rate": self.DEFAULT_LEARN,
+            "guess_probability": self.DEFAULT_GUESS,
+            "slip_probability": self.DEFAULT_SLIP,
+            "total_attempts": 0,
+            "correct_attempts": 0,
+            "learning_velocity": None,
+            "plateau_flag": False,
+            "last_practiced_at": None,
+        }
+    
+    @staticmethod
+    def _mastery_columns(user_id: str, skill_id: str, record: Dict) -> Dict:
+        """
+        Full upsert row for a skill. Every row in a bulk upsert must carry the
+        same columns, so unchanged values are copied from the current record.
+        """
+        return {
+            "user_id": user_id,
+            "skill_id": skill_id,
+            "mastery_probability": record["mastery_probability"],
+            "prior_knowledge": record["prior_knowledge"],
+            "learn_rate": record["learn_rate"],
+            "guess_probability": record["guess_probability"],
+            "slip_probability": record["slip_probability"],
+            "total_attempts": record["total_attempts"] or 0,
+            "correct_attempts": record["correct_attempts"] or 0,
+            "learning_velocity": record.get("learning_velocity"),
+            "plateau_flag": bool(record.get("plateau_flag")),
+            "last_practiced_at": record.get("last_practiced_at"),
+        }
+    
+    @staticmethod
+    def _event_row(
+        user_id: str,
+        skill_id: str,
+        event_type: str,
+        mastery_before: float,
+        mastery_after: float,
+        event_data: Dict,
+    ) -> Dict:
+        return {
+            "user_id": user_id,
+            "skill_id": skill_id,
+            "event_type": event_type,
+            "mastery_before": round(mastery_before, 4),
+            "mastery_after": round(mastery_after, 4),
+            "event_data": event_data,
+        }
+    
+    def _persist_batch(self, rows: List[Dict], events: List[Dict]) -> None:
+        """Write all mastery rows in one upsert and all events in one insert."""
+        if rows:
+            self.db.table("user_skill_mastery").upsert(
+                rows, on_conflict="user_id,skill_id"
+            ).execute()
+        if events:
+            self.db.table("learning_events").insert(events).execute()
+    
     async def get_user_mastery(self, user_id: str, skill_id: str) -> Optional[Dict]:
         """
         Get current mastery record for a user-skill pair.
@@ -259,12 +495,7 @@ class BKTService:
             mastery_after: Mastery probability after update
             event_data: Additional event data
         """
-        self.db.table("learning_events").insert({
-            "user_id": user_id,
-            "skill_id": skill_id,
-            "event_type": event_type,
-            "mastery_before": round(mastery_before, 4),
-            "mastery_after": round(mastery_after, 4),
-            "event_data": event_data
-        }).execute()
+        self.db.table("learning_events").insert(self._event_row(
+            user_id, skill_id, event_type, mastery_before, mastery_after, event_data
+        )).execute()
 
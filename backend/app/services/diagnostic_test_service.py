@@ -2,8 +2,18 @@ from datetime import datetime
 from typing import List, Dict, Optional, Tuple
 from supabase import Client
 import random
-from app.models.diagnostic_test import DiagnosticTestStatus, DiagnosticQuestionStatus
+import numpy as np
+from app.config import get_settings
+from app.models.diagnostic_test import DiagnosticTestStatus, DiagnosticQuestionStatus, DiagnosticTestMode
+from app.services.answer_validation_service import get_answer_matcher
 from app.services.bkt_service import BKTService
+from app.services.adaptive_testing import (
+    estimate_ability,
+    get_item_index,
+    mastery_from_ability,
+    select_item,
+    should_stop,
+)
 
 
 class DiagnosticTestService:
@@ -17,15 +27,30 @@ class DiagnosticTestService:
     # Difficulty distribution (medium difficulty for baseline assessment)
     DIFFICULTY_DISTRIBUTION = {"E": 0.33, "M": 0.34, "H": 0.33}
 
+    # Column prefix for per-section results on diagnostic_tests
+    SECTION_PREFIX = {"math": "math", "reading_writing": "rw"}
+
+    # Joined question details returned for each test question
+    QUESTION_DETAIL_SELECT = (
+        "id, test_id, question_id, section, display_order, status, user_answer, "
+        "is_correct, is_marked_for_review, answered_at, "
+        "questions(id, stimulus, stem, difficulty, question_type, answer_options, correct_answer, topic_id, "
+        "topics(id, name, category_id, categories(id, name, section)))"
+    )
+
     def __init__(self, db: Client):
         self.db = db
 
-    async def create_diagnostic_test(self, user_id: str) -> Dict:
+    async def create_diagnostic_test(self, user_id: str, adaptive: bool = False) -> Dict:
         """
         Create a new diagnostic test with 40 questions (20 math, 20 R&W).
 
+        Adaptive tests get no questions up front: they are selected one at a
+        time by next_adaptive_question, and total_questions is the maximum.
+
         Args:
             user_id: User ID creating the test
+            adaptive: Create a computerized adaptive test
 
         Returns:
             Dict containing test data
@@ -34,6 +59,7 @@ class DiagnosticTestService:
         test_data = {
             "user_id": user_id,
             "status": DiagnosticTestStatus.NOT_STARTED.value,
+            "mode": (DiagnosticTestMode.ADAPTIVE if adaptive else DiagnosticTestMode.FIXED).value,
             "total_questions": self.TOTAL_QUESTIONS,
         }
 
@@ -41,6 +67,9 @@ class DiagnosticTestService:
         test = test_response.data[0]
         test_id = test["id"]
 
+        if adaptive:
+            return {"test": test}
+
         # Generate questions for both sections
         await self._generate_test_questions(test_id, "math", self.MATH_QUESTIONS)
         await self._generate_test_questions(test_id, "reading_writing", self.RW_QUESTIONS)
@@ -283,22 +312,9 @@ class DiagnosticTestService:
 
         # Check correctness
         correct_answer = question.get("correct_answer", [])
-        acceptable_answers = question.get("acceptable_answers", [])
-
-        def normalize_answer(ans_list):
-            if not ans_list:
-                return []
-            return [str(a).strip().lower() for a in ans_list]
-
-        normalized_user = normalize_answer(user_answer)
-        normalized_correct = normalize_answer(correct_answer)
-        normalized_acceptable = normalize_answer(acceptable_answers) if acceptable_answers else []
-
-        is_correct = normalized_user == normalized_correct or (
-            normalized_acceptable
-            and len(normalized_user) > 0
-            and normalized_user[0] in normalized_acceptable
-        )
+        is_correct = get_answer_matcher(
+            correct_answer, question.get("acceptable_answers")
+        ).matches(user_answer)
 
         # Update diagnostic test question
         update_data = {
@@ -313,6 +329,161 @@ class DiagnosticTestService:
 
         return is_correct, correct_answer
 
+    async def next_adaptive_question(self, test_id: str, user_id: str, section: str) -> Dict:
+        """
+        Update a section's ability estimate and pick its next question.
+
+        The estimate uses every answered question of the section. If the
+        stopping rule is met the section is done; otherwise the most
+        informative unused item (with exposure control) is added to the test.
+        A question that was added but not answered yet is returned again, so
+        repeated calls don't skip ahead.
+
+        Args:
+            test_id: Adaptive diagnostic test ID
+            user_id: User ID taking the test
+            section: math or reading_writing
+
+        Returns:
+            Dict with section, done, ability, standard_error, questions_answered
+            and question (test question row with details, None when done)
+        """
+        if section not in self.SECTION_PREFIX:
+            raise ValueError(f"Unknown section: {section}")
+
+        test_response = (
+            self.db.table("diagnostic_tests")
+            .select("*")
+            .eq("id", test_id)
+            .execute()
+        )
+
+        if not test_response.data:
+            raise ValueError("Test not found")
+
+        test = test_response.data[0]
+        if test["user_id"] != user_id:
+            raise PermissionError("Test does not belong to user")
+        if test.get("mode") != DiagnosticTestMode.ADAPTIVE.value:
+            raise ValueError("Test is not adaptive")
+        if test["status"] == DiagnosticTestStatus.COMPLETED.value:
+            raise ValueError("Test is already completed")
+
+        given_response = (
+            self.db.table("diagnostic_test_questions")
+            .select("id, question_id, section, display_order, is_correct")
+            .eq("test_id", test_id)
+            .order("display_order")
+            .execute()
+        )
+        given = [q for q in given_response.data if q["section"] == section]
+        answered = [q for q in given if q.get("is_correct") is not None]
+        pending = [q for q in given if q.get("is_correct") is None]
+
+        index = get_item_index(self.db, section)
+        a, b = index.params([q["question_id"] for q in answered])
+        ability, se = estimate_ability(a, b, np.array([q["is_correct"] for q in answered]))
+
+        prefix = self.SECTION_PREFIX[section]
+        self.db.table("diagnostic_tests").update({
+            f"{prefix}_ability": round(ability, 3),
+            f"{prefix}_ability_se": round(se, 3),
+        }).eq("id", test_id).execute()
+
+        settings = get_settings()
+        max_items = self.MATH_QUESTIONS if section == "math" else self.RW_QUESTIONS
+        result = {
+            "section": section,
+            "done": should_stop(
+                se, len(answered), settings.diagnostic_cat_se_threshold,
+                settings.diagnostic_cat_min_items, max_items,
+            ),
+            "ability": round(ability, 3),
+            "standard_error": round(se, 3),
+            "questions_answered": len(answered),
+            "question": None,
+        }
+        if result["done"]:
+            return result
+
+        if pending:
+            dtq_id = pending[0]["id"]
+        else:
+            question_id = select_item(
+                index, ability, {q["question_id"] for q in given}, settings.diagnostic_cat_top_k
+            )
+            if question_id is None:
+                result["done"] = True
+                return result
+
+            next_order = max((q["display_order"] for q in given_response.data), default=0) + 1
+            inserted = self.db.table("diagnostic_test_questions").insert({
+                "test_id": test_id,
+                "question_id": question_id,
+                "section": section,
+                "display_order": next_order,
+                "status": DiagnosticQuestionStatus.NOT_STARTED.value,
+                "is_marked_for_review": False,
+            }).execute()
+            dtq_id = inserted.data[0]["id"]
+
+        question_response = (
+            self.db.table("diagnostic_test_questions")
+            .select(self.QUESTION_DETAIL_SELECT)
+            .eq("id", dtq_id)
+            .execute()
+        )
+        result["question"] = question_response.data[0]
+        return result
+
+    def _ability_baselines(
+        self, answered: List[Dict], topic_performance: Dict[str, Dict]
+    ) -> Tuple[Dict[str, Dict], Dict[str, float], Dict[str, float]]:
+        """
+        BKT baselines for an adaptive test from each section's ability.
+
+        Each topic gets the guess-adjusted expected score on its items at the
+        section's ability. Topics with answered questions become baselines
+        with their observed attempt counts; topics the test never reached only
+        get that score as the prior for a new record, so mastery the student
+        already built in practice is not overwritten.
+
+        Returns:
+            (baselines keyed by answered topic, ability columns for
+            diagnostic_tests, priors keyed by unreached topic)
+        """
+        baselines = {}
+        abilities = {}
+        unreached_priors = {}
+
+        for section, prefix in self.SECTION_PREFIX.items():
+            index = get_item_index(self.db, section)
+            section_answered = [q for q in answered if q["section"] == section]
+            a, b = index.params([q["question_id"] for q in section_answered])
+            ability, se = estimate_ability(a, b, np.array([q["is_correct"] for q in section_answered]))
+            abilities[f"{prefix}_ability"] = round(ability, 3)
+            abilities[f"{prefix}_ability_se"] = round(se, 3)
+
+            positions_by_topic = {}
+            for pos, topic_id in enumerate(index.topic_ids):
+                positions_by_topic.setdefault(topic_id, []).append(pos)
+
+            for topic_id, positions in positions_by_topic.items():
+                mastery = mastery_from_ability(
+                    ability, index.discrimination[positions], index.difficulty[positions]
+                )
+                perf = topic_performance.get(topic_id)
+                if perf and perf["total"]:
+                    baselines[topic_id] = {
+                        "mastery": mastery,
+                        "total_attempts": perf["total"],
+                        "correct_attempts": perf["correct"],
+                    }
+                else:
+                    unreached_priors[topic_id] = mastery
+
+        return baselines, abilities, unreached_priors
+
     async def complete_test(self, test_id: str, user_id: str) -> Dict:
         """
         Complete a diagnostic test and initialize BKT mastery baselines.
@@ -380,60 +551,54 @@ class DiagnosticTestService:
         # Initialize BKT mastery for each topic based on performance
         bkt_service = BKTService(self.db)
         mastery_updates = []
+        baselines = {}
+        unreached_priors = {}
+        update_data = {}
+
+        if test.get("mode") == DiagnosticTestMode.ADAPTIVE.value:
+            # Seed from the section abilities rather than raw per-topic scores
+            answered = [q for q in questions_response.data if q.get("is_correct") is not None]
+            baselines, update_data, unreached_priors = self._ability_baselines(
+                answered, topic_performance
+            )
+            update_data["total_questions"] = len(questions_response.data)
 
         for topic_id, perf in topic_performance.items():
-            percentage_correct = perf["correct"] / perf["total"] if perf["total"] > 0 else 0
-
-            # Adjust for guessing (P(G) = 0.25)
-            # Formula: P(L0) = (observed - guess) / (1 - guess)
-            adjusted_mastery = max(0.01, min(0.99, (percentage_correct - 0.25) / 0.75))
-
-            # Check if mastery record already exists
-            existing_mastery = await bkt_service.get_user_mastery(user_id, topic_id)
-
-            mastery_data = {
-                "user_id": user_id,
-                "skill_id": topic_id,
-                "mastery_probability": round(adjusted_mastery, 4),
-                "prior_knowledge": round(adjusted_mastery, 4),
-                "total_attempts": perf["total"],
-                "correct_attempts": perf["correct"],
-                "last_practiced_at": datetime.utcnow().isoformat()
-            }
+            if topic_id not in baselines:
+                percentage_correct = perf["correct"] / perf["total"] if perf["total"] > 0 else 0
+
+                # Adjust for guessing (P(G) = 0.25)
+                # Formula: P(L0) = (observed - guess) / (1 - guess)
+                adjusted_mastery = max(0.01, min(0.99, (percentage_correct - 0.25) / 0.75))
 
-            if existing_mastery:
-                # Update existing record
-                self.db.table("user_skill_mastery").update(mastery_data).eq(
-                    "id", existing_mastery["id"]
-                ).execute()
-            else:
-                # Create new record with default BKT parameters
-                mastery_data.update({
-                    "learn_rate": bkt_service.DEFAULT_LEARN,
-                    "guess_probability": bkt_service.DEFAULT_GUESS,
-                    "slip_probability": bkt_service.DEFAULT_SLIP,
-                })
-                self.db.table("user_skill_mastery").insert(mastery_data).execute()
+                baselines[topic_id] = {
+                    "mastery": adjusted_mastery,
+                    "total_attempts": perf["total"],
+                    "correct_attempts": perf["correct"],
+                }
 
             mastery_updates.append({
                 "topic_id": topic_id,
                 "topic_name": perf["topic_name"],
-                "initial_mastery": round(adjusted_mastery, 4),
+                "initial_mastery": round(baselines[topic_id]["mastery"], 4),
                 "questions_answered": perf["total"],
                 "correct_answers": perf["correct"]
             })
 
-        # Initialize any remaining topics with default prior if not covered in diagnostic
+        # Write all baselines in one batch, initializing any remaining topics
+        # that have no record yet (with the ability-derived prior on adaptive
+        # tests, the default prior otherwise)
         all_topics_response = self.db.table("topics").select("id").execute()
-        for topic in all_topics_response.data:
-            topic_id = topic["id"]
-            if topic_id not in topic_performance:
-                existing = await bkt_service.get_user_mastery(user_id, topic_id)
-                if not existing:
-                    await bkt_service.initialize_skill_mastery(user_id, topic_id)
+        await bkt_service.set_mastery_baselines(
+            user_id,
+            baselines,
+            default_skill_ids=[topic["id"] for topic in all_topics_response.data],
+            default_priors=unreached_priors,
+        )
 
         # Update test record
         update_data = {
+            **update_data,
             "status": DiagnosticTestStatus.COMPLETED.value,
             "completed_at": datetime.utcnow().isoformat(),
             "total_correct": total_correct,
@@ -449,5 +614,7 @@ class DiagnosticTestService:
             "mastery_updates": mastery_updates,
             "total_correct": total_correct,
             "math_correct": math_correct,
-            "rw_correct": rw_correct
+            "rw_correct": rw_correct,
+            "math_ability": update_data.get("math_ability"),
+            "rw_ability": update_data.get("rw_ability"),
         }
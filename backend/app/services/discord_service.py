@@ -3,6 +3,8 @@ import logging
 from datetime import datetime
 from typing import Optional
 
+from app.core.http_clients import WEBHOOK_TIMEOUT, get_http_clients
+
 logger = logging.getLogger(__name__)
 
 
@@ -64,9 +66,9 @@ async def send_user_signup_notification(
         }
 
         # Send POST request to Discord webhook
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            response = await client.post(webhook_url, json=payload)
-            response.raise_for_status()
+        client = get_http_clients().webhooks
+        response = await client.post(webhook_url, json=payload, timeout=WEBHOOK_TIMEOUT)
+        response.raise_for_status()
 
         logger.info(f"Discord notification sent for user signup: {email}")
         return True
@@ -155,9 +157,9 @@ async def send_feedback_notification(
         }
 
         # Send POST request to Discord webhook
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            response = await client.post(webhook_url, json=payload)
-            response.raise_for_status()
+        client = get_http_clients().webhooks
+        response = await client.post(webhook_url, json=payload, timeout=WEBHOOK_TIMEOUT)
+        response.raise_for_status()
 
         logger.info(f"Discord feedback notification sent from: {user_email}")
         return True
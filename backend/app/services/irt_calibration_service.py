@@ -0,0 +1,338 @@
+"""
+IRT Calibration Service
+
+Fits 2-parameter logistic (2PL) item parameters from every scored response
+(practice sessions, mock exams, diagnostic tests) and writes them to
+question_difficulty_params:
+
+    P(correct | theta) = 1 / (1 + exp(-a * (theta - b)))
+
+a is the discrimination, b the difficulty and theta the student's ability.
+Estimation is joint maximum likelihood (JMLE): alternating Fisher-scoring
+steps for abilities and item parameters, vectorized over all responses with
+NumPy, with weak normal priors so items or students with all-correct or
+all-wrong responses stay finite.
+
+Recalibration is incremental: items whose response count is unchanged since
+their last calibration keep their stored parameters (which also anchor the
+ability scale) and only items with new responses are re-estimated and written.
+"""
+
+import time
+from array import array
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from supabase import Client
+
+# Response sources in the irt_item_responses view
+RESPONSE_SOURCES = ("session", "mock_exam", "diagnostic")
+
+# Bounds from the question_difficulty_params CHECK constraints
+DIFFICULTY_MIN, DIFFICULTY_MAX = -3.0, 3.0
+DISCRIMINATION_MIN, DISCRIMINATION_MAX = 0.1, 3.0
+THETA_MAX = 4.0
+
+# Priors: theta ~ N(0, 1), b ~ N(0, 2^2), a ~ N(1, 0.5^2)
+DIFFICULTY_PRIOR_VAR = 4.0
+DISCRIMINATION_PRIOR_VAR = 0.25
+
+# Largest change to a parameter in one scoring step
+MAX_STEP = 1.0
+
+
+@dataclass
+class ResponseData:
+    """Responses encoded as parallel index arrays"""
+    person_idx: np.ndarray  # int32, index into user_ids
+    item_idx: np.ndarray    # int32, index into question_ids
+    correct: np.ndarray     # int8, 1 if correct
+    user_ids: List[str]
+    question_ids: List[str]
+
+
+@dataclass
+class CalibrationFit:
+    discrimination: np.ndarray
+    difficulty: np.ndarray
+    theta: np.ndarray
+    iterations: int
+
+
+def _sigmoid(z: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-z))
+
+
+def _logit(p: np.ndarray) -> np.ndarray:
+    return np.log(p / (1.0 - p))
+
+
+def fit_2pl(
+    person_idx: np.ndarray,
+    item_idx: np.ndarray,
+    correct: np.ndarray,
+    n_persons: int,
+    n_items: int,
+    discrimination: Optional[np.ndarray] = None,
+    difficulty: Optional[np.ndarray] = None,
+    fixed: Optional[np.ndarray] = None,
+    max_iter: int = 50,
+    tol: float = 1e-3,
+) -> CalibrationFit:
+    """
+    Estimate 2PL item parameters and abilities by JMLE.
+
+    Args:
+        person_idx: Responding person per response (0..n_persons-1)
+        item_idx: Item per response (0..n_items-1)
+        correct: 1/0 outcome per response
+        n_persons: Number of persons
+        n_items: Number of items
+        discrimination: Starting a per item (NaN or omitted: 1.0)
+        difficulty: Starting b per item (NaN or omitted: from the item's p-value)
+        fixed: Items whose a and b are held at their starting values. When
+            any are fixed they define the ability scale; otherwise abilities
+            are standardized to mean 0, sd 1 each iteration.
+        max_iter: Maximum alternating iterations
+        tol: Stop once no free item parameter moves more than this
+
+    Returns:
+        CalibrationFit with a, b per item, theta per person and iterations run
+    """
+    y = correct.astype(np.float64)
+    fixed = np.zeros(n_items, dtype=bool) if fixed is None else fixed
+    free = ~fixed
+    anchored = bool(fixed.any())
+
+    n_item = np.bincount(item_idx, minlength=n_items)
+    s_item = np.bincount(item_idx, weights=y, minlength=n_items)
+    n_person = np.bincount(person_idx, minlength=n_persons)
+    s_person = np.bincount(person_idx, weights=y, minlength=n_persons)
+
+    a = np.ones(n_items) if discrimination is None else np.nan_to_num(discrimination, nan=1.0)
+    b = -_logit((s_item + 0.5) / (n_item + 1.0))
+    if difficulty is not None:
+        b = np.where(np.isnan(difficulty), b, difficulty)
+    b = np.clip(b, DIFFICULTY_MIN, DIFFICULTY_MAX)
+    theta = np.clip(_logit((s_person + 0.5) / (n_person + 1.0)), -THETA_MAX, THETA_MAX)
+
+    iterations = 0
+    for iterations in range(1, max_iter + 1):
+        # Ability step (MAP with a standard normal prior)
+        a_r = a[item_idx]
+        p = _sigmoid(a_r * (theta[person_idx] - b[item_idx]))
+        grad = np.bincount(person_idx, weights=a_r * (y - p), minlength=n_persons) - theta
+        info = np.bincount(person_idx, weights=a_r * a_r * p * (1.0 - p), minlength=n_persons) + 1.0
+        theta = np.clip(theta + np.clip(grad / info, -MAX_STEP, MAX_STEP), -THETA_MAX, THETA_MAX)
+        if not anchored:
+            theta = (theta - theta.mean()) / (theta.std() or 1.0)
+
+        # Item step: one 2x2 Fisher-scoring step on (a, b) per item
+        d = theta[person_idx] - b[item_idx]
+        p = _sigmoid(a_r * d)
+        w = p * (1.0 - p)
+        r = y - p
+        g_a = np.bincount(item_idx, weights=d * r, minlength=n_items) - (a - 1.0) / DISCRIMINATION_PRIOR_VAR
+        g_b = np.bincount(item_idx, weights=-a_r * r, minlength=n_items) - b / DIFFICULTY_PRIOR_VAR
+        i_aa = np.bincount(item_idx, weights=d * d * w, minlength=n_items) + 1.0 / DISCRIMINATION_PRIOR_VAR
+        i_bb = np.bincount(item_idx, weights=a_r * a_r * w, minlength=n_items) + 1.0 / DIFFICULTY_PRIOR_VAR
+        i_ab = np.bincount(item_idx, weights=-a_r * d * w, minlength=n_items)
+        det = i_aa * i_bb - i_ab * i_ab
+        step_a = np.clip((i_bb * g_a - i_ab * g_b) / det, -MAX_STEP, MAX_STEP)
+        step_b = np.clip((i_aa * g_b - i_ab * g_a) / det, -MAX_STEP, MAX_STEP)
+
+        new_a = np.where(free, np.clip(a + step_a, DISCRIMINATION_MIN, DISCRIMINATION_MAX), a)
+        new_b = np.where(free, np.clip(b + step_b, DIFFICULTY_MIN, DIFFICULTY_MAX), b)
+        change = max(
+            float(np.abs(new_a - a).max(initial=0.0)),
+            float(np.abs(new_b - b).max(initial=0.0)),
+        )
+        a, b = new_a, new_b
+        if change < tol:
+            break
+
+    return CalibrationFit(discrimination=a, difficulty=b, theta=theta, iterations=iterations)
+
+
+def point_biserial(
+    item_idx: np.ndarray, correct: np.ndarray, ability: np.ndarray, n_items: int
+) -> np.ndarray:
+    """Correlation between correctness and ability per item (NaN when undefined)"""
+    y = correct.astype(np.float64)
+    n = np.bincount(item_idx, minlength=n_items).astype(np.float64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_y = np.bincount(item_idx, weights=y, minlength=n_items) / n
+        mean_t = np.bincount(item_idx, weights=ability, minlength=n_items) / n
+        mean_tt = np.bincount(item_idx, weights=ability * ability, minlength=n_items) / n
+        mean_yt = np.bincount(item_idx, weights=y * ability, minlength=n_items) / n
+        cov = mean_yt - mean_y * mean_t
+        var = (mean_y * (1.0 - mean_y)) * (mean_tt - mean_t * mean_t)
+        return cov / np.sqrt(var)
+
+
+class IRTCalibrationService:
+    """Batch 2PL calibration writing question_difficulty_params"""
+
+    def __init__(self, db: Client, page_size: int = 1000):
+        """
+        Args:
+            db: Service role client (the response view spans all users)
+            page_size: Rows per request when reading responses and parameters
+        """
+        self.db = db
+        self.page_size = page_size
+
+    def _iter_response_pages(self) -> Iterator[List[Dict]]:
+        """Yield scored responses page by page, keyset-paginated per source"""
+        for source in RESPONSE_SOURCES:
+            last_id = None
+            while True:
+                query = (
+                    self.db.table("irt_item_responses")
+                    .select("response_id, user_id, question_id, is_correct")
+                    .eq("source", source)
+                )
+                if last_id is not None:
+                    query = query.gt("response_id", last_id)
+                rows = query.order("response_id").limit(self.page_size).execute().data
+                if rows:
+                    yield rows
+                if len(rows) < self.page_size:
+                    break
+                last_id = rows[-1]["response_id"]
+
+    def load_responses(self) -> ResponseData:
+        """Stream all scored responses into index arrays"""
+        users: Dict[str, int] = {}
+        items: Dict[str, int] = {}
+        person_idx = array("i")
+        item_idx = array("i")
+        correct = array("b")
+
+        for rows in self._iter_response_pages():
+            person_idx.extend(users.setdefault(r["user_id"], len(users)) for r in rows)
+            item_idx.extend(items.setdefault(r["question_id"], len(items)) for r in rows)
+            correct.extend(1 if r["is_correct"] else 0 for r in rows)
+
+        return ResponseData(
+            person_idx=np.frombuffer(person_idx, dtype=np.int32) if person_idx else np.zeros(0, np.int32),
+            item_idx=np.frombuffer(item_idx, dtype=np.int32) if item_idx else np.zeros(0, np.int32),
+            correct=np.frombuffer(correct, dtype=np.int8) if correct else np.zeros(0, np.int8),
+            user_ids=list(users),
+            question_ids=list(items),
+        )
+
+    def load_params(self) -> Dict[str, Dict]:
+        """Current question_difficulty_params rows keyed by question_id"""
+        params = {}
+        last_id = None
+        while True:
+            query = self.db.table("question_difficulty_params").select(
+                "question_id, difficulty_param, discrimination_param, total_responses, is_calibrated"
+            )
+            if last_id is not None:
+                query = query.gt("question_id", last_id)
+            rows = query.order("question_id").limit(self.page_size).execute().data
+            for row in rows:
+                params[row["question_id"]] = row
+            if len(rows) < self.page_size:
+                return params
+            last_id = rows[-1]["question_id"]
+
+    @staticmethod
+    def _starting_params(
+        question_ids: List[str], stored: Dict[str, Dict], counts: np.ndarray, full: bool
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Starting a, b per item and the mask of items to keep fixed"""
+        n_items = len(question_ids)
+        a = np.full(n_items, np.nan)
+        b = np.full(n_items, np.nan)
+        fixed = np.zeros(n_items, dtype=bool)
+
+        for i, question_id in enumerate(question_ids):
+            row = stored.get(question_id)
+            if not row or row.get("difficulty_param") is None:
+                continue
+            a[i] = float(row["discrimination_param"])
+            b[i] = float(row["difficulty_param"])
+            fixed[i] = not full and row.get("total_responses") == int(counts[i])
+
+        return a, b, fixed
+
+    def _write_params(self, rows: List[Dict]) -> None:
+        for start in range(0, len(rows), self.page_size):
+            self.db.table("question_difficulty_params").upsert(
+                rows[start:start + self.page_size], on_conflict="question_id"
+            ).execute()
+
+    async def calibrate(
+        self,
+        full: bool = False,
+        min_responses: int = 30,
+        max_iter: int = 50,
+    ) -> Dict:
+        """
+        Recalibrate item parameters from all scored responses.
+
+        Args:
+            full: Re-estimate every item instead of only those with new responses
+            min_responses: Responses an item needs to be marked is_calibrated
+            max_iter: Maximum JMLE iterations
+
+        Returns:
+            Summary with response/user/item counts, items updated and timings
+        """
+        started = time.perf_counter()
+        data = self.load_responses()
+        stored = self.load_params()
+        load_seconds = time.perf_counter() - started
+
+        n_items = len(data.question_ids)
+        n_persons = len(data.user_ids)
+        summary = {
+            "responses": int(len(data.correct)),
+            "users": n_persons,
+            "items": n_items,
+            "items_updated": 0,
+            "items_calibrated": 0,
+            "iterations": 0,
+            "load_seconds": round(load_seconds, 2),
+            "fit_seconds": 0.0,
+        }
+
+        counts = np.bincount(data.item_idx, minlength=n_items)
+        a, b, fixed = self._starting_params(data.question_ids, stored, counts, full)
+        if n_items == 0 or fixed.all():
+            return summary
+
+        fit_started = time.perf_counter()
+        fit = fit_2pl(
+            data.person_idx, data.item_idx, data.correct, n_persons, n_items,
+            discrimination=a, difficulty=b, fixed=fixed, max_iter=max_iter,
+        )
+        biserial = point_biserial(data.item_idx, data.correct, fit.theta[data.person_idx], n_items)
+        summary["fit_seconds"] = round(time.perf_counter() - fit_started, 2)
+        summary["iterations"] = fit.iterations
+
+        correct_counts = np.bincount(data.item_idx, weights=data.correct, minlength=n_items)
+        calibrated_at = datetime.utcnow().isoformat()
+        rows = []
+        for i in np.flatnonzero(~fixed):
+            is_calibrated = bool(counts[i] >= min_responses)
+            rows.append({
+                "question_id": data.question_ids[i],
+                "difficulty_param": round(float(fit.difficulty[i]), 3),
+                "discrimination_param": round(float(fit.discrimination[i]), 3),
+                "total_responses": int(counts[i]),
+                "correct_responses": int(correct_counts[i]),
+                "is_calibrated": is_calibrated,
+                "point_biserial": None if np.isnan(biserial[i]) else round(float(biserial[i]), 3),
+                "calibrated_at": calibrated_at,
+            })
+            summary["items_calibrated"] += is_calibrated
+
+        self._write_params(rows)
+        summary["items_updated"] = len(rows)
+        return summary
@@ -0,0 +1,48 @@
+"""Handlers for durable background jobs (see app/services/job_queue.py).
+
+Importing this module registers every handler; both the API (for inline runs)
+and the worker entry point import it. Handlers receive a service-role client,
+so they must only act on the records named in their payload.
+"""
+
+from typing import Any, Dict, Optional
+
+from supabase import Client
+
+from app.config import get_settings
+from app.services.job_queue import job_handler
+from app.services.mock_exam_service import MockExamService
+from app.services.irt_calibration_service import IRTCalibrationService
+from app.services.population_index import PopulationIndexService
+
+MOCK_EXAM_FINALIZE = "mock_exam.finalize"
+IRT_CALIBRATE = "irt.calibrate"
+POPULATION_REBUILD = "population.rebuild"
+
+
+@job_handler(MOCK_EXAM_FINALIZE)
+async def finalize_mock_exam(payload: Dict[str, Any], db: Client) -> Optional[Dict[str, Any]]:
+    """Scaled scores and mastery updates once every module of an exam is completed"""
+    exam = db.table("mock_exams").select("user_id").eq("id", payload["exam_id"]).execute()
+    if not exam.data or exam.data[0]["user_id"] != payload["user_id"]:
+        raise PermissionError(f"Exam {payload['exam_id']} does not belong to user {payload['user_id']}")
+
+    finalized = await MockExamService(db).finalize_exam_if_complete(
+        exam_id=payload["exam_id"], user_id=payload["user_id"]
+    )
+    return {"finalized": finalized}
+
+
+@job_handler(IRT_CALIBRATE)
+async def calibrate_irt(payload: Dict[str, Any], db: Client) -> Optional[Dict[str, Any]]:
+    """Refit 2PL parameters for items with new responses (all items if payload["full"])"""
+    return await IRTCalibrationService(db).calibrate(
+        full=bool(payload.get("full")),
+        min_responses=payload.get("min_responses") or get_settings().irt_min_responses,
+    )
+
+
+@job_handler(POPULATION_REBUILD)
+async def rebuild_population_index(payload: Dict[str, Any], db: Client) -> Optional[Dict[str, Any]]:
+    """Rebuild the population percentile digests from every student's latest metrics"""
+    return await PopulationIndexService(db).rebuild()
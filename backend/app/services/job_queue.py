@@ -0,0 +1,195 @@
+"""Durable background jobs backed by the `background_jobs` table.
+
+FastAPI `BackgroundTasks` run in the request's process: if that process is
+recycled the work is lost, failures are only printed, and nothing records
+whether the work ever happened. Jobs here are rows in Postgres instead:
+
+- `enqueue` is idempotent on `job_key`, so a retried request doesn't queue the
+  same work twice.
+- Workers (`python -m app.worker`) claim due jobs with FOR UPDATE SKIP LOCKED,
+  so any number of them can poll without double-processing.
+- A failed job is retried with exponential backoff until `max_attempts`.
+- A job whose worker died is reclaimed once its lease expires.
+
+Handlers are registered per job type with `@job_handler("type")` and receive
+(payload, db) where db is a service-role client. Where no worker is running
+(serverless), `run_job_inline` lets the request process work a specific job
+right after responding; if that process dies, a worker picks the job up later.
+"""
+
+import asyncio
+import os
+import random
+import socket
+import traceback
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from supabase import Client
+
+from app.db import get_service_client
+
+JobHandler = Callable[[Dict[str, Any], Client], Awaitable[Optional[Dict[str, Any]]]]
+
+_HANDLERS: Dict[str, JobHandler] = {}
+
+# Retry backoff: BASE * 2^(attempt-1) seconds with jitter, capped at MAX
+BACKOFF_BASE_SECONDS = 10
+BACKOFF_MAX_SECONDS = 600
+# A running job is handed to another worker if not finished within this time
+DEFAULT_LEASE_SECONDS = 300
+
+
+def job_handler(job_type: str) -> Callable[[JobHandler], JobHandler]:
+    """Register an async handler for a job type"""
+    def decorator(func: JobHandler) -> JobHandler:
+        _HANDLERS[job_type] = func
+        return func
+    return decorator
+
+
+def registered_job_types() -> List[str]:
+    return sorted(_HANDLERS)
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def retry_delay_seconds(attempts: int) -> int:
+    """Backoff before the next attempt after `attempts` failed tries"""
+    delay = min(BACKOFF_BASE_SECONDS * 2 ** (attempts - 1), BACKOFF_MAX_SECONDS)
+    return int(delay * random.uniform(0.8, 1.2))
+
+
+class JobQueue:
+    """Enqueue, claim and settle background jobs"""
+
+    def __init__(self, db: Client):
+        self.db = db
+
+    def enqueue(
+        self,
+        job_type: str,
+        payload: Optional[Dict[str, Any]] = None,
+        job_key: Optional[str] = None,
+        user_id: Optional[str] = None,
+        max_attempts: int = 5,
+        delay_seconds: int = 0,
+    ) -> Dict[str, Any]:
+        """
+        Queue a job, or return the existing job with the same job_key.
+
+        Args:
+            job_type: Registered handler type, e.g. "mock_exam.finalize"
+            payload: JSON-serializable handler arguments
+            job_key: Idempotency key (enqueueing it again is a no-op)
+            user_id: Owner, who may read the job's status
+            max_attempts: Attempts before the job is marked failed
+            delay_seconds: Earliest start, relative to now
+
+        Returns:
+            The job row
+        """
+        response = self.db.rpc("enqueue_job", {
+            "p_job_type": job_type,
+            "p_payload": payload or {},
+            "p_job_key": job_key,
+            "p_user_id": user_id,
+            "p_max_attempts": max_attempts,
+            "p_delay_seconds": delay_seconds,
+        }).execute()
+        return response.data
+
+    def claim(
+        self,
+        worker_id: str,
+        limit: int = 1,
+        job_types: Optional[List[str]] = None,
+        job_id: Optional[str] = None,
+        lease_seconds: int = DEFAULT_LEASE_SECONDS,
+    ) -> List[Dict[str, Any]]:
+        """Claim up to `limit` due jobs (requires a service role client)"""
+        response = self.db.rpc("claim_jobs", {
+            "p_worker_id": worker_id,
+            "p_limit": limit,
+            "p_job_types": job_types,
+            "p_job_id": job_id,
+            "p_lease_seconds": lease_seconds,
+        }).execute()
+        return response.data or []
+
+    def complete(self, job: Dict[str, Any], result: Optional[Dict[str, Any]] = None) -> None:
+        self.db.table("background_jobs").update({
+            "status": "succeeded",
+            "result": result,
+            "last_error": None,
+            "completed_at": datetime.utcnow().isoformat(),
+        }).eq("id", job["id"]).eq("locked_by", job["locked_by"]).execute()
+
+    def fail(self, job: Dict[str, Any], error: str) -> None:
+        """Schedule a retry with backoff, or mark the job failed when out of attempts"""
+        if job["attempts"] >= job["max_attempts"]:
+            update = {
+                "status": "failed",
+                "completed_at": datetime.utcnow().isoformat(),
+            }
+        else:
+            delay = retry_delay_seconds(job["attempts"])
+            update = {
+                "status": "queued",
+                "run_at": (datetime.utcnow() + timedelta(seconds=delay)).isoformat(),
+                "locked_by": None,
+                "locked_at": None,
+            }
+        update["last_error"] = error[-4000:]
+        self.db.table("background_jobs").update(update).eq("id", job["id"]).eq(
+            "locked_by", job["locked_by"]
+        ).execute()
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Fetch a job (RLS limits users to their own)"""
+        response = self.db.table("background_jobs").select(
+            "id, job_type, status, attempts, max_attempts, run_at, last_error, result, "
+            "created_at, updated_at, completed_at"
+        ).eq("id", job_id).execute()
+        return response.data[0] if response.data else None
+
+    async def run(self, job: Dict[str, Any]) -> bool:
+        """Run a claimed job's handler and record the outcome
+
+        Returns:
+            True if the handler succeeded
+        """
+        handler = _HANDLERS.get(job["job_type"])
+        if handler is None:
+            self.fail(job, f"No handler registered for job type {job['job_type']}")
+            return False
+
+        try:
+            result = await handler(job.get("payload") or {}, self.db)
+        except Exception as e:
+            print(f"[JOB ERROR] {job['job_type']} {job['id']} attempt {job['attempts']}: {e}")
+            self.fail(job, f"{e}\n{traceback.format_exc()}")
+            return False
+
+        self.complete(job, result)
+        return True
+
+
+async def run_job_inline(job_id: str, lease_seconds: int = DEFAULT_LEASE_SECONDS) -> None:
+    """Claim and run one specific job in this process, if nobody else has
+
+    Meant for FastAPI BackgroundTasks right after enqueueing, so jobs still
+    run promptly where no worker is deployed. Jobs that fail here are retried
+    by workers on their backoff schedule.
+    """
+    queue = JobQueue(get_service_client())
+    try:
+        jobs = await asyncio.to_thread(
+            queue.claim, default_worker_id(), 1, None, job_id, lease_seconds
+        )
+        for job in jobs:
+            await queue.run(job)
+    except Exception as e:
+        print(f"[JOB ERROR] Failed to run job {job_id} inline: {e}")
@@ -0,0 +1,164 @@
+"""
+Learner Analytics Service
+
+All of a student's dashboard analytics in one call: learning velocity, score
+predictions, growth curve, skill heatmap and mock exam performance.
+
+Requested separately, those re-read the same mastery rows, snapshot series
+and study plan once per endpoint. Here each is loaded once into a shared
+RequestLoader (concurrently, since the client blocks) and every requested
+section is built from it by the same services the individual endpoints use,
+so their output is identical.
+
+Results are cached per user in the process, keyed by a version: the user's
+last mastery update and latest snapshot. Practice, mock exams and snapshots
+change one of them, so a cached result is only reused while what it was built
+from is unchanged. Study plan writes change neither and call
+invalidate_learner_analytics; other processes pick them up within
+learner_analytics_cache_ttl_seconds.
+"""
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from supabase import Client
+
+from app.config import get_settings
+from app.services.analytics_service import AnalyticsService
+from app.services.prediction_service import PredictionService
+from app.services.request_loader import RequestLoader
+from app.services.snapshot_series import load_snapshot_series
+from app.services.velocity_service import VelocityService
+
+LEARNER_ANALYTICS_SECTIONS = ("velocity", "predictions", "growth_curve", "skill_heatmap", "mock_exams")
+
+# Lookups each section is built from (the snapshot series is always loaded,
+# as part of the version)
+_SECTION_LOADS = {
+    "velocity": ("mastery",),
+    "predictions": ("study_plan",),
+    "growth_curve": (),
+    "skill_heatmap": ("mastery",),
+    "mock_exams": ("mock_exams",),
+}
+
+# Cached (user, growth_days, exam_limit) results kept per process
+ANALYTICS_CACHE_SIZE = 1024
+
+# (user_id, growth_days, exam_limit) -> (expires_at, version, sections)
+_analytics_cache: "OrderedDict[Tuple[str, int, int], Tuple[float, Tuple, Dict[str, Any]]]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def invalidate_learner_analytics(user_id: str) -> None:
+    """Drop a user's cached analytics after a write their version doesn't cover"""
+    with _cache_lock:
+        for key in [key for key in _analytics_cache if key[0] == user_id]:
+            del _analytics_cache[key]
+
+
+class LearnerAnalyticsService:
+    """Builds the dashboard's analytics sections from one load of the user's data"""
+
+    def __init__(self, db: Client, loader: Optional[RequestLoader] = None):
+        self.db = db
+        self.loader = loader or RequestLoader(db)
+        self.analytics = AnalyticsService(db, self.loader)
+        self.velocity = VelocityService(db, self.loader)
+        self.predictions = PredictionService(db, self.loader)
+
+    async def get_learner_analytics(
+        self,
+        user_id: str,
+        sections: Optional[Iterable[str]] = None,
+        growth_days: int = 30,
+        exam_limit: int = 10
+    ) -> Dict[str, Any]:
+        """
+        Get the requested analytics sections for a user.
+
+        Args:
+            user_id: Student ID
+            sections: Any of LEARNER_ANALYTICS_SECTIONS (None = all)
+            growth_days: Days covered by the growth curve
+            exam_limit: Maximum number of mock exams
+
+        Returns:
+            Dict with each requested section, shaped like its own endpoint's
+            response, and mastery_updated_at
+        """
+        sections = list(sections or LEARNER_ANALYTICS_SECTIONS)
+        key = (user_id, growth_days, exam_limit)
+
+        mastery_updated_at, series = await asyncio.gather(
+            asyncio.to_thread(self._get_mastery_updated_at, user_id),
+            asyncio.to_thread(load_snapshot_series, self.db, user_id, self.loader),
+        )
+        version = (mastery_updated_at, series.created_at[-1] if len(series) else None)
+
+        with _cache_lock:
+            cached = _analytics_cache.get(key)
+        if cached and cached[0] > time.monotonic() and cached[1] == version:
+            expires_at, built = cached[0], cached[2]
+        else:
+            expires_at, built = time.monotonic() + get_settings().learner_analytics_cache_ttl_seconds, {}
+
+        missing = [section for section in sections if section not in built]
+        if missing:
+            built = {**built, **await self._build_sections(user_id, missing, growth_days, exam_limit)}
+            if get_settings().learner_analytics_cache_ttl_seconds > 0:
+                with _cache_lock:
+                    _analytics_cache[key] = (expires_at, version, built)
+                    _analytics_cache.move_to_end(key)
+                    while len(_analytics_cache) > ANALYTICS_CACHE_SIZE:
+                        _analytics_cache.popitem(last=False)
+
+        return {
+            "mastery_updated_at": mastery_updated_at,
+            **{section: built[section] for section in sections}
+        }
+
+    def _get_mastery_updated_at(self, user_id: str) -> Optional[str]:
+        """When the user's mastery last changed (None before their first answer)"""
+        rows = self.db.table("user_skill_mastery").select("updated_at").eq(
+            "user_id", user_id
+        ).order("updated_at", desc=True).limit(1).execute().data
+        return rows[0]["updated_at"] if rows else None
+
+    async def _build_sections(
+        self,
+        user_id: str,
+        sections: Iterable[str],
+        growth_days: int,
+        exam_limit: int
+    ) -> Dict[str, Any]:
+        """Load what the sections need concurrently, then build each from the loader"""
+        prefetch = {
+            "mastery": lambda: self.loader.mastery(user_id),
+            "study_plan": lambda: self.loader.active_study_plan(user_id),
+            "mock_exams": lambda: self.analytics.get_completed_mock_exams(user_id, exam_limit),
+        }
+        loads = {load for section in sections for load in _SECTION_LOADS[section]}
+        await asyncio.gather(*(asyncio.to_thread(prefetch[load]) for load in loads))
+
+        built = {}
+        for section in sections:
+            if section == "velocity":
+                built[section] = await self.velocity.calculate_learning_velocity(user_id)
+            elif section == "predictions":
+                built[section] = await self.predictions.calculate_predictive_scores(user_id)
+            elif section == "growth_curve":
+                built[section] = {
+                    "data": await self.analytics.get_growth_curve(user_id, days_back=growth_days),
+                    "skill_id": None,
+                    "days_covered": growth_days
+                }
+            elif section == "skill_heatmap":
+                heatmap = await self.analytics.get_skill_heatmap(user_id)
+                built[section] = self.analytics.summarize_heatmap(heatmap)
+            elif section == "mock_exams":
+                built[section] = await self.analytics.get_mock_exam_performance(user_id, limit=exam_limit)
+        return built
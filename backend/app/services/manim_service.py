@@ -1,5 +1,6 @@
 import os
 import uuid
+import asyncio
 import subprocess
 import re
 import shutil
@@ -8,6 +9,9 @@ from typing import Dict, Any, Optional, List, Tuple
 from openai import OpenAI
 from supabase import Client, create_client
 from app.config import get_settings
+from app.services.manim_worker_pool import get_manim_worker_pool, render_environment
+from app.services.tts_cache import DEFAULT_CACHE_DIR, TTSAudioCache
+from app.services.storage_upload import upload_file
 from datetime import datetime
 
 settings = get_settings()
@@ -213,6 +217,10 @@ Use the exact category and topic names from the list above. If the question does
                 short_id=short_id
             )
 
+            tts_stats = self.get_tts_cache_stats()
+            if tts_stats is not None:
+                print(f"TTS cache: hit_rate={tts_stats['hit_rate']:.1%}, bytes_saved={tts_stats['bytes_saved']}")
+
             return {
                 "success": True,
                 "videoUrl": video_url,
@@ -228,6 +236,17 @@ Use the exact category and topic names from the list above. If the question does
             print(f"Error generating Manim video: {str(e)}")
             raise Exception(f"Failed to generate video: {str(e)}")
 
+    def get_tts_cache_stats(self) -> Optional[Dict[str, Any]]:
+        """Hit rate and bytes saved of the shared voiceover audio cache
+
+        Render processes record stats next to the cached audio, so read them
+        from the configured directory rather than this process's environment.
+        """
+        if settings.tts_cache_max_mb <= 0:
+            return None
+        cache_dir = Path(settings.tts_cache_dir) if settings.tts_cache_dir else DEFAULT_CACHE_DIR
+        return TTSAudioCache(cache_dir, settings.tts_cache_max_mb * 1024 * 1024).stats()
+
     async def _upload_to_storage(
         self, 
         video_path: Path, 
@@ -269,23 +288,22 @@ Use the exact category and topic names from the list above. If the question does
                 settings.supabase_service_role_key
             )
 
-            # Read video file
-            with open(video_path, "rb") as f:
-                video_content = f.read()
-
             # Upload to Supabase Storage with organized path structure
             # Format: {category_slug}/{topic_slug}/{short_id}.mp4
             storage_path = f"{category_slug}/{topic_slug}/{short_id}.mp4"
             bucket = service_client.storage.from_("manim-videos")
 
-            # Upload file (bucket should already exist from migration)
-            result = bucket.upload(
-                storage_path,
-                video_content,
-                {
-                    "content-type": "video/mp4",
-                    "cache-control": "public, max-age=31536000",  # 1 year cache
-                },
+            # Stream the file in resumable chunks instead of reading it into memory
+            # (bucket should already exist from migration)
+            await asyncio.to_thread(
+                upload_file,
+                video_path,
+                supabase_url=settings.supabase_url,
+                api_key=settings.supabase_service_role_key,
+                bucket="manim-videos",
+                object_name=storage_path,
+                content_type="video/mp4",
+                cache_control="31536000",  # 1 year cache
             )
 
             # Get public URL
@@ -433,6 +451,13 @@ Do not include any explanations or markdown formatting, just the code."""
             if not class_name:
                 raise Exception("Could not find Scene or VoiceoverScene class in generated code")
 
+            # Render on a warm worker (manim already imported) when the pool is enabled
+            pool = get_manim_worker_pool()
+            if pool is not None:
+                return await asyncio.to_thread(
+                    pool.render, code, class_name, scene_id, self.output_dir
+                )
+
             # Run manim command
             cmd = [
                 "manim",
@@ -442,13 +467,12 @@ Do not include any explanations or markdown formatting, just the code."""
                 class_name,
             ]
 
-            # Set up environment to include backend directory in Python path
-            env = os.environ.copy()
+            # Scene environment (OPENAI_API_KEY and TTS cache settings for
+            # VoiceoverService, no Supabase keys unless the cache needs them),
+            # with the backend directory in the Python path
+            env = render_environment()
             backend_dir = str(Path(__file__).parent.parent.parent)
             env['PYTHONPATH'] = backend_dir + os.pathsep + env.get('PYTHONPATH', '')
-            # Explicitly set OPENAI_API_KEY for subprocess (VoiceoverService needs it)
-            if settings.openai_api_key:
-                env['OPENAI_API_KEY'] = settings.openai_api_key
 
             result = subprocess.run(
                 cmd,
@@ -456,7 +480,7 @@ Do not include any explanations or markdown formatting, just the code."""
                 env=env,
                 capture_output=True,
                 text=True,
-                timeout=120,  # 2 minute timeout
+                timeout=settings.manim_render_timeout,
             )
 
             if result.returncode != 0:
@@ -481,7 +505,7 @@ Do not include any explanations or markdown formatting, just the code."""
 
             return video_path
 
-        except subprocess.TimeoutExpired:
+        except (subprocess.TimeoutExpired, TimeoutError):
             raise Exception("Video generation timed out")
         except Exception as e:
             print(f"Error executing Manim: {str(e)}")
@@ -0,0 +1,337 @@
+"""Pool of long-lived Manim render workers.
+
+Spawning `manim render` for every attempt re-imports manim, numpy, cairo and
+manim_voiceover from scratch, which costs several seconds before the first
+frame is drawn. Workers in this pool import those once at startup and then
+receive scene source over a pipe. Every job renders in its own temp directory,
+and a worker is recycled after `max_jobs` renders or once its peak RSS has
+grown more than `max_rss_growth_mb` past its post-import baseline.
+"""
+
+import multiprocessing
+import os
+import queue
+import resource
+import shutil
+import sys
+import tempfile
+import threading
+import traceback
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from app.config import get_settings
+
+BACKEND_DIR = str(Path(__file__).parent.parent.parent)
+
+
+def _peak_rss_mb() -> float:
+    """Peak resident set size of the current process in MB (ru_maxrss is KB on Linux)"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _render_job(job: Dict[str, Any]) -> Path:
+    """Render one scene inside a worker and move the MP4 into the output layout
+
+    The video ends up at {output_dir}/media/videos/scene_{scene_id}/480p15/,
+    the same place the `manim render -ql` subprocess writes it, so upload,
+    cleanup and `/manim/videos/{filename}` keep working unchanged.
+    """
+    from manim import tempconfig
+
+    scene_id = job["scene_id"]
+    class_name = job["class_name"]
+    output_dir = Path(job["output_dir"])
+
+    work_dir = Path(tempfile.mkdtemp(prefix=f"manim_{scene_id[:8]}_"))
+    previous_cwd = os.getcwd()
+    try:
+        scene_file = work_dir / f"scene_{scene_id}.py"
+        scene_file.write_text(job["source"])
+
+        os.chdir(work_dir)
+        namespace: Dict[str, Any] = {"__name__": scene_file.stem, "__file__": str(scene_file)}
+        exec(compile(job["source"], str(scene_file), "exec"), namespace)
+
+        scene_cls = namespace.get(class_name)
+        if scene_cls is None:
+            raise Exception(f"Scene class {class_name} not defined in generated code")
+
+        with tempconfig({
+            "quality": "low_quality",
+            "media_dir": str(work_dir / "media"),
+            "input_file": str(scene_file),
+            "progress_bar": "none",
+        }):
+            scene = scene_cls()
+            scene.render()
+            rendered = Path(scene.renderer.file_writer.movie_file_path)
+
+        if not rendered.exists():
+            raise Exception(f"Video file not found after generation. Checked: {rendered}")
+
+        dest_dir = output_dir / "media" / "videos" / f"scene_{scene_id}" / "480p15"
+        dest_dir.mkdir(parents=True, exist_ok=True)
+        dest = dest_dir / rendered.name
+        shutil.move(str(rendered), str(dest))
+        return dest
+
+    finally:
+        os.chdir(previous_cwd)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def render_environment() -> Dict[str, str]:
+    """Environment for processes that run scene code
+
+    VoiceoverService reads OPENAI_API_KEY and the shared TTS cache reads its
+    TTS_CACHE_* / SUPABASE_* settings from the environment, which may only be
+    configured through the .env file in the parent process. Scene code is
+    generated, so SUPABASE_* variables inherited from this process are
+    dropped and the service role key is only passed when the cache's bucket
+    tier needs it.
+    """
+    settings = get_settings()
+    env = {key: value for key, value in os.environ.items() if not key.startswith("SUPABASE_")}
+    env.update({
+        "TTS_CACHE_DIR": settings.tts_cache_dir,
+        "TTS_CACHE_MAX_MB": str(settings.tts_cache_max_mb),
+        "TTS_CACHE_BUCKET": settings.tts_cache_bucket,
+    })
+    if settings.tts_cache_bucket:
+        env["SUPABASE_URL"] = settings.supabase_url
+        env["SUPABASE_SERVICE_ROLE_KEY"] = settings.supabase_service_role_key
+    if settings.openai_api_key:
+        env["OPENAI_API_KEY"] = settings.openai_api_key
+    return env
+
+
+def _worker_main(conn, env: Dict[str, str]) -> None:
+    """Worker process entry point: import manim once, then serve render jobs"""
+    if BACKEND_DIR not in sys.path:
+        sys.path.insert(0, BACKEND_DIR)
+    # Supabase keys inherited from the parent only stay if env passes them on
+    for key in [key for key in os.environ if key.startswith("SUPABASE_")]:
+        del os.environ[key]
+    os.environ.update(env)
+
+    try:
+        import manim  # noqa: F401
+        import app.services.openai_voiceover  # noqa: F401
+    except Exception:
+        conn.send({"ok": False, "error": traceback.format_exc()})
+        conn.close()
+        return
+
+    conn.send({"ok": True, "ready": True, "rss_mb": _peak_rss_mb()})
+
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            break
+        if job is None:
+            break
+
+        try:
+            video_path = _render_job(job)
+            conn.send({"ok": True, "video_path": str(video_path), "rss_mb": _peak_rss_mb()})
+        except Exception as e:
+            conn.send({
+                "ok": False,
+                "error": f"{e}\n{traceback.format_exc()}",
+                "rss_mb": _peak_rss_mb(),
+            })
+
+    conn.close()
+
+
+class _Worker:
+    """Parent-side handle for one worker process"""
+
+    def __init__(self, ctx, env: Dict[str, str]):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(
+            target=_worker_main,
+            args=(child_conn, env),
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+        self.ready = False
+        self.jobs = 0
+        self.baseline_rss_mb = 0.0
+        self.rss_mb = 0.0
+
+    def _recv(self, timeout: float) -> Dict[str, Any]:
+        if not self.conn.poll(timeout):
+            raise TimeoutError("Manim worker did not respond in time")
+        return self.conn.recv()
+
+    def wait_ready(self, timeout: float) -> None:
+        if self.ready:
+            return
+        message = self._recv(timeout)
+        if not message.get("ok"):
+            raise Exception(f"Manim worker failed to start: {message.get('error')}")
+        self.ready = True
+        self.baseline_rss_mb = self.rss_mb = message.get("rss_mb", 0.0)
+
+    def run(self, job: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        self.wait_ready(timeout)
+        self.conn.send(job)
+        result = self._recv(timeout)
+        self.jobs += 1
+        self.rss_mb = result.get("rss_mb", self.rss_mb)
+        return result
+
+    def stop(self) -> None:
+        try:
+            self.conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join(timeout=5)
+        self.conn.close()
+
+
+class ManimWorkerPool:
+    """Fixed-size pool of warm Manim workers, safe to use from multiple threads"""
+
+    def __init__(
+        self,
+        size: int,
+        max_jobs: int = 20,
+        max_rss_growth_mb: int = 512,
+        render_timeout: int = 120,
+        env: Optional[Dict[str, str]] = None,
+    ):
+        self.size = size
+        self.max_jobs = max_jobs
+        self.max_rss_growth_mb = max_rss_growth_mb
+        self.render_timeout = render_timeout
+        self.env = env or {}
+
+        self._ctx = multiprocessing.get_context("spawn")
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._started = False
+        self._closed = False
+
+        self.jobs_completed = 0
+        self.jobs_failed = 0
+        self.workers_recycled = 0
+
+    def start(self) -> None:
+        """Spawn workers; imports happen in the background until first use"""
+        with self._lock:
+            if self._started or self._closed:
+                return
+            for _ in range(self.size):
+                self._idle.put(self._spawn())
+            self._started = True
+        print(f"🔥 Started {self.size} warm Manim worker(s)")
+
+    def _spawn(self) -> _Worker:
+        return _Worker(self._ctx, self.env)
+
+    def _should_recycle(self, worker: _Worker) -> bool:
+        if worker.jobs >= self.max_jobs:
+            return True
+        return worker.rss_mb - worker.baseline_rss_mb > self.max_rss_growth_mb
+
+    def _retire(self, worker: _Worker) -> None:
+        worker.stop()
+        with self._lock:
+            self.workers_recycled += 1
+            if not self._closed:
+                self._idle.put(self._spawn())
+
+    def render(self, source: str, class_name: str, scene_id: str, output_dir: Path) -> Path:
+        """Render a scene on a warm worker and return the path of the MP4
+
+        Blocks the calling thread; async callers should go through
+        `asyncio.to_thread`.
+
+        Raises:
+            TimeoutError: If no worker is free or the render exceeds the timeout
+            Exception: If the scene fails to render
+        """
+        if self._closed:
+            raise Exception("Manim worker pool is shut down")
+        self.start()
+
+        try:
+            worker = self._idle.get(timeout=self.render_timeout)
+        except queue.Empty:
+            raise TimeoutError("No Manim worker became available in time")
+
+        job = {
+            "source": source,
+            "class_name": class_name,
+            "scene_id": scene_id,
+            "output_dir": str(output_dir),
+        }
+
+        try:
+            result = worker.run(job, self.render_timeout)
+        except Exception:
+            # Hung, crashed or failed-to-start worker: replace it with a fresh one
+            with self._lock:
+                self.jobs_failed += 1
+            self._retire(worker)
+            raise
+
+        if self._should_recycle(worker):
+            self._retire(worker)
+        else:
+            self._idle.put(worker)
+
+        with self._lock:
+            if result.get("ok"):
+                self.jobs_completed += 1
+            else:
+                self.jobs_failed += 1
+
+        if not result.get("ok"):
+            print(f"Manim error output: {result.get('error')}")
+            raise Exception(f"Manim execution failed: {result.get('error')}")
+
+        return Path(result["video_path"])
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": self.size,
+            "idle_workers": self._idle.qsize(),
+            "jobs_completed": self.jobs_completed,
+            "jobs_failed": self.jobs_failed,
+            "workers_recycled": self.workers_recycled,
+        }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            worker.stop()
+
+
+@lru_cache()
+def get_manim_worker_pool() -> Optional[ManimWorkerPool]:
+    """Shared worker pool, or None when MANIM_WORKER_POOL_SIZE is 0"""
+    settings = get_settings()
+    if settings.manim_worker_pool_size <= 0:
+        return None
+    return ManimWorkerPool(
+        size=settings.manim_worker_pool_size,
+        max_jobs=settings.manim_worker_max_jobs,
+        max_rss_growth_mb=settings.manim_worker_max_rss_growth_mb,
+        render_timeout=settings.manim_render_timeout,
+        env=render_environment(),
+    )
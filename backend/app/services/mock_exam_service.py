@@ -8,7 +8,11 @@ from app.models.mock_exam import (
     ModuleStatus,
     MockQuestionStatus,
 )
+from app.db import get_service_client
+from app.services.answer_buffer import get_answer_buffer
+from app.services.answer_validation_service import get_answer_matcher
 from app.services.bkt_service import BKTService
+from app.services.scoring_tables import get_scoring_tables
 
 
 class MockExamService:
@@ -23,22 +27,42 @@ class MockExamService:
     MEDIUM_DISTRIBUTION = {"E": 0.33, "M": 0.34, "H": 0.33}  # Balanced
     HARD_DISTRIBUTION = {"E": 0.15, "M": 0.35, "H": 0.5}  # Module 2 if did well
 
+    # A refill that dies holding the lease blocks others for at most this long
+    FORM_POOL_REFILL_LEASE_SECONDS = 300
+
     def __init__(self, db: Client):
         self.db = db
 
     async def create_mock_exam(
-        self, user_id: str, exam_type: str = "full_length"
+        self, user_id: str, exam_type: str = "full_length", use_form_pool: bool = True
     ) -> Dict:
         """
         Create a new mock exam with 4 modules (2 math, 2 reading/writing).
 
+        Module-1 questions come from pre-assembled forms (see replenish_form_pool),
+        claimed together with the exam and module inserts in a single database
+        transaction. If the pool is empty the exam is assembled the slow way.
+
         Args:
             user_id: User ID creating the exam
             exam_type: Type of exam (full_length or section_only)
+            use_form_pool: Claim pooled forms when available
 
         Returns:
             Dict containing exam and modules data
         """
+        if use_form_pool:
+            try:
+                response = self.db.rpc(
+                    "create_mock_exam_from_forms",
+                    {"p_exam_type": exam_type, "p_time_limit_minutes": self.TIME_LIMIT_MINUTES},
+                ).execute()
+                if response.data:
+                    return response.data
+                print("[MOCK EXAM] Form pool empty, assembling exam on demand")
+            except Exception as e:
+                print(f"[MOCK EXAM ERROR] Failed to create exam from form pool: {e}")
+
         # Create mock exam record
         exam_data = {
             "user_id": user_id,
@@ -51,7 +75,6 @@ class MockExamService:
         exam_id = exam["id"]
 
         # Create 4 modules - Start with Reading/Writing as per SAT format
-        modules = []
         module_types = [
             (ModuleType.RW_MODULE_1, 1),
             (ModuleType.RW_MODULE_2, 2),
@@ -59,62 +82,54 @@ class MockExamService:
             (ModuleType.MATH_MODULE_2, 2),
         ]
 
-        for module_type, module_number in module_types:
-            module_data = {
+        modules_data = [
+            {
                 "exam_id": exam_id,
                 "module_type": module_type.value,
                 "module_number": module_number,
                 "time_limit_minutes": self.TIME_LIMIT_MINUTES,
                 "status": ModuleStatus.NOT_STARTED.value,
             }
-            module_response = (
-                self.db.table("mock_exam_modules").insert(module_data).execute()
-            )
-            module = module_response.data[0]
-            modules.append(module)
+            for module_type, module_number in module_types
+        ]
+        modules_response = self.db.table("mock_exam_modules").insert(modules_data).execute()
+        modules_by_type = {m["module_type"]: m for m in modules_response.data}
+        modules = [modules_by_type[module_type.value] for module_type, _ in module_types]
 
-            # Generate questions for module 1 of each section
-            # Module 2 questions will be generated after module 1 is completed (adaptive)
+        # Generate questions for module 1 of each section
+        # Module 2 questions will be generated after module 1 is completed (adaptive)
+        for module_type, module_number in module_types:
             if module_number == 1:
                 await self._generate_module_questions(
-                    module["id"], module_type, difficulty_level="medium"
+                    modules_by_type[module_type.value]["id"],
+                    module_type,
+                    difficulty_level="medium",
+                    use_form_pool=use_form_pool,
                 )
 
         return {"exam": exam, "modules": modules}
 
-    async def _generate_module_questions(
-        self,
-        module_id: str,
-        module_type: ModuleType,
-        difficulty_level: str = "medium",
-    ) -> None:
-        """
-        Generate questions for a module based on module type, difficulty, and category weights.
+    @staticmethod
+    def _section_for_module(module_type: ModuleType) -> str:
+        return "math" if "math" in module_type.value else "reading_writing"
 
-        Args:
-            module_id: Module ID to assign questions to
-            module_type: Type of module (math or rw)
-            difficulty_level: Overall difficulty (easy, medium, hard) for adaptive testing
-        """
-        # Check if questions already exist for this module to prevent duplicates
-        existing_count = self.db.table("mock_exam_questions").select(
-            "id", count="exact"
-        ).eq("module_id", module_id).execute().count
-
-        if existing_count and existing_count > 0:
-            return  # Questions already generated, skip
+    def _distribution_for(self, difficulty_level: str) -> Dict[str, float]:
+        if difficulty_level == "easy":
+            return self.EASY_DISTRIBUTION
+        if difficulty_level == "hard":
+            return self.HARD_DISTRIBUTION
+        return self.MEDIUM_DISTRIBUTION
 
-        # Determine section type
-        section = "math" if "math" in module_type.value else "reading_writing"
+    def _load_question_bank(self, section: str) -> Tuple[List[Dict], Dict[str, Dict[str, List[Dict]]]]:
+        """
+        Fetch a section's categories and its active questions grouped for sampling.
 
-        # Select difficulty distribution
-        if difficulty_level == "easy":
-            distribution = self.EASY_DISTRIBUTION
-        elif difficulty_level == "hard":
-            distribution = self.HARD_DISTRIBUTION
-        else:
-            distribution = self.MEDIUM_DISTRIBUTION
+        Args:
+            section: Section name (math or reading_writing)
 
+        Returns:
+            Tuple of (categories with weights, {category_id: {difficulty: [questions]}})
+        """
         # Fetch categories with their weights for this section
         categories_response = (
             self.db.table("categories")
@@ -130,7 +145,7 @@ class MockExamService:
         # Filter by section through topics -> categories relationship
         questions_response = (
             self.db.table("questions")
-            .select("*, topics(id, category_id, categories(section))")
+            .select("id, difficulty, topics(id, category_id, categories(section))")
             .eq("is_active", True)
             .execute()
         )
@@ -157,13 +172,34 @@ class MockExamService:
             if difficulty in ["E", "M", "H"]:
                 questions_by_category[category_id][difficulty].append(q)
 
+        return categories_response.data, questions_by_category
+
+    def _category_target(self, category: Dict) -> int:
+        return int(self.QUESTIONS_PER_MODULE * category["weight_in_section"] / 100.0)
+
+    def _assemble_form(
+        self,
+        categories: List[Dict],
+        questions_by_category: Dict[str, Dict[str, List[Dict]]],
+        distribution: Dict[str, float],
+    ) -> List[Dict]:
+        """
+        Sample one module's questions by category weight and difficulty distribution.
+
+        Args:
+            categories: Section categories with weight_in_section
+            questions_by_category: Questions grouped by category and difficulty
+            distribution: Share of E/M/H questions within each category
+
+        Returns:
+            Shuffled list of at most QUESTIONS_PER_MODULE questions
+        """
         # Select questions per category based on weights
         selected_questions = []
 
-        for category in categories_response.data:
+        for category in categories:
             category_id = category["id"]
-            category_weight = category["weight_in_section"] / 100.0
-            category_target = int(self.QUESTIONS_PER_MODULE * category_weight)
+            category_target = self._category_target(category)
 
             if category_target == 0:
                 continue
@@ -226,9 +262,88 @@ class MockExamService:
         # Shuffle questions for randomness
         random.shuffle(selected_questions)
 
+        return selected_questions[:self.QUESTIONS_PER_MODULE]
+
+    def _validate_form(
+        self,
+        form: List[Dict],
+        categories: List[Dict],
+        questions_by_category: Dict[str, Dict[str, List[Dict]]],
+    ) -> bool:
+        """
+        Check a pooled form before storing it: a full module of distinct questions
+        where every category got its weighted share (or everything it has).
+        """
+        question_ids = [q["id"] for q in form]
+        if len(question_ids) != self.QUESTIONS_PER_MODULE or len(set(question_ids)) != len(question_ids):
+            return False
+
+        category_of = {
+            q["id"]: category_id
+            for category_id, by_difficulty in questions_by_category.items()
+            for questions in by_difficulty.values()
+            for q in questions
+        }
+        if any(qid not in category_of for qid in question_ids):
+            return False
+
+        for category in categories:
+            available = sum(len(qs) for qs in questions_by_category.get(category["id"], {}).values())
+            expected = min(self._category_target(category), available)
+            actual = sum(1 for qid in question_ids if category_of[qid] == category["id"])
+            if actual < expected:
+                return False
+
+        return True
+
+    async def _generate_module_questions(
+        self,
+        module_id: str,
+        module_type: ModuleType,
+        difficulty_level: str = "medium",
+        use_form_pool: bool = True,
+    ) -> None:
+        """
+        Generate questions for a module based on module type, difficulty, and category weights.
+
+        Claims a pre-assembled form for the section and difficulty tier when one
+        is available, otherwise samples the question bank directly.
+
+        Args:
+            module_id: Module ID to assign questions to
+            module_type: Type of module (math or rw)
+            difficulty_level: Overall difficulty (easy, medium, hard) for adaptive testing
+            use_form_pool: Claim a pooled form when available
+        """
+        # Check if questions already exist for this module to prevent duplicates
+        existing_count = self.db.table("mock_exam_questions").select(
+            "id", count="exact"
+        ).eq("module_id", module_id).execute().count
+
+        if existing_count and existing_count > 0:
+            return  # Questions already generated, skip
+
+        if use_form_pool:
+            try:
+                assigned = self.db.rpc(
+                    "assign_mock_exam_form",
+                    {"p_module_id": module_id, "p_difficulty_level": difficulty_level},
+                ).execute()
+                if assigned.data:
+                    return
+            except Exception as e:
+                print(f"[MOCK EXAM ERROR] Failed to assign pooled form: {e}")
+
+        categories, questions_by_category = self._load_question_bank(
+            self._section_for_module(module_type)
+        )
+        selected_questions = self._assemble_form(
+            categories, questions_by_category, self._distribution_for(difficulty_level)
+        )
+
         # Insert questions with display order
         batch_inserts = []
-        for idx, question in enumerate(selected_questions[:self.QUESTIONS_PER_MODULE], start=1):
+        for idx, question in enumerate(selected_questions, start=1):
             question_data = {
                 "module_id": module_id,
                 "question_id": question["id"],
@@ -241,6 +356,80 @@ class MockExamService:
         if batch_inserts:
             self.db.table("mock_exam_questions").insert(batch_inserts).execute()
 
+    async def replenish_form_pool(
+        self, target_per_tier: int = 20, low_water: int = 10
+    ) -> Optional[Dict[str, int]]:
+        """
+        Top up the pool of pre-assembled module forms.
+
+        A (section, difficulty tier) is refilled to target_per_tier once its
+        unclaimed count drops below low_water, so the question bank is fetched
+        once per refill rather than once per exam. Forms with a question that
+        was deactivated since they were built are discarded first. Refills
+        hold a lease in the database, so concurrent calls (one is scheduled
+        after every exam create) don't overfill the pool. Requires a service
+        role client.
+
+        Args:
+            target_per_tier: Unclaimed forms to keep per section and tier
+            low_water: Refill a tier when it has fewer unclaimed forms than this
+
+        Returns:
+            Dict of "{section}/{difficulty}" -> number of forms added, or None
+            if another refill is running
+        """
+        claimed = self.db.rpc(
+            "claim_mock_exam_form_pool_refill", {"p_lease_seconds": self.FORM_POOL_REFILL_LEASE_SECONDS}
+        ).execute().data
+        if not claimed:
+            return None
+
+        try:
+            discarded = self.db.rpc("discard_inactive_mock_exam_forms", {}).execute().data
+            if discarded:
+                print(f"[MOCK EXAM] Discarded {discarded} pooled forms with inactive questions")
+            return await self._refill_form_pool(target_per_tier, low_water)
+        finally:
+            self.db.rpc("release_mock_exam_form_pool_refill", {}).execute()
+
+    async def _refill_form_pool(self, target_per_tier: int, low_water: int) -> Dict[str, int]:
+        """Add forms to the tiers below low_water (caller holds the refill lease)."""
+        levels_response = self.db.table("mock_exam_form_pool_levels").select("*").execute()
+        levels = {
+            (row["section"], row["difficulty_level"]): row["available"]
+            for row in levels_response.data
+        }
+
+        added = {}
+        for section in ("reading_writing", "math"):
+            tiers_to_fill = {
+                difficulty: target_per_tier - levels.get((section, difficulty), 0)
+                for difficulty in ("easy", "medium", "hard")
+                if levels.get((section, difficulty), 0) < low_water
+            }
+            if not tiers_to_fill:
+                continue
+
+            categories, questions_by_category = self._load_question_bank(section)
+
+            for difficulty, needed in tiers_to_fill.items():
+                distribution = self._distribution_for(difficulty)
+                forms = []
+                for _ in range(needed):
+                    form = self._assemble_form(categories, questions_by_category, distribution)
+                    if self._validate_form(form, categories, questions_by_category):
+                        forms.append({
+                            "section": section,
+                            "difficulty_level": difficulty,
+                            "question_ids": [q["id"] for q in form],
+                        })
+
+                if forms:
+                    self.db.table("mock_exam_forms").insert(forms).execute()
+                added[f"{section}/{difficulty}"] = len(forms)
+
+        return added
+
     async def start_module(self, module_id: str, user_id: str) -> Dict:
         """
         Start a module, setting status and start time.
@@ -294,15 +483,24 @@ class MockExamService:
         return updated_module.data[0]
 
     async def complete_module(
-        self, module_id: str, user_id: str, time_remaining_seconds: Optional[int] = None
+        self,
+        module_id: str,
+        user_id: str,
+        time_remaining_seconds: Optional[int] = None,
+        finalize: bool = True,
     ) -> Dict:
         """
         Complete a module and calculate raw score. Generate adaptive questions for next module if needed.
 
+        Module 2 is committed from the candidates prepared by
+        prepare_next_module_candidates, so it is available when this returns.
+
         Args:
             module_id: Module ID to complete
             user_id: User ID completing the module
             time_remaining_seconds: Remaining time when module was completed
+            finalize: Finalize the exam here if all modules are done (callers that
+                pass False should call finalize_exam_if_complete themselves)
 
         Returns:
             Completed module with score
@@ -322,6 +520,9 @@ class MockExamService:
         if module["mock_exams"]["user_id"] != user_id:
             raise PermissionError("Module does not belong to user")
 
+        # Write buffered answer saves before scoring them
+        await get_answer_buffer().flush(module_id, forget=True)
+
         # Calculate raw score (count correct answers)
         questions_response = (
             self.db.table("mock_exam_questions")
@@ -351,94 +552,186 @@ class MockExamService:
 
         if module_number == 1:
             # Determine difficulty for module 2 based on module 1 performance
-            percentage = correct_count / self.QUESTIONS_PER_MODULE
-            if percentage >= 0.7:
-                next_difficulty = "hard"
-            elif percentage >= 0.4:
-                next_difficulty = "medium"
-            else:
-                next_difficulty = "easy"
-
-            # Get module 2 of same section
-            section_prefix = "math" if "math" in module_type else "rw"
-            next_module_type = f"{section_prefix}_module_2"
-
-            next_module_response = (
-                self.db.table("mock_exam_modules")
-                .select("*")
-                .eq("exam_id", exam_id)
-                .eq("module_type", next_module_type)
-                .execute()
-            )
+            next_difficulty = self._next_module_difficulty(correct_count)
 
-            if next_module_response.data:
-                next_module = next_module_response.data[0]
-                await self._generate_module_questions(
+            next_module = self._get_next_module(exam_id, module_type)
+            if next_module:
+                await self._commit_next_module(
                     next_module["id"],
-                    ModuleType(next_module_type),
-                    difficulty_level=next_difficulty,
+                    ModuleType(next_module["module_type"]),
+                    next_difficulty,
                 )
 
-        # Check if all modules are completed
-        all_modules_response = (
+        if finalize:
+            await self.finalize_exam_if_complete(exam_id, user_id)
+
+        return module
+
+    def _next_module_difficulty(self, correct_count: int) -> str:
+        """Pick module 2's difficulty tier from the module 1 raw score."""
+        percentage = correct_count / self.QUESTIONS_PER_MODULE
+        if percentage >= 0.7:
+            return "hard"
+        if percentage >= 0.4:
+            return "medium"
+        return "easy"
+
+    def _get_next_module(self, exam_id: str, module_type: str) -> Optional[Dict]:
+        """Get module 2 of the same section as a module-1 module type."""
+        section_prefix = "math" if "math" in module_type else "rw"
+        next_module_response = (
             self.db.table("mock_exam_modules")
             .select("*")
             .eq("exam_id", exam_id)
+            .eq("module_type", f"{section_prefix}_module_2")
             .execute()
         )
+        return next_module_response.data[0] if next_module_response.data else None
 
-        all_completed = all(
-            m["status"] == ModuleStatus.COMPLETED.value
-            for m in all_modules_response.data
+    async def prepare_next_module_candidates(self, module_id: str, user_id: str) -> List[str]:
+        """
+        Speculatively prepare easy, medium and hard forms for module 2 while
+        module 1 is in progress, so completing module 1 only has to commit one.
+
+        Pooled forms are reserved first; any tier the pool can't supply is
+        assembled from the question bank.
+
+        Args:
+            module_id: Module 1 ID (other modules are ignored)
+            user_id: User ID taking the exam
+
+        Returns:
+            Difficulty tiers that had to be assembled on demand
+        """
+        module_response = (
+            self.db.table("mock_exam_modules")
+            .select("*, mock_exams!inner(user_id)")
+            .eq("id", module_id)
+            .execute()
         )
 
-        if all_completed:
-            await self._finalize_exam(exam_id, user_id)
+        if not module_response.data:
+            raise ValueError("Module not found")
 
-        return module
+        module = module_response.data[0]
+        if module["mock_exams"]["user_id"] != user_id:
+            raise PermissionError("Module does not belong to user")
 
-    async def _finalize_exam(self, exam_id: str, user_id: str) -> None:
+        if module["module_number"] != 1:
+            return []
+
+        next_module = self._get_next_module(module["exam_id"], module["module_type"])
+        if not next_module:
+            return []
+
+        # Candidates are only written with the service role, so users can't
+        # plant their own module-2 questions
+        service_db = get_service_client()
+        missing = service_db.rpc(
+            "reserve_module_candidates", {"p_module_id": next_module["id"]}
+        ).execute().data or []
+
+        if missing:
+            categories, questions_by_category = self._load_question_bank(
+                self._section_for_module(ModuleType(next_module["module_type"]))
+            )
+            candidates = [
+                {
+                    "module_id": next_module["id"],
+                    "difficulty_level": difficulty,
+                    "question_ids": [
+                        q["id"]
+                        for q in self._assemble_form(
+                            categories, questions_by_category, self._distribution_for(difficulty)
+                        )
+                    ],
+                }
+                for difficulty in missing
+            ]
+            service_db.table("mock_exam_module_candidates").upsert(
+                candidates, on_conflict="module_id,difficulty_level", ignore_duplicates=True
+            ).execute()
+
+        return missing
+
+    async def _commit_next_module(
+        self, module_id: str, module_type: ModuleType, difficulty_level: str
+    ) -> None:
         """
-        Finalize exam by calculating scores, updating mastery, and updating exam record.
+        Commit the speculatively prepared candidate for module 2, discarding the
+        other tiers. Generates the module the regular way if no candidate exists.
+
+        The database picks the tier from module 1's stored raw score with the
+        same thresholds as _next_module_difficulty; difficulty_level is only
+        used for the fallback.
+        """
+        try:
+            committed = get_service_client().rpc(
+                "commit_module_candidate", {"p_module_id": module_id}
+            ).execute().data
+        except Exception as e:
+            print(f"[MOCK EXAM ERROR] Failed to commit module candidate: {e}")
+            committed = False
+
+        if not committed:
+            await self._generate_module_questions(
+                module_id, module_type, difficulty_level=difficulty_level
+            )
+
+    async def finalize_exam_if_complete(self, exam_id: str, user_id: str) -> bool:
+        """
+        Finalize the exam once every module is completed.
 
         Args:
-            exam_id: Exam ID to finalize
+            exam_id: Exam ID
             user_id: User ID who took the exam
+
+        Returns:
+            True if the exam was finalized
         """
-        # Get all modules
-        modules_response = (
+        all_completed = self.all_modules_completed(exam_id)
+
+        if all_completed:
+            await self._finalize_exam(exam_id, user_id)
+
+        return all_completed
+
+    def all_modules_completed(self, exam_id: str) -> bool:
+        """Check whether every module of an exam is completed."""
+        all_modules_response = (
             self.db.table("mock_exam_modules")
-            .select("*")
+            .select("status")
             .eq("exam_id", exam_id)
             .execute()
         )
 
-        # Calculate section scores
-        math_raw = sum(
-            m["raw_score"] or 0
-            for m in modules_response.data
-            if "math" in m["module_type"]
-        )
-        rw_raw = sum(
-            m["raw_score"] or 0
-            for m in modules_response.data
-            if "rw" in m["module_type"]
+        return all(
+            m["status"] == ModuleStatus.COMPLETED.value
+            for m in all_modules_response.data
         )
 
-        # Convert raw scores to scaled scores (simplified linear scaling)
-        # Real SAT uses complex equating, but this is a reasonable approximation
-        math_score = self._convert_to_scaled_score(math_raw, self.QUESTIONS_PER_MODULE * 2)
-        rw_score = self._convert_to_scaled_score(rw_raw, self.QUESTIONS_PER_MODULE * 2)
-        total_score = math_score + rw_score
+    async def _finalize_exam(self, exam_id: str, user_id: str) -> None:
+        """
+        Finalize exam by calculating scores, updating mastery, and updating exam record.
 
-        # Update skill mastery based on exam performance
-        try:
-            await self._update_mastery_from_exam(exam_id, user_id)
-        except Exception as e:
-            print(f"[MOCK EXAM ERROR] Failed to update mastery: {e}")
-            # Don't re-raise - we still want to finalize the exam even if mastery update fails
+        The full results document is built from the same single query and
+        stored on the exam, since completed exams never change. Finalization
+        runs as a retryable job: the exam is claimed by moving it to completed
+        (only if it isn't already) before mastery is updated, so a rerun never
+        counts the exam's answers twice.
+
+        Args:
+            exam_id: Exam ID to finalize
+            user_id: User ID who took the exam
+        """
+        # Get all modules with their questions in one query
+        modules = self._load_exam_modules(exam_id)
+
+        # Convert raw scores to scaled scores with the equated tables
+        math_score = self._section_scaled_score(modules, "math")
+        rw_score = self._section_scaled_score(modules, "reading_writing")
+        total_score = math_score + rw_score
 
-        # Update exam
         update_data = {
             "status": MockExamStatus.COMPLETED.value,
             "completed_at": datetime.utcnow().isoformat(),
@@ -447,80 +740,291 @@ class MockExamService:
             "total_score": total_score,
         }
 
-        self.db.table("mock_exams").update(update_data).eq("id", exam_id).execute()
+        try:
+            update_data["results"] = self.build_exam_results(modules)
+        except Exception as e:
+            # Results are rebuilt on first read if caching fails
+            print(f"[MOCK EXAM ERROR] Failed to build results document: {e}")
 
-    async def _update_mastery_from_exam(self, exam_id: str, user_id: str) -> None:
+        claimed = (
+            self.db.table("mock_exams")
+            .update(update_data)
+            .eq("id", exam_id)
+            .neq("status", MockExamStatus.COMPLETED.value)
+            .execute()
+        )
+        if not claimed.data:
+            # Finalized by an earlier run
+            return
+
+        # Update skill mastery based on exam performance
+        try:
+            await self._update_mastery_from_exam(exam_id, user_id, modules=modules)
+        except Exception as e:
+            print(f"[MOCK EXAM ERROR] Failed to update mastery: {e}")
+            # Don't re-raise - the exam stays finalized even if mastery update fails
+
+    def _load_exam_modules(self, exam_id: str) -> List[Dict]:
         """
-        Update user's skill mastery based on mock exam performance.
+        Fetch an exam's modules with their questions, question details and
+        topic/category in a single query, in module and display order.
+        """
+        modules_response = (
+            self.db.table("mock_exam_modules")
+            .select(
+                "*, mock_exam_questions(module_id, display_order, is_correct, user_answer, "
+                "questions(id, topic_id, difficulty, question_type, correct_answer, answer_options, "
+                "topics(name, categories(name, section))))"
+            )
+            .eq("exam_id", exam_id)
+            .execute()
+        )
+        return self._sort_exam_modules(modules_response.data)
+
+    @staticmethod
+    def _sort_exam_modules(modules: List[Dict]) -> List[Dict]:
+        module_order = [m.value for m in ModuleType]
+        modules = sorted(modules, key=lambda m: module_order.index(m["module_type"]))
+        for module in modules:
+            module["mock_exam_questions"] = sorted(
+                module.get("mock_exam_questions") or [], key=lambda q: q["display_order"]
+            )
+        return modules
+
+    @staticmethod
+    def _answer_labels(question: Dict) -> Dict[str, str]:
+        """Map MC option IDs to display labels (A, B, C, ...) for one question."""
+        options = question.get("answer_options")
+        if question.get("question_type") != "mc" or not options:
+            return {}
+
+        # Option structure can vary: {"id": ..., "content": ...} or [id, content]
+        if isinstance(options, dict):
+            options_list = list(options.items())
+        elif isinstance(options, list):
+            options_list = options
+        else:
+            options_list = []
+
+        labels = {}
+        for label, opt in zip("ABCDEF", options_list):
+            opt_id = None
+            if isinstance(opt, dict):
+                opt_id = opt.get("id")
+            elif isinstance(opt, (list, tuple)) and len(opt) > 0:
+                opt_id = opt[0]
+            labels.setdefault(str(opt_id), label)
+        return labels
+
+    @staticmethod
+    def _map_answers(answers: Optional[List[str]], labels: Dict[str, str]) -> Optional[List[str]]:
+        """Replace option IDs with labels, keeping anything that isn't an option ID."""
+        if not answers or not labels:
+            return answers
+        return [labels.get(str(answer), answer) for answer in answers]
+
+    def build_exam_results(self, modules: List[Dict]) -> Dict:
+        """
+        Assemble the results document for an exam from _load_exam_modules output.
 
-        Processes each answered question through BKT iteratively to update mastery probabilities.
+        Args:
+            modules: Modules with nested mock_exam_questions
+
+        Returns:
+            Dict with modules, category_performance, total_questions,
+            total_correct and overall_percentage (JSON-serializable)
+        """
+        module_results = []
+        category_stats = {}
+        total_questions = 0
+        total_correct = 0
+
+        for module in modules:
+            question_results = []
+            correct_in_module = 0
+
+            for meq in module["mock_exam_questions"]:
+                question = meq["questions"]
+                topic = question["topics"]
+                category = topic["categories"]
+
+                is_correct = meq.get("is_correct")
+                if is_correct is True:
+                    correct_in_module += 1
+                    total_correct += 1
+
+                total_questions += 1
+
+                # Track category performance
+                cat_key = f"{category['name']}_{category['section']}"
+                if cat_key not in category_stats:
+                    category_stats[cat_key] = {
+                        "category_name": category["name"],
+                        "section": category["section"],
+                        "total": 0,
+                        "correct": 0,
+                    }
+                category_stats[cat_key]["total"] += 1
+                if is_correct is True:
+                    category_stats[cat_key]["correct"] += 1
+
+                # Map UUIDs to labels for MC questions
+                labels = self._answer_labels(question)
+                user_answer = self._map_answers(meq.get("user_answer"), labels)
+
+                # Correct answer is usually stored as labels (["A"]) for MC, but
+                # may hold option UUIDs. Simple heuristic: map anything longer than a label.
+                correct_answer = question.get("correct_answer")
+                if correct_answer and len(correct_answer[0]) > 5:
+                    correct_answer = self._map_answers(correct_answer, labels)
+
+                question_results.append({
+                    "question_id": question["id"],
+                    "topic_name": topic["name"],
+                    "category_name": category["name"],
+                    "difficulty": question["difficulty"],
+                    "is_correct": is_correct,
+                    "user_answer": user_answer,
+                    "correct_answer": correct_answer,
+                    "question_type": question["question_type"],
+                })
+
+            module_results.append({
+                "module_type": module["module_type"],
+                "module_number": module["module_number"],
+                "raw_score": module.get("raw_score") or 0,
+                "total_questions": len(question_results),
+                "correct_count": correct_in_module,
+                "questions": question_results,
+            })
+
+        # Calculate category performance
+        category_performance = [
+            {
+                "category_name": stats["category_name"],
+                "section": stats["section"],
+                "total_questions": stats["total"],
+                "correct_answers": stats["correct"],
+                "percentage": (stats["correct"] / stats["total"] * 100)
+                if stats["total"] > 0
+                else 0,
+            }
+            for stats in category_stats.values()
+        ]
+
+        overall_percentage = (
+            (total_correct / total_questions * 100) if total_questions > 0 else 0
+        )
+
+        return {
+            "modules": module_results,
+            "category_performance": category_performance,
+            "total_questions": total_questions,
+            "total_correct": total_correct,
+            "overall_percentage": overall_percentage,
+        }
+
+    async def get_exam_results(self, exam_id: str, user_id: str) -> Dict:
+        """
+        Get results for an exam.
+
+        Completed exams carry their results document, so this is a single row
+        fetch. Exams finalized before results were cached (or still in
+        progress) are assembled from one nested query; completed ones are
+        cached on the way out.
 
         Args:
             exam_id: Exam ID
-            user_id: User ID who took the exam
+            user_id: User ID who owns the exam
+
+        Returns:
+            Dict with exam and the results document fields
         """
-        # Get all modules for this exam
-        modules_response = self.db.table("mock_exam_modules").select("id").eq(
-            "exam_id", exam_id
-        ).execute()
+        exam_response = (
+            self.db.table("mock_exams")
+            .select("*")
+            .eq("id", exam_id)
+            .eq("user_id", user_id)
+            .execute()
+        )
 
-        if not modules_response.data:
-            return
+        if not exam_response.data:
+            raise ValueError("Exam not found")
 
-        module_ids = [m["id"] for m in modules_response.data]
+        exam = exam_response.data[0]
+        results = exam.pop("results", None)
 
-        # Fetch all answered questions with topic info
-        questions_response = self.db.table("mock_exam_questions").select(
-            "is_correct, questions(topic_id)"
-        ).in_("module_id", module_ids).execute()
+        if results is None:
+            results = self.build_exam_results(self._load_exam_modules(exam_id))
+            if exam["status"] == MockExamStatus.COMPLETED.value:
+                self.db.table("mock_exams").update({"results": results}).eq("id", exam_id).execute()
 
-        if not questions_response.data:
-            return
+        return {"exam": exam, **results}
 
-        # Initialize BKT service
-        bkt_service = BKTService(self.db)
+    async def _update_mastery_from_exam(
+        self, exam_id: str, user_id: str, modules: Optional[List[Dict]] = None
+    ) -> None:
+        """
+        Update user's skill mastery based on mock exam performance.
 
-        # Update mastery for each answered question
-        for q in questions_response.data:
-            if q.get("is_correct") is None:
-                continue  # Skip unanswered questions
+        Answered questions are fed to BKT in the order they appeared in the exam
+        (RW module 1, RW module 2, Math module 1, Math module 2), grouped per
+        skill and written back in one batch.
 
-            try:
-                topic_id = q["questions"]["topic_id"]
-                is_correct = q["is_correct"]
-
-                # Update mastery through BKT
-                await bkt_service.update_mastery(
-                    user_id=user_id,
-                    skill_id=topic_id,
-                    is_correct=is_correct
-                )
-            except Exception as e:
-                # Log error but continue processing other questions
-                print(f"[MOCK EXAM ERROR] Failed to process question: {e}")
-                continue
+        Args:
+            exam_id: Exam ID
+            user_id: User ID who took the exam
+            modules: Output of _load_exam_modules, if already fetched
+        """
+        if modules is None:
+            modules = self._load_exam_modules(exam_id)
+
+        exam_order = [
+            ModuleType.RW_MODULE_1.value,
+            ModuleType.RW_MODULE_2.value,
+            ModuleType.MATH_MODULE_1.value,
+            ModuleType.MATH_MODULE_2.value,
+        ]
+
+        answered = [
+            q
+            for module in sorted(modules, key=lambda m: exam_order.index(m["module_type"]))
+            for q in module["mock_exam_questions"]
+            if q.get("is_correct") is not None and (q.get("questions") or {}).get("topic_id")
+        ]
+
+        if not answered:
+            return
+
+        await BKTService(self.db).update_mastery_batch(
+            user_id,
+            [
+                {"skill_id": q["questions"]["topic_id"], "is_correct": q["is_correct"]}
+                for q in answered
+            ],
+        )
 
-    def _convert_to_scaled_score(self, raw_score: int, total_questions: int) -> int:
+    def _section_scaled_score(self, modules: List[Dict], section: str) -> int:
         """
-        Convert raw score to SAT scaled score (200-800).
-        Uses simplified linear scaling and rounds to nearest 10.
+        Scaled section score (200-800) from the equated scoring tables.
+
+        The table is chosen by the module-2 route, which follows from the
+        module-1 raw score exactly as when module 2 was assigned.
 
         Args:
-            raw_score: Number of correct answers
-            total_questions: Total questions in section
+            modules: The exam's modules
+            section: math or reading_writing
 
         Returns:
             Scaled score between 200 and 800 (rounded to nearest 10)
         """
-        if raw_score <= 0:
-            return 200
-
-        percentage = raw_score / total_questions
-        # Linear scale from 200 to 800
-        scaled = 200 + (percentage * 600)
-        # Round to nearest 10
-        scaled = round(scaled / 10) * 10
-        return int(min(800, max(200, scaled)))
+        raw_by_number = {
+            m["module_number"]: m.get("raw_score") or 0
+            for m in modules
+            if self._section_for_module(ModuleType(m["module_type"])) == section
+        }
+        route = self._next_module_difficulty(raw_by_number.get(1, 0))
+        return get_scoring_tables().section_score(section, route, sum(raw_by_number.values()))
 
     async def submit_answers_batch(
         self,
@@ -562,7 +1066,7 @@ class MockExamService:
         # Note: 'in_' expects a list of strings
         meq_response = (
             self.db.table("mock_exam_questions")
-            .select("id, question_id, questions(correct_answer, acceptable_answers)")
+            .select("id, question_id, display_order, questions(correct_answer, acceptable_answers)")
             .eq("module_id", module_id)
             .in_("question_id", question_ids)
             .execute()
@@ -575,17 +1079,6 @@ class MockExamService:
         successful = 0
         failed = 0
         
-        # Helper for normalization
-        def normalize_answer(ans_list):
-            if not ans_list:
-                return []
-            if isinstance(ans_list, str):
-                return [ans_list.strip().lower()]
-            try:
-                return [str(a).strip().lower() for a in ans_list]
-            except TypeError:
-                return []
-
         for ans in answers:
             qid = ans["question_id"]
             if qid not in meq_map:
@@ -601,24 +1094,17 @@ class MockExamService:
             question = meq["questions"]
             
             # Check correctness
-            correct_answer = question.get("correct_answer", [])
-            acceptable_answers = question.get("acceptable_answers", [])
             user_answer = ans["user_answer"]
-
-            normalized_user = normalize_answer(user_answer)
-            normalized_correct = normalize_answer(correct_answer)
-            normalized_acceptable = normalize_answer(acceptable_answers) if acceptable_answers else []
-
-            is_correct_bool = normalized_user == normalized_correct or (
-                bool(normalized_acceptable)
-                and len(normalized_user) > 0
-                and normalized_user[0] in normalized_acceptable
-            )
-            is_correct = bool(is_correct_bool)
+            is_correct = get_answer_matcher(
+                question.get("correct_answer", []), question.get("acceptable_answers")
+            ).matches(user_answer)
 
             # Prepare update payload
             updates.append({
                 "id": meq["id"], # Primary key for upsert
+                "module_id": module_id,
+                "question_id": qid,
+                "display_order": meq["display_order"],
                 "status": ans["status"],
                 "user_answer": user_answer,
                 "is_correct": is_correct,
@@ -635,6 +1121,8 @@ class MockExamService:
 
         # Perform bulk update
         if updates:
+            # These are newer than any buffered autosave of the same questions
+            await get_answer_buffer().supersede(module_id, [u["question_id"] for u in updates])
             try:
                 self.db.table("mock_exam_questions").upsert(updates).execute()
             except Exception as e:
@@ -657,10 +1145,14 @@ class MockExamService:
         status: str,
         is_marked_for_review: bool,
         user_id: str,
-    ) -> Tuple[bool, List[str]]:
+    ) -> Tuple[bool, List[str], str]:
         """
         Submit an answer for a question in a module.
 
+        With the answer buffer running the save is buffered and written in
+        bulk later (see app/services/answer_buffer.py); otherwise it is
+        written through.
+
         Args:
             module_id: Module ID
             question_id: Question ID
@@ -670,8 +1162,15 @@ class MockExamService:
             user_id: User ID submitting answer
 
         Returns:
-            Tuple of (is_correct, correct_answer)
+            Tuple of (is_correct, correct_answer, mock_exam_questions id)
         """
+        buffer = get_answer_buffer()
+        if buffer.running:
+            return buffer.record(
+                self.db, module_id, question_id, user_id,
+                user_answer, status, is_marked_for_review,
+            )
+
         # Verify module belongs to user
         module_response = (
             self.db.table("mock_exam_modules")
@@ -703,31 +1202,9 @@ class MockExamService:
 
         # Check correctness
         correct_answer = question.get("correct_answer", [])
-        acceptable_answers = question.get("acceptable_answers", [])
-
-        def normalize_answer(ans_list):
-            if not ans_list:
-                return []
-            # Ensure we are working with strings, handle non-iterable items gracefully
-            if isinstance(ans_list, str):
-                return [ans_list.strip().lower()]
-            try:
-                return [str(a).strip().lower() for a in ans_list]
-            except TypeError:
-                return []
-
-        normalized_user = normalize_answer(user_answer)
-        normalized_correct = normalize_answer(correct_answer)
-        normalized_acceptable = normalize_answer(acceptable_answers) if acceptable_answers else []
-
-        is_correct_bool = normalized_user == normalized_correct or (
-            bool(normalized_acceptable)
-            and len(normalized_user) > 0
-            and normalized_user[0] in normalized_acceptable
-        )
-
-        # Explicitly cast to bool to avoid any ambiguity
-        is_correct = bool(is_correct_bool)
+        is_correct = get_answer_matcher(
+            correct_answer, question.get("acceptable_answers")
+        ).matches(user_answer)
 
         # Update mock exam question
         update_data = {
@@ -740,4 +1217,4 @@ class MockExamService:
 
         self.db.table("mock_exam_questions").update(update_data).eq("id", meq["id"]).execute()
 
-        return is_correct, correct_answer
+        return is_correct, correct_answer, meq["id"]
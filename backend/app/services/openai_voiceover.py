@@ -4,6 +4,7 @@ import os
 from pathlib import Path
 from openai import OpenAI
 from manim_voiceover.services.base import SpeechService
+from app.services.tts_cache import TTSAudioCache, get_tts_cache
 
 
 class VoiceoverService(SpeechService):
@@ -63,19 +64,26 @@ class VoiceoverService(SpeechService):
 
         output_path = Path(cache_dir) / audio_path
 
-        # Call OpenAI TTS API
-        try:
-            response = self.client.audio.speech.create(
-                model=self.model,
-                voice=self.voice,
-                input=text,
-            )
-
-            # Save audio to file
-            response.stream_to_file(str(output_path))
-
-        except Exception as e:
-            raise Exception(f"OpenAI TTS generation failed: {str(e)}")
+        # Reuse audio synthesized by any earlier render (shared across scenes)
+        tts_cache = get_tts_cache()
+        cache_key = TTSAudioCache.make_key(text, self.voice, self.model)
+        if tts_cache is None or not tts_cache.get(cache_key, output_path):
+            # Call OpenAI TTS API
+            try:
+                response = self.client.audio.speech.create(
+                    model=self.model,
+                    voice=self.voice,
+                    input=text,
+                )
+
+                # Save audio to file
+                response.stream_to_file(str(output_path))
+
+            except Exception as e:
+                raise Exception(f"OpenAI TTS generation failed: {str(e)}")
+
+            if tts_cache is not None:
+                tts_cache.put(cache_key, output_path)
 
         # Return result dictionary
         json_dict = {
@@ -0,0 +1,335 @@
+"""
+Population percentiles: where a student's predicted score, learning velocity
+and mastery rank among all students.
+
+Each metric and section is summarized by a t-digest, a quantile sketch of a
+hundred or so weighted centroids that is most precise near the tails (the 1st
+and 99th percentiles matter more than the exact median). A digest answers a
+percentile query with a binary search over its centroids, so the cost does
+not grow with the population, and it absorbs new values incrementally.
+
+PopulationIndexService.rebuild (a background job, or
+scripts/rebuild_population_index.py from cron) reads one row per student from
+the user_population_metrics view and stores a digest per metric in
+population_percentiles (migration 041). API processes load the digests with
+get_population_index, reload them every population_index_refresh_seconds,
+and add each new student's first snapshot in the meantime. Later snapshots
+change an existing student's value, which only a rebuild can account for.
+"""
+
+import threading
+import time
+from array import array
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from supabase import Client
+
+from app.config import get_settings
+
+# (metric, section) -> user_population_metrics column ("score", "total" is
+# the sum of both sections and only counts students with both)
+POPULATION_METRICS: Dict[Tuple[str, str], Optional[str]] = {
+    ("score", "math"): "predicted_sat_math",
+    ("score", "rw"): "predicted_sat_rw",
+    ("score", "total"): None,
+    ("velocity", "total"): "velocity",
+    ("mastery", "total"): "mean_mastery",
+}
+
+# Centroid budget: about compression / 2 centroids, with percentile error
+# well under one point in the middle of the distribution
+DEFAULT_COMPRESSION = 200
+# Values buffered before they are merged into the centroids
+BUFFER_FACTOR = 5
+
+
+def _scale(q: np.ndarray, compression: float) -> np.ndarray:
+    """t-digest k1 scale function: small centroids near q=0 and q=1"""
+    return compression / (2 * np.pi) * np.arcsin(2 * np.clip(q, 0.0, 1.0) - 1)
+
+
+class TDigest:
+    """Merging t-digest over float values"""
+
+    def __init__(
+        self,
+        compression: float = DEFAULT_COMPRESSION,
+        means: Optional[List[float]] = None,
+        weights: Optional[List[float]] = None,
+        minimum: float = np.inf,
+        maximum: float = -np.inf,
+    ):
+        self.compression = compression
+        self.means = np.asarray(means if means is not None else [], dtype=np.float64)
+        self.weights = np.asarray(weights if weights is not None else [], dtype=np.float64)
+        self.min = minimum
+        self.max = maximum
+        self._buffer: List[float] = []
+        self._cumulative: Optional[np.ndarray] = None
+        self._total = float(self.weights.sum())
+
+    @property
+    def count(self) -> float:
+        """Number of values summarized"""
+        return self._total + len(self._buffer)
+
+    def add(self, value: float) -> None:
+        """Add one value (merged in batches)"""
+        if value is None or np.isnan(value):
+            return
+        self._buffer.append(float(value))
+        if len(self._buffer) >= BUFFER_FACTOR * self.compression:
+            self._flush()
+
+    def add_many(self, values: np.ndarray) -> None:
+        """Add an array of values in one merge (NaN is skipped)"""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values):
+            self._merge(values, np.ones(len(values)))
+
+    def _flush(self) -> None:
+        if self._buffer:
+            values = np.array(self._buffer)
+            self._buffer = []
+            self._merge(values, np.ones(len(values)))
+
+    def _merge(self, means: np.ndarray, weights: np.ndarray) -> None:
+        means = np.concatenate([self.means, means])
+        weights = np.concatenate([self.weights, weights])
+        # Equal values become one point first: scores sit on a 10-point grid,
+        # and a centroid straddling two of them blurs both percentiles
+        means, inverse = np.unique(means, return_inverse=True)
+        weights = np.bincount(inverse.ravel(), weights=weights)
+
+        # Consecutive points whose left edges fall in the same unit of the
+        # scale function form one centroid
+        total = float(weights.sum())
+        left = (np.cumsum(weights) - weights) / total
+        bins = np.floor(_scale(left, self.compression))
+        starts = np.flatnonzero(np.concatenate([[True], bins[1:] != bins[:-1]]))
+
+        merged_weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / merged_weights
+        self.weights = merged_weights
+        self.min = min(self.min, float(means[0]))
+        self.max = max(self.max, float(means[-1]))
+        self._total = total
+        self._cumulative = None
+
+    def cdf(self, value: float) -> Optional[float]:
+        """
+        Estimated fraction of values below `value`, counting values equal to
+        it as half below (mid-rank). None if the digest is empty.
+        """
+        self._flush()
+        n = len(self.means)
+        if n == 0:
+            return None
+        if value < self.min:
+            return 0.0
+        if value > self.max:
+            return 1.0
+        if self._cumulative is None:
+            # Weight up to each centroid's middle
+            self._cumulative = np.cumsum(self.weights) - self.weights / 2
+        cumulative, means, total = self._cumulative, self.means, self._total
+
+        lo = int(np.searchsorted(means, value, side="left"))
+        hi = int(np.searchsorted(means, value, side="right"))
+        if hi > lo:
+            # Centroids exactly at value: the middle of their combined weight
+            below = cumulative[lo] - self.weights[lo] / 2
+            upto = cumulative[hi - 1] + self.weights[hi - 1] / 2
+            return (below + upto) / 2 / total
+        if lo == 0:
+            # Between the minimum and the first centroid
+            span = means[0] - self.min
+            return (cumulative[0] * (value - self.min) / span if span > 0 else 0.0) / total
+        if lo == n:
+            # Between the last centroid and the maximum
+            span = self.max - means[-1]
+            tail = total - cumulative[-1]
+            return (cumulative[-1] + (tail * (value - means[-1]) / span if span > 0 else tail)) / total
+        fraction = (value - means[lo - 1]) / (means[lo] - means[lo - 1])
+        return (cumulative[lo - 1] + fraction * (cumulative[lo] - cumulative[lo - 1])) / total
+
+    def to_dict(self) -> Dict:
+        self._flush()
+        return {
+            "means": [round(m, 6) for m in self.means.tolist()],
+            "weights": self.weights.tolist(),
+            "min": self.min,
+            "max": self.max,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict, compression: float = DEFAULT_COMPRESSION) -> "TDigest":
+        return cls(compression, data["means"], data["weights"], data["min"], data["max"])
+
+
+class PopulationIndex:
+    """One digest per (metric, section)"""
+
+    def __init__(self, digests: Optional[Dict[Tuple[str, str], TDigest]] = None,
+                 built_at: Optional[str] = None):
+        self.digests = digests or {}
+        self.built_at = built_at
+        self._lock = threading.Lock()
+
+    def percentile(self, metric: str, section: str, value: Optional[float]) -> Optional[int]:
+        """
+        Percentile (0-100) of a value among students, or None if the value is
+        missing or there is no population data for the metric yet.
+        """
+        digest = self.digests.get((metric, section))
+        if value is None or digest is None:
+            return None
+        with self._lock:
+            fraction = digest.cdf(float(value))
+        if fraction is None:
+            return None
+        return int(round(100 * fraction))
+
+    def population(self, metric: str, section: str) -> int:
+        digest = self.digests.get((metric, section))
+        return int(digest.count) if digest else 0
+
+    def observe_student(
+        self, math: Optional[float], rw: Optional[float], mastery: Optional[float]
+    ) -> None:
+        """Add a new student's first snapshot"""
+        values = {
+            ("score", "math"): math,
+            ("score", "rw"): rw,
+            ("score", "total"): math + rw if math is not None and rw is not None else None,
+            ("mastery", "total"): mastery,
+        }
+        with self._lock:
+            for key, value in values.items():
+                if value is not None and key in self.digests:
+                    self.digests[key].add(value)
+
+
+class PopulationIndexService:
+    """Rebuilds and loads the population percentile digests"""
+
+    def __init__(self, db: Client, page_size: int = 1000):
+        """
+        Args:
+            db: Service role client for rebuilds (the metrics view spans all
+                users); any signed-in client can load
+            page_size: Rows per request when reading the metrics view
+        """
+        self.db = db
+        self.page_size = page_size
+
+    def _iter_metric_pages(self) -> Iterator[List[Dict]]:
+        """Yield per-student metrics page by page, keyset-paginated on user_id"""
+        last_id = None
+        while True:
+            query = self.db.table("user_population_metrics").select(
+                "user_id, predicted_sat_math, predicted_sat_rw, mean_mastery, velocity"
+            )
+            if last_id is not None:
+                query = query.gt("user_id", last_id)
+            rows = query.order("user_id").limit(self.page_size).execute().data
+            if rows:
+                yield rows
+            if len(rows) < self.page_size:
+                return
+            last_id = rows[-1]["user_id"]
+
+    def load_metrics(self) -> Dict[str, np.ndarray]:
+        """Every student's metrics as float arrays (NaN where missing)"""
+        columns = ("predicted_sat_math", "predicted_sat_rw", "mean_mastery", "velocity")
+        values = {column: array("d") for column in columns}
+        for rows in self._iter_metric_pages():
+            for column in columns:
+                values[column].extend(
+                    np.nan if r.get(column) is None else float(r[column]) for r in rows
+                )
+        return {column: np.frombuffer(v, dtype=np.float64) if v else np.zeros(0) for column, v in values.items()}
+
+    @staticmethod
+    def build(metrics: Dict[str, np.ndarray], compression: float = DEFAULT_COMPRESSION) -> PopulationIndex:
+        """Digest per-student metric arrays"""
+        digests = {}
+        for key, column in POPULATION_METRICS.items():
+            # NaN in either section makes the total NaN, so it is skipped
+            values = metrics["predicted_sat_math"] + metrics["predicted_sat_rw"] if column is None else metrics[column]
+            digest = TDigest(compression)
+            digest.add_many(values)
+            digests[key] = digest
+        return PopulationIndex(digests, datetime.utcnow().isoformat())
+
+    async def rebuild(self, compression: float = DEFAULT_COMPRESSION) -> Dict:
+        """
+        Rebuild every digest from all students' current metrics.
+
+        Returns:
+            Summary with the number of students, population per metric and timings
+        """
+        started = time.perf_counter()
+        metrics = self.load_metrics()
+        load_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        index = self.build(metrics, compression)
+        rows = [
+            {
+                "metric": metric,
+                "section": section,
+                "digest": digest.to_dict(),
+                "population": int(digest.count),
+                "built_at": index.built_at,
+            }
+            for (metric, section), digest in index.digests.items()
+        ]
+        self.db.table("population_percentiles").upsert(rows, on_conflict="metric,section").execute()
+
+        return {
+            "students": int(len(metrics["velocity"])),
+            "population": {f"{row['metric']}.{row['section']}": row["population"] for row in rows},
+            "load_seconds": round(load_seconds, 2),
+            "build_seconds": round(time.perf_counter() - started, 2),
+        }
+
+    def load(self) -> PopulationIndex:
+        """The stored digests"""
+        rows = self.db.table("population_percentiles").select("metric, section, digest, built_at").execute().data
+        digests = {
+            (row["metric"], row["section"]): TDigest.from_dict(row["digest"])
+            for row in rows or []
+        }
+        built_at = max((row["built_at"] for row in rows or []), default=None)
+        return PopulationIndex(digests, built_at)
+
+
+_index: Optional[PopulationIndex] = None
+_index_loaded_at = 0.0
+_index_lock = threading.Lock()
+
+
+def get_population_index(db: Client) -> PopulationIndex:
+    """
+    The process-wide index, reloaded every population_index_refresh_seconds.
+    Empty (every percentile None) until the first rebuild has run.
+    """
+    global _index, _index_loaded_at
+    refresh = get_settings().population_index_refresh_seconds
+    if _index is not None and time.monotonic() - _index_loaded_at < refresh:
+        return _index
+
+    with _index_lock:
+        if _index is None or time.monotonic() - _index_loaded_at >= refresh:
+            try:
+                _index = PopulationIndexService(db).load()
+            except Exception as e:
+                # Keep serving the previous digests; retry after the interval
+                print(f"[POPULATION INDEX ERROR] Failed to load percentiles: {e}")
+                _index = _index or PopulationIndex()
+            _index_loaded_at = time.monotonic()
+    return _index
@@ -7,15 +7,20 @@ for the cognition business analytics.
 
 from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime, timedelta
-import statistics
+import numpy as np
 from supabase import Client
 
+from app.services.population_index import get_population_index
+from app.services.request_loader import RequestLoader
+from app.services.snapshot_series import SnapshotSeries, linear_trend, load_snapshot_series
+
 
 class PredictionService:
     """Service for calculating predictive SAT score analytics"""
     
-    def __init__(self, db: Client):
+    def __init__(self, db: Client, loader: Optional[RequestLoader] = None):
         self.db = db
+        self.loader = loader or RequestLoader(db)
     
     async def calculate_predictive_scores(self, user_id: str) -> Dict[str, Any]:
         """
@@ -35,8 +40,8 @@ class PredictionService:
             current_scores = self._get_current_scores(snapshots, study_plan)
             
             # Calculate trends using linear regression
-            math_trend = self._calculate_trend(snapshots, "predicted_sat_math")
-            rw_trend = self._calculate_trend(snapshots, "predicted_sat_rw")
+            math_trend = self._calculate_trend(snapshots, "math")
+            rw_trend = self._calculate_trend(snapshots, "rw")
             
             # Calculate predictions for different time horizons
             predictions = self._calculate_predictions(
@@ -57,6 +62,7 @@ class PredictionService:
                 "current_math": current_scores["math"],
                 "current_rw": current_scores["rw"],
                 "current_total": current_scores["total"],
+                "score_percentiles": self._calculate_score_percentiles(current_scores),
                 "predicted_math_in_30_days": predictions["math_30_days"],
                 "predicted_rw_in_30_days": predictions["rw_30_days"],
                 "predicted_total_in_30_days": predictions["total_30_days"],
@@ -75,27 +81,16 @@ class PredictionService:
             print(f"Error calculating predictive scores: {e}")
             return self._get_default_prediction_data()
     
-    async def _get_snapshots_last_90_days(self, user_id: str) -> List[Dict]:
+    async def _get_snapshots_last_90_days(self, user_id: str) -> SnapshotSeries:
         """Get performance snapshots from the last 90 days"""
-        cutoff_date = (datetime.now() - timedelta(days=90)).isoformat()
-        
-        result = self.db.table("user_performance_snapshots").select(
-            "predicted_sat_math, predicted_sat_rw, created_at, snapshot_type"
-        ).eq("user_id", user_id).gte("created_at", cutoff_date).order(
-            "created_at", desc=False
-        ).execute()
-        
-        return result.data if result.data else []
+        cutoff_date = datetime.now() - timedelta(days=90)
+        return load_snapshot_series(self.db, user_id, self.loader).since(cutoff_date)
     
     async def _get_active_study_plan(self, user_id: str) -> Optional[Dict]:
         """Get the user's active study plan"""
-        result = self.db.table("study_plans").select(
-            "target_math_score, target_rw_score, current_math_score, current_rw_score, test_date, start_date"
-        ).eq("user_id", user_id).eq("is_active", True).execute()
-        
-        return result.data[0] if result.data else None
+        return self.loader.active_study_plan(user_id)
     
-    def _get_current_scores(self, snapshots: List[Dict], study_plan: Optional[Dict]) -> Dict[str, int]:
+    def _get_current_scores(self, snapshots: SnapshotSeries, study_plan: Optional[Dict]) -> Dict[str, int]:
         """Get current scores from study plan or most recent snapshot"""
         # Prioritize study plan current scores
         if study_plan:
@@ -111,9 +106,8 @@ class PredictionService:
         if not snapshots:
             return {"math": 400, "rw": 400, "total": 800}
         
-        latest = snapshots[-1]
-        math = latest.get("predicted_sat_math", 400) or 400
-        rw = latest.get("predicted_sat_rw", 400) or 400
+        math = int(np.nan_to_num(snapshots.math[-1])) or 400
+        rw = int(np.nan_to_num(snapshots.rw[-1])) or 400
         
         return {
             "math": math,
@@ -121,48 +115,28 @@ class PredictionService:
             "total": math + rw
         }
     
-    def _calculate_trend(self, snapshots: List[Dict], score_field: str) -> Dict[str, float]:
+    def _calculate_trend(self, snapshots: SnapshotSeries, scores: str) -> Dict[str, float]:
         """
-        Calculate linear regression trend for a score field.
+        Calculate linear regression trend for a score column ("math" or "rw").
         Returns slope (points per week) and R-squared.
         """
         if len(snapshots) < 2:
             return {"slope": 0.0, "r_squared": 0.0, "intercept": 400.0}
         
-        # Prepare data for linear regression
-        data_points = []
-        for snapshot in snapshots:
-            score = snapshot.get(score_field, 400) or 400
-            date = datetime.fromisoformat(snapshot["created_at"].replace('Z', '+00:00'))
-            # Convert to weeks since first snapshot
-            weeks = (date - datetime.fromisoformat(snapshots[0]["created_at"].replace('Z', '+00:00'))).days / 7.0
-            data_points.append((weeks, score))
-        
-        if len(data_points) < 2:
-            return {"slope": 0.0, "r_squared": 0.0, "intercept": 400.0}
+        # Weeks since first snapshot; missing scores count as 400
+        weeks = snapshots.elapsed_days() / 7.0
+        values = np.nan_to_num(getattr(snapshots, scores))
+        values[values == 0] = 400
         
-        # Simple linear regression
-        n = len(data_points)
-        sum_x = sum(point[0] for point in data_points)
-        sum_y = sum(point[1] for point in data_points)
-        sum_xy = sum(point[0] * point[1] for point in data_points)
-        sum_x2 = sum(point[0] ** 2 for point in data_points)
-        sum_y2 = sum(point[1] ** 2 for point in data_points)
-        
-        # Calculate slope and intercept
-        slope = (n * sum_xy - sum_x * sum_y) / (n * sum_x2 - sum_x ** 2)
-        intercept = (sum_y - slope * sum_x) / n
-        
-        # Calculate R-squared
-        y_mean = sum_y / n
-        ss_tot = sum((point[1] - y_mean) ** 2 for point in data_points)
-        ss_res = sum((point[1] - (slope * point[0] + intercept)) ** 2 for point in data_points)
-        r_squared = 1 - (ss_res / ss_tot) if ss_tot > 0 else 0.0
+        trend = linear_trend(weeks, values)
+        if trend is None:
+            # All snapshots on the same day: no trend yet
+            return {"slope": 0.0, "r_squared": 0.0, "intercept": round(float(values.mean()), 1)}
         
         return {
-            "slope": round(slope, 2),
-            "r_squared": round(r_squared, 3),
-            "intercept": round(intercept, 1)
+            "slope": round(trend["slope"], 2),
+            "r_squared": round(trend["r_squared"], 3),
+            "intercept": round(trend["intercept"], 1)
         }
     
     def _calculate_predictions(
@@ -382,12 +356,21 @@ class PredictionService:
         
         return timeline
     
+    def _calculate_score_percentiles(self, current_scores: Dict[str, int]) -> Dict[str, Optional[int]]:
+        """Percentile of each current score among all students (None before the first rebuild)"""
+        index = get_population_index(self.db)
+        return {
+            section: index.percentile("score", section, current_scores[section])
+            for section in ("math", "rw", "total")
+        }
+    
     def _get_default_prediction_data(self) -> Dict[str, Any]:
         """Return default data when calculation fails"""
         return {
             "current_math": 400,
             "current_rw": 400,
             "current_total": 800,
+            "score_percentiles": {"math": None, "rw": None, "total": None},
             "predicted_math_in_30_days": 400,
             "predicted_rw_in_30_days": 400,
             "predicted_total_in_30_days": 800,
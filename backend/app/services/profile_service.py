@@ -1,23 +1,95 @@
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 from datetime import date, datetime, timedelta
 from uuid import UUID
+import asyncio
 import json
 import logging
+import os
+import time
+
+from ..config import get_settings
+from .storage_upload import upload_stream
 
 from ..models.profile import (
     UserProfile,
     UserProfileUpdate,
     UserPreferences,
     UserPreferencesUpdate,
-    UserProfileStats
+    UserProfileStats,
+    UserStreak,
+    UserAchievement,
+    ProfileResponse
 )
 
 logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Assembled /profile responses per user: {user_id: (expires_at, response)}.
+# Per process, so other instances may serve a stale copy for up to the TTL.
+_profile_cache: Dict[str, Tuple[float, ProfileResponse]] = {}
+
+
+def invalidate_profile_cache(user_id: str) -> None:
+    """Drop a user's cached /profile response after a write that changes it"""
+    _profile_cache.pop(user_id, None)
+
+
+async def _execute_all(*queries) -> List[Any]:
+    """Run independent queries concurrently; the client is blocking, so each runs in a thread"""
+    responses = await asyncio.gather(*(asyncio.to_thread(q.execute) for q in queries))
+    return [r.data for r in responses]
+
 
 class ProfileService:
     def __init__(self, db):
         self.db = db
 
+    async def get_profile_overview(self, user_id: str) -> Optional[ProfileResponse]:
+        """
+        Profile, preferences, streak, stats and recent achievements for /profile.
+
+        Independent lookups run concurrently, so the page costs two round
+        trips (everything keyed by user, then the active plan's sessions)
+        rather than one per lookup. Responses are cached per user for
+        profile_cache_ttl_seconds and invalidated by writes that change them.
+
+        Returns:
+            The assembled profile, or None if the user has no profile row
+        """
+        cached = _profile_cache.get(user_id)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+
+        users, preferences, streaks, achievements, plans, snapshots = await _execute_all(
+            self.db.table("users").select("*").eq("id", user_id),
+            self.db.table("user_preferences").select("*").eq("user_id", user_id),
+            self.db.table("user_streaks").select("*").eq("user_id", user_id),
+            self.db.table("user_achievements").select("*").eq("user_id", user_id)
+            .order("unlocked_at", desc=True).limit(5),
+            self._active_plan_query(user_id),
+            self._latest_snapshot_query(user_id),
+        )
+
+        if not users:
+            logger.info(f"No user profile found for user {user_id}")
+            return None
+
+        plan = plans[0] if plans else None
+        sessions = await self._load_plan_sessions(plan["id"]) if plan else []
+
+        overview = ProfileResponse(
+            profile=UserProfile(**users[0]),
+            preferences=UserPreferences(**preferences[0]) if preferences else None,
+            streak=UserStreak(**streaks[0]) if streaks else None,
+            stats=self._build_stats(plan, sessions, snapshots[0] if snapshots else None),
+            recent_achievements=[UserAchievement(**a) for a in achievements],
+        )
+
+        ttl = settings.profile_cache_ttl_seconds
+        if ttl > 0:
+            _profile_cache[user_id] = (time.monotonic() + ttl, overview)
+        return overview
+
     async def get_user_profile(self, user_id: str) -> Optional[UserProfile]:
         """Get complete user profile"""
         response = self.db.table("users").select("*").eq("id", user_id).execute()
@@ -42,6 +114,7 @@ class ProfileService:
 
         try:
             response = self.db.table("users").update(update_data).eq("id", user_id).execute()
+            invalidate_profile_cache(user_id)
             if not response.data:
                 logger.warning(f"No data returned when updating profile for user {user_id}")
                 return None
@@ -51,17 +124,21 @@ class ProfileService:
             logger.error(f"Error updating profile for user {user_id}: {str(e)}", exc_info=True)
             raise
 
-    async def upload_profile_photo(self, user_id: str, file) -> Optional[str]:
+    async def upload_profile_photo(
+        self, user_id: str, file, access_token: Optional[str] = None
+    ) -> Optional[str]:
         try:
             logger.info(f"Starting upload for user {user_id}, file: {file.filename}, content type: {file.content_type}")
 
-            # Read file content
-            content = await file.read()
-            if not content:
+            # Determine size without reading the upload into memory
+            file_size = file.size
+            if file_size is None:
+                file.file.seek(0, os.SEEK_END)
+                file_size = file.file.tell()
+            if not file_size:
                 logger.error("Error: File content is empty")
                 return None
 
-            file_size = len(content)
             logger.info(f"File size: {file_size} bytes")
 
             # Validate file size (5MB max)
@@ -81,19 +158,23 @@ class ProfileService:
                 # Get the storage bucket
                 bucket = self.db.storage.from_("profile-photos")
                 
-                # Upload the file with owner metadata
-                result = bucket.upload(
-                    file_name,
-                    content,
-                    {
-                        "content-type": file.content_type or "application/octet-stream",
-                        "x-upsert": "true",
-                        "cache-control": "public, max-age=31536000",
-                        "x-object-meta-owner": user_id
-                    }
+                # Stream the spooled upload in resumable chunks as the user (RLS applies)
+                await asyncio.to_thread(
+                    upload_stream,
+                    file.file,
+                    file_size,
+                    supabase_url=settings.supabase_url,
+                    api_key=settings.supabase_anon_key,
+                    access_token=access_token,
+                    bucket="profile-photos",
+                    object_name=file_name,
+                    content_type=file.content_type or "application/octet-stream",
+                    cache_control="31536000",
+                    upsert=True,
+                    metadata={"owner": user_id},
                 )
                 
-                logger.info(f"Upload result: {result}")
+                logger.info(f"Uploaded {file_size} bytes to profile-photos/{file_name}")
                 
                 # Get the public URL
                 photo_url = bucket.get_public_url(file_name)
@@ -103,6 +184,7 @@ class ProfileService:
                 update_response = self.db.table("users").update(
                     {"profile_photo_url": photo_url}
                 ).eq("id", user_id).execute()
+                invalidate_profile_cache(user_id)
 
                 if not update_response.data:
                     logger.error("Error: Failed to update user profile with photo URL")
@@ -148,6 +230,7 @@ class ProfileService:
             self.db.table("users").update(
                 {"profile_photo_url": None}
             ).eq("id", user_id).execute()
+            invalidate_profile_cache(user_id)
 
             logger.info(f"Successfully deleted profile photo for user {user_id}")
             return True
@@ -195,6 +278,7 @@ class ProfileService:
         }
 
         response = self.db.table("user_preferences").insert(default_prefs).execute()
+        invalidate_profile_cache(user_id)
 
         if response.data:
             return UserPreferences(**response.data[0])
@@ -220,6 +304,7 @@ class ProfileService:
         response = self.db.table("user_preferences").update(update_data).eq(
             "user_id", user_id
         ).execute()
+        invalidate_profile_cache(user_id)
 
         if not response.data:
             # Preferences might not exist, create them
@@ -229,82 +314,85 @@ class ProfileService:
 
     async def get_user_stats(self, user_id: str) -> Optional[UserProfileStats]:
         """Get aggregated user statistics"""
-        stats = UserProfileStats()
-
-        # First get the active study plan ID
-        study_plan_response = self.db.table("study_plans").select("id").eq(
-            "user_id", user_id
-        ).eq("is_active", True).execute()
-
-        if not study_plan_response.data:
+        plans, snapshots = await _execute_all(
+            self._active_plan_query(user_id),
+            self._latest_snapshot_query(user_id),
+        )
+        if not plans:
             # No active study plan, return empty stats
-            return stats
+            return UserProfileStats()
 
-        study_plan_id = study_plan_response.data[0]["id"]
-
-        # Get practice session stats
-        sessions_response = self.db.table("practice_sessions").select(
-            "id, status, completed_at, started_at"
-        ).eq("study_plan_id", study_plan_id).execute()
-
-        if sessions_response.data:
-            completed_sessions = [s for s in sessions_response.data if s.get("status") == "completed"]
-            stats.total_practice_sessions = len(completed_sessions)
-
-            # Calculate total study time
-            for session in completed_sessions:
-                if session.get("started_at") and session.get("completed_at"):
-                    start = datetime.fromisoformat(session["started_at"])
-                    end = datetime.fromisoformat(session["completed_at"])
-                    duration = (end - start).total_seconds() / 3600  # Convert to hours
-                    stats.total_study_hours += duration
-
-            if stats.total_practice_sessions > 0:
-                stats.average_session_duration = stats.total_study_hours / stats.total_practice_sessions * 60  # In minutes
-
-        # Get question stats
-        # Note: session_questions doesn't have is_correct, we need to check user_answer vs correct answer
-        questions_response = self.db.table("session_questions").select(
-            "status, user_answer, question_id"
-        ).in_("session_id", [s["id"] for s in sessions_response.data] if sessions_response.data else []).execute()
-
-        if questions_response.data:
-            answered_questions = [q for q in questions_response.data if q.get("status") == "answered"]
-            stats.total_questions_answered = len(answered_questions)
-
-            # For now, we'll skip calculating correct answers since it requires joining with questions table
-            # This would need a more complex query to compare user_answer with question's correct_answer
-            stats.total_correct_answers = 0
-            stats.accuracy_percentage = 0.0
-
-        # Get full study plan details for scores and test date
-        # (we already have the ID from earlier)
-        full_plan_response = self.db.table("study_plans").select("*").eq(
-            "id", study_plan_id
-        ).execute()
-
-        if full_plan_response.data:
-            plan = full_plan_response.data[0]
-            stats.current_math_score = plan.get("current_math_score")
-            stats.target_math_score = plan.get("target_math_score")
-            stats.current_rw_score = plan.get("current_rw_score")
-            stats.target_rw_score = plan.get("target_rw_score")
+        sessions = await self._load_plan_sessions(plans[0]["id"])
+        return self._build_stats(plans[0], sessions, snapshots[0] if snapshots else None)
 
-            if plan.get("test_date"):
-                test_date = datetime.fromisoformat(plan["test_date"]).date()
-                stats.days_until_test = (test_date - date.today()).days
+    def _active_plan_query(self, user_id: str):
+        # The whole row: stats need its id (for sessions) and its scores
+        return self.db.table("study_plans").select("*").eq(
+            "user_id", user_id
+        ).eq("is_active", True)
 
-        # Get latest performance snapshot for improvement tracking
-        snapshot_response = self.db.table("user_performance_snapshots").select(
+    def _latest_snapshot_query(self, user_id: str):
+        return self.db.table("user_performance_snapshots").select(
             "predicted_sat_math, predicted_sat_rw"
-        ).eq("user_id", user_id).order("created_at", desc=True).limit(1).execute()
+        ).eq("user_id", user_id).order("created_at", desc=True).limit(1)
+
+    async def _load_plan_sessions(self, study_plan_id: str) -> List[Dict[str, Any]]:
+        """A plan's practice sessions with their question statuses, in one query"""
+        results = await _execute_all(
+            self.db.table("practice_sessions").select(
+                "id, status, completed_at, started_at, session_questions(status)"
+            ).eq("study_plan_id", study_plan_id)
+        )
+        return results[0] or []
+
+    @staticmethod
+    def _build_stats(
+        plan: Optional[Dict[str, Any]],
+        sessions: List[Dict[str, Any]],
+        snapshot: Optional[Dict[str, Any]],
+    ) -> UserProfileStats:
+        """Aggregate stats from the active plan, its sessions and the latest snapshot"""
+        stats = UserProfileStats()
+        if not plan:
+            return stats
 
-        if snapshot_response.data and stats.current_math_score and stats.current_rw_score:
-            latest = snapshot_response.data[0]
-            if latest.get("predicted_sat_math"):
-                stats.improvement_math = latest["predicted_sat_math"] - stats.current_math_score
-            if latest.get("predicted_sat_rw"):
-                stats.improvement_rw = latest["predicted_sat_rw"] - stats.current_rw_score
+        completed_sessions = [s for s in sessions if s.get("status") == "completed"]
+        stats.total_practice_sessions = len(completed_sessions)
+
+        # Calculate total study time
+        for session in completed_sessions:
+            if session.get("started_at") and session.get("completed_at"):
+                start = datetime.fromisoformat(session["started_at"])
+                end = datetime.fromisoformat(session["completed_at"])
+                duration = (end - start).total_seconds() / 3600  # Convert to hours
+                stats.total_study_hours += duration
+
+        if stats.total_practice_sessions > 0:
+            stats.average_session_duration = stats.total_study_hours / stats.total_practice_sessions * 60  # In minutes
+
+        # Question stats. Correct answers are not counted yet: that needs each
+        # user_answer compared with its question's correct_answer
+        stats.total_questions_answered = sum(
+            1 for s in sessions for q in s.get("session_questions") or []
+            if q.get("status") == "answered"
+        )
+
+        # Scores and test date
+        stats.current_math_score = plan.get("current_math_score")
+        stats.target_math_score = plan.get("target_math_score")
+        stats.current_rw_score = plan.get("current_rw_score")
+        stats.target_rw_score = plan.get("target_rw_score")
+
+        if plan.get("test_date"):
+            test_date = datetime.fromisoformat(plan["test_date"]).date()
+            stats.days_until_test = (test_date - date.today()).days
+
+        # Latest performance snapshot for improvement tracking
+        if snapshot and stats.current_math_score and stats.current_rw_score:
+            if snapshot.get("predicted_sat_math"):
+                stats.improvement_math = snapshot["predicted_sat_math"] - stats.current_math_score
+            if snapshot.get("predicted_sat_rw"):
+                stats.improvement_rw = snapshot["predicted_sat_rw"] - stats.current_rw_score
 
         return stats
 
@@ -313,5 +401,6 @@ class ProfileService:
         response = self.db.table("users").update(
             {"onboarding_completed": True}
         ).eq("id", user_id).execute()
+        invalidate_profile_cache(user_id)
 
         return bool(response.data)
\ No newline at end of file
@@ -0,0 +1,107 @@
+"""
+Set-based updates to many questions.
+
+Admin bulk edits and the question clean-up scripts used to send one
+`update().eq('id', ...)` per question, one after another. Here questions that
+get the same change are updated together: ids are split into chunks, each
+chunk is a single `update().in_('id', chunk)` request, and a few chunks are
+in flight at once. Per-question changes (e.g. a corrected answer for each) are
+grouped by identical payload first, so questions sharing a fix still share
+requests.
+
+Each chunk reports how many rows it updated; a failed chunk is reported with
+its error and does not stop the others.
+"""
+
+import asyncio
+import json
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+from supabase import Client
+
+# Ids per request: the filter travels in the URL, and 200 UUIDs (~7.5KB)
+# stay under common 8KB proxy limits
+BULK_UPDATE_CHUNK_SIZE = 200
+# Chunk requests in flight at once
+BULK_UPDATE_CONCURRENCY = 4
+
+
+class QuestionBulkUpdater:
+    """Applies updates to questions in chunks of ids"""
+
+    def __init__(
+        self,
+        db: Client,
+        chunk_size: int = BULK_UPDATE_CHUNK_SIZE,
+        concurrency: int = BULK_UPDATE_CONCURRENCY,
+        on_chunk: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ):
+        """
+        Args:
+            db: Supabase client allowed to update questions (admin or service role)
+            chunk_size: Question ids per update request
+            concurrency: Update requests in flight at once
+            on_chunk: Called with each chunk's result as it completes (progress output)
+        """
+        self.db = db
+        self.chunk_size = chunk_size
+        self.concurrency = concurrency
+        self.on_chunk = on_chunk
+
+    async def update_many(self, question_ids: Sequence[str], updates: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Apply the same updates to every question in question_ids.
+
+        Returns:
+            Summary: requested, updated, failed (ids in failed chunks) and
+            per-chunk results
+        """
+        return await self.update_each({question_id: updates for question_id in question_ids})
+
+    async def update_each(self, updates_by_id: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Apply each question's own updates, batching questions whose updates are identical.
+
+        Returns:
+            Summary like update_many
+        """
+        groups: Dict[str, List[str]] = {}
+        payloads: Dict[str, Dict[str, Any]] = {}
+        for question_id, updates in updates_by_id.items():
+            key = json.dumps(updates, sort_keys=True, default=str)
+            groups.setdefault(key, []).append(question_id)
+            payloads[key] = updates
+
+        chunks = [
+            (payloads[key], ids[start:start + self.chunk_size])
+            for key, ids in groups.items()
+            for start in range(0, len(ids), self.chunk_size)
+        ]
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def run(index: int, updates: Dict[str, Any], ids: List[str]) -> Dict[str, Any]:
+            async with semaphore:
+                result = await asyncio.to_thread(self._update_chunk, updates, ids)
+            result["chunk"] = index
+            if self.on_chunk:
+                self.on_chunk(result)
+            return result
+
+        results = await asyncio.gather(*(run(i, updates, ids) for i, (updates, ids) in enumerate(chunks)))
+        return {
+            "requested": len(updates_by_id),
+            "updated": sum(r["updated"] for r in results),
+            "failed": sum(r["requested"] for r in results if r["error"]),
+            "chunks": results,
+        }
+
+    def _update_chunk(self, updates: Dict[str, Any], ids: Iterable[str]) -> Dict[str, Any]:
+        ids = list(ids)
+        try:
+            response = self.db.table("questions").update(
+                updates, count="exact", returning="minimal"
+            ).in_("id", ids).execute()
+            return {"requested": len(ids), "updated": response.count or 0, "error": None}
+        except Exception as e:
+            print(f"[BULK UPDATE ERROR] Chunk of {len(ids)} questions failed: {e}")
+            return {"requested": len(ids), "updated": 0, "error": str(e)}
@@ -0,0 +1,166 @@
+"""
+Question Pool Search
+
+Ranked search over the question bank for the question pool browser. The
+search_questions database function (migration 043) matches the stem,
+stimulus and rationale as plain text: every query word must match, the last
+one as a prefix so results follow a query as it is typed, and matches in the
+stem weigh most. When nothing matches every word it falls back to trigram
+similarity, so misspelled queries still find questions. Each result carries
+a snippet with the matched words highlighted. Only the first
+SEARCH_MAX_MATCHES matches are ranked and counted, so broad queries (a common
+word) cost the same however large the bank grows; their total is reported as
+capped.
+
+The question bank is the same for every student, so the top results of
+recent queries (the first SEARCH_CACHE_DEPTH for each query and filters) are
+cached per process, least recently used evicted: the first pages of common
+searches are served without a database request. Admin edits call
+invalidate_question_search; other processes pick them up within
+question_search_cache_ttl_seconds.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from supabase import Client
+
+from app.config import get_settings
+
+# Matches ranked and counted per query
+SEARCH_MAX_MATCHES = 1000
+# Results cached per query and filters: the first two pages at the default page size
+SEARCH_CACHE_DEPTH = 40
+# Queries cached per process
+SEARCH_CACHE_SIZE = 256
+# Longer queries are cut (they are words for an index lookup, not documents)
+MAX_QUERY_LENGTH = 200
+
+# (query, section, difficulty, topic_id, category_id) -> (expires_at, top rows)
+_search_cache: "OrderedDict[Tuple, Tuple[float, List[Dict[str, Any]]]]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def normalize_search_query(query: Optional[str]) -> str:
+    """Lowercased query with whitespace collapsed, so equivalent queries share a cache entry"""
+    return " ".join((query or "").lower().split())[:MAX_QUERY_LENGTH]
+
+
+def invalidate_question_search() -> None:
+    """Drop cached search results after questions change"""
+    with _cache_lock:
+        _search_cache.clear()
+
+
+class QuestionSearchService:
+    """Ranked, highlighted question search with a per-process cache of top results"""
+
+    def __init__(self, db: Client):
+        self.db = db
+
+    def search(
+        self,
+        query: str,
+        section: Optional[str] = None,
+        difficulty: Optional[str] = None,
+        topic_id: Optional[str] = None,
+        category_id: Optional[str] = None,
+        limit: int = 20,
+        offset: int = 0
+    ) -> Dict[str, Any]:
+        """
+        Search active questions.
+
+        Args:
+            query: Search text
+            section: Filter by section (math/reading_writing)
+            difficulty: Filter by difficulty (E/M/H)
+            topic_id: Filter by topic ID
+            category_id: Filter by category ID
+            limit: Number of results
+            offset: Results to skip
+
+        Returns:
+            Dict with questions (best first, each with rank and snippet),
+            total matches, total_capped (more than SEARCH_MAX_MATCHES matched)
+            and match_type ('exact', 'fuzzy', or None without matches)
+        """
+        query = normalize_search_query(query)
+        if not query:
+            return {"questions": [], "total": 0, "total_capped": False, "match_type": None}
+
+        key = (query, section, difficulty, topic_id, category_id)
+        if offset + limit <= SEARCH_CACHE_DEPTH:
+            rows = self._top_results(key)[offset:offset + limit]
+        else:
+            rows = self._fetch(key, limit, offset)
+
+        # Every row carries the total; past the last match, take it from the top results
+        first = rows[0] if rows else next(iter(self._top_results(key)), None)
+        total = first["total_count"] if first else 0
+        return {
+            "questions": [self._format(row) for row in rows],
+            "total": total,
+            "total_capped": total >= SEARCH_MAX_MATCHES,
+            "match_type": first["match_type"] if first else None
+        }
+
+    def _top_results(self, key: Tuple) -> List[Dict[str, Any]]:
+        """The first SEARCH_CACHE_DEPTH results for a query, from the cache when fresh"""
+        now = time.monotonic()
+        with _cache_lock:
+            cached = _search_cache.get(key)
+            if cached and cached[0] > now:
+                _search_cache.move_to_end(key)
+                return cached[1]
+
+        rows = self._fetch(key, SEARCH_CACHE_DEPTH, 0)
+
+        ttl = get_settings().question_search_cache_ttl_seconds
+        if ttl > 0:
+            with _cache_lock:
+                _search_cache[key] = (now + ttl, rows)
+                _search_cache.move_to_end(key)
+                while len(_search_cache) > SEARCH_CACHE_SIZE:
+                    _search_cache.popitem(last=False)
+        return rows
+
+    def _fetch(self, key: Tuple, limit: int, offset: int) -> List[Dict[str, Any]]:
+        query, section, difficulty, topic_id, category_id = key
+        return self.db.rpc("search_questions", {
+            "p_query": query,
+            "p_section": section,
+            "p_difficulty": difficulty,
+            "p_topic_id": topic_id,
+            "p_category_id": category_id,
+            "p_limit": limit,
+            "p_offset": offset,
+            "p_max_matches": SEARCH_MAX_MATCHES,
+        }).execute().data or []
+
+    @staticmethod
+    def _format(row: Dict[str, Any]) -> Dict[str, Any]:
+        """A search row shaped like the question pool browser's questions"""
+        return {
+            'id': row['id'],
+            'stem': row['stem'],
+            'stimulus': row.get('stimulus'),
+            'difficulty': row['difficulty'],
+            'question_type': row['question_type'],
+            'answer_options': row.get('answer_options'),
+            'correct_answer': row.get('correct_answer'),
+            'rationale': row.get('rationale'),
+            'topic': {
+                'id': row['topic_id'],
+                'name': row.get('topic_name'),
+            } if row.get('topic_id') else None,
+            'category': {
+                'id': row['category_id'],
+                'name': row.get('category_name'),
+                'section': row.get('section'),
+            } if row.get('category_id') else None,
+            'rank': row.get('rank'),
+            'snippet': row.get('snippet'),
+        }
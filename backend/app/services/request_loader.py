@@ -0,0 +1,130 @@
+"""
+Request-scoped loader for lookups that many handlers repeat: a user's study
+plans, practice sessions and skill mastery, and topics by id.
+
+Most per-user reads start by resolving user -> study_plans -> practice_sessions
+ids, and code paths that call several helpers (a performance snapshot, the
+wrong-answer and saved-question lists) used to do it once per helper. A
+RequestLoader fetches each of these at most once for the request it belongs
+to: every session of every plan comes from one joined query, and topics are
+fetched in a single batch for whichever ids are not loaded yet. Services
+accept a loader so a route can share one across them; get_request_loader is
+the FastAPI dependency, cached per request like any other.
+
+Nothing outlives the request, so there is nothing to invalidate. Writes made
+during the request are not reflected in what the loader already returned.
+"""
+
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, TypeVar
+
+from fastapi import Depends
+from supabase import Client
+
+from app.core.auth import get_authenticated_client
+
+T = TypeVar("T")
+
+# Session columns every caller so far needs; the embedded plan carries the
+# filter and lets callers tell the active plan's sessions apart
+SESSION_COLUMNS = "id, study_plan_id, status, created_at, started_at, completed_at"
+
+# Mastery columns for the skill heatmap and learning velocity, with each
+# skill's topic and category embedded
+MASTERY_COLUMNS = (
+    "skill_id, mastery_probability, learning_velocity, plateau_flag, total_attempts, "
+    "correct_attempts, last_practiced_at, updated_at, "
+    "topics(id, name, category_id, categories(id, name, section))"
+)
+
+# Study plan goals and self-reported scores, for predictions
+PLAN_COLUMNS = (
+    "id, target_math_score, target_rw_score, current_math_score, current_rw_score, "
+    "test_date, start_date"
+)
+
+
+class RequestLoader:
+    """Memoized per-request lookups"""
+
+    def __init__(self, db: Client):
+        self.db = db
+        self._memo: Dict[Hashable, Any] = {}
+        # topic_id -> topic row with its category (None if it doesn't exist)
+        self._topics: Dict[str, Optional[Dict[str, Any]]] = {}
+
+    def load(self, key: Hashable, fetch: Callable[[], T]) -> T:
+        """
+        Result of fetch(), called at most once per key for this request.
+
+        Lookups specific to one service are keyed by a tuple starting with
+        the service's name.
+        """
+        if key not in self._memo:
+            self._memo[key] = fetch()
+        return self._memo[key]
+
+    def sessions(self, user_id: str) -> List[Dict[str, Any]]:
+        """Every practice session in any of the user's study plans"""
+        return self.load(("sessions", user_id), lambda: self.db.table("practice_sessions").select(
+            f"{SESSION_COLUMNS}, study_plans!inner(user_id, is_active)"
+        ).eq("study_plans.user_id", user_id).execute().data or [])
+
+    def session_ids(self, user_id: str, active_plan_only: bool = False) -> List[str]:
+        """
+        IDs of the user's practice sessions.
+
+        Args:
+            user_id: User ID
+            active_plan_only: Only sessions of the active study plan
+
+        Returns:
+            Session IDs (empty if the user has no plan or no sessions)
+        """
+        return [
+            s["id"] for s in self.sessions(user_id)
+            if not active_plan_only or (s.get("study_plans") or {}).get("is_active")
+        ]
+
+    def sessions_by_id(self, user_id: str) -> Dict[str, Dict[str, Any]]:
+        """The user's practice sessions keyed by id"""
+        return self.load(("sessions_by_id", user_id), lambda: {s["id"]: s for s in self.sessions(user_id)})
+
+    def mastery(self, user_id: str) -> List[Dict[str, Any]]:
+        """The user's skill mastery rows with topic and category"""
+        return self.load(("mastery", user_id), lambda: self.db.table("user_skill_mastery").select(
+            MASTERY_COLUMNS
+        ).eq("user_id", user_id).execute().data or [])
+
+    def active_study_plan(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """The user's active study plan, or None"""
+        def fetch():
+            rows = self.db.table("study_plans").select(PLAN_COLUMNS).eq(
+                "user_id", user_id
+            ).eq("is_active", True).execute().data
+            return rows[0] if rows else None
+        return self.load(("active_study_plan", user_id), fetch)
+
+    def topics(self, topic_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Topics with their category name and section, keyed by id. Only ids not
+        already loaded in this request are fetched, in one query.
+        """
+        wanted = {t for t in topic_ids if t}
+        missing = [t for t in wanted if t not in self._topics]
+        if missing:
+            response = self.db.table("topics").select(
+                "*, categories(name, section)"
+            ).in_("id", missing).execute()
+            for topic_id in missing:
+                self._topics[topic_id] = None
+            for topic in response.data or []:
+                self._topics[topic["id"]] = topic
+        return {t: self._topics[t] for t in wanted if self._topics[t] is not None}
+
+
+def get_request_loader(db: Client = Depends(get_authenticated_client)) -> RequestLoader:
+    """
+    Dependency function for FastAPI endpoints.
+    Returns a loader bound to the request's authenticated client.
+    """
+    return RequestLoader(db)
@@ -0,0 +1,259 @@
+"""
+Equated raw-to-scaled scoring tables.
+
+Every SAT-style score in the app is a lookup into one precomputed file
+(app/data/scoring_tables.json):
+
+- Mock exam sections: one table per section and module-2 route
+  (easy/medium/hard) mapping the section raw score (module 1 + module 2) to a
+  200-800 scaled score. The same raw score is worth more on the hard route.
+- Ability estimates (snapshots, diagnostics): a theta grid mapped onto the
+  same 200-800 scale, so both kinds of scores agree.
+
+Tables are built from item parameters (question_difficulty_params, or E/M/H
+label defaults) by scripts/build_scoring_tables.py: for each route, the
+distribution of raw scores at every ability is computed with the
+Lord-Wingersky recursion over the module forms, and each raw score is mapped
+to the scaled score of its expected ability (EAP). The build script then
+checks the tables against simulated exams.
+"""
+
+import json
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+TABLES_PATH = Path(__file__).resolve().parent.parent / "data" / "scoring_tables.json"
+
+SECTIONS = ("math", "reading_writing")
+ROUTES = ("easy", "medium", "hard")
+
+# Reporting scale: theta 0 -> 500, one SD -> 100 points, rounded to 10
+SCALE_MEAN = 500
+SCALE_SD = 100
+SCORE_MIN = 200
+SCORE_MAX = 800
+
+# Ability grid for the recursion and the theta table
+THETA_MIN = -4.0
+THETA_STEP = 0.05
+THETA_GRID = np.round(np.arange(THETA_MIN, 4.0 + THETA_STEP / 2, THETA_STEP), 2)
+PRIOR = np.exp(-0.5 * THETA_GRID ** 2)
+
+
+def scale_theta(theta) -> np.ndarray:
+    """Reporting-scale score(s) for ability theta, clamped and rounded to 10"""
+    score = np.clip(SCALE_MEAN + SCALE_SD * np.asarray(theta, dtype=np.float64), SCORE_MIN, SCORE_MAX)
+    return (np.round(score / 10) * 10).astype(int)
+
+
+class ScoringTables:
+    """Loaded tables; every lookup is a list index"""
+
+    def __init__(self, data: Dict):
+        self.questions_per_module = data["questions_per_module"]
+        self.theta_min = data["theta_scale"]["min"]
+        self.theta_step = data["theta_scale"]["step"]
+        self.theta_scores: List[int] = data["theta_scale"]["scores"]
+        self.raw_scores: Dict[Tuple[str, str], List[int]] = {
+            (section, route): scores
+            for section, routes in data["sections"].items()
+            for route, scores in routes.items()
+        }
+
+    def section_score(self, section: str, route: str, raw_score: int) -> int:
+        """
+        Scaled score for a section's raw score (both modules) on a route.
+
+        Args:
+            section: math or reading_writing
+            route: Module 2 difficulty tier (easy, medium, hard)
+            raw_score: Correct answers across both modules
+        """
+        table = self.raw_scores[(section, route)]
+        return table[min(max(int(raw_score), 0), len(table) - 1)]
+
+    def theta_score(self, theta: float) -> int:
+        """Scaled score for an ability estimate"""
+        i = int(round((theta - self.theta_min) / self.theta_step))
+        return self.theta_scores[min(max(i, 0), len(self.theta_scores) - 1)]
+
+
+@lru_cache()
+def get_scoring_tables() -> ScoringTables:
+    with open(TABLES_PATH) as f:
+        return ScoringTables(json.load(f))
+
+
+# ----------------------------------------------------------------------------
+# Building (scripts/build_scoring_tables.py)
+# ----------------------------------------------------------------------------
+
+def item_probabilities(discrimination: np.ndarray, difficulty: np.ndarray) -> np.ndarray:
+    """P(correct) of each item at each THETA_GRID point, shape (items, grid)"""
+    return 1.0 / (1.0 + np.exp(-discrimination[:, None] * (THETA_GRID[None, :] - difficulty[:, None])))
+
+
+def label_counts(distribution: Dict[str, float], n: int) -> Dict[str, int]:
+    """E/M/H item counts for an n-item form (largest remainder)"""
+    exact = {label: n * share for label, share in distribution.items()}
+    counts = {label: int(value) for label, value in exact.items()}
+    for label in sorted(exact, key=lambda k: exact[k] - counts[k], reverse=True)[:n - sum(counts.values())]:
+        counts[label] += 1
+    return counts
+
+
+def form_probabilities(
+    label_probs: Dict[str, np.ndarray], distribution: Dict[str, float], n: int
+) -> np.ndarray:
+    """
+    Per-position P(correct) for a randomly assembled n-item form, shape (n, grid).
+
+    Each position of a label is answered with that label's pool-average
+    probability, which is exact for items drawn at random from the pool.
+    """
+    rows = []
+    for label, count in label_counts(distribution, n).items():
+        rows.extend([label_probs[label]] * count)
+    return np.array(rows)
+
+
+def raw_score_distribution(probabilities: np.ndarray) -> np.ndarray:
+    """Lord-Wingersky recursion: P(raw = k | theta), shape (items + 1, grid)"""
+    dist = np.ones((1, probabilities.shape[1]))
+    for p in probabilities:
+        nxt = np.zeros((dist.shape[0] + 1, dist.shape[1]))
+        nxt[:-1] += dist * (1.0 - p)
+        nxt[1:] += dist * p
+        dist = nxt
+    return dist
+
+
+def build_section_tables(
+    label_probs: Dict[str, np.ndarray],
+    distributions: Dict[str, Dict[str, float]],
+    route_for: Callable[[int], str],
+    questions_per_module: int,
+) -> Dict[str, List[int]]:
+    """
+    Raw-to-scaled tables for one section, one per module-2 route.
+
+    Args:
+        label_probs: Pool-average P(correct) per E/M/H label over THETA_GRID
+        distributions: E/M/H shares for "module_1" and each route
+        route_for: Module-2 route for a module-1 raw score
+        questions_per_module: Items per module
+
+    Returns:
+        {route: [scaled score for raw 0..2 * questions_per_module]}
+    """
+    n = questions_per_module
+    module_1 = raw_score_distribution(form_probabilities(label_probs, distributions["module_1"], n))
+
+    tables = {}
+    for route in ROUTES:
+        module_2 = raw_score_distribution(form_probabilities(label_probs, distributions[route], n))
+        on_route = np.array([route_for(raw) == route for raw in range(n + 1)])
+
+        # P(route, section raw = k | theta)
+        joint = np.zeros((2 * n + 1, len(THETA_GRID)))
+        for raw_1 in np.flatnonzero(on_route):
+            joint[raw_1:raw_1 + n + 1] += module_1[raw_1] * module_2
+
+        weights = joint * PRIOR
+        mass = weights.sum(axis=1)
+        possible = mass > 1e-12
+        eap = np.zeros(2 * n + 1)
+        eap[possible] = (weights[possible] * THETA_GRID).sum(axis=1) / mass[possible]
+
+        # Raw scores that can't occur on this route take the nearest possible one
+        positions = np.flatnonzero(possible)
+        nearest = positions[np.abs(np.arange(2 * n + 1)[:, None] - positions[None, :]).argmin(axis=1)]
+        scores = np.maximum.accumulate(scale_theta(eap[nearest]))
+
+        scores[0] = SCORE_MIN
+        if route == ROUTES[-1]:
+            scores[-1] = SCORE_MAX
+        tables[route] = [int(s) for s in scores]
+
+    return tables
+
+
+def build_tables(
+    label_probs_by_section: Dict[str, Dict[str, np.ndarray]],
+    distributions: Dict[str, Dict[str, float]],
+    route_for: Callable[[int], str],
+    questions_per_module: int,
+    source: str,
+) -> Dict:
+    """Complete tables document (the contents of TABLES_PATH)"""
+    return {
+        "source": source,
+        "questions_per_module": questions_per_module,
+        "module_1_routes": [route_for(raw) for raw in range(questions_per_module + 1)],
+        "theta_scale": {
+            "min": THETA_MIN,
+            "step": THETA_STEP,
+            "scores": [int(s) for s in scale_theta(THETA_GRID)],
+        },
+        "sections": {
+            section: build_section_tables(label_probs, distributions, route_for, questions_per_module)
+            for section, label_probs in label_probs_by_section.items()
+        },
+    }
+
+
+def simulate_section(
+    tables: ScoringTables,
+    section: str,
+    pools: Dict[str, Tuple[np.ndarray, np.ndarray]],
+    distributions: Dict[str, Dict[str, float]],
+    route_for: Callable[[int], str],
+    theta: np.ndarray,
+    rng: np.random.Generator,
+) -> Dict[str, np.ndarray]:
+    """
+    Take one simulated exam per ability in theta, each with its own randomly
+    drawn forms, and score it with the tables.
+
+    Args:
+        pools: (discrimination, difficulty) arrays per E/M/H label
+
+    Returns:
+        Arrays of raw score, route and table score per simulee
+    """
+    n = tables.questions_per_module
+
+    def take_module(distribution: Dict[str, float], ability: np.ndarray) -> np.ndarray:
+        correct = np.zeros(len(ability), dtype=int)
+        for label, count in label_counts(distribution, n).items():
+            a_pool, b_pool = pools[label]
+            picks = rng.integers(0, len(a_pool), (len(ability), count))
+            p = 1.0 / (1.0 + np.exp(-a_pool[picks] * (ability[:, None] - b_pool[picks])))
+            correct += (rng.random(p.shape) < p).sum(axis=1)
+        return correct
+
+    raw_1 = take_module(distributions["module_1"], theta)
+    routes = np.array([route_for(int(r)) for r in raw_1])
+    raw = raw_1.copy()
+    for route in ROUTES:
+        on_route = routes == route
+        if on_route.any():
+            raw[on_route] += take_module(distributions[route], theta[on_route])
+
+    scores = np.array([tables.section_score(section, r, k) for r, k in zip(routes, raw)])
+    return {"raw": raw, "route": routes, "score": scores}
+
+
+def label_pools(
+    labels: Sequence[str], discrimination: np.ndarray, difficulty: np.ndarray
+) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+    """Split item parameters into (a, b) arrays per E/M/H label"""
+    labels = np.asarray(labels)
+    return {
+        label: (discrimination[labels == label], difficulty[labels == label])
+        for label in ("E", "M", "H")
+        if (labels == label).any()
+    }
@@ -0,0 +1,244 @@
+"""
+A user's performance snapshots as a compact, columnar time series.
+
+The growth curve, score predictions and learning velocity all read the same
+per-user history: when each snapshot was taken, its predicted SAT scores and
+its mean skill mastery. SnapshotSeries holds those as parallel NumPy arrays,
+oldest first, with timestamps parsed once. Regressions, windows and weekly
+bucketing then run as array operations instead of per-row Python that parses
+created_at again at every step.
+
+Series are cached per user in the process. Snapshots are only ever inserted,
+so a cached series is brought up to date by fetching the rows since its last
+snapshot (with a small overlap for rows committed late) rather than the whole
+history. Only narrow columns are selected; mean mastery comes from the
+mean_mastery column (migration 040) rather than each snapshot's skills JSON.
+"""
+
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from supabase import Client
+
+SERIES_COLUMNS = (
+    "created_at, snapshot_type, predicted_sat_math, predicted_sat_rw, "
+    "cognitive_efficiency_score, mean_mastery"
+)
+
+# Rows per request (PostgREST returns at most 1000)
+FETCH_PAGE_SIZE = 1000
+
+# Users whose series are kept in memory
+SERIES_CACHE_SIZE = 1024
+# Refreshes re-read this much of the cached tail, for snapshots committed
+# after a later one was already read
+REFRESH_OVERLAP_SECONDS = 60
+
+SECONDS_PER_DAY = 86400.0
+
+
+def _timestamp(value: str) -> float:
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def _column(rows: List[Dict[str, Any]], name: str) -> np.ndarray:
+    return np.array(
+        [np.nan if row.get(name) is None else float(row[name]) for row in rows], dtype=np.float64
+    )
+
+
+class SnapshotSeries:
+    """Parallel arrays of a user's snapshots, oldest first (missing values are NaN)"""
+
+    __slots__ = ("created_at", "snapshot_type", "timestamps", "math", "rw", "efficiency", "mastery")
+
+    def __init__(
+        self,
+        created_at: List[str],
+        snapshot_type: List[str],
+        timestamps: np.ndarray,
+        math: np.ndarray,
+        rw: np.ndarray,
+        efficiency: np.ndarray,
+        mastery: np.ndarray,
+    ):
+        self.created_at = created_at  # as stored, for API output
+        self.snapshot_type = snapshot_type
+        self.timestamps = timestamps  # epoch seconds
+        self.math = math
+        self.rw = rw
+        self.efficiency = efficiency
+        self.mastery = mastery
+
+    @classmethod
+    def from_rows(cls, rows: List[Dict[str, Any]]) -> "SnapshotSeries":
+        """Build from snapshot rows ordered by created_at"""
+        return cls(
+            created_at=[row["created_at"] for row in rows],
+            snapshot_type=[row.get("snapshot_type") for row in rows],
+            timestamps=np.array([_timestamp(row["created_at"]) for row in rows], dtype=np.float64),
+            math=_column(rows, "predicted_sat_math"),
+            rw=_column(rows, "predicted_sat_rw"),
+            efficiency=_column(rows, "cognitive_efficiency_score"),
+            mastery=_column(rows, "mean_mastery"),
+        )
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def __getitem__(self, index: slice) -> "SnapshotSeries":
+        return SnapshotSeries(
+            self.created_at[index],
+            self.snapshot_type[index],
+            self.timestamps[index],
+            self.math[index],
+            self.rw[index],
+            self.efficiency[index],
+            self.mastery[index],
+        )
+
+    def concat(self, other: "SnapshotSeries") -> "SnapshotSeries":
+        return SnapshotSeries(
+            self.created_at + other.created_at,
+            self.snapshot_type + other.snapshot_type,
+            np.concatenate([self.timestamps, other.timestamps]),
+            np.concatenate([self.math, other.math]),
+            np.concatenate([self.rw, other.rw]),
+            np.concatenate([self.efficiency, other.efficiency]),
+            np.concatenate([self.mastery, other.mastery]),
+        )
+
+    def since(self, cutoff: datetime) -> "SnapshotSeries":
+        """Snapshots taken at or after cutoff (naive datetimes are UTC, as in a query filter)"""
+        if cutoff.tzinfo is None:
+            cutoff = cutoff.replace(tzinfo=timezone.utc)
+        start = np.searchsorted(self.timestamps, cutoff.timestamp(), side="left")
+        return self[start:]
+
+    def last(self, n: int) -> "SnapshotSeries":
+        """The n most recent snapshots"""
+        return self[max(0, len(self) - n):]
+
+    def totals(self) -> np.ndarray:
+        """Predicted total score per snapshot (a missing section counts as 0)"""
+        return np.nan_to_num(self.math) + np.nan_to_num(self.rw)
+
+    def elapsed_days(self) -> np.ndarray:
+        """Whole days since the first snapshot (as timedelta.days counts them)"""
+        if not len(self):
+            return np.zeros(0)
+        return np.floor((self.timestamps - self.timestamps[0]) / SECONDS_PER_DAY)
+
+    def week_buckets(self) -> np.ndarray:
+        """
+        Calendar week of each snapshot in UTC, as year * 100 + week number with
+        weeks starting on Sunday (strftime's %Y-W%U).
+        """
+        days = (self.timestamps // SECONDS_PER_DAY).astype(np.int64).astype("datetime64[D]")
+        years = days.astype("datetime64[Y]")
+        day_of_year = (days - years).astype(np.int64)
+        # 1970-01-01 was a Thursday: weekday with Sunday as 0
+        weekday = (days.astype(np.int64) + 4) % 7
+        week = (day_of_year + 7 - weekday) // 7
+        return (years.astype(np.int64) + 1970) * 100 + week
+
+
+def linear_trend(x: np.ndarray, y: np.ndarray) -> Optional[Dict[str, float]]:
+    """
+    Least-squares line through (x, y).
+
+    Returns:
+        slope, intercept and r_squared, or None if x has no spread
+    """
+    n = len(x)
+    if n < 2:
+        return None
+    x_mean, y_mean = x.mean(), y.mean()
+    dx = x - x_mean
+    sxx = float(dx @ dx)
+    if sxx == 0:
+        return None
+    slope = float(dx @ (y - y_mean)) / sxx
+    intercept = float(y_mean - slope * x_mean)
+    residuals = y - (slope * x + intercept)
+    ss_tot = float(((y - y_mean) ** 2).sum())
+    ss_res = float(residuals @ residuals)
+    return {
+        "slope": slope,
+        "intercept": intercept,
+        "r_squared": 1 - ss_res / ss_tot if ss_tot > 0 else 0.0,
+    }
+
+
+_cache: "OrderedDict[str, SnapshotSeries]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _after(created_at: str, snapshot_id: str) -> str:
+    """or=() tree for rows after (created_at, id) in oldest-first order"""
+    created_at = '"' + created_at.replace("\\", "\\\\").replace('"', '\\"') + '"'
+    return f"and(created_at.eq.{created_at},id.gt.{snapshot_id}),created_at.gt.{created_at}"
+
+
+def _fetch(db: Client, user_id: str, since_iso: Optional[str]) -> SnapshotSeries:
+    """Snapshots from since_iso on (all if None), keyset-paged on (created_at, id) until a short page"""
+    rows: List[Dict[str, Any]] = []
+    while True:
+        query = db.table("user_performance_snapshots").select(f"id, {SERIES_COLUMNS}").eq("user_id", user_id)
+        if since_iso is not None:
+            query = query.gte("created_at", since_iso)
+        if rows:
+            query = query.or_(_after(rows[-1]["created_at"], rows[-1]["id"]))
+        page = query.order("created_at").order("id").limit(FETCH_PAGE_SIZE).execute().data or []
+        rows.extend(page)
+        if len(page) < FETCH_PAGE_SIZE:
+            return SnapshotSeries.from_rows(rows)
+
+
+def load_snapshot_series(db: Client, user_id: str, loader=None) -> SnapshotSeries:
+    """
+    A user's full snapshot series, brought up to date.
+
+    Args:
+        db: Supabase client
+        user_id: User ID
+        loader: Optional RequestLoader, so services sharing a request read
+            the series once
+
+    Returns:
+        The user's SnapshotSeries (possibly empty)
+    """
+    if loader is not None:
+        return loader.load(("snapshot_series", user_id), lambda: load_snapshot_series(db, user_id))
+
+    with _cache_lock:
+        cached = _cache.get(user_id)
+
+    if cached is None or not len(cached):
+        series = _fetch(db, user_id, None)
+    else:
+        # Re-read from just before the cached tail and replace it
+        overlap_start = float(np.floor(cached.timestamps[-1])) - REFRESH_OVERLAP_SECONDS
+        since = datetime.fromtimestamp(overlap_start, tz=timezone.utc)
+        keep = np.searchsorted(cached.timestamps, overlap_start, side="left")
+        series = cached[:keep].concat(_fetch(db, user_id, since.isoformat()))
+
+    with _cache_lock:
+        # A concurrent refresh may have stored a newer series; either is complete
+        _cache[user_id] = series
+        _cache.move_to_end(user_id)
+        while len(_cache) > SERIES_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return series
+
+
+def clear_snapshot_series_cache() -> None:
+    """Drop every cached series"""
+    with _cache_lock:
+        _cache.clear()
@@ -0,0 +1,175 @@
+"""Streaming, resumable uploads to Supabase Storage (TUS protocol).
+
+`bucket.upload()` needs the whole file as one bytes object, so uploading a
+rendered video held the entire MP4 in memory. This uploader creates a TUS
+upload at /storage/v1/upload/resumable and PATCHes the file in fixed-size
+chunks streamed straight from disk, so memory stays bounded by a small read
+buffer regardless of file size. A failed chunk is retried with backoff after
+asking the server (HEAD) how many bytes it actually persisted, so only the
+missing part is resent.
+
+This module only depends on httpx and the standard library because it is
+also mounted into the Modal container, which has no `app` package.
+"""
+
+import base64
+import json
+import os
+import time
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, Optional
+
+import httpx
+
+TUS_VERSION = "1.0.0"
+# Supabase Storage requires 6MB chunks for resumable uploads (the last one may be smaller)
+CHUNK_SIZE = 6 * 1024 * 1024
+# Bytes read from disk at a time while sending a chunk
+READ_BLOCK_SIZE = 256 * 1024
+
+
+class StorageUploadError(Exception):
+    """Raised when a resumable upload cannot be completed"""
+
+
+def _encode_metadata(metadata: dict) -> str:
+    return ",".join(
+        f"{key} {base64.b64encode(value.encode('utf-8')).decode('ascii')}"
+        for key, value in metadata.items()
+    )
+
+
+def _read_range(fileobj: BinaryIO, offset: int, length: int) -> Iterator[bytes]:
+    """Yield `length` bytes starting at `offset` in small blocks
+
+    Re-creatable per attempt, so a retried chunk is simply read again from disk.
+    """
+    fileobj.seek(offset)
+    remaining = length
+    while remaining:
+        block = fileobj.read(min(READ_BLOCK_SIZE, remaining))
+        if not block:
+            raise StorageUploadError(f"File ended {remaining} bytes before the expected size")
+        remaining -= len(block)
+        yield block
+
+
+def upload_stream(
+    fileobj: BinaryIO,
+    size: int,
+    *,
+    supabase_url: str,
+    api_key: str,
+    bucket: str,
+    object_name: str,
+    content_type: str = "application/octet-stream",
+    cache_control: str = "3600",
+    upsert: bool = False,
+    metadata: Optional[Dict[str, str]] = None,
+    access_token: Optional[str] = None,
+    chunk_size: int = CHUNK_SIZE,
+    max_retries: int = 3,
+    timeout: float = 60.0,
+) -> None:
+    """Upload `size` bytes from a seekable file object in resumable chunks
+
+    Args:
+        fileobj: Seekable binary file positioned anywhere (it is rewound)
+        size: Total number of bytes to upload
+        supabase_url: Project URL, e.g. https://xyz.supabase.co
+        api_key: Anon or service role key (sent as `apikey`)
+        bucket: Storage bucket name
+        object_name: Path of the object inside the bucket
+        content_type: MIME type stored with the object
+        cache_control: Cache-Control max-age in seconds
+        upsert: Overwrite an existing object at the same path
+        metadata: User metadata stored with the object (the TUS equivalent
+            of `x-object-meta-*` headers on a regular upload)
+        access_token: User JWT for RLS-checked uploads (defaults to api_key)
+        chunk_size: Bytes per PATCH request
+        max_retries: Attempts per chunk before giving up
+        timeout: Per-request timeout in seconds
+
+    Raises:
+        StorageUploadError: If the upload can't be created or a chunk keeps failing
+    """
+    endpoint = f"{supabase_url.rstrip('/')}/storage/v1/upload/resumable"
+    headers = {
+        "apikey": api_key,
+        "Authorization": f"Bearer {access_token or api_key}",
+        "Tus-Resumable": TUS_VERSION,
+    }
+
+    upload_metadata = {
+        "bucketName": bucket,
+        "objectName": object_name,
+        "contentType": content_type,
+        "cacheControl": cache_control,
+    }
+    if metadata:
+        upload_metadata["metadata"] = json.dumps(metadata)
+
+    with httpx.Client(timeout=timeout, headers=headers) as client:
+        create = client.post(
+            endpoint,
+            headers={
+                "Upload-Length": str(size),
+                "Upload-Metadata": _encode_metadata(upload_metadata),
+                "x-upsert": "true" if upsert else "false",
+            },
+        )
+        if create.status_code != 201 or "location" not in create.headers:
+            raise StorageUploadError(
+                f"Failed to create resumable upload ({create.status_code}): {create.text[:200]}"
+            )
+        upload_url = str(httpx.URL(endpoint).join(create.headers["location"]))
+
+        offset = 0
+        while offset < size:
+            length = min(chunk_size, size - offset)
+
+            for attempt in range(max_retries):
+                try:
+                    response = client.patch(
+                        upload_url,
+                        content=_read_range(fileobj, offset, length),
+                        headers={
+                            "Upload-Offset": str(offset),
+                            "Content-Length": str(length),
+                            "Content-Type": "application/offset+octet-stream",
+                        },
+                    )
+                    if response.status_code == 204:
+                        offset = int(response.headers.get("upload-offset", offset + length))
+                        break
+                    if response.status_code < 500 and response.status_code != 409:
+                        raise StorageUploadError(
+                            f"Chunk at byte {offset} rejected ({response.status_code}): {response.text[:200]}"
+                        )
+                    error = f"HTTP {response.status_code}"
+                except httpx.HTTPError as e:
+                    error = str(e)
+
+                if attempt == max_retries - 1:
+                    raise StorageUploadError(
+                        f"Chunk at byte {offset} failed after {max_retries} attempts: {error}"
+                    )
+
+                time.sleep(2 ** attempt)
+
+                # Resume from whatever the server persisted before the failure
+                try:
+                    head = client.head(upload_url)
+                    server_offset = int(head.headers.get("upload-offset", offset))
+                except (httpx.HTTPError, ValueError):
+                    server_offset = offset
+                if server_offset != offset:
+                    offset = server_offset
+                    break
+
+
+def upload_file(path: Path, **kwargs) -> None:
+    """Upload a file on disk with `upload_stream` (see it for keyword arguments)"""
+    path = Path(path)
+    with open(path, "rb") as f:
+        upload_stream(f, os.path.getsize(path), **kwargs)
@@ -3,6 +3,7 @@ from datetime import date, datetime, timedelta
 from uuid import UUID
 
 from ..models.profile import UserStreak
+from .profile_service import invalidate_profile_cache
 
 
 class StreakService:
@@ -32,6 +33,7 @@ class StreakService:
         }
 
         response = self.db.table("user_streaks").insert(streak_data).execute()
+        invalidate_profile_cache(user_id)
 
         if response.data:
             return UserStreak(**response.data[0])
@@ -129,6 +131,7 @@ class StreakService:
         update_response = self.db.table("user_streaks").update(update_data).eq(
             "user_id", user_id
         ).execute()
+        invalidate_profile_cache(user_id)
 
         if update_response.data:
             return UserStreak(**update_response.data[0])
@@ -144,6 +147,7 @@ class StreakService:
         response = self.db.table("user_streaks").update(update_data).eq(
             "user_id", user_id
         ).execute()
+        invalidate_profile_cache(user_id)
 
         return bool(response.data)
 
@@ -156,6 +160,7 @@ class StreakService:
         response = self.db.table("user_streaks").update(update_data).eq(
             "user_id", user_id
         ).execute()
+        invalidate_profile_cache(user_id)
 
         return bool(response.data)
 
@@ -5,6 +5,8 @@ from supabase import Client
 import math
 import random
 from app.services.bkt_service import BKTService
+from app.services.learner_analytics_service import invalidate_learner_analytics
+from app.services.profile_service import invalidate_profile_cache
 
 
 class StudyPlanService:
@@ -500,6 +502,8 @@ class StudyPlanService:
         }
 
         study_plan_response = self.db.table("study_plans").insert(study_plan_data).execute()
+        invalidate_profile_cache(user_id)
+        invalidate_learner_analytics(user_id)
         study_plan = study_plan_response.data[0]
         study_plan_id = study_plan["id"]
 
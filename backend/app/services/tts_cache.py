@@ -0,0 +1,189 @@
+"""Shared, content-addressed cache for synthesized voiceover audio.
+
+manim_voiceover only caches inside each scene's own `cache_dir`, and those
+directories are deleted after upload, so identical narration lines were
+re-synthesized on every retry and every similar video. This cache is keyed by
+(text, voice, model) and lives outside the render directories:
+
+- Local tier: files under TTS_CACHE_DIR, capped at TTS_CACHE_MAX_MB and
+  evicted least-recently-used first (mtime is bumped on every hit).
+- Bucket tier (optional): when TTS_CACHE_BUCKET is set, audio is also stored
+  in that Supabase Storage bucket using SUPABASE_URL and
+  SUPABASE_SERVICE_ROLE_KEY, so fresh containers start warm.
+
+Hit/miss counters and bytes saved are kept in `stats.json` next to the audio
+so they add up across render processes.
+
+This module only depends on the standard library (supabase is optional)
+because it is also mounted into the Modal container, which has no `app`
+package.
+"""
+
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+DEFAULT_CACHE_DIR = Path(tempfile.gettempdir()) / "prepst_tts_cache"
+DEFAULT_MAX_MB = 512
+
+
+class TTSAudioCache:
+    """Two-tier (local disk LRU + optional storage bucket) TTS audio cache"""
+
+    def __init__(self, cache_dir: Path, max_bytes: int, bucket=None):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.bucket = bucket
+        self._stats_path = self.cache_dir / "stats.json"
+
+    @staticmethod
+    def make_key(text: str, voice: str, model: str) -> str:
+        """Content address for one narration line"""
+        payload = json.dumps({"text": text, "voice": voice, "model": model}, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _local_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.mp3"
+
+    def get(self, key: str, dest: Path) -> bool:
+        """Copy cached audio for `key` to `dest`. Returns True on a hit."""
+        local_path = self._local_path(key)
+
+        if local_path.exists():
+            shutil.copyfile(local_path, dest)
+            os.utime(local_path)  # Mark as recently used for LRU eviction
+            self._record("local_hits", local_path.stat().st_size)
+            return True
+
+        if self.bucket is not None:
+            try:
+                content = self.bucket.download(f"{key}.mp3")
+            except Exception:
+                content = None
+            if content:
+                self._write_local(key, content)
+                Path(dest).write_bytes(content)
+                self._record("bucket_hits", len(content))
+                return True
+
+        self._record("misses", 0)
+        return False
+
+    def put(self, key: str, src: Path) -> None:
+        """Store freshly synthesized audio in both tiers (best effort)"""
+        try:
+            content = Path(src).read_bytes()
+            self._write_local(key, content)
+            if self.bucket is not None:
+                self.bucket.upload(
+                    f"{key}.mp3",
+                    content,
+                    {"content-type": "audio/mpeg", "upsert": "true"},
+                )
+        except Exception as e:
+            # A cache write failure must never fail the render
+            print(f"Warning: Could not store TTS audio in cache: {e}")
+
+    def _write_local(self, key: str, content: bytes) -> None:
+        local_path = self._local_path(key)
+        local_path.parent.mkdir(parents=True, exist_ok=True)
+        # Write then rename so concurrent renders never read a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=local_path.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, local_path)
+        self._evict()
+
+    def _evict(self) -> None:
+        """Delete least-recently-used files until the local tier fits max_bytes"""
+        entries = []
+        total = 0
+        for path in self.cache_dir.glob("*/*.mp3"):
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+
+        if total <= self.max_bytes:
+            return
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+                total -= size
+            except FileNotFoundError:
+                pass
+
+    def _record(self, counter: str, bytes_saved: int) -> None:
+        """Update shared counters under an exclusive file lock"""
+        try:
+            with open(self._stats_path, "a+") as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                f.seek(0)
+                raw = f.read()
+                stats = json.loads(raw) if raw else {}
+                stats[counter] = stats.get(counter, 0) + 1
+                stats["bytes_saved"] = stats.get("bytes_saved", 0) + bytes_saved
+                f.seek(0)
+                f.truncate()
+                f.write(json.dumps(stats))
+        except Exception as e:
+            print(f"Warning: Could not update TTS cache stats: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit rate and bytes saved across all processes sharing this cache"""
+        try:
+            stats = json.loads(self._stats_path.read_text())
+        except (FileNotFoundError, ValueError):
+            stats = {}
+
+        local_hits = stats.get("local_hits", 0)
+        bucket_hits = stats.get("bucket_hits", 0)
+        misses = stats.get("misses", 0)
+        lookups = local_hits + bucket_hits + misses
+
+        return {
+            "local_hits": local_hits,
+            "bucket_hits": bucket_hits,
+            "misses": misses,
+            "hit_rate": round((local_hits + bucket_hits) / lookups, 4) if lookups else 0.0,
+            "bytes_saved": stats.get("bytes_saved", 0),
+        }
+
+
+def _create_bucket(bucket_name: str):
+    """Supabase Storage bucket for the shared tier, or None if unavailable"""
+    supabase_url = os.environ.get("SUPABASE_URL")
+    service_key = os.environ.get("SUPABASE_SERVICE_ROLE_KEY")
+    if not bucket_name or not supabase_url or not service_key:
+        return None
+    try:
+        from supabase import create_client
+
+        return create_client(supabase_url, service_key).storage.from_(bucket_name)
+    except Exception as e:
+        print(f"Warning: TTS cache bucket tier disabled: {e}")
+        return None
+
+
+@lru_cache()
+def get_tts_cache() -> Optional[TTSAudioCache]:
+    """Process-wide cache configured from the environment (None if TTS_CACHE_MAX_MB=0)"""
+    max_mb = int(os.environ.get("TTS_CACHE_MAX_MB", DEFAULT_MAX_MB))
+    if max_mb <= 0:
+        return None
+    cache_dir = Path(os.environ.get("TTS_CACHE_DIR") or DEFAULT_CACHE_DIR)
+    bucket = _create_bucket(os.environ.get("TTS_CACHE_BUCKET", ""))
+    return TTSAudioCache(cache_dir, max_mb * 1024 * 1024, bucket=bucket)
@@ -6,16 +6,21 @@ for the cognition business analytics.
 """
 
 from typing import Dict, List, Any, Optional
-from datetime import datetime, timedelta
-import statistics
+from datetime import datetime, timedelta, timezone
+import numpy as np
 from supabase import Client
 
+from app.services.population_index import get_population_index
+from app.services.request_loader import RequestLoader
+from app.services.snapshot_series import SECONDS_PER_DAY, SnapshotSeries, load_snapshot_series
+
 
 class VelocityService:
     """Service for calculating learning velocity metrics"""
     
-    def __init__(self, db: Client):
+    def __init__(self, db: Client, loader: Optional[RequestLoader] = None):
         self.db = db
+        self.loader = loader or RequestLoader(db)
     
     async def calculate_learning_velocity(self, user_id: str) -> Dict[str, Any]:
         """
@@ -62,52 +67,37 @@ class VelocityService:
     
     async def _get_mastery_data(self, user_id: str) -> List[Dict]:
         """Get user skill mastery data with velocity information"""
-        result = self.db.table("user_skill_mastery").select(
-            "skill_id, velocity, learning_rate, total_attempts, correct_attempts, "
-            "mastery_probability, last_practiced_at, created_at"
-        ).eq("user_id", user_id).execute()
-        
-        return result.data if result.data else []
+        return [
+            {
+                **record,
+                "velocity": float(record.get("learning_velocity") or 0),
+                "mastery_probability": float(record.get("mastery_probability") or 0),
+                "total_attempts": record.get("total_attempts") or 0
+            }
+            for record in self.loader.mastery(user_id)
+        ]
     
-    async def _get_performance_snapshots(self, user_id: str, limit: int = 20) -> List[Dict]:
+    async def _get_performance_snapshots(self, user_id: str, limit: int = 20) -> SnapshotSeries:
         """Get recent performance snapshots for trend analysis"""
-        result = self.db.table("user_performance_snapshots").select(
-            "predicted_sat_math, predicted_sat_rw, questions_answered, "
-            "questions_correct, created_at, snapshot_type"
-        ).eq("user_id", user_id).order("created_at", desc=True).limit(limit).execute()
-        
-        return result.data if result.data else []
+        return load_snapshot_series(self.db, user_id, self.loader).last(limit)
     
-    def _calculate_overall_velocity(self, snapshots: List[Dict]) -> float:
+    def _calculate_overall_velocity(self, snapshots: SnapshotSeries) -> float:
         """Calculate overall learning velocity from performance snapshots"""
         if len(snapshots) < 2:
             return 0.0
         
-        # Sort by date (oldest first)
-        sorted_snapshots = sorted(snapshots, key=lambda x: x["created_at"])
-        
-        # Calculate total score improvement over time
-        first_snapshot = sorted_snapshots[0]
-        last_snapshot = sorted_snapshots[-1]
-        
-        first_total = (first_snapshot.get("predicted_sat_math", 0) or 0) + \
-                     (first_snapshot.get("predicted_sat_rw", 0) or 0)
-        last_total = (last_snapshot.get("predicted_sat_math", 0) or 0) + \
-                    (last_snapshot.get("predicted_sat_rw", 0) or 0)
-        
-        # Calculate time difference in weeks
-        first_date = datetime.fromisoformat(first_snapshot["created_at"].replace('Z', '+00:00'))
-        last_date = datetime.fromisoformat(last_snapshot["created_at"].replace('Z', '+00:00'))
-        weeks_elapsed = (last_date - first_date).days / 7.0
+        # Calculate total score improvement over time (snapshots are oldest first)
+        totals = snapshots.totals()
+        weeks_elapsed = snapshots.elapsed_days()[-1] / 7.0
         
         if weeks_elapsed <= 0:
             return 0.0
         
         # Velocity = points improvement per week
-        velocity = (last_total - first_total) / weeks_elapsed
-        return round(velocity, 1)
+        velocity = (totals[-1] - totals[0]) / weeks_elapsed
+        return round(float(velocity), 1)
     
-    def _calculate_momentum_score(self, mastery_data: List[Dict], snapshots: List[Dict]) -> int:
+    def _calculate_momentum_score(self, mastery_data: List[Dict], snapshots: SnapshotSeries) -> int:
         """Calculate momentum score (0-100) based on recent activity and improvement"""
         if not mastery_data and not snapshots:
             return 50  # Neutral score
@@ -139,7 +129,7 @@ class VelocityService:
         if not mastery_data:
             return 50.0
         
-        now = datetime.now()
+        now = datetime.now(timezone.utc)
         recent_practices = 0
         
         for mastery in mastery_data:
@@ -147,6 +137,8 @@ class VelocityService:
                 last_practice = datetime.fromisoformat(
                     mastery["last_practiced_at"].replace('Z', '+00:00')
                 )
+                if last_practice.tzinfo is None:
+                    last_practice = last_practice.replace(tzinfo=timezone.utc)
                 days_since = (now - last_practice).days
                 
                 if days_since <= 7:  # Practiced within last week
@@ -155,38 +147,23 @@ class VelocityService:
         activity_ratio = recent_practices / len(mastery_data)
         return activity_ratio * 100
     
-    def _calculate_velocity_consistency(self, snapshots: List[Dict]) -> float:
+    def _calculate_velocity_consistency(self, snapshots: SnapshotSeries) -> float:
         """Calculate how consistent the learning velocity is"""
         if len(snapshots) < 3:
             return 50.0
         
-        # Calculate velocity between consecutive snapshots
-        velocities = []
-        sorted_snapshots = sorted(snapshots, key=lambda x: x["created_at"])
+        # Velocity between consecutive snapshots (whole days apart, as before)
+        weeks = np.floor(np.diff(snapshots.timestamps) / SECONDS_PER_DAY) / 7.0
+        gains = np.diff(snapshots.totals())
+        apart = weeks > 0
+        velocities = gains[apart] / weeks[apart]
         
-        for i in range(1, len(sorted_snapshots)):
-            prev = sorted_snapshots[i-1]
-            curr = sorted_snapshots[i]
-            
-            prev_total = (prev.get("predicted_sat_math", 0) or 0) + \
-                        (prev.get("predicted_sat_rw", 0) or 0)
-            curr_total = (curr.get("predicted_sat_math", 0) or 0) + \
-                        (curr.get("predicted_sat_rw", 0) or 0)
-            
-            prev_date = datetime.fromisoformat(prev["created_at"].replace('Z', '+00:00'))
-            curr_date = datetime.fromisoformat(curr["created_at"].replace('Z', '+00:00'))
-            weeks = (curr_date - prev_date).days / 7.0
-            
-            if weeks > 0:
-                velocity = (curr_total - prev_total) / weeks
-                velocities.append(velocity)
-        
-        if not velocities:
+        if not len(velocities):
             return 50.0
         
         # Consistency = inverse of standard deviation
         if len(velocities) > 1:
-            std_dev = statistics.stdev(velocities)
+            std_dev = float(np.std(velocities, ddof=1))
             # Convert to 0-100 scale (lower std dev = higher consistency)
             consistency = max(0, 100 - (std_dev * 10))
         else:
@@ -224,14 +201,10 @@ class VelocityService:
         if not mastery_data:
             return []
         
-        # Get topic names for skills
-        skill_ids = [mastery["skill_id"] for mastery in mastery_data]
-        topics_result = self.db.table("topics").select("id, name").in_("id", skill_ids).execute()
-        topic_names = {topic["id"]: topic["name"] for topic in topics_result.data}
-        
         velocity_by_skill = []
         for mastery in mastery_data:
-            skill_name = topic_names.get(mastery["skill_id"], "Unknown Skill")
+            # Topic names come embedded with the mastery rows
+            skill_name = (mastery.get("topics") or {}).get("name") or "Unknown Skill"
             velocity = mastery.get("velocity", 0.0)
             
             # Categorize velocity
@@ -255,60 +228,39 @@ class VelocityService:
         # Sort by velocity (highest first)
         return sorted(velocity_by_skill, key=lambda x: x["velocity"], reverse=True)
     
-    def _calculate_velocity_trend(self, snapshots: List[Dict]) -> List[Dict]:
+    def _calculate_velocity_trend(self, snapshots: SnapshotSeries) -> List[Dict]:
         """Calculate velocity trend over last 4 weeks"""
         if len(snapshots) < 2:
             return []
         
-        # Group snapshots by week
-        weekly_data = {}
-        for snapshot in snapshots:
-            date = datetime.fromisoformat(snapshot["created_at"].replace('Z', '+00:00'))
-            week_key = date.strftime("%Y-W%U")
-            
-            if week_key not in weekly_data:
-                weekly_data[week_key] = []
-            weekly_data[week_key].append(snapshot)
+        # Latest snapshot of each calendar week (snapshots are oldest first)
+        weeks = snapshots.week_buckets()
+        latest = np.flatnonzero(np.append(weeks[1:] != weeks[:-1], True))
+        totals = snapshots.totals()[latest].astype(int).tolist()
+        week_keys = weeks[latest].tolist()
         
         # Calculate weekly velocities
         trend_data = []
-        sorted_weeks = sorted(weekly_data.keys())
-        
-        for i in range(1, len(sorted_weeks)):
-            prev_week = sorted_weeks[i-1]
-            curr_week = sorted_weeks[i]
-            
-            prev_snapshots = weekly_data[prev_week]
-            curr_snapshots = weekly_data[curr_week]
-            
-            # Use latest snapshot from each week
-            prev_latest = max(prev_snapshots, key=lambda x: x["created_at"])
-            curr_latest = max(curr_snapshots, key=lambda x: x["created_at"])
-            
-            prev_total = (prev_latest.get("predicted_sat_math", 0) or 0) + \
-                        (prev_latest.get("predicted_sat_rw", 0) or 0)
-            curr_total = (curr_latest.get("predicted_sat_math", 0) or 0) + \
-                        (curr_latest.get("predicted_sat_rw", 0) or 0)
-            
-            velocity = curr_total - prev_total  # Weekly improvement
+        for i in range(1, len(latest)):
+            velocity = totals[i] - totals[i - 1]  # Weekly improvement
             
             trend_data.append({
-                "week": curr_week,
+                "week": f"{week_keys[i] // 100}-W{week_keys[i] % 100:02d}",
                 "velocity": round(velocity, 1),
-                "total_score": curr_total
+                "total_score": totals[i]
             })
         
         return trend_data[-4:]  # Last 4 weeks
     
-    def _calculate_acceleration(self, snapshots: List[Dict]) -> float:
+    def _calculate_acceleration(self, snapshots: SnapshotSeries) -> float:
         """Calculate acceleration (current velocity vs previous period)"""
         if len(snapshots) < 4:
             return 1.0  # No acceleration data
         
-        # Split snapshots into two periods
-        mid_point = len(snapshots) // 2
-        recent_period = snapshots[:mid_point]
-        previous_period = snapshots[mid_point:]
+        # Split snapshots into two periods (the newer half gets the smaller share)
+        split = len(snapshots) - len(snapshots) // 2
+        recent_period = snapshots[split:]
+        previous_period = snapshots[:split]
         
         recent_velocity = self._calculate_overall_velocity(recent_period)
         previous_velocity = self._calculate_overall_velocity(previous_period)
@@ -320,9 +272,12 @@ class VelocityService:
         return round(acceleration, 2)
     
     def _calculate_velocity_percentile(self, velocity: float) -> int:
-        """Calculate velocity percentile (placeholder - would need population data)"""
-        # This would ideally compare against all users
-        # For now, use a simple mapping
+        """Calculate velocity percentile among all students"""
+        percentile = get_population_index(self.db).percentile("velocity", "total", velocity)
+        if percentile is not None:
+            return percentile
+
+        # No population percentiles built yet: use a simple mapping
         if velocity >= 10:
             return 90
         elif velocity >= 5:
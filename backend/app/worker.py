@@ -0,0 +1,104 @@
+"""
+Background job worker - claims and runs jobs from the background_jobs table.
+
+Run one or more of these next to the API (e.g. as a separate Railway service):
+
+    python -m app.worker --concurrency 4
+
+Each worker thread claims jobs with FOR UPDATE SKIP LOCKED, so any number of
+processes and threads can share the queue. SIGINT/SIGTERM stop claiming and
+let in-flight jobs finish.
+"""
+import argparse
+import asyncio
+import signal
+import threading
+from typing import List, Optional
+
+from app.config import get_settings
+from app.db import get_service_client
+from app.services.job_queue import JobQueue, default_worker_id, registered_job_types
+import app.services.job_handlers  # noqa: F401  (registers handlers)
+
+
+def _worker_loop(
+    worker_id: str,
+    stop: threading.Event,
+    job_types: Optional[List[str]],
+    poll_interval: float,
+    lease_seconds: int,
+) -> None:
+    queue = JobQueue(get_service_client())
+    loop = asyncio.new_event_loop()
+    try:
+        while not stop.is_set():
+            try:
+                jobs = queue.claim(worker_id, 1, job_types, None, lease_seconds)
+            except Exception as e:
+                print(f"[WORKER ERROR] {worker_id} failed to claim jobs: {e}", flush=True)
+                jobs = []
+
+            if not jobs:
+                stop.wait(poll_interval)
+                continue
+
+            for job in jobs:
+                loop.run_until_complete(queue.run(job))
+    finally:
+        loop.close()
+
+
+def run_workers(
+    concurrency: int,
+    job_types: Optional[List[str]] = None,
+    poll_interval: float = 1.0,
+    lease_seconds: int = 300,
+    stop: Optional[threading.Event] = None,
+) -> None:
+    """Run `concurrency` worker threads until `stop` is set"""
+    stop = stop or threading.Event()
+    base_id = default_worker_id()
+    threads = [
+        threading.Thread(
+            target=_worker_loop,
+            args=(f"{base_id}:{i}", stop, job_types, poll_interval, lease_seconds),
+            name=f"job-worker-{i}",
+            daemon=True,
+        )
+        for i in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def main():
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Run background job workers")
+    parser.add_argument("--concurrency", type=int, default=settings.job_worker_concurrency)
+    parser.add_argument("--job-type", action="append", dest="job_types",
+                        help="Only run these job types (repeatable; default: all)")
+    args = parser.parse_args()
+
+    stop = threading.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: stop.set())
+
+    print(
+        f"👷 Starting {args.concurrency} job worker(s) for "
+        f"{', '.join(args.job_types or registered_job_types())}",
+        flush=True,
+    )
+    run_workers(
+        args.concurrency,
+        job_types=args.job_types,
+        poll_interval=settings.job_poll_interval_seconds,
+        lease_seconds=settings.job_lease_seconds,
+        stop=stop,
+    )
+    print("✅ Job workers stopped", flush=True)
+
+
+if __name__ == "__main__":
+    main()
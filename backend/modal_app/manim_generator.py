@@ -1,6 +1,7 @@
 """Modal serverless function for generating Manim videos"""
 
 import os
+import sys
 import uuid
 import subprocess
 import re
@@ -40,6 +41,19 @@ image = (
 # Create network file system for temporary video storage
 volume = modal.Volume.from_name("manim-output", create_if_missing=True)
 
+# Standalone backend modules shared with the container (no `app` package there):
+# - tts_cache.py: shared TTS audio cache; its local tier lives on the volume so
+#   synthesized narration survives across containers
+# - storage_upload.py: chunked resumable upload to Supabase Storage
+SHARED_LIB_DIR = "/root/prepst_lib"
+shared_lib_mounts = [
+    modal.Mount.from_local_file(
+        Path(__file__).parent.parent / "app" / "services" / module,
+        remote_path=f"{SHARED_LIB_DIR}/{module}",
+    )
+    for module in ("tts_cache.py", "storage_upload.py")
+]
+
 
 def slugify(text: str) -> str:
     """Convert text to URL-friendly slug"""
@@ -222,9 +236,15 @@ def execute_manim(scene_file: Path, scene_id: str, output_dir: Path, openai_api_
     ]
 
     # Set up environment with OPENAI_API_KEY
+    # The scene code is generated: only the TTS cache's bucket tier needs the
+    # Supabase keys
     env = os.environ.copy()
+    if not env.get('TTS_CACHE_BUCKET'):
+        for key in [key for key in env if key.startswith('SUPABASE_')]:
+            del env[key]
     env['OPENAI_API_KEY'] = openai_api_key
-    env['PYTHONPATH'] = str(output_dir)
+    env['PYTHONPATH'] = str(output_dir) + os.pathsep + SHARED_LIB_DIR
+    env.setdefault('TTS_CACHE_DIR', str(output_dir / "tts_cache"))
 
     result = subprocess.run(
         cmd,
@@ -263,28 +283,27 @@ async def upload_to_supabase(
     supabase_url: str,
     supabase_service_key: str,
 ) -> str:
-    """Upload video to Supabase Storage"""
+    """Upload video to Supabase Storage in resumable chunks"""
     from supabase import create_client
     
     try:
+        from storage_upload import upload_file
+        
         # Create service role client
         client = create_client(supabase_url, supabase_service_key)
 
-        # Read video file
-        with open(video_path, "rb") as f:
-            video_content = f.read()
-
-        # Upload to Supabase Storage
+        # Stream to Supabase Storage without reading the whole file into memory
         storage_path = f"{category_slug}/{topic_slug}/{short_id}.mp4"
         bucket = client.storage.from_("manim-videos")
 
-        bucket.upload(
-            storage_path,
-            video_content,
-            {
-                "content-type": "video/mp4",
-                "cache-control": "public, max-age=31536000",
-            },
+        upload_file(
+            video_path,
+            supabase_url=supabase_url,
+            api_key=supabase_service_key,
+            bucket="manim-videos",
+            object_name=storage_path,
+            content_type="video/mp4",
+            cache_control="31536000",
         )
 
         # Get public URL
@@ -302,6 +321,7 @@ async def upload_to_supabase(
     secrets=[modal.Secret.from_name("manim-secrets")],
     timeout=180,  # 3 minutes timeout
     volumes={"/tmp/manim_output": volume},
+    mounts=shared_lib_mounts,
 )
 async def generate_video(question: str, max_retries: int = 3) -> Dict[str, Any]:
     """
@@ -319,6 +339,10 @@ async def generate_video(question: str, max_retries: int = 3) -> Dict[str, Any]:
     supabase_url = os.environ["SUPABASE_URL"]
     supabase_service_key = os.environ["SUPABASE_SERVICE_ROLE_KEY"]
     
+    # Make the mounted shared modules importable (storage_upload, tts_cache)
+    if SHARED_LIB_DIR not in sys.path:
+        sys.path.insert(0, SHARED_LIB_DIR)
+    
     try:
         # Classify question
         category_slug, topic_slug = await classify_question(question, openai_api_key)
@@ -350,6 +374,7 @@ async def generate_video(question: str, max_retries: int = 3) -> Dict[str, Any]:
 from openai import OpenAI
 from manim_voiceover.services.base import SpeechService
 from pathlib import Path
+from tts_cache import TTSAudioCache, get_tts_cache
 
 class VoiceoverService(SpeechService):
     def __init__(self, voice: str = "alloy", model: str = "tts-1", **kwargs):
@@ -380,15 +405,21 @@ class VoiceoverService(SpeechService):
         
         output_path = Path(cache_dir) / audio_path
         
-        try:
-            response = self.client.audio.speech.create(
-                model=self.model,
-                voice=self.voice,
-                input=text,
-            )
-            response.stream_to_file(str(output_path))
-        except Exception as e:
-            raise Exception(f"OpenAI TTS generation failed: {str(e)}")
+        tts_cache = get_tts_cache()
+        cache_key = TTSAudioCache.make_key(text, self.voice, self.model)
+        if tts_cache is None or not tts_cache.get(cache_key, output_path):
+            try:
+                response = self.client.audio.speech.create(
+                    model=self.model,
+                    voice=self.voice,
+                    input=text,
+                )
+                response.stream_to_file(str(output_path))
+            except Exception as e:
+                raise Exception(f"OpenAI TTS generation failed: {str(e)}")
+            
+            if tts_cache is not None:
+                tts_cache.put(cache_key, output_path)
         
         json_dict = {
             "input_text": text,
@@ -447,6 +478,14 @@ class VoiceoverService(SpeechService):
         except Exception as cleanup_error:
             print(f"Warning: Could not clean up local files: {cleanup_error}")
         
+        # Report shared TTS cache effectiveness (stats are kept on the volume)
+        try:
+            from tts_cache import TTSAudioCache
+            tts_stats = TTSAudioCache(output_dir / "tts_cache", 1).stats()
+            print(f"TTS cache: hit_rate={tts_stats['hit_rate']:.1%}, bytes_saved={tts_stats['bytes_saved']}")
+        except Exception as stats_error:
+            print(f"Warning: Could not read TTS cache stats: {stats_error}")
+        
         return {
             "success": True,
             "videoUrl": video_url,
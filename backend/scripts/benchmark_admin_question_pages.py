@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Page through the admin question browser with quality filters applied, as
+before (offset pages, PNG / empty-answer checks in Python, an exact count per
+request) and now (filters on generated columns, keyset cursor, estimated
+count from the page request itself).
+
+Previously each page was filtered after it was fetched, so with a filter set
+most pages came back short or empty and reaching the matching questions took
+one request per unfiltered page. Runs against an in-memory Supabase stand-in
+seeded with a question bank, reports requests and how full pages are, and
+checks the keyset pages cover every matching question exactly once, in order.
+
+The stand-in scans every row per request; depth-independent page cost comes
+from the (created_at, id) index in Postgres, so latency is not compared here.
+
+Usage:
+    python scripts/benchmark_admin_question_pages.py --questions 100000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import uuid
+from datetime import datetime, timedelta, timezone
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fake_supabase import FakeSupabase
+from app.api.admin_questions import list_questions
+
+ADMIN_ID = "00000000-0000-0000-0000-0000000000ad"
+PNG = '<img src="data:image/png;base64,iVBORw0KGgo=">'
+
+
+def seed(db: FakeSupabase, rng: random.Random, questions: int, broken: float):
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    topic = {"id": str(uuid.uuid4()), "name": "Linear equations", "categories": {"id": str(uuid.uuid4()), "name": "Algebra"}}
+    rows = []
+    for i in range(questions):
+        png_stem = rng.random() < broken
+        png_options = rng.random() < broken
+        correct_answer = [] if rng.random() < broken else ["B"]
+        answer_options = {"A": "1", "B": PNG if png_options else "2", "C": "3", "D": "4"}
+        rows.append({
+            "id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "external_id": f"q-{i:06d}",
+            "module": rng.choice(["math", "english"]),
+            "difficulty": rng.choice("EMH"),
+            "question_type": "mc",
+            "is_active": True,
+            "is_flagged": False,
+            "topic_id": topic["id"],
+            "topics": topic,
+            "stem": f"<p>Question {i} about {rng.choice(['slope', 'area', 'tone', 'evidence'])}</p>" + (PNG if png_stem else ""),
+            "answer_options": answer_options,
+            "correct_answer": correct_answer,
+            # Generated columns (migration 042)
+            "has_png_in_stem": png_stem,
+            "has_png_in_options": png_options,
+            "has_empty_answers": not correct_answer,
+            # Imports insert in batches: many questions share a timestamp
+            "created_at": (start + timedelta(seconds=i // 50)).isoformat(),
+        })
+    db.tables["questions"] = rows
+    db.tables["users"] = [{"id": ADMIN_ID, "role": "admin"}]
+
+
+async def page(db, **filters):
+    params = dict(
+        search=None, module=None, difficulty=None, question_type=None, is_active=None,
+        is_flagged=None, topic_id=None, has_empty_answers=None, has_png_in_stem=None,
+        has_png_in_answers=None, limit=50, cursor=None, offset=0,
+    )
+    params.update(filters)
+    return await list_questions(user_id=ADMIN_ID, db=db, **params)
+
+
+QUALITY_COLUMNS = ("has_png_in_stem", "has_png_in_options", "has_empty_answers")
+
+
+def legacy_pages(db, filters, limit):
+    """Offset pages (plain filters in the database, quality checks in Python), plus an exact count query each"""
+    requests, sizes, offset = 0, [], 0
+    plain = {c: v for c, v in filters.items() if c not in QUALITY_COLUMNS}
+    quality = {c: v for c, v in filters.items() if c in QUALITY_COLUMNS}
+    ordered = sorted(
+        (r for r in db.tables["questions"] if all(r[c] == v for c, v in plain.items())),
+        key=lambda r: r["created_at"], reverse=True
+    )
+    while offset < len(ordered):
+        fetched = ordered[offset:offset + limit]
+        kept = [q for q in fetched if all(q[c] == v for c, v in quality.items())]
+        requests += 2
+        sizes.append(len(kept))
+        offset += limit
+    return requests, sizes
+
+
+async def keyset_pages(db, filters, limit):
+    seen, sizes, cursor, requests = [], [], None, 0
+    api_filters = {
+        {"has_png_in_options": "has_png_in_answers"}.get(column, column): value
+        for column, value in filters.items()
+    }
+    while True:
+        db.round_trips = 0
+        result = await page(db, limit=limit, cursor=cursor, **api_filters)
+        requests += db.round_trips - 1  # not the admin check
+        sizes.append(len(result["questions"]))
+        seen.extend(q["id"] for q in result["questions"])
+        cursor = result["next_cursor"]
+        if not cursor:
+            return requests, sizes, seen
+
+
+async def main_async(args):
+    db = FakeSupabase()
+    seed(db, random.Random(args.seed), args.questions, args.broken)
+    rows = db.tables["questions"]
+    limit = 50
+
+    print(f"{args.questions} questions, {args.broken:.0%} with each problem, {limit} per page")
+    print(f"{'filter':<22}{'matches':>8}{'legacy requests':>17}{'full pages':>12}{'keyset requests':>17}{'full pages':>12}")
+    failures = []
+    for label, filters in [
+        ("has_png_in_stem", {"has_png_in_stem": True}),
+        ("has_empty_answers", {"has_empty_answers": True}),
+        ("png options, math", {"has_png_in_options": True, "module": "math"}),
+    ]:
+        expected = [
+            r["id"] for r in sorted(rows, key=lambda r: (r["created_at"], r["id"]), reverse=True)
+            if all(r[column] == value for column, value in filters.items())
+        ]
+        pages_needed = -(-len(expected) // limit)
+        # Legacy: every offset page to see all matches
+        legacy_requests, legacy_sizes = legacy_pages(db, filters, limit)
+        requests, sizes, seen = await keyset_pages(db, filters, limit)
+        legacy_full = sum(s == limit for s in legacy_sizes) / len(legacy_sizes)
+        full = sum(s == limit for s in sizes[:-1]) / max(1, len(sizes) - 1)
+        print(f"{label:<22}{len(expected):>8}{legacy_requests:>17}{legacy_full:>11.0%}"
+              f"{requests:>17}{full:>11.0%}")
+        if seen != expected or len(sizes) != max(1, pages_needed) or requests != len(sizes):
+            failures.append(label)
+
+    first = await page(db, has_png_in_stem=True)
+    print(f"first page total (estimated count, same request): {first['total']}")
+
+    # Search with characters that need quoting in the filter tree
+    rows[0]["stem"] += " (slope, intercept)"
+    found = await page(db, search="(slope, intercept)")
+    if [q["id"] for q in found["questions"]] != [rows[0]["id"]]:
+        failures.append("search quoting")
+
+    if failures:
+        print(f"FAILED: {', '.join(failures)}")
+        sys.exit(1)
+    print("Keyset pages are full and cover every match exactly once, in order, one request each")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--questions", type=int, default=100_000)
+    parser.add_argument("--broken", type=float, default=0.03)
+    parser.add_argument("--seed", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
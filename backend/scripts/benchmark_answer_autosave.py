@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Simulate a timed mock exam module taken by many students at once and compare
+answer autosave written through (one ownership check, question lookup and
+update per save) against the write-behind answer buffer.
+
+Every student answers a 27-question module over 32 minutes, changing some
+answers and toggling "mark for review" along the way; each change is one
+PATCH. Saves are replayed in time order on a simulated clock, with the buffer
+flushed every --flush-seconds of simulated time, then every module is
+completed. Reports the save request rate, database statements and writes per
+second of exam time, and checks both runs leave identical answers and scores.
+
+Usage:
+    python scripts/benchmark_answer_autosave.py --students 100 --flush-seconds 3
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+import uuid
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fake_supabase import FakeSupabase
+import app.services.answer_buffer as answer_buffer
+from app.services.answer_buffer import AnswerBuffer
+from app.services.mock_exam_service import MockExamService
+
+QUESTIONS = 27
+MODULE_SECONDS = 32 * 60
+
+
+def build_exam(students: int, rng: random.Random):
+    """Seed rows for one in-progress module per student, plus their save events"""
+    modules, questions, events = [], [], []
+    for s in range(students):
+        user_id = str(uuid.UUID(int=rng.getrandbits(128)))
+        exam_id = str(uuid.UUID(int=rng.getrandbits(128)))
+        module_id = str(uuid.UUID(int=rng.getrandbits(128)))
+        module_questions = []
+        for order in range(1, QUESTIONS + 1):
+            options = [str(uuid.UUID(int=rng.getrandbits(128))) for _ in range(4)]
+            correct = rng.randrange(4)
+            key = {"correct_answer": ["ABCD"[correct]], "acceptable_answers": [options[correct]]}
+            row = {
+                "id": str(uuid.UUID(int=rng.getrandbits(128))),
+                "module_id": module_id,
+                "question_id": str(uuid.UUID(int=rng.getrandbits(128))),
+                "display_order": order,
+                "status": "not_started",
+                "user_answer": None,
+                "is_correct": None,
+                "is_marked_for_review": False,
+                "questions": key,
+            }
+            questions.append(row)
+            module_questions.append({k: row[k] for k in ("id", "question_id", "display_order", "questions")})
+
+            # Work through the module in order; some answers are revised and
+            # some questions marked for review (and later unmarked)
+            t = MODULE_SECONDS * (order - 1 + rng.random()) / QUESTIONS
+            answer, review = rng.choice(options), False
+            saves = [(answer, review)]
+            for _ in range(rng.choice([0, 0, 1, 1, 2, 3])):
+                answer = rng.choice(options)
+                saves.append((answer, review))
+            if rng.random() < 0.3:
+                review = True
+                saves.append((answer, review))
+                if rng.random() < 0.5:
+                    saves.append((rng.choice(options), False))
+            for answer, review in saves:
+                t += rng.uniform(2, 20)
+                events.append((min(t, MODULE_SECONDS), s, user_id, module_id, row["question_id"], answer, review))
+
+        modules.append({
+            "id": module_id,
+            "exam_id": exam_id,
+            "module_type": "rw_module_2",
+            "module_number": 2,
+            "status": "in_progress",
+            "mock_exams": {"user_id": user_id, "id": exam_id},
+            "mock_exam_questions": module_questions,
+        })
+    events.sort()
+    return modules, questions, events
+
+
+async def run(label: str, modules, questions, events, flush_seconds: float, latency_ms: float):
+    db = FakeSupabase(latency_ms=latency_ms)
+    db.tables["mock_exam_modules"] = [dict(m) for m in modules]
+    db.tables["mock_exam_questions"] = [dict(q) for q in questions]
+
+    buffer = AnswerBuffer(flush_seconds, db_factory=lambda: db)
+    buffer.running = flush_seconds > 0  # flushed on the simulated clock below
+    answer_buffer._buffer = buffer
+
+    next_flush = flush_seconds
+    save_seconds = 0.0
+    start = time.perf_counter()
+    for t, _, user_id, module_id, question_id, answer, review in events:
+        while buffer.running and next_flush <= t:
+            await buffer.flush()
+            next_flush += flush_seconds
+        save_start = time.perf_counter()
+        await MockExamService(db).submit_answer(
+            module_id=module_id,
+            question_id=question_id,
+            user_answer=[answer],
+            status="answered",
+            is_marked_for_review=review,
+            user_id=user_id,
+        )
+        save_seconds += time.perf_counter() - save_start
+    save_trips, save_writes = db.round_trips, db.writes
+
+    for module in modules:
+        await MockExamService(db).complete_module(
+            module["id"], module["mock_exams"]["user_id"], time_remaining_seconds=0, finalize=False
+        )
+    total_seconds = time.perf_counter() - start
+
+    final_rows = db.tables["mock_exam_questions"]
+    scores = {m["id"]: m["raw_score"] for m in db.tables["mock_exam_modules"]}
+    state = {
+        q["id"]: (q["user_answer"], q["is_correct"], q["is_marked_for_review"], q["status"])
+        for q in final_rows
+    }
+
+    n = len(events)
+    print(
+        f"{label:<14} saves={n:<6} statements={save_trips:<6} writes={save_writes:<6} "
+        f"writes/s={save_writes / MODULE_SECONDS:6.2f}  statements/s={save_trips / MODULE_SECONDS:6.2f}  "
+        f"mean save={save_seconds / n * 1000:6.2f}ms  total={total_seconds:6.2f}s"
+    )
+    if buffer.running:
+        stats = buffer.stats
+        print(
+            f"{'':<14} coalesced={stats['coalesced']} flushes={stats['flushes']} "
+            f"rows written={stats['rows_written']} ({stats['rows_written'] / n:.0%} of saves)"
+        )
+    return state, scores
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=100)
+    parser.add_argument("--flush-seconds", type=float, default=3.0)
+    parser.add_argument("--latency-ms", type=float, default=1.0, help="Simulated database round trip")
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+
+    modules, questions, events = build_exam(args.students, random.Random(args.seed))
+    print(
+        f"{args.students} students, {QUESTIONS}-question module over {MODULE_SECONDS // 60} min: "
+        f"{len(events)} saves ({len(events) / MODULE_SECONDS:.1f} requests/s)"
+    )
+
+    direct = asyncio.run(run("write-through", modules, questions, events, 0, args.latency_ms))
+    buffered = asyncio.run(run("buffered", modules, questions, events, args.flush_seconds, args.latency_ms))
+
+    if direct != buffered:
+        print("MISMATCH: buffered saves left different answers or scores")
+        sys.exit(1)
+    print("Final answers and module scores match")
+
+
+if __name__ == "__main__":
+    main()
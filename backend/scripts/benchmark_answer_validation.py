@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Measure answer validation: re-normalizing the answer key on every submission
+(previous behaviour) vs. compiled, cached answer matchers.
+
+Validates a stream of submissions against a synthetic question bank (mostly
+multiple choice, the rest student-produced responses) and checks that both
+paths agree wherever the old rules apply.
+
+Usage:
+    python scripts/benchmark_answer_validation.py --validations 1000000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import uuid
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.answer_validation_service import get_answer_matcher, parse_number
+
+SPR_KEYS = [["2.6"], ["28"], [".6"], ["-1/2"], ["2/3"], ["0", "3."], ["1,000"], ["12"], ["3/4"]]
+
+
+def old_validate(user_answer, correct_answer, acceptable_answers):
+    """Per-submission normalization, as the submission paths used to do it"""
+    def normalize_answer(ans_list):
+        if not ans_list:
+            return []
+        if isinstance(ans_list, str):
+            return [ans_list.strip().lower()]
+        try:
+            return [str(a).strip().lower() for a in ans_list]
+        except TypeError:
+            return []
+
+    normalized_user = normalize_answer(user_answer)
+    normalized_correct = normalize_answer(correct_answer)
+    normalized_acceptable = normalize_answer(acceptable_answers) if acceptable_answers else []
+
+    return normalized_user == normalized_correct or (
+        bool(normalized_acceptable)
+        and len(normalized_user) > 0
+        and normalized_user[0] in normalized_acceptable
+    )
+
+
+def build_bank(n: int, spr_share: float, rng: random.Random):
+    bank = []
+    for _ in range(n):
+        if rng.random() < spr_share:
+            bank.append({"correct_answer": list(rng.choice(SPR_KEYS)), "acceptable_answers": None})
+        else:
+            options = [str(uuid.UUID(int=rng.getrandbits(128))) for _ in range(4)]
+            correct = rng.randrange(4)
+            bank.append({
+                "correct_answer": ["ABCD"[correct]],
+                "acceptable_answers": [options[correct]],
+                "options": options,
+            })
+    return bank
+
+
+def build_submissions(bank, n: int, rng: random.Random):
+    submissions = []
+    for _ in range(n):
+        question = rng.choice(bank)
+        if "options" in question:
+            answer = [rng.choice(question["options"])]
+        else:
+            key = question["correct_answer"][0]
+            answer = [rng.choice([key, key + "0" if "." in key else key, "7", "13/5", ".6666"])]
+        # Questions arrive as fresh JSON from the database on every request
+        submissions.append((
+            answer,
+            list(question["correct_answer"]),
+            list(question["acceptable_answers"]) if question["acceptable_answers"] else None,
+        ))
+    return submissions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--validations", type=int, default=1_000_000)
+    parser.add_argument("--questions", type=int, default=3000)
+    parser.add_argument("--spr-share", type=float, default=0.2, help="Share of numeric-entry questions")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    bank = build_bank(args.questions, args.spr_share, rng)
+    submissions = build_submissions(bank, args.validations, rng)
+
+    start = time.perf_counter()
+    old = [old_validate(u, c, a) for u, c, a in submissions]
+    old_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    new = [get_answer_matcher(c, a).matches(u) for u, c, a in submissions]
+    new_seconds = time.perf_counter() - start
+
+    # The matchers accept strictly more (numeric equivalents), never less
+    lost = sum(1 for o, n in zip(old, new) if o and not n)
+    gained = sum(1 for o, n in zip(old, new) if n and not o)
+    gained_numeric = sum(
+        1 for (u, c, a), o, n in zip(submissions, old, new)
+        if n and not o and parse_number(u[0].strip().lower()) is not None
+    )
+
+    n = args.validations
+    print(f"{n:,} validations over {args.questions:,} questions ({args.spr_share:.0%} numeric entry)")
+    print(f"  per-submission normalization: {old_seconds:6.2f}s  ({old_seconds / n * 1e6:.2f} us each)")
+    print(f"  compiled matchers:            {new_seconds:6.2f}s  ({new_seconds / n * 1e6:.2f} us each)")
+    print(f"  speedup: {old_seconds / new_seconds:.1f}x")
+    print(f"  correct before: {sum(old):,}  after: {sum(new):,}  "
+          f"(newly accepted numeric equivalents: {gained_numeric:,})")
+
+    if lost or gained != gained_numeric:
+        print(f"MISMATCH: {lost} answers no longer accepted, {gained - gained_numeric} non-numeric gains")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Measure bulk question updates: one update().eq('id', ...) per question, one
+after another (previous behaviour of the admin bulk endpoint and clean-up
+scripts) vs. QuestionBulkUpdater's chunked, concurrent update().in_() calls.
+
+Runs against an in-memory Supabase stand-in that adds a fixed latency to
+every request. The per-question path is timed on a sample (--legacy-sample)
+since it scales linearly; throughput is reported in ids/sec for both. Also
+checks that every question was updated, and that per-question updates with
+shared payloads (update_each) are grouped into few requests.
+
+Usage:
+    python scripts/benchmark_bulk_update.py --questions 10000 --latency-ms 15
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+import uuid
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fake_supabase import FakeSupabase
+from app.services.question_bulk_update import QuestionBulkUpdater
+
+
+def seed(latency_ms, count):
+    db = FakeSupabase(latency_ms=latency_ms)
+    db.tables["questions"] = [
+        {"id": str(uuid.uuid4()), "is_active": True, "correct_answer": []}
+        for _ in range(count)
+    ]
+    return db
+
+
+def per_question(db, question_ids, updates):
+    updated = 0
+    for question_id in question_ids:
+        result = db.table("questions").update(updates).eq("id", question_id).execute()
+        updated += len(result.data)
+    return updated
+
+
+def report(label, db, requested, updated, elapsed):
+    print(
+        f"{label:<22} ids={requested:<6} updated={updated:<6} requests={db.round_trips:<6} "
+        f"time={elapsed * 1000:>8.0f}ms  {requested / elapsed:>8.0f} ids/sec"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--questions", type=int, default=10000)
+    parser.add_argument("--legacy-sample", type=int, default=500)
+    parser.add_argument("--latency-ms", type=float, default=15.0)
+    args = parser.parse_args()
+
+    random.seed(7)
+    ok = True
+
+    # Previous behaviour, on a sample of the ids
+    db = seed(args.latency_ms, args.questions)
+    sample = [q["id"] for q in db.tables["questions"][:args.legacy_sample]]
+    start = time.perf_counter()
+    updated = per_question(db, sample, {"is_active": False})
+    elapsed = time.perf_counter() - start
+    report("per-question", db, len(sample), updated, elapsed)
+    legacy_rate = len(sample) / elapsed
+
+    # Same update for every question
+    db = seed(args.latency_ms, args.questions)
+    question_ids = [q["id"] for q in db.tables["questions"]]
+    start = time.perf_counter()
+    summary = asyncio.run(QuestionBulkUpdater(db).update_many(question_ids, {"is_active": False}))
+    elapsed = time.perf_counter() - start
+    report("update_many", db, len(question_ids), summary["updated"], elapsed)
+    all_disabled = not any(q["is_active"] for q in db.tables["questions"])
+    ok &= all_disabled and summary["updated"] == len(question_ids) and not summary["failed"]
+    print(f"  speed-up vs per-question: {len(question_ids) / elapsed / legacy_rate:.0f}x")
+
+    # Per-question answers drawn from a few values, as the answer fix scripts produce
+    db = seed(args.latency_ms, args.questions)
+    answers = {q["id"]: {"correct_answer": [random.choice("ABCD")]} for q in db.tables["questions"]}
+    start = time.perf_counter()
+    summary = asyncio.run(QuestionBulkUpdater(db).update_each(answers))
+    elapsed = time.perf_counter() - start
+    report("update_each (4 fixes)", db, len(answers), summary["updated"], elapsed)
+    ok &= all(q["correct_answer"] == answers[q["id"]]["correct_answer"] for q in db.tables["questions"])
+    ok &= summary["updated"] == len(answers)
+
+    print("✅ Every question updated as requested" if ok else "❌ Updates missing or wrong")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Measure GET /mock-exams/{id}/results: one question query per module (previous
+behaviour) vs. a single nested query vs. the results document cached on the
+exam row at finalization.
+
+Runs against an in-memory Supabase stand-in that adds a fixed latency to
+every request, so the difference reflects round trips to a remote database.
+Also checks that all paths return the same results.
+
+Usage:
+    python scripts/benchmark_exam_results.py --latency-ms 20
+"""
+
+import argparse
+import asyncio
+import copy
+import os
+import random
+import sys
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fake_supabase import FakeSupabase
+from app.services.mock_exam_service import MockExamService
+
+USER_ID = "00000000-0000-0000-0000-000000000001"
+EXAM_ID = "00000000-0000-0000-0000-0000000000e1"
+
+# (module_type, module_number, section, question count)
+MODULES = [
+    ("rw_module_1", 1, "reading_writing", 27),
+    ("rw_module_2", 2, "reading_writing", 27),
+    ("math_module_1", 1, "math", 22),
+    ("math_module_2", 2, "math", 22),
+]
+
+
+def seed(db):
+    """Seed a completed 98-question exam; embeds are stored pre-nested"""
+    random.seed(11)
+    db.tables["mock_exams"] = [{
+        "id": EXAM_ID, "user_id": USER_ID, "exam_type": "full_length",
+        "status": "completed", "total_score": 1200, "math_score": 600, "rw_score": 600,
+        "results": None,
+    }]
+    db.tables["mock_exam_modules"] = []
+    db.tables["mock_exam_questions"] = []
+
+    for module_type, module_number, section, count in MODULES:
+        module_id = f"module-{module_type}"
+        meqs = []
+        for order in range(1, count + 1):
+            options = [{"id": f"{module_id}-{order}-opt-{i}", "text": str(i)} for i in range(4)]
+            answer = random.choice(options)["id"]
+            is_correct = random.random() < 0.6
+            meqs.append({
+                "module_id": module_id,
+                "display_order": order,
+                "is_correct": is_correct,
+                "user_answer": [answer],
+                "questions": {
+                    "id": f"{module_id}-q{order}",
+                    "topic_id": f"topic-{order % 8}",
+                    "difficulty": random.choice(["E", "M", "H"]),
+                    "question_type": "mc",
+                    "correct_answer": [answer] if is_correct else [options[0]["id"]],
+                    "answer_options": options,
+                    "topics": {
+                        "name": f"Topic {order % 8}",
+                        "categories": {"name": f"{section} category {order % 4}", "section": section},
+                    },
+                },
+            })
+        random.shuffle(meqs)
+        db.tables["mock_exam_questions"].extend(meqs)
+        db.tables["mock_exam_modules"].append({
+            "id": module_id, "exam_id": EXAM_ID, "module_type": module_type,
+            "module_number": module_number, "raw_score": sum(1 for q in meqs if q["is_correct"]),
+            "mock_exam_questions": copy.deepcopy(meqs),
+        })
+
+
+async def per_module(db):
+    """Previous route: exam, modules, then each module's questions"""
+    service = MockExamService(db)
+    exam = db.table("mock_exams").select("*").eq("id", EXAM_ID).eq("user_id", USER_ID).execute().data[0]
+    exam.pop("results", None)
+    modules = db.table("mock_exam_modules").select("*").eq("exam_id", EXAM_ID).execute().data
+    for module in modules:
+        module["mock_exam_questions"] = (
+            db.table("mock_exam_questions").select("*").eq("module_id", module["id"])
+            .order("display_order").execute().data
+        )
+    return {"exam": exam, **service.build_exam_results(service._sort_exam_modules(modules))}
+
+
+async def single_query(db):
+    return await MockExamService(db).get_exam_results(EXAM_ID, USER_ID)
+
+
+async def cached(db):
+    return await MockExamService(db).get_exam_results(EXAM_ID, USER_ID)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    outputs = {}
+    for label, func in (("per-module", per_module), ("single-query", single_query), ("cached", cached)):
+        db = FakeSupabase(latency_ms=args.latency_ms)
+        seed(db)
+        if label == "cached":
+            # As written by _finalize_exam
+            service = MockExamService(db)
+            db.tables["mock_exams"][0]["results"] = service.build_exam_results(
+                service._load_exam_modules(EXAM_ID)
+            )
+            db.round_trips = 0
+        start = time.perf_counter()
+        outputs[label] = asyncio.run(func(db))
+        elapsed = time.perf_counter() - start
+        print(
+            f"{label:<13} requests={db.round_trips:<3} questions={outputs[label]['total_questions']:<4} "
+            f"time={elapsed * 1000:.0f}ms (latency {args.latency_ms:.0f}ms/request)"
+        )
+
+    same = outputs["per-module"] == outputs["single-query"] == outputs["cached"]
+    print("✅ Same results on every path" if same else "❌ Results differ between paths")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Measure background job throughput with N worker threads.
+
+Queues --jobs jobs of a benchmark type whose handler sleeps --work-ms (to
+stand in for DB-bound work such as exam finalization), then drains them with
+app.worker's run_workers for each worker count and reports jobs/second.
+Needs the service role key and migration 036; benchmark jobs are deleted
+afterwards.
+
+Usage:
+    python scripts/benchmark_job_queue.py --jobs 200 --workers 1,2,4,8
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import threading
+import time
+import uuid
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.db import get_service_client
+from app.services.job_queue import job_handler
+from app.worker import run_workers
+
+JOB_TYPE = "benchmark.noop"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=200)
+    parser.add_argument("--workers", default="1,2,4,8", help="Comma-separated worker counts")
+    parser.add_argument("--work-ms", type=int, default=50, help="Simulated work per job")
+    args = parser.parse_args()
+
+    db = get_service_client()
+    run_id = uuid.uuid4().hex[:8]
+    state = {"done": 0, "stop": threading.Event()}
+    lock = threading.Lock()
+
+    @job_handler(JOB_TYPE)
+    async def noop(payload, _db):
+        await asyncio.sleep(args.work_ms / 1000)
+        with lock:
+            state["done"] += 1
+            if state["done"] >= args.jobs:
+                state["stop"].set()
+        return None
+
+    try:
+        for workers in [int(w) for w in args.workers.split(",")]:
+            db.table("background_jobs").insert([
+                {
+                    "job_type": JOB_TYPE,
+                    "job_key": f"{JOB_TYPE}:{run_id}:{workers}:{i}",
+                    "payload": {"i": i},
+                }
+                for i in range(args.jobs)
+            ]).execute()
+
+            state["done"] = 0
+            state["stop"] = threading.Event()
+            start = time.perf_counter()
+            run_workers(workers, job_types=[JOB_TYPE], poll_interval=0.05, stop=state["stop"])
+            elapsed = time.perf_counter() - start
+
+            print(
+                f"workers={workers:<3} jobs={args.jobs} "
+                f"time={elapsed:.2f}s throughput={args.jobs / elapsed:.1f} jobs/s"
+            )
+    finally:
+        db.table("background_jobs").delete().eq("job_type", JOB_TYPE).like(
+            "job_key", f"{JOB_TYPE}:{run_id}:%"
+        ).execute()
+
+
+if __name__ == "__main__":
+    main()
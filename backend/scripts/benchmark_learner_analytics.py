@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Measure the dashboard's analytics: the five separate endpoints (learning
+velocity, predictive scores, growth curve, skill heatmap, mock exam
+performance) vs. the unified /analytics/users/me/dashboard call.
+
+Separately, each endpoint loads what it needs on its own: the mastery rows,
+snapshot series and study plan are read more than once. The unified call
+loads each once, concurrently, and caches the result until the user's
+mastery or snapshots change. Runs against an in-memory Supabase stand-in and
+reports queries and latency per dashboard load, cold and cached, and checks
+the unified sections match the separate endpoints.
+
+Usage:
+    python scripts/benchmark_learner_analytics.py --skills 120 --latency-ms 15
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fake_supabase import FakeSupabase
+from app.services import learner_analytics_service, snapshot_series
+from app.services.analytics_service import AnalyticsService
+from app.services.learner_analytics_service import LearnerAnalyticsService
+from app.services.prediction_service import PredictionService
+from app.services.request_loader import RequestLoader
+from app.services.velocity_service import VelocityService
+
+USER_ID = "00000000-0000-0000-0000-000000000001"
+
+
+def seed(db: FakeSupabase, rng: random.Random, skills: int, snapshots: int, exams: int):
+    now = datetime.now(timezone.utc)
+    categories = [
+        {"id": str(uuid.UUID(int=rng.getrandbits(128))), "name": f"Category {i}", "section": "math" if i % 2 else "reading_writing"}
+        for i in range(8)
+    ]
+    db.tables["user_skill_mastery"] = []
+    for i in range(skills):
+        category = categories[i % len(categories)]
+        skill_id = str(uuid.UUID(int=rng.getrandbits(128)))
+        practiced = now - timedelta(days=rng.random() * 30)
+        db.tables["user_skill_mastery"].append({
+            "user_id": USER_ID,
+            "skill_id": skill_id,
+            "mastery_probability": round(rng.random(), 4),
+            "learning_velocity": round(rng.gauss(0.02, 0.03), 4) if rng.random() > 0.1 else None,
+            "plateau_flag": rng.random() < 0.1,
+            "total_attempts": rng.randrange(0, 60),
+            "correct_attempts": 0,
+            "last_practiced_at": practiced.isoformat(),
+            "updated_at": practiced.isoformat(),
+            "topics": {"id": skill_id, "name": f"Skill {i}", "category_id": category["id"], "categories": category},
+        })
+    db.tables["user_performance_snapshots"] = []
+    for i in range(snapshots):
+        db.tables["user_performance_snapshots"].append({
+            "user_id": USER_ID,
+            "snapshot_type": "session_complete",
+            "predicted_sat_math": 450 + i,
+            "predicted_sat_rw": 480 + i // 2,
+            "cognitive_efficiency_score": round(rng.random(), 3),
+            "mean_mastery": round(rng.random(), 4),
+            "created_at": (now - timedelta(days=(snapshots - i) * 0.7)).isoformat(),
+        })
+    db.tables["study_plans"] = [{
+        "id": str(uuid.uuid4()), "user_id": USER_ID, "is_active": True,
+        "target_math_score": 700, "target_rw_score": 680, "current_math_score": 520, "current_rw_score": 540,
+        "test_date": (now + timedelta(days=60)).date().isoformat(), "start_date": (now - timedelta(days=40)).date().isoformat(),
+    }]
+    db.tables["mock_exams"] = [
+        {
+            "id": str(uuid.uuid4()), "user_id": USER_ID, "exam_type": "full_length", "status": "completed",
+            "total_score": 1000 + 20 * i, "math_score": 500 + 10 * i, "rw_score": 500 + 10 * i,
+            "completed_at": (now - timedelta(days=7 * (exams - i))).isoformat(),
+        }
+        for i in range(exams)
+    ]
+
+
+async def separate_endpoints(db):
+    """Each endpoint as its own request (own loader)"""
+    analytics = AnalyticsService(db)
+    heatmap = await AnalyticsService(db).get_skill_heatmap(USER_ID)
+    return {
+        "velocity": await VelocityService(db).calculate_learning_velocity(USER_ID),
+        "predictions": await PredictionService(db).calculate_predictive_scores(USER_ID),
+        "growth_curve": {
+            "data": await analytics.get_growth_curve(USER_ID, days_back=30), "skill_id": None, "days_covered": 30
+        },
+        "skill_heatmap": analytics.summarize_heatmap(heatmap),
+        "mock_exams": await AnalyticsService(db).get_mock_exam_performance(USER_ID, limit=10),
+    }
+
+
+async def unified(db, sections=None):
+    return await LearnerAnalyticsService(db, RequestLoader(db)).get_learner_analytics(USER_ID, sections=sections)
+
+
+def clear_caches():
+    snapshot_series.clear_snapshot_series_cache()
+    learner_analytics_service._analytics_cache.clear()
+
+
+async def measure(db, call, repeat, before=None):
+    timings, queries, result = [], 0, None
+    for _ in range(repeat):
+        if before:
+            before()
+        db.round_trips = 0
+        start = time.perf_counter()
+        result = await call()
+        timings.append((time.perf_counter() - start) * 1000)
+        queries += db.round_trips
+    return statistics.median(timings), queries / repeat, result
+
+
+async def main_async(args):
+    db = FakeSupabase(latency_ms=args.latency_ms)
+    seed(db, random.Random(args.seed), args.skills, args.snapshots, args.exams)
+    # Population percentiles load once per process; keep them out of the counts
+    VelocityService(db)._calculate_velocity_percentile(0.0)
+
+    def touch_mastery():
+        row = db.tables["user_skill_mastery"][0]
+        row["updated_at"] = datetime.now(timezone.utc).isoformat()
+
+    print(f"{args.skills} skills, {args.snapshots} snapshots, {args.exams} exams, "
+          f"{args.latency_ms:.0f}ms per query, median of {args.repeat}")
+    print(f"{'dashboard load':<34}{'queries':>8}{'latency':>11}")
+    cases = [
+        ("five endpoints, cold", lambda: separate_endpoints(db), clear_caches),
+        ("five endpoints, warm series", lambda: separate_endpoints(db), None),
+        ("unified, cold", lambda: unified(db), clear_caches),
+        ("unified, after a mastery update", lambda: unified(db), touch_mastery),
+        ("unified, cached", lambda: unified(db), None),
+        ("unified, skill_heatmap only", lambda: unified(db, ["skill_heatmap"]), clear_caches),
+    ]
+    results = {}
+    for label, call, before in cases:
+        ms, queries, results[label] = await measure(db, call, args.repeat, before)
+        print(f"{label:<34}{queries:>8.0f}{ms:>9.1f}ms")
+
+    separate = results["five endpoints, cold"]
+    mismatches = [
+        section for section, value in separate.items()
+        if results["unified, cold"][section] != value or results["unified, cached"][section] != value
+    ]
+    if mismatches:
+        print(f"MISMATCH: {', '.join(mismatches)} differ from the separate endpoints")
+        sys.exit(1)
+    print("Unified sections match the separate endpoints")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--skills", type=int, default=120)
+    parser.add_argument("--snapshots", type=int, default=200)
+    parser.add_argument("--exams", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=15.0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark median render wall time: one `manim render` subprocess per attempt
+vs. warm workers from ManimWorkerPool.
+
+Uses a small plain Scene (no voiceover) so TTS calls don't skew the numbers.
+Requires manim to be installed (use requirements-manim.txt).
+
+Usage:
+    python scripts/benchmark_manim_render.py --runs 5
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+# Add parent directory to path
+BACKEND_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from app.services.manim_worker_pool import ManimWorkerPool
+
+SCENE_SOURCE = '''from manim import *
+
+
+class BenchmarkScene(Scene):
+    def construct(self):
+        title = Text("Slope").scale(1.5).to_edge(UP)
+        formula = MathTex(r"m = \\frac{y_2 - y_1}{x_2 - x_1}").scale(0.8)
+        self.play(Write(title))
+        self.play(FadeIn(formula))
+        self.wait(0.5)
+'''
+
+
+def render_subprocess(output_dir: Path) -> float:
+    scene_id = str(uuid.uuid4())
+    scene_file = output_dir / f"scene_{scene_id}.py"
+    scene_file.write_text(SCENE_SOURCE)
+
+    env = os.environ.copy()
+    env["PYTHONPATH"] = str(BACKEND_DIR) + os.pathsep + env.get("PYTHONPATH", "")
+
+    start = time.perf_counter()
+    result = subprocess.run(
+        ["manim", "render", "-ql", str(scene_file), "BenchmarkScene"],
+        cwd=str(output_dir),
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=300,
+    )
+    elapsed = time.perf_counter() - start
+
+    if result.returncode != 0:
+        raise Exception(f"Manim execution failed: {result.stderr}")
+    return elapsed
+
+
+def render_pool(pool: ManimWorkerPool, output_dir: Path) -> float:
+    start = time.perf_counter()
+    pool.render(SCENE_SOURCE, "BenchmarkScene", str(uuid.uuid4()), output_dir)
+    return time.perf_counter() - start
+
+
+def summarize(label: str, timings: list) -> None:
+    print(
+        f"{label:<12} median={statistics.median(timings):.2f}s "
+        f"mean={statistics.mean(timings):.2f}s "
+        f"min={min(timings):.2f}s max={max(timings):.2f}s (n={len(timings)})"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Renders per approach")
+    args = parser.parse_args()
+
+    output_dir = Path(tempfile.mkdtemp(prefix="manim_bench_"))
+    pool = ManimWorkerPool(size=1, max_jobs=args.runs + 1, render_timeout=300)
+
+    try:
+        print(f"Rendering {args.runs}x with a fresh `manim render` subprocess...")
+        subprocess_timings = [render_subprocess(output_dir) for _ in range(args.runs)]
+
+        print("Warming pool worker (not timed)...")
+        pool.start()
+        render_pool(pool, output_dir)
+
+        print(f"Rendering {args.runs}x on the warm worker...")
+        pool_timings = [render_pool(pool, output_dir) for _ in range(args.runs)]
+
+        print()
+        summarize("subprocess", subprocess_timings)
+        summarize("warm pool", pool_timings)
+        speedup = statistics.median(subprocess_timings) / statistics.median(pool_timings)
+        print(f"Median speedup: {speedup:.2f}x")
+    finally:
+        pool.shutdown()
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Measure mock exam mastery finalization: one BKTService.update_mastery call
+per answered question (previous behaviour) vs. update_mastery_batch.
+
+Runs against an in-memory Supabase stand-in that adds a fixed latency to
+every request, so the difference reflects round trips to a remote database.
+Also checks that both paths end in the same mastery state.
+
+Usage:
+    python scripts/benchmark_mastery_update.py --questions 98 --skills 30 --latency-ms 20
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fake_supabase import FakeSupabase
+from app.services.bkt_service import BKTService
+
+USER_ID = "00000000-0000-0000-0000-000000000001"
+
+
+async def sequential(db, responses):
+    bkt = BKTService(db)
+    for r in responses:
+        await bkt.update_mastery(user_id=USER_ID, skill_id=r["skill_id"], is_correct=r["is_correct"])
+
+
+async def batched(db, responses):
+    await BKTService(db).update_mastery_batch(USER_ID, responses)
+
+
+def final_state(db):
+    return {
+        row["skill_id"]: (float(row["mastery_probability"]), row["total_attempts"], row["correct_attempts"])
+        for row in db.tables.get("user_skill_mastery", [])
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--questions", type=int, default=98)
+    parser.add_argument("--skills", type=int, default=30)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    random.seed(7)
+    skills = [f"skill-{i}" for i in range(args.skills)]
+    responses = [
+        {"skill_id": random.choice(skills), "is_correct": random.random() < 0.6}
+        for _ in range(args.questions)
+    ]
+
+    states = {}
+    for label, func in (("per-question", sequential), ("batched", batched)):
+        db = FakeSupabase(latency_ms=args.latency_ms)
+        start = time.perf_counter()
+        asyncio.run(func(db, responses))
+        elapsed = time.perf_counter() - start
+        states[label] = final_state(db)
+        events = len(db.tables.get("learning_events", []))
+        print(
+            f"{label:<13} requests={db.round_trips:<4} events={events:<4} "
+            f"time={elapsed * 1000:.0f}ms (latency {args.latency_ms:.0f}ms/request)"
+        )
+
+    same = states["per-question"] == states["batched"]
+    print("✅ Same final mastery state" if same else "❌ Final mastery states differ")
+
+
+if __name__ == "__main__":
+    main()
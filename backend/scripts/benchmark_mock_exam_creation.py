@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Measure mock exam creation latency (p50/p99) with and without the
+pre-assembled form pool.
+
+Signs in as an existing test user and calls MockExamService.create_mock_exam
+the way the API route does (user-scoped client, RLS applied). The pool is
+topped up with the service role key before the pooled run. Every exam created
+here is deleted again at the end.
+
+Usage:
+    python scripts/benchmark_mock_exam_creation.py --email test@example.com --password secret --runs 50
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from supabase import create_client
+
+from app.config import get_settings
+from app.db import get_service_client
+from app.services.mock_exam_service import MockExamService
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def run(service: MockExamService, user_id: str, runs: int, use_form_pool: bool):
+    timings = []
+    exam_ids = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = await service.create_mock_exam(user_id=user_id, use_form_pool=use_form_pool)
+        timings.append((time.perf_counter() - start) * 1000)
+        exam_ids.append(result["exam"]["id"])
+    return timings, exam_ids
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--runs", type=int, default=50)
+    args = parser.parse_args()
+
+    settings = get_settings()
+    client = create_client(settings.supabase_url, settings.supabase_anon_key)
+    session = client.auth.sign_in_with_password({"email": args.email, "password": args.password})
+    client.postgrest.auth(session.session.access_token)
+    user_id = session.user.id
+
+    service = MockExamService(client)
+    admin = get_service_client()
+    created = []
+
+    try:
+        for use_form_pool in (False, True):
+            if use_form_pool:
+                # Stock enough medium forms that no pooled run falls back
+                await MockExamService(admin).replenish_form_pool(args.runs, args.runs)
+
+            timings, exam_ids = await run(service, user_id, args.runs, use_form_pool)
+            created.extend(exam_ids)
+
+            label = "form pool" if use_form_pool else "on demand"
+            print(
+                f"{label:<10} runs={len(timings)} "
+                f"p50={statistics.median(timings):.0f}ms "
+                f"p99={percentile(timings, 99):.0f}ms "
+                f"max={max(timings):.0f}ms"
+            )
+    finally:
+        for i in range(0, len(created), 100):
+            admin.table("mock_exams").delete().in_("id", created[i:i + 100]).execute()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Measure the population percentile index on synthetic students: build time,
+digest size, percentile query latency and accuracy against exact percentiles
+computed from the full sorted population.
+
+Percentiles are mid-rank (values equal to the query count as half below), as
+the index reports them. Also times incremental adds (new students between
+rebuilds) and the accuracy of a digest that absorbed them.
+
+Usage:
+    python scripts/benchmark_population_index.py --students 1000000
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.population_index import DEFAULT_COMPRESSION, PopulationIndexService, TDigest
+
+
+def synthetic_metrics(rng: np.random.Generator, students: int):
+    """Scores on the SAT's 10-point grid, a skewed velocity and bounded mastery"""
+    math = np.clip(np.round(rng.normal(520, 110, students) / 10) * 10, 200, 800)
+    rw = np.clip(np.round((0.6 * (math - 520) + rng.normal(530, 90, students)) / 10) * 10, 200, 800)
+    math[rng.random(students) < 0.03] = np.nan  # no math practice yet
+    velocity = np.round(rng.standard_t(3, students) * 4 + rng.exponential(3, students), 1)
+    velocity[rng.random(students) < 0.2] = np.nan  # a single day of snapshots
+    mastery = rng.beta(2.5, 3, students)
+    return {"predicted_sat_math": math, "predicted_sat_rw": rw, "mean_mastery": mastery, "velocity": velocity}
+
+
+def exact_percentiles(values: np.ndarray, queries: np.ndarray) -> np.ndarray:
+    ordered = np.sort(values[~np.isnan(values)])
+    below = np.searchsorted(ordered, queries, side="left")
+    upto = np.searchsorted(ordered, queries, side="right")
+    return 100 * (below + upto) / 2 / len(ordered)
+
+
+def errors(digest: TDigest, values: np.ndarray, queries: np.ndarray):
+    exact = exact_percentiles(values, queries)
+    estimated = np.array([100 * digest.cdf(q) for q in queries])
+    error = np.abs(estimated - exact)
+    tails = (exact < 5) | (exact > 95)
+    return error.max(), error.mean(), error[tails].max() if tails.any() else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=1_000_000)
+    parser.add_argument("--compression", type=float, default=DEFAULT_COMPRESSION)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--new-students", type=int, default=50_000, help="Incremental adds after the build")
+    parser.add_argument("--seed", type=int, default=4)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    metrics = synthetic_metrics(rng, args.students)
+    metrics["total"] = metrics["predicted_sat_math"] + metrics["predicted_sat_rw"]
+
+    start = time.perf_counter()
+    index = PopulationIndexService.build(metrics, args.compression)
+    build_seconds = time.perf_counter() - start
+    print(f"{args.students} students, compression {args.compression:g}: built in {build_seconds:.2f}s")
+
+    columns = {
+        ("score", "math"): "predicted_sat_math",
+        ("score", "rw"): "predicted_sat_rw",
+        ("score", "total"): "total",
+        ("velocity", "total"): "velocity",
+        ("mastery", "total"): "mean_mastery",
+    }
+    print(f"{'metric':<16}{'centroids':>10}{'json':>9}{'query':>9}{'max err':>9}{'mean err':>10}{'tail err':>10}")
+    for key, column in columns.items():
+        digest = index.digests[key]
+        values = metrics[column]
+        present = values[~np.isnan(values)]
+        # Observed values and points across the range (on the 10-point grid
+        # for scores, as predicted scores always are)
+        spread = rng.uniform(present.min(), present.max(), args.queries // 2)
+        if key[0] == "score":
+            spread = np.round(spread / 10) * 10
+        queries = np.concatenate([rng.choice(present, args.queries // 2), spread])
+        start = time.perf_counter()
+        for q in queries:
+            index.percentile(*key, q)
+        query_us = (time.perf_counter() - start) / len(queries) * 1e6
+        max_error, mean_error, tail_error = errors(digest, values, queries)
+        size_kb = len(json.dumps(digest.to_dict())) / 1024
+        print(f"{'.'.join(key):<16}{len(digest.means):>10}{size_kb:>7.1f}KB{query_us:>7.1f}us"
+              f"{max_error:>9.3f}{mean_error:>10.3f}{tail_error:>10.3f}")
+
+    # New students between rebuilds, one at a time
+    new = synthetic_metrics(rng, args.new_students)
+    start = time.perf_counter()
+    for math, rw, mastery in zip(new["predicted_sat_math"], new["predicted_sat_rw"], new["mean_mastery"]):
+        index.observe_student(None if np.isnan(math) else math, rw, mastery)
+    add_us = (time.perf_counter() - start) / args.new_students * 1e6
+    combined = np.concatenate([metrics["mean_mastery"], new["mean_mastery"]])
+    queries = rng.choice(combined, args.queries)
+    max_error, mean_error, _ = errors(index.digests[("mastery", "total")], combined, queries)
+    print(f"{args.new_students} incremental adds: {add_us:.1f}us per student; "
+          f"mastery max err {max_error:.3f}, mean err {mean_error:.3f} (percentile points)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Measure GET /profile latency: the previous route (five service calls awaited
+in sequence, about nine queries) vs. the concurrent loader, cold and cached.
+
+Runs against an in-memory Supabase stand-in with a fixed per-request latency
+plus exponential jitter, so percentiles reflect both the number of sequential
+round trips and their tail. Also checks that all paths return the same
+profile.
+
+Usage:
+    python scripts/benchmark_profile.py --requests 200 --latency-ms 15 --jitter-ms 10
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import date, datetime, timedelta
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fake_supabase import FakeSupabase
+from app.models.profile import ProfileResponse, UserProfileStats
+from app.services import profile_service
+from app.services.achievement_service import AchievementService
+from app.services.profile_service import ProfileService
+from app.services.streak_service import StreakService
+
+USER_ID = "00000000-0000-0000-0000-000000000001"
+
+
+def seed(db: FakeSupabase, rng: random.Random, sessions: int = 40, questions_per_session: int = 20):
+    now = datetime(2026, 10, 1, 18, 0)
+    plan_id = str(uuid.uuid4())
+    db.tables["users"] = [{
+        "id": USER_ID, "email": "student@example.com", "name": "Student",
+        "onboarding_completed": True, "created_at": now.isoformat(),
+    }]
+    db.tables["user_preferences"] = [{"id": str(uuid.uuid4()), "user_id": USER_ID, "created_at": now.isoformat()}]
+    db.tables["user_streaks"] = [{
+        "id": str(uuid.uuid4()), "user_id": USER_ID, "current_streak": 6, "longest_streak": 11,
+        "total_study_days": 40, "created_at": now.isoformat(),
+    }]
+    db.tables["user_achievements"] = [
+        {
+            "id": str(uuid.uuid4()), "user_id": USER_ID, "achievement_type": f"type_{i}",
+            "achievement_name": f"Achievement {i}", "unlocked_at": (now - timedelta(days=i)).isoformat(),
+        }
+        for i in range(12)
+    ]
+    db.tables["study_plans"] = [
+        {"id": str(uuid.uuid4()), "user_id": USER_ID, "is_active": False},
+        {
+            "id": plan_id, "user_id": USER_ID, "is_active": True,
+            "current_math_score": 560, "target_math_score": 700,
+            "current_rw_score": 580, "target_rw_score": 690,
+            "test_date": (date.today() + timedelta(days=60)).isoformat(),
+        },
+    ]
+    db.tables["user_performance_snapshots"] = [
+        {"user_id": USER_ID, "predicted_sat_math": 600 + i, "predicted_sat_rw": 610 + i,
+         "created_at": (now - timedelta(days=30 - i)).isoformat()}
+        for i in range(30)
+    ]
+    db.tables["practice_sessions"], db.tables["session_questions"] = [], []
+    for s in range(sessions):
+        session_id = str(uuid.uuid4())
+        started = now - timedelta(days=s, minutes=rng.randint(20, 50))
+        questions = [
+            {"session_id": session_id, "question_id": str(uuid.uuid4()),
+             "status": rng.choice(["answered", "answered", "answered", "skipped", "not_started"]),
+             "user_answer": ["A"]}
+            for _ in range(questions_per_session)
+        ]
+        db.tables["session_questions"].extend(questions)
+        completed = s > 2
+        db.tables["practice_sessions"].append({
+            "id": session_id, "study_plan_id": plan_id,
+            "status": "completed" if completed else "in_progress",
+            "started_at": started.isoformat(),
+            "completed_at": now.isoformat() if completed else None,
+            # Embedded resource for the loader's session_questions(status)
+            "session_questions": [{"status": q["status"]} for q in questions],
+        })
+
+
+async def legacy_user_stats(db, user_id: str) -> UserProfileStats:
+    """ProfileService.get_user_stats before the loader: five sequential queries"""
+    stats = UserProfileStats()
+    plan_rows = db.table("study_plans").select("id").eq("user_id", user_id).eq("is_active", True).execute().data
+    if not plan_rows:
+        return stats
+    plan_id = plan_rows[0]["id"]
+    sessions = db.table("practice_sessions").select("id, status, completed_at, started_at").eq(
+        "study_plan_id", plan_id).execute().data
+    questions = db.table("session_questions").select("status, user_answer, question_id").in_(
+        "session_id", [s["id"] for s in sessions]).execute().data
+    plan = db.table("study_plans").select("*").eq("id", plan_id).execute().data[0]
+    snapshots = db.table("user_performance_snapshots").select("predicted_sat_math, predicted_sat_rw").eq(
+        "user_id", user_id).order("created_at", desc=True).limit(1).execute().data
+
+    # Same aggregation as today; only the data access differs
+    by_session = {}
+    for q in questions:
+        by_session.setdefault(q["session_id"], []).append({"status": q["status"]})
+    nested = [{**s, "session_questions": by_session.get(s["id"], [])} for s in sessions]
+    return ProfileService._build_stats(plan, nested, snapshots[0] if snapshots else None)
+
+
+async def legacy_profile(db, user_id: str) -> ProfileResponse:
+    """The /profile route before the loader: every lookup awaited in turn"""
+    service = ProfileService(db)
+    profile = await service.get_user_profile(user_id)
+    preferences = await service.get_user_preferences(user_id)
+    streak = await StreakService(db).get_user_streak(user_id)
+    stats = await legacy_user_stats(db, user_id)
+    achievements = await AchievementService(db).get_recent_achievements(user_id, limit=5)
+    return ProfileResponse(
+        profile=profile, preferences=preferences, streak=streak,
+        stats=stats, recent_achievements=achievements,
+    )
+
+
+async def measure(label: str, db: FakeSupabase, load, requests: int, clear_cache: bool):
+    timings, result = [], None
+    db.round_trips = 0
+    for _ in range(requests):
+        if clear_cache:
+            profile_service._profile_cache.clear()
+        start = time.perf_counter()
+        result = await load()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    p50 = statistics.median(timings)
+    p95 = timings[int(0.95 * (len(timings) - 1))]
+    print(f"{label:<20} p50={p50:7.1f}ms  p95={p95:7.1f}ms  queries/request={db.round_trips / requests:4.1f}")
+    return result
+
+
+async def main_async(args):
+    db = FakeSupabase(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms)
+    seed(db, random.Random(args.seed))
+    service = ProfileService(db)
+
+    legacy = await measure("sequential (before)", db, lambda: legacy_profile(db, USER_ID), args.requests, True)
+    cold = await measure("concurrent, cold", db, lambda: service.get_profile_overview(USER_ID), args.requests, True)
+    cached = await measure("concurrent, cached", db, lambda: service.get_profile_overview(USER_ID), args.requests, False)
+
+    if not (legacy.model_dump() == cold.model_dump() == cached.model_dump()):
+        print("MISMATCH: loader output differs from the sequential route")
+        sys.exit(1)
+    print("All paths return the same profile")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=15.0)
+    parser.add_argument("--jitter-ms", type=float, default=10.0, help="Mean extra delay per query (exponential)")
+    parser.add_argument("--seed", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
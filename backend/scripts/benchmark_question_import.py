@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Measure the question bank importer on a generated question bank: loading the
+whole file and inserting 50-question batches one after another (previous
+behaviour) vs. the streaming import (worker-process transform, parallel
+upserts on external_id).
+
+Runs against an in-memory Supabase stand-in that adds a fixed latency to
+every request. Also checks that:
+- an import interrupted by a failing batch resumes from its checkpoint and
+  ends with every question exactly once
+- a dry run against the imported bank reports exactly the questions that were
+  added to or edited in the file
+- --update-existing keeps disabled questions disabled, repaired answers and
+  the option ids answers were saved against
+- parsing the file one question at a time needs a fraction of json.load's memory
+
+Usage:
+    python scripts/benchmark_question_import.py --questions 100000 --latency-ms 10
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# import_questions creates a client at import time; it is never used here
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "unused.unused.unused")
+
+from fake_supabase import FakeSupabase
+import import_questions
+from import_questions import QuestionImport, iter_question_bank, transform_question
+from topic_mapping import TOPIC_MAP
+
+WORDS = "the of a function value equation passage author claim table data line point graph".split()
+
+
+def text(rng, words):
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def generate_question(rng, n, skills, edited=False):
+    """A question in one of the bank's three shapes (stem MC, IBN MC, IBN SPR)"""
+    shape = n % 3
+    rationale = f"<p>{text(rng, 40)}</p>" + (" <p>Revised.</p>" if edited else "")
+    # Every 97th question has no stem and is skipped as invalid
+    stem = f"<p>{text(rng, 30)}</p>" if n % 97 else ""
+    question = {
+        "questionId": f"q{n:07d}",
+        "uId": f"u{n:07d}",
+        "skill_desc": skills[n % len(skills)],
+        "difficulty": "EMH"[n % 3],
+        "score_band_range_cd": n % 7 + 1,
+        "module": "math" if n % 2 else "english",
+    }
+    if shape == 0:
+        question["content"] = {
+            "stem": stem,
+            "stimulus": f"<p>{text(rng, 120)}</p>",
+            "answerOptions": [{"id": f"{n}-{k}", "content": text(rng, 6)} for k in "abcd"],
+            "correct_answer": ["B"],
+            "keys": [f"{n}-b"],
+            "type": "mcq",
+            "rationale": rationale,
+        }
+    elif shape == 1:
+        question["content"] = {
+            "prompt": stem,
+            "answer": {
+                "choices": {k: {"body": text(rng, 6)} for k in "abcd"},
+                "correct_choice": "c",
+                "rationale": rationale,
+            },
+        }
+    else:
+        question["content"] = {
+            "prompt": stem,
+            "answer": {"rationale": f"<p>The correct answer is {n % 50}.</p>" + rationale},
+        }
+    return question
+
+
+def write_bank(path, count, extra=0, edited=()):
+    rng = random.Random(7)
+    skills = sorted(TOPIC_MAP)
+    with open(path, "w") as f:
+        f.write("{")
+        for n in range(count + extra):
+            question = generate_question(rng, n, skills, edited=n in edited)
+            f.write(("," if n else "") + json.dumps(f"id-{n}") + ": " + json.dumps(question))
+        f.write("}")
+
+
+def legacy_import(db, path):
+    """The previous importer: json.load, prefetch external IDs, sequential 50-row inserts"""
+    existing = {q["external_id"] for q in db.table("questions").select("external_id").execute().data}
+    with open(path) as f:
+        data = json.load(f)
+    questions = []
+    for q_id, q_data in data.items():
+        transformed = transform_question(q_id, q_data)
+        if transformed["external_id"] in existing or not transformed["topic_id"] or not transformed["stem"]:
+            continue
+        questions.append(transformed)
+    for i in range(0, len(questions), 50):
+        db.table("questions").insert(questions[i:i + 50]).execute()
+    return len(questions)
+
+
+class FailingUpserts(FakeSupabase):
+    """Upserts raise once `remaining` of them have gone through (a dropped connection)"""
+
+    def __init__(self, remaining, **kwargs):
+        super().__init__(**kwargs)
+        self.remaining = remaining
+
+    def table(self, name):
+        query = super().table(name)
+        execute = query.execute
+
+        def failing_execute():
+            if query.op == "upsert":
+                with self.lock:
+                    self.remaining -= 1
+                    failed = self.remaining < 0
+                if failed:
+                    raise ConnectionError("connection reset by peer")
+            return execute()
+
+        query.execute = failing_execute
+        return query
+
+
+def parse_peak_mb(parse):
+    tracemalloc.start()
+    parse()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--questions", type=int, default=100000)
+    parser.add_argument("--latency-ms", type=float, default=10.0)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    # A failed batch stops the import straight away instead of retrying
+    import_questions.MAX_ATTEMPTS = 1
+    ok = True
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "question_bank.json")
+        write_bank(path, args.questions)
+        print(f"question bank: {args.questions} questions, {os.path.getsize(path) / 1e6:.0f}MB")
+
+        db = FakeSupabase(latency_ms=args.latency_ms)
+        start = time.perf_counter()
+        inserted = legacy_import(db, path)
+        elapsed = time.perf_counter() - start
+        print(
+            f"{'load + sequential':<20} rows={inserted:<7} requests={db.round_trips:<5} "
+            f"time={elapsed:6.1f}s  {inserted / elapsed:7.0f} rows/sec"
+        )
+        expected = {q["external_id"] for q in db.tables["questions"]}
+
+        db = FakeSupabase(latency_ms=args.latency_ms)
+        result = QuestionImport(db, path, workers=args.workers, verbose=False).run()
+        print(
+            f"{'streaming':<20} rows={result['rows']:<7} requests={db.round_trips:<5} "
+            f"time={result['seconds']:6.1f}s  {result['rows_per_sec']:7.0f} rows/sec"
+        )
+        ok &= {q["external_id"] for q in db.tables["questions"]} == expected
+        ok &= len(db.tables["questions"]) == len(expected)
+
+        # Interrupted a third of the way through, then resumed from the checkpoint
+        checkpoint = path + ".checkpoint.json"
+        db = FailingUpserts(args.questions // import_questions.BATCH_SIZE // 3, latency_ms=args.latency_ms)
+        first = QuestionImport(db, path, workers=args.workers, checkpoint_path=checkpoint, verbose=False).run()
+        db.remaining = float("inf")
+        second = QuestionImport(db, path, workers=args.workers, checkpoint_path=checkpoint, verbose=False).run()
+        rows = [q["external_id"] for q in db.tables["questions"]]
+        resumed = bool(first["error"]) and not second["error"] and first["entries_done"] > 0
+        print(
+            f"interrupted at question {first['entries_done']} ({first['error']}), resumed: "
+            f"{second['rows']} more rows, {len(rows)} total, checkpoint removed={not os.path.exists(checkpoint)}"
+        )
+        ok &= resumed and len(rows) == len(set(rows)) and set(rows) == expected
+        ok &= not os.path.exists(checkpoint)
+
+        # Dry run against the imported bank after editing and appending questions
+        edited = set(range(5, args.questions, max(args.questions // 500, 1)))
+        write_bank(path, args.questions, extra=200, edited=edited)
+        importer = QuestionImport(db, path, workers=args.workers, dry_run=True, verbose=False)
+        result = importer.run()
+        diff = importer.diff
+        edited_valid = {f"q{n:07d}" for n in edited} & expected
+        columns = {c for cs in diff["changed"].values() for c in cs}
+        print(
+            f"dry run: new={len(diff['new'])} changed={len(diff['changed'])} ({', '.join(sorted(columns))}) "
+            f"unchanged={diff['unchanged']} in {result['seconds']:.1f}s"
+        )
+        added_valid = {f"q{n:07d}" for n in range(args.questions, args.questions + 200) if n % 97}
+        ok &= set(diff["changed"]) == edited_valid and columns == {"rationale"}
+        ok &= set(diff["new"]) == added_valid
+        ok &= len(db.tables["questions"]) == len(expected)
+
+        # Re-import with --update-existing: edits land, disabled questions stay
+        # disabled, a repaired answer the file lacks is kept and so are the
+        # option ids of a question imported when they were random
+        questions = {q["external_id"]: q for q in db.tables["questions"]}
+        disabled = sorted(edited_valid)[:5]
+        for external_id in disabled:
+            questions[external_id]["is_active"] = False
+        repaired = sorted(expected - edited_valid)[0]
+        questions[repaired]["correct_answer"] = ["REPAIRED"]
+        # An IBN multiple-choice question imported when option ids were random
+        legacy = next(q for q in sorted(expected - edited_valid) if int(q[1:]) % 3 == 1)
+        legacy_ids = {option["id"]: str(uuid.uuid4()) for option in questions[legacy]["answer_options"]}
+        questions[legacy]["answer_options"] = [
+            {**option, "id": legacy_ids[option["id"]]} for option in questions[legacy]["answer_options"]
+        ]
+        questions[legacy]["acceptable_answers"] = [legacy_ids[a] for a in questions[legacy]["acceptable_answers"]]
+        legacy_options = questions[legacy]["answer_options"]
+        legacy_acceptable = questions[legacy]["acceptable_answers"]
+        transform = import_questions.transform_question
+
+        def lose_repaired_answer(q_id, q_data):
+            question = transform(q_id, q_data)
+            if question["external_id"] == repaired:
+                question["correct_answer"] = []
+            return question
+
+        import_questions.transform_question = lose_repaired_answer
+        result = QuestionImport(db, path, workers=0, update_existing=True, verbose=False).run()
+        import_questions.transform_question = transform
+        questions = {q["external_id"]: q for q in db.tables["questions"]}
+        kept_disabled = all(questions[external_id]["is_active"] is False for external_id in disabled)
+        kept_option_ids = (
+            questions[legacy]["answer_options"] == legacy_options
+            and questions[legacy]["acceptable_answers"] == legacy_acceptable
+        )
+        print(
+            f"update existing: rows={result['rows']} disabled kept={kept_disabled} "
+            f"repaired answer={questions[repaired]['correct_answer']} option ids kept={kept_option_ids}"
+        )
+        ok &= kept_disabled and questions[repaired]["correct_answer"] == ["REPAIRED"] and kept_option_ids
+        ok &= all("Revised." in questions[external_id]["rationale"] for external_id in edited_valid)
+        ok &= all(questions[external_id]["is_active"] is True for external_id in added_valid)
+        ok &= len(questions) == len(expected) + len(added_valid)
+
+        def load():
+            with open(path) as f:
+                json.load(f)
+
+        def stream():
+            for _ in iter_question_bank(path):
+                pass
+
+        print(f"parse peak memory: json.load {parse_peak_mb(load):.0f}MB, streaming {parse_peak_mb(stream):.1f}MB")
+
+    print("✅ Imports, resume and dry run are correct" if ok else "❌ Import results differ")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Measure question pool search: ILIKE '%term%' on the stem for the page and
+again for the exact count (previous behaviour) vs. QuestionSearchService
+(one search_questions call per query, top results cached in the process).
+
+Runs against an in-memory Supabase stand-in that adds a fixed latency to
+every request, on generated banks of increasing size. ILIKE scans every row,
+as it does in Postgres without a usable index. search_questions is stood in
+for by an inverted index over the same plain text, as the tsvector and
+trigram GIN indexes of migration 043 serve it, ranking at most
+SEARCH_MAX_MATCHES matches: what is measured is requests
+per search, cache hits and how each path grows with the bank, not Postgres
+itself (check the function's plan with EXPLAIN ANALYZE on a real database).
+
+Also checks that cached and uncached pages agree with the function, deep
+pages and totals are right, and a misspelled query finds the intended word.
+
+Usage:
+    python scripts/benchmark_question_search.py --sizes 10000,50000,100000 --latency-ms 10
+"""
+
+import argparse
+import bisect
+import os
+import random
+import re
+import statistics
+import sys
+import time
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fake_supabase import FakeSupabase
+from app.services import question_search
+from app.services.question_search import QuestionSearchService, invalidate_question_search
+
+VOCABULARY_SIZE = 3000
+# ts_rank weights for stem (A), stimulus (B) and rationale (C)
+FIELD_WEIGHTS = (1.0, 0.4, 0.2)
+SYLLABLES = "ba be bi bo ca co da de di fa fe go ha in ka la le li lo ma me mi mo na ne no pa pe po ra re ri ro sa se si so ta te ti to va ve vo".split()
+
+
+def plain_text(html):
+    """question_plain_text() from migration 043"""
+    text = re.sub(r"<[^>]*>", " ", html or "")
+    text = re.sub(r"&(#[0-9]+|#x[0-9a-fA-F]+|[a-zA-Z]+);", " ", text)
+    return " ".join(text.split())
+
+
+def trigrams(word):
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SearchIndex:
+    """Inverted index over a generated bank, answering like search_questions"""
+
+    def __init__(self, rows, field_words, vocabulary):
+        self.rows = rows
+        self.vocabulary = vocabulary
+        self.sorted_words = sorted(range(len(vocabulary)), key=lambda i: vocabulary[i])
+        self.sorted_vocabulary = [vocabulary[i] for i in self.sorted_words]
+        self.difficulty = np.array([r["difficulty"] for r in rows])
+
+        # Per field, and for any field: word id -> sorted doc ids
+        self.postings = [self._postings(words, len(rows)) for words in field_words]
+        self.any_field = self._postings(np.hstack(field_words), len(rows))
+
+        self.trigram_words = {}
+        for i, word in enumerate(vocabulary):
+            for gram in trigrams(word):
+                self.trigram_words.setdefault(gram, []).append(i)
+
+    def _postings(self, words, size):
+        pairs = np.unique(words.astype(np.int64) * size + np.arange(size)[:, None])
+        word_ids, docs = pairs // size, pairs % size
+        bounds = np.searchsorted(word_ids, np.arange(len(self.vocabulary) + 1))
+        return [docs[bounds[w]:bounds[w + 1]] for w in range(len(self.vocabulary))]
+
+    def _docs(self, word_ids):
+        if len(word_ids) == 1:
+            return self.any_field[word_ids[0]]
+        parts = [self.any_field[w] for w in word_ids]
+        return np.unique(np.concatenate(parts)) if parts else np.array([], dtype=np.int64)
+
+    @staticmethod
+    def _contains(postings, docs):
+        found = np.searchsorted(postings, docs)
+        return (found < len(postings)) & (postings[np.minimum(found, len(postings) - 1)] == docs)
+
+    def _prefix_words(self, prefix):
+        start = bisect.bisect_left(self.sorted_vocabulary, prefix)
+        end = bisect.bisect_left(self.sorted_vocabulary, prefix + "￿")
+        return self.sorted_words[start:end]
+
+    def _similar_words(self, word):
+        grams = trigrams(word)
+        shared = {}
+        for gram in grams:
+            for i in self.trigram_words.get(gram, ()):
+                shared[i] = shared.get(i, 0) + 1
+        # word_similarity: the share of the query's trigrams the word has
+        return [i for i, n in shared.items() if n / len(grams) >= 0.5]
+
+    def search_questions(self, db, p_query, p_section=None, p_difficulty=None, p_topic_id=None,
+                         p_category_id=None, p_limit=20, p_offset=0,
+                         p_max_matches=question_search.SEARCH_MAX_MATCHES):
+        words = re.sub(r"[^a-z0-9]+", " ", p_query.lower()).split()
+        if not words:
+            return []
+
+        # Every word, the last one as a prefix
+        terms = [[self.vocabulary.index(w)] if w in self.vocabulary else [] for w in words[:-1]]
+        terms.append(self._prefix_words(words[-1]))
+        match_type = "exact"
+        candidates = None
+        for term in terms:
+            docs = self._docs(term)
+            candidates = docs if candidates is None else np.intersect1d(candidates, docs, assume_unique=True)
+        if p_difficulty is not None and len(candidates):
+            candidates = candidates[self.difficulty[candidates] == p_difficulty]
+        candidates = candidates[:p_max_matches]
+
+        if not len(candidates):
+            match_type = "fuzzy"
+            terms = [self._similar_words(w) for w in words]
+            candidates = None
+            for term in terms:
+                docs = self._docs(term)
+                candidates = docs if candidates is None else np.intersect1d(candidates, docs, assume_unique=True)
+            if p_difficulty is not None and len(candidates):
+                candidates = candidates[self.difficulty[candidates] == p_difficulty]
+            candidates = candidates[:p_max_matches]
+
+        # Rank only the matches kept: look each up in the term's postings per field
+        rank = np.zeros(len(candidates))
+        for term in terms:
+            for f, weight in enumerate(FIELD_WEIGHTS):
+                hit = np.zeros(len(candidates), dtype=bool)
+                for w in term:
+                    if len(self.postings[f][w]):
+                        hit |= self._contains(self.postings[f][w], candidates)
+                rank += weight * hit
+        order = np.lexsort((candidates, -rank))[p_offset:p_offset + p_limit]
+
+        marked = {self.vocabulary[w] for term in terms for w in term}
+        page = []
+        for i in order:
+            row = self.rows[candidates[i]]
+            text = row["search_text"].split()
+            first = next((j for j, w in enumerate(text) if w in marked), 0)
+            window = text[max(first - 6, 0):first + 12]
+            page.append({
+                **{k: v for k, v in row.items() if k != "search_text"},
+                "rank": float(rank[i]),
+                "snippet": " ".join(f"<mark>{w}</mark>" if w in marked else w for w in window),
+                "match_type": match_type,
+                "total_count": len(candidates),
+            })
+        return page
+
+
+def generate_bank(size, seed=7):
+    rng = np.random.default_rng(seed)
+    py_rng = random.Random(seed)
+    vocabulary = sorted({
+        "".join(py_rng.choice(SYLLABLES) for _ in range(py_rng.randint(2, 4)))
+        for _ in range(VOCABULARY_SIZE * 2)
+    })[:VOCABULARY_SIZE]
+    py_rng.shuffle(vocabulary)
+    # Zipf-like word frequencies: a few common words, a long tail of rare ones
+    weights = 1.0 / np.arange(1, len(vocabulary) + 1) ** 1.07
+    weights /= weights.sum()
+    field_words = [rng.choice(len(vocabulary), size=(size, n), p=weights) for n in (25, 60, 40)]
+
+    rows = []
+    for i in range(size):
+        stem, stimulus, rationale = (" ".join(vocabulary[w] for w in words[i]) for words in field_words)
+        row = {
+            "id": f"{i:08d}-0000-0000-0000-000000000000",
+            "stem": f"<p>{stem}</p>",
+            "stimulus": f"<p>{stimulus}&nbsp;</p>",
+            "difficulty": "EMH"[i % 3],
+            "question_type": "mc",
+            "answer_options": None,
+            "correct_answer": ["A"],
+            "rationale": f"<p>{rationale}</p>",
+            "topic_id": "topic-1",
+            "topic_name": "Topic",
+            "category_id": "category-1",
+            "category_name": "Category",
+            "section": "math",
+            "is_active": True,
+            "topics": {"id": "topic-1", "name": "Topic", "category_id": "category-1",
+                       "categories": {"id": "category-1", "name": "Category", "section": "math"}},
+        }
+        row["search_text"] = " ".join(plain_text(row[c]) for c in ("stem", "stimulus", "rationale"))
+        rows.append(row)
+    return rows, field_words, vocabulary
+
+
+def legacy_search(db, search, limit=20, offset=0):
+    """The previous browse search: ILIKE on the stem for the page, then for the count"""
+    page = db.table("questions").select("*").eq("is_active", True).ilike(
+        "stem", f"%{search}%"
+    ).order("difficulty").range(offset, offset + limit - 1).execute()
+    count = db.table("questions").select("id", count="exact").eq("is_active", True).ilike(
+        "stem", f"%{search}%"
+    ).execute()
+    return page.data, count.count
+
+
+def workload(vocabulary, n, seed=11):
+    """Searches as students type them: common words most often, prefixes while typing, some typos"""
+    rng = random.Random(seed)
+    common = vocabulary[:40]
+    searches = []
+    for _ in range(n):
+        kind = rng.random()
+        word = common[min(int(rng.paretovariate(1.2)) - 1, len(common) - 1)]
+        if kind < 0.5:
+            query = word
+        elif kind < 0.75:
+            query = f"{word} {rng.choice(common)}"
+        elif kind < 0.95:
+            query = word[:rng.randint(3, len(word))]
+        else:
+            j = rng.randrange(1, len(word))
+            query = word[:j] + word[j + 1:]
+        offset = 20 if rng.random() < 0.2 else 0
+        searches.append((query, offset))
+    return searches
+
+
+def percentile(values, p):
+    return sorted(values)[min(int(len(values) * p), len(values) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,50000,100000")
+    parser.add_argument("--searches", type=int, default=300)
+    parser.add_argument("--legacy-searches", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=10.0)
+    args = parser.parse_args()
+
+    ok = True
+    for size in [int(s) for s in args.sizes.split(",")]:
+        rows, field_words, vocabulary = generate_bank(size)
+        index = SearchIndex(rows, field_words, vocabulary)
+        db = FakeSupabase(latency_ms=args.latency_ms)
+        db.tables["questions"] = rows
+        db.functions["search_questions"] = index.search_questions
+        searches = workload(vocabulary, args.searches)
+        print(f"== {size} questions")
+
+        times = []
+        db.round_trips = 0
+        for query, offset in searches[:args.legacy_searches]:
+            start = time.perf_counter()
+            legacy_search(db, query, offset=offset)
+            times.append(time.perf_counter() - start)
+        print(
+            f"  ilike page + count     p50={statistics.median(times) * 1000:7.1f}ms  "
+            f"p95={percentile(times, 0.95) * 1000:7.1f}ms  requests/search={db.round_trips / len(times):.2f}"
+        )
+
+        invalidate_question_search()
+        service = QuestionSearchService(db)
+        times, cold = [], []
+        db.round_trips = 0
+        seen = set()
+        for query, offset in searches:
+            start = time.perf_counter()
+            service.search(query, offset=offset)
+            elapsed = time.perf_counter() - start
+            times.append(elapsed)
+            if query not in seen:
+                cold.append(elapsed)
+                seen.add(query)
+        print(
+            f"  search, first time     p50={statistics.median(cold) * 1000:7.1f}ms  "
+            f"p95={percentile(cold, 0.95) * 1000:7.1f}ms  ({len(cold)} distinct queries)"
+        )
+        print(
+            f"  search, workload       p50={statistics.median(times) * 1000:7.1f}ms  "
+            f"p95={percentile(times, 0.95) * 1000:7.1f}ms  requests/search={db.round_trips / len(times):.2f}"
+        )
+
+        # Cached pages, deep pages and totals agree with the function
+        for query, _ in searches[:20]:
+            direct = index.search_questions(db, query, p_limit=20, p_offset=20)
+            served = service.search(query, offset=20)
+            ok &= [q["id"] for q in served["questions"]] == [r["id"] for r in direct]
+            deep = service.search(query, offset=question_search.SEARCH_CACHE_DEPTH + 20)
+            expected = index.search_questions(db, query, p_limit=20, p_offset=question_search.SEARCH_CACHE_DEPTH + 20)
+            ok &= [q["id"] for q in deep["questions"]] == [r["id"] for r in expected]
+            total = direct[0]["total_count"] if direct else served["total"]
+            ok &= served["total"] == deep["total"] == total
+            if not ok:
+                print(f"  ❌ '{query}': pages or totals differ from search_questions")
+                break
+
+        # A word with a letter left out still finds the word
+        word = next(w for w in vocabulary[300:] if len(w) >= 8)
+        typo = word[:4] + word[5:]
+        result = service.search(typo)
+        found = result["match_type"] == "fuzzy" and any(
+            word in q["stem"] + q["stimulus"] + q["rationale"] for q in result["questions"]
+        )
+        print(f"  '{typo}' -> {result['match_type']} matches for '{word}': {result['total']}")
+        ok &= bool(found)
+
+    print("✅ Search pages, totals and typo matches are correct" if ok else "❌ Search results differ")
+
+
+if __name__ == "__main__":
+    main()
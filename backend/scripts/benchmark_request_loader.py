@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Count database round trips for the handlers that resolve user -> study plans
+-> practice sessions, before and after the request-scoped loader, and check
+both return the same data.
+
+Covers GET /practice-sessions/wrong-answers and /saved-questions, GET
+/analytics/users/me/study-time and the cognitive metrics and recent
+performance stats a performance snapshot computes. Runs against an in-memory
+Supabase stand-in seeded with two users, so results must also stay scoped to
+the requesting user.
+
+Usage:
+    python scripts/benchmark_request_loader.py --sessions 40 --latency-ms 15
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fake_supabase import FakeSupabase
+from app.api.analytics import get_user_study_time
+from app.api.practice_sessions import get_saved_questions, get_wrong_answers
+from app.services.analytics_service import AnalyticsService
+from app.services.request_loader import RequestLoader
+
+USER_ID = "00000000-0000-0000-0000-000000000001"
+OTHER_USER_ID = "00000000-0000-0000-0000-000000000002"
+
+
+def seed(db: FakeSupabase, rng: random.Random, sessions: int, questions_per_session: int = 10):
+    now = datetime.now(timezone.utc)
+    db.tables["categories"] = []
+    db.tables["topics"] = [
+        {"id": str(uuid.UUID(int=rng.getrandbits(128))), "name": f"Topic {i}",
+         "categories": {"name": f"Category {i % 4}", "section": "math" if i % 2 else "reading_writing"}}
+        for i in range(12)
+    ]
+    db.tables["questions"] = [
+        {"id": str(uuid.UUID(int=rng.getrandbits(128))), "stem": f"Question {i}",
+         "difficulty": "M", "question_type": "mc", "correct_answer": ["A"]}
+        for i in range(200)
+    ]
+    db.tables["study_plans"], db.tables["practice_sessions"], db.tables["session_questions"] = [], [], []
+    db.tables["mock_exams"] = []
+
+    for user_id in (USER_ID, OTHER_USER_ID):
+        plans = [
+            {"id": str(uuid.UUID(int=rng.getrandbits(128))), "user_id": user_id, "is_active": active,
+             "created_at": (now - timedelta(days=90 if not active else 30)).isoformat()}
+            for active in (False, True)
+        ]
+        db.tables["study_plans"].extend(plans)
+        for s in range(sessions):
+            plan = plans[s % 2]
+            session_id = str(uuid.UUID(int=rng.getrandbits(128)))
+            completed_at = now - timedelta(days=s // 3, hours=rng.randint(0, 12))
+            started_at = completed_at - timedelta(minutes=rng.randint(10, 60))
+            db.tables["practice_sessions"].append({
+                "id": session_id, "study_plan_id": plan["id"],
+                "status": "completed" if s > 1 else "in_progress",
+                "created_at": started_at.isoformat(),
+                # Some older rows never recorded a start time
+                "started_at": started_at.isoformat() if s % 7 else None,
+                "completed_at": completed_at.isoformat() if s > 1 else None,
+                "study_plans": {"user_id": user_id, "is_active": plan["is_active"]},
+            })
+            for q in range(questions_per_session):
+                question = rng.choice(db.tables["questions"])
+                answer = rng.choice(["A", "B"])
+                db.tables["session_questions"].append({
+                    "id": str(uuid.UUID(int=rng.getrandbits(128))),
+                    "session_id": session_id,
+                    "question_id": question["id"],
+                    "topic_id": rng.choice(db.tables["topics"])["id"],
+                    "status": "answered",
+                    "user_answer": [answer],
+                    "is_correct": answer == "A",
+                    "is_saved": rng.random() < 0.15,
+                    "confidence_score": rng.randint(1, 5),
+                    "time_spent_seconds": rng.randint(20, 180),
+                    "answered_at": (completed_at - timedelta(minutes=q)).isoformat(),
+                    "created_at": (started_at + timedelta(minutes=q)).isoformat(),
+                    "questions": {"correct_answer": ["A"]},
+                })
+
+
+def legacy_session_ids(db, user_id: str):
+    """How each handler resolved the user's sessions before the loader"""
+    plans = db.table("study_plans").select("id").eq("user_id", user_id).order("created_at", desc=True).execute().data
+    if not plans:
+        return []
+    sessions = db.table("practice_sessions").select("id").in_("study_plan_id", [p["id"] for p in plans]).execute().data
+    return [s["id"] for s in sessions]
+
+
+async def legacy_question_list(db, user_id: str, flag: str, value, order_by: str, limit: int):
+    """wrong-answers / saved-questions before the loader (the row shape is shared)"""
+    session_ids = legacy_session_ids(db, user_id)
+    if not session_ids:
+        return []
+    rows = db.table("session_questions").select("*").in_("session_id", session_ids).eq(
+        flag, value).order(order_by, desc=True).limit(limit).execute().data
+    question_ids = list({r["question_id"] for r in rows})
+    topic_ids = list({r["topic_id"] for r in rows})
+    row_session_ids = list({r["session_id"] for r in rows})
+    questions = {q["id"]: q for q in db.table("questions").select("*").in_("id", question_ids).execute().data}
+    topics = {t["id"]: t for t in db.table("topics").select("*, categories(name, section)").in_("id", topic_ids).execute().data}
+    sessions = {s["id"]: s for s in db.table("practice_sessions").select("*").in_("id", row_session_ids).execute().data}
+    return [
+        (r["id"], questions[r["question_id"]]["stem"], topics[r["topic_id"]]["categories"]["name"],
+         sessions[r["session_id"]]["created_at"])
+        for r in rows
+    ]
+
+
+def summarize(rows):
+    return [
+        (r["session_question_id"], r["question"]["stem"], r["topic"]["category"], r["session"]["created_at"])
+        for r in rows
+    ]
+
+
+async def legacy_snapshot_stats(db, user_id: str):
+    """Cognitive metrics and performance stats, each resolving the active plan's sessions itself"""
+    results = []
+    for _ in range(2):
+        plan = db.table("study_plans").select("id").eq("user_id", user_id).eq("is_active", True).execute().data[0]
+        sessions = db.table("practice_sessions").select("id").eq("study_plan_id", plan["id"]).execute().data
+        cutoff = (datetime.now() - timedelta(days=30)).isoformat()
+        results.append(db.table("session_questions").select("*").in_(
+            "session_id", [s["id"] for s in sessions]).eq("status", "answered").gte("answered_at", cutoff).execute().data)
+    return len(results[0]), sum(1 for r in results[1] if r["user_answer"] == r["questions"]["correct_answer"])
+
+
+async def legacy_study_time(db, user_id: str, days_back: int):
+    """Study time before the loader: every completed session, then one query per untimed session"""
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=days_back)).isoformat()
+    plan_ids = {p["id"] for p in db.table("study_plans").select("id").eq("user_id", user_id).execute().data}
+    sessions = db.table("practice_sessions").select("*").eq("status", "completed").gte("completed_at", cutoff).execute().data
+    counted = 0
+    for session in sessions:
+        if session["study_plan_id"] not in plan_ids:
+            continue
+        if not session["started_at"]:
+            db.table("session_questions").select("time_spent_seconds").eq("session_id", session["id"]).execute()
+        counted += 1
+    db.table("mock_exams").select("*").eq("status", "completed").execute()
+    return counted
+
+
+async def measure(db: FakeSupabase, label: str, before, after):
+    db.round_trips = 0
+    start = time.perf_counter()
+    old = await before()
+    old_ms, old_trips = (time.perf_counter() - start) * 1000, db.round_trips
+
+    db.round_trips = 0
+    start = time.perf_counter()
+    new = await after()
+    new_ms, new_trips = (time.perf_counter() - start) * 1000, db.round_trips
+
+    print(f"{label:<26} queries {old_trips:>3} -> {new_trips:<3}  {old_ms:7.1f}ms -> {new_ms:7.1f}ms")
+    if old != new:
+        print(f"MISMATCH in {label}: {old!r:.200} != {new!r:.200}")
+        sys.exit(1)
+
+
+async def main_async(args):
+    db = FakeSupabase(latency_ms=args.latency_ms)
+    seed(db, random.Random(args.seed), args.sessions)
+
+    await measure(
+        db, "wrong-answers",
+        lambda: legacy_question_list(db, USER_ID, "is_correct", False, "answered_at", 50),
+        lambda: _route_rows(get_wrong_answers(limit=50, user_id=USER_ID, db=db, loader=RequestLoader(db))),
+    )
+    await measure(
+        db, "saved-questions",
+        lambda: legacy_question_list(db, USER_ID, "is_saved", True, "created_at", 50),
+        lambda: _route_rows(get_saved_questions(limit=50, user_id=USER_ID, db=db, loader=RequestLoader(db))),
+    )
+    await measure(
+        db, "study-time",
+        lambda: legacy_study_time(db, USER_ID, 30),
+        lambda: _study_sessions(get_user_study_time(days_back=30, user_id=USER_ID, db=db, loader=RequestLoader(db))),
+    )
+    await measure(
+        db, "snapshot metrics + stats",
+        lambda: legacy_snapshot_stats(db, USER_ID),
+        lambda: _snapshot_stats(AnalyticsService(db), USER_ID),
+    )
+
+
+async def _route_rows(call):
+    return summarize(await call)
+
+
+async def _study_sessions(call):
+    return (await call)["sessions_count"]
+
+
+async def _snapshot_stats(service: AnalyticsService, user_id: str):
+    await service._calculate_cognitive_metrics(user_id)
+    stats = await service._get_recent_performance_stats(user_id)
+    return stats["total_answered"], stats["total_correct"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=40, help="Practice sessions per user")
+    parser.add_argument("--latency-ms", type=float, default=15.0)
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
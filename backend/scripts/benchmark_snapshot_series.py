@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Measure the snapshot-driven analytics endpoints for a user with a long
+history: the growth curve, score predictions and learning velocity, reading
+snapshot rows per service (previous behaviour) vs. the shared columnar
+snapshot series.
+
+The previous growth curve selected every column, including each snapshot's
+full skills JSON, and averaged it per point; predictions and velocity each
+re-queried the snapshots and re-parsed created_at at every step. Runs against
+an in-memory Supabase stand-in, reports per-endpoint latency cold (empty
+series cache) and warm (incremental refresh), and checks the new code returns
+what the old code did. The stand-in caps selects at 1000 rows like PostgREST,
+so the series must page through longer histories; the previous code is run
+uncapped as the reference.
+
+Usage:
+    python scripts/benchmark_snapshot_series.py --snapshots 2000 --latency-ms 15
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fake_supabase import FakeSupabase
+from app.services import snapshot_series
+from app.services.analytics_service import AnalyticsService
+from app.services.prediction_service import PredictionService
+from app.services.request_loader import RequestLoader
+from app.services.velocity_service import VelocityService
+
+USER_ID = "00000000-0000-0000-0000-000000000001"
+
+
+def seed(db: FakeSupabase, rng: random.Random, snapshots: int, skills: int = 60):
+    now = datetime.now(timezone.utc)
+    skill_ids = [str(uuid.UUID(int=rng.getrandbits(128))) for _ in range(skills)]
+    rows = []
+    math_score, rw_score = 480.0, 500.0
+    span = timedelta(days=400)
+    for i in range(snapshots):
+        created_at = now - span + span * (i + rng.random()) / snapshots
+        math_score = min(800, max(200, math_score + rng.gauss(0.15, 6)))
+        rw_score = min(800, max(200, rw_score + rng.gauss(0.1, 6)))
+        skills_snapshot = {s: round(rng.random(), 4) for s in skill_ids} if rng.random() > 0.05 else {}
+        rows.append({
+            "id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "user_id": USER_ID,
+            "snapshot_type": rng.choice(["session_complete", "mock_exam"]),
+            "predicted_sat_math": int(math_score) if rng.random() > 0.02 else None,
+            "predicted_sat_rw": int(rw_score),
+            "skills_snapshot": skills_snapshot,
+            # Maintained by a trigger in the database
+            "mean_mastery": statistics.mean(skills_snapshot.values()) if skills_snapshot else None,
+            "cognitive_efficiency_score": round(rng.random(), 3),
+            "created_at": created_at.isoformat(),
+        })
+    db.tables["user_performance_snapshots"] = rows
+
+
+# ----------------------------------------------------------------------
+# Previous implementations (snapshot rows as dicts)
+# ----------------------------------------------------------------------
+
+def _parse(value):
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+def _total(snapshot):
+    return (snapshot.get("predicted_sat_math", 0) or 0) + (snapshot.get("predicted_sat_rw", 0) or 0)
+
+
+def legacy_growth_curve(db, user_id, days_back):
+    cutoff_date = datetime.now() - timedelta(days=days_back)
+    rows = db.table("user_performance_snapshots").select("*").eq("user_id", user_id).gte(
+        "created_at", cutoff_date.isoformat()).order("created_at").execute().data
+    growth = []
+    for snapshot in rows:
+        point = {
+            "date": snapshot["created_at"],
+            "snapshot_type": snapshot["snapshot_type"],
+            "predicted_sat_math": snapshot.get("predicted_sat_math"),
+            "predicted_sat_rw": snapshot.get("predicted_sat_rw"),
+            "cognitive_efficiency": snapshot.get("cognitive_efficiency_score"),
+        }
+        if snapshot.get("skills_snapshot"):
+            masteries = list(snapshot["skills_snapshot"].values())
+            point["mastery"] = statistics.mean(masteries) if masteries else 0
+        growth.append(point)
+    return growth
+
+
+def legacy_trend(snapshots, field):
+    if len(snapshots) < 2:
+        return {"slope": 0.0, "r_squared": 0.0, "intercept": 400.0}
+    points = []
+    for snapshot in snapshots:
+        score = snapshot.get(field, 400) or 400
+        weeks = (_parse(snapshot["created_at"]) - _parse(snapshots[0]["created_at"])).days / 7.0
+        points.append((weeks, score))
+    n = len(points)
+    sum_x = sum(p[0] for p in points)
+    sum_y = sum(p[1] for p in points)
+    sum_xy = sum(p[0] * p[1] for p in points)
+    sum_x2 = sum(p[0] ** 2 for p in points)
+    slope = (n * sum_xy - sum_x * sum_y) / (n * sum_x2 - sum_x ** 2)
+    intercept = (sum_y - slope * sum_x) / n
+    y_mean = sum_y / n
+    ss_tot = sum((p[1] - y_mean) ** 2 for p in points)
+    ss_res = sum((p[1] - (slope * p[0] + intercept)) ** 2 for p in points)
+    r_squared = 1 - (ss_res / ss_tot) if ss_tot > 0 else 0.0
+    return {"slope": round(slope, 2), "r_squared": round(r_squared, 3), "intercept": round(intercept, 1)}
+
+
+def legacy_prediction_trends(db, user_id):
+    cutoff_date = (datetime.now() - timedelta(days=90)).isoformat()
+    rows = db.table("user_performance_snapshots").select("*").eq("user_id", user_id).gte(
+        "created_at", cutoff_date).order("created_at").execute().data
+    return legacy_trend(rows, "predicted_sat_math"), legacy_trend(rows, "predicted_sat_rw")
+
+
+def legacy_overall_velocity(snapshots):
+    if len(snapshots) < 2:
+        return 0.0
+    ordered = sorted(snapshots, key=lambda x: x["created_at"])
+    weeks = (_parse(ordered[-1]["created_at"]) - _parse(ordered[0]["created_at"])).days / 7.0
+    if weeks <= 0:
+        return 0.0
+    return round((_total(ordered[-1]) - _total(ordered[0])) / weeks, 1)
+
+
+def legacy_consistency(snapshots):
+    if len(snapshots) < 3:
+        return 50.0
+    ordered = sorted(snapshots, key=lambda x: x["created_at"])
+    velocities = []
+    for prev, curr in zip(ordered, ordered[1:]):
+        weeks = (_parse(curr["created_at"]) - _parse(prev["created_at"])).days / 7.0
+        if weeks > 0:
+            velocities.append((_total(curr) - _total(prev)) / weeks)
+    if not velocities:
+        return 50.0
+    return max(0, 100 - statistics.stdev(velocities) * 10) if len(velocities) > 1 else 75.0
+
+
+def legacy_velocity_trend(snapshots):
+    if len(snapshots) < 2:
+        return []
+    weekly = {}
+    for snapshot in snapshots:
+        weekly.setdefault(_parse(snapshot["created_at"]).strftime("%Y-W%U"), []).append(snapshot)
+    weeks = sorted(weekly)
+    trend = []
+    for prev, curr in zip(weeks, weeks[1:]):
+        prev_total = _total(max(weekly[prev], key=lambda x: x["created_at"]))
+        curr_total = _total(max(weekly[curr], key=lambda x: x["created_at"]))
+        trend.append({"week": curr, "velocity": round(curr_total - prev_total, 1), "total_score": curr_total})
+    return trend[-4:]
+
+
+def legacy_acceleration(snapshots):
+    if len(snapshots) < 4:
+        return 1.0
+    mid = len(snapshots) // 2
+    recent, previous = legacy_overall_velocity(snapshots[:mid]), legacy_overall_velocity(snapshots[mid:])
+    if previous == 0:
+        return 1.0
+    return round(recent / previous, 2)
+
+
+def legacy_velocity(db, user_id):
+    rows = db.table("user_performance_snapshots").select("*").eq("user_id", user_id).order(
+        "created_at", desc=True).limit(20).execute().data
+    return (legacy_overall_velocity(rows), round(legacy_consistency(rows), 6),
+            legacy_velocity_trend(rows), legacy_acceleration(rows))
+
+
+# ----------------------------------------------------------------------
+# Series-backed implementations
+# ----------------------------------------------------------------------
+
+async def series_growth_curve(db, user_id, days_back, loader=None):
+    return await AnalyticsService(db, loader).get_growth_curve(user_id, days_back=days_back)
+
+
+async def series_prediction_trends(db, user_id, loader=None):
+    service = PredictionService(db, loader)
+    snapshots = await service._get_snapshots_last_90_days(user_id)
+    return service._calculate_trend(snapshots, "math"), service._calculate_trend(snapshots, "rw")
+
+
+async def series_velocity(db, user_id, loader=None):
+    service = VelocityService(db, loader)
+    snapshots = await service._get_performance_snapshots(user_id)
+    return (service._calculate_overall_velocity(snapshots), round(service._calculate_velocity_consistency(snapshots), 6),
+            service._calculate_velocity_trend(snapshots), service._calculate_acceleration(snapshots))
+
+
+async def timed(call, repeat: int):
+    timings, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = await call()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), result
+
+
+def uncapped(db: FakeSupabase, legacy, *args):
+    """Run a previous implementation without the row cap, as the reference result"""
+    max_rows, db.max_rows = db.max_rows, None
+    try:
+        return legacy(db, *args)
+    finally:
+        db.max_rows = max_rows
+
+
+def same_growth(old, new):
+    if len(old) != len(new):
+        return False
+    for a, b in zip(old, new):
+        if {k: v for k, v in a.items() if k != "mastery"} != {k: v for k, v in b.items() if k != "mastery"}:
+            return False
+        if ("mastery" in a) != ("mastery" in b) or abs(a.get("mastery", 0) - b.get("mastery", 0)) > 1e-9:
+            return False
+    return True
+
+
+async def main_async(args):
+    db = FakeSupabase(latency_ms=args.latency_ms)
+    seed(db, random.Random(args.seed), args.snapshots)
+    repeat = args.repeat
+
+    print(f"{args.snapshots} snapshots over 400 days, {args.latency_ms:.0f}ms per query, median of {repeat}")
+    print(f"{'endpoint':<18}{'before':>10}{'cold':>10}{'warm':>10}")
+
+    cases = [
+        ("growth curve", lambda: asyncio.sleep(0, uncapped(db, legacy_growth_curve, USER_ID, 365)),
+         lambda: series_growth_curve(db, USER_ID, 365), same_growth),
+        ("predictions", lambda: asyncio.sleep(0, uncapped(db, legacy_prediction_trends, USER_ID)),
+         lambda: series_prediction_trends(db, USER_ID), lambda a, b: a == b),
+        ("velocity", lambda: asyncio.sleep(0, uncapped(db, legacy_velocity, USER_ID)),
+         lambda: series_velocity(db, USER_ID), lambda a, b: a == b),
+    ]
+    mismatches = []
+    for label, before, after, same in cases:
+        before_ms, old = await timed(before, repeat)
+        cold_ms = 0.0
+        for _ in range(repeat):
+            snapshot_series.clear_snapshot_series_cache()
+            ms, new = await timed(after, 1)
+            cold_ms += ms / repeat
+        warm_ms, warm = await timed(after, repeat)
+        print(f"{label:<18}{before_ms:>8.1f}ms{cold_ms:>8.1f}ms{warm_ms:>8.1f}ms")
+        if not (same(old, new) and same(old, warm)):
+            mismatches.append(label)
+
+    # All three in one request, sharing a loader
+    async def all_three():
+        loader = RequestLoader(db)
+        await series_growth_curve(db, USER_ID, 365, loader)
+        await series_prediction_trends(db, USER_ID, loader)
+        await series_velocity(db, USER_ID, loader)
+
+    db.round_trips = 0
+    shared_ms, _ = await timed(all_three, repeat)
+    print(f"{'all three, shared':<18}{'':>10}{'':>10}{shared_ms:>8.1f}ms  ({db.round_trips / repeat:.0f} query per request)")
+
+    if mismatches:
+        print(f"MISMATCH: {', '.join(mismatches)} differ from the previous implementation")
+        sys.exit(1)
+    print("Series-backed results match the previous implementation")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--snapshots", type=int, default=2000)
+    parser.add_argument("--latency-ms", type=float, default=15.0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=9)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Measure peak RSS while uploading a large file to storage:
+whole-file `bucket.upload()` (previous behaviour) vs. chunked resumable
+uploads from app/services/storage_upload.py.
+
+Runs against an in-process stand-in for Supabase Storage that implements
+the object upload endpoint and the TUS resumable endpoints, discarding the
+bytes it receives. Each upload runs in a fresh child process so its peak
+RSS (ru_maxrss) is measured in isolation.
+
+Usage:
+    python scripts/benchmark_storage_upload.py --size-mb 100
+"""
+
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+FAKE_KEY = "bench.bench.bench"  # Passes supabase-py's JWT shape check
+
+
+class StorageStandIn(BaseHTTPRequestHandler):
+    """Minimal Supabase Storage stand-in: accepts and discards uploads"""
+
+    uploads = {}
+
+    def log_message(self, format, *args):
+        pass
+
+    def _drain_body(self) -> int:
+        remaining = int(self.headers.get("Content-Length", 0))
+        received = 0
+        while remaining:
+            data = self.rfile.read(min(remaining, 64 * 1024))
+            if not data:
+                break
+            received += len(data)
+            remaining -= len(data)
+        return received
+
+    def do_POST(self):
+        self._drain_body()
+        if self.path.startswith("/storage/v1/upload/resumable"):
+            upload_id = uuid.uuid4().hex
+            self.uploads[upload_id] = 0
+            self.send_response(201)
+            self.send_header("Location", f"/storage/v1/upload/resumable/{upload_id}")
+            self.send_header("Tus-Resumable", "1.0.0")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+        else:
+            body = b'{"Key": "bench"}'
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    def do_PATCH(self):
+        upload_id = self.path.rsplit("/", 1)[-1]
+        self.uploads[upload_id] += self._drain_body()
+        self.send_response(204)
+        self.send_header("Upload-Offset", str(self.uploads[upload_id]))
+        self.send_header("Tus-Resumable", "1.0.0")
+        self.end_headers()
+
+    def do_HEAD(self):
+        upload_id = self.path.rsplit("/", 1)[-1]
+        self.send_response(200)
+        self.send_header("Upload-Offset", str(self.uploads.get(upload_id, 0)))
+        self.send_header("Tus-Resumable", "1.0.0")
+        self.end_headers()
+
+
+def child_upload(mode: str, url: str, path: Path) -> None:
+    """Run one upload and print this process's peak RSS in MB"""
+    if mode == "whole-file":
+        from supabase import create_client
+
+        bucket = create_client(url, FAKE_KEY).storage.from_("manim-videos")
+        with open(path, "rb") as f:
+            content = f.read()
+        bucket.upload("bench/video.mp4", content, {"content-type": "video/mp4"})
+    else:
+        from app.services.storage_upload import upload_file
+
+        upload_file(
+            path,
+            supabase_url=url,
+            api_key=FAKE_KEY,
+            bucket="manim-videos",
+            object_name="bench/video.mp4",
+            content_type="video/mp4",
+        )
+
+    print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=int, default=100)
+    parser.add_argument("--child", choices=["whole-file", "resumable"], help=argparse.SUPPRESS)
+    parser.add_argument("--url", help=argparse.SUPPRESS)
+    parser.add_argument("--file", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child_upload(args.child, args.url, Path(args.file))
+        return
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StorageStandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    fd, file_path = tempfile.mkstemp(suffix=".mp4")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            block = os.urandom(1024 * 1024)
+            for _ in range(args.size_mb):
+                f.write(block)
+
+        print(f"Uploading a {args.size_mb}MB file to a local storage stand-in at {url}\n")
+        for mode in ("whole-file", "resumable"):
+            start = time.perf_counter()
+            result = subprocess.run(
+                [sys.executable, __file__, "--child", mode, "--url", url, "--file", file_path],
+                capture_output=True,
+                text=True,
+            )
+            elapsed = time.perf_counter() - start
+            if result.returncode != 0:
+                print(f"{mode:<11} failed: {result.stderr.strip()[-500:]}")
+                continue
+            peak_rss = float(result.stdout.strip().splitlines()[-1])
+            print(f"{mode:<11} peak RSS={peak_rss:.1f}MB wall={elapsed:.2f}s")
+    finally:
+        server.shutdown()
+        os.unlink(file_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+Measure vocabulary adds and searches: an ILIKE existence check then an
+insert per add, and word ILIKE '%term%' with an exact count per search
+(previous behaviour) vs. one INSERT ... ON CONFLICT DO NOTHING on the unique
+(user_id, word_norm) index and prefix searches on the same index with an
+estimated count (migration 044).
+
+Index latency is measured in SQLite on a user with --words words and a
+popular list of the same size, with each migration's indexes: ILIKE becomes
+SQLite's case-insensitive LIKE, which like ILIKE cannot use the lower(word)
+index, and word_norm LIKE 'prefix%' becomes the range scan Postgres plans for
+it with text_pattern_ops. PostgREST's estimated count is exact up to its
+max-rows setting (1000 here) and the planner's estimate beyond it, so only
+that many matches are counted.
+
+The routes run against an in-memory Supabase stand-in that adds a fixed
+latency to every request: requests per add, concurrent adds of the same
+word (exactly one succeeds, the others get 409) and a bulk import of a word
+list vs. adding the words one at a time.
+
+Usage:
+    python scripts/benchmark_vocabulary.py --words 100000 --latency-ms 10
+"""
+
+import argparse
+import asyncio
+import bisect
+import os
+import random
+import sqlite3
+import statistics
+import string
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fastapi import HTTPException
+
+from fake_supabase import FakeSupabase
+from app.api.vocabulary import (
+    AddVocabManualRequest,
+    BulkAddVocabRequest,
+    BulkVocabWord,
+    add_vocab_bulk,
+    add_vocab_manually,
+    get_user_vocabulary,
+)
+
+USER_ID = "00000000-0000-0000-0000-0000000000a1"
+MAX_ROWS = 1000
+
+LEGACY_SCHEMA = """
+CREATE TABLE vocabulary_words (
+    id INTEGER PRIMARY KEY, user_id TEXT NOT NULL, word TEXT NOT NULL,
+    definition TEXT NOT NULL, created_at TEXT NOT NULL
+);
+CREATE INDEX idx_vocabulary_words_user ON vocabulary_words(user_id);
+CREATE UNIQUE INDEX idx_vocabulary_words_user_word_unique ON vocabulary_words(user_id, lower(word));
+CREATE TABLE popular_sat_vocab (id INTEGER PRIMARY KEY, word TEXT NOT NULL UNIQUE, frequency_rank INTEGER NOT NULL);
+CREATE INDEX idx_popular_vocab_rank ON popular_sat_vocab(frequency_rank);
+"""
+
+NORM_SCHEMA = """
+CREATE TABLE vocabulary_words (
+    id INTEGER PRIMARY KEY, user_id TEXT NOT NULL, word TEXT NOT NULL,
+    definition TEXT NOT NULL, created_at TEXT NOT NULL,
+    word_norm TEXT GENERATED ALWAYS AS (lower(trim(word))) STORED
+);
+CREATE INDEX idx_vocabulary_words_user ON vocabulary_words(user_id);
+CREATE UNIQUE INDEX idx_vocabulary_words_user_word_norm ON vocabulary_words(user_id, word_norm);
+CREATE TABLE popular_sat_vocab (
+    id INTEGER PRIMARY KEY, word TEXT NOT NULL UNIQUE, frequency_rank INTEGER NOT NULL,
+    word_norm TEXT GENERATED ALWAYS AS (lower(trim(word))) STORED
+);
+CREATE INDEX idx_popular_vocab_rank ON popular_sat_vocab(frequency_rank);
+CREATE INDEX idx_popular_vocab_word_norm ON popular_sat_vocab(word_norm);
+"""
+
+
+def make_words(rng, count):
+    """Distinct word-like strings"""
+    words = set()
+    while len(words) < count:
+        words.add("".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(5, 12))))
+    return sorted(words, key=lambda _: rng.random())
+
+
+def open_database(schema, words):
+    conn = sqlite3.connect(":memory:")
+    conn.executescript(schema)
+    conn.executemany(
+        "INSERT INTO vocabulary_words (user_id, word, definition, created_at) VALUES (?, ?, 'd', ?)",
+        [(USER_ID, w, f"2025-01-01T00:{i // 60 % 60:02d}:{i % 60:02d}.{i:06d}") for i, w in enumerate(words)]
+    )
+    conn.executemany(
+        "INSERT INTO popular_sat_vocab (word, frequency_rank) VALUES (?, ?)",
+        [(w, i) for i, w in enumerate(words)]
+    )
+    conn.execute("ANALYZE")
+    return conn
+
+
+def prefix_range(prefix):
+    return prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def legacy_add(conn, word):
+    if conn.execute("SELECT id FROM vocabulary_words WHERE user_id = ? AND word LIKE ?", (USER_ID, word)).fetchall():
+        return False
+    conn.execute(
+        "INSERT INTO vocabulary_words (user_id, word, definition, created_at) VALUES (?, ?, 'd', '2026')",
+        (USER_ID, word)
+    )
+    return True
+
+
+def norm_add(conn, word):
+    return bool(conn.execute(
+        "INSERT INTO vocabulary_words (user_id, word, definition, created_at) VALUES (?, ?, 'd', '2026') "
+        "ON CONFLICT (user_id, word_norm) DO NOTHING RETURNING id",
+        (USER_ID, word)
+    ).fetchall())
+
+
+def legacy_search(conn, term):
+    where = "user_id = ? AND word LIKE ?"
+    params = (USER_ID, f"%{term}%")
+    rows = conn.execute(f"SELECT * FROM vocabulary_words WHERE {where} ORDER BY created_at DESC LIMIT 50", params).fetchall()
+    total = conn.execute(f"SELECT count(*) FROM vocabulary_words WHERE {where}", params).fetchone()[0]
+    return rows, total
+
+
+def norm_search(conn, term):
+    where = "user_id = ? AND word_norm >= ? AND word_norm < ?"
+    params = (USER_ID, *prefix_range(term))
+    rows = conn.execute(f"SELECT * FROM vocabulary_words WHERE {where} ORDER BY created_at DESC LIMIT 50", params).fetchall()
+    total = conn.execute(f"SELECT count(*) FROM (SELECT 1 FROM vocabulary_words WHERE {where} LIMIT {MAX_ROWS + 1})", params).fetchone()[0]
+    return rows, total
+
+
+def legacy_popular(conn, term):
+    params = (f"%{term}%",)
+    rows = conn.execute("SELECT * FROM popular_sat_vocab WHERE word LIKE ? ORDER BY frequency_rank LIMIT 30", params).fetchall()
+    total = conn.execute("SELECT count(*) FROM popular_sat_vocab WHERE word LIKE ?", params).fetchone()[0]
+    return rows, total
+
+
+def norm_popular(conn, term):
+    params = prefix_range(term)
+    where = "word_norm >= ? AND word_norm < ?"
+    rows = conn.execute(f"SELECT * FROM popular_sat_vocab WHERE {where} ORDER BY frequency_rank LIMIT 30", params).fetchall()
+    total = conn.execute(f"SELECT count(*) FROM (SELECT 1 FROM popular_sat_vocab WHERE {where} LIMIT {MAX_ROWS + 1})", params).fetchone()[0]
+    return rows, total
+
+
+def timed(fn, conn, inputs):
+    times, results = [], []
+    for value in inputs:
+        start = time.perf_counter()
+        results.append(fn(conn, value))
+        times.append((time.perf_counter() - start) * 1000)
+    return times, results
+
+
+def report(label, times):
+    times = sorted(times)
+    print(f"  {label:<38} p50={statistics.median(times):7.2f}ms  p95={times[int(len(times) * 0.95)]:7.2f}ms")
+
+
+def measure_indexes(rng, count, samples):
+    words = make_words(rng, count)
+    print(f"== SQLite, {count} words in one user's list and in the popular list")
+    legacy, norm = open_database(LEGACY_SCHEMA, words), open_database(NORM_SCHEMA, words)
+    ok = True
+
+    # Half new words, half already saved (in another case)
+    new_words = make_words(random.Random(11), samples)
+    adds = [w if i % 2 else rng.choice(words).upper() for i, w in enumerate(new_words)]
+    legacy_times, legacy_added = timed(legacy_add, legacy, adds)
+    norm_times, norm_added = timed(norm_add, norm, adds)
+    report("add: ILIKE check + insert", legacy_times)
+    report("add: insert on conflict do nothing", norm_times)
+    ok &= legacy_added == norm_added
+
+    # Prefixes of saved words as they are typed
+    terms = [w[:rng.randint(1, 5)] for w in rng.sample(words, samples)]
+    saved = sorted(words + [w for w, added in zip(adds, norm_added) if added])
+    searches = (("my words", legacy_search, norm_search, saved), ("popular", legacy_popular, norm_popular, sorted(words)))
+    for label, old, new, ordered in searches:
+        legacy_times, _ = timed(old, legacy, terms)
+        norm_times, results = timed(new, norm, terms)
+        report(f"search {label}: ILIKE + exact count", legacy_times)
+        report(f"search {label}: prefix + estimated", norm_times)
+        for term, (rows, total) in zip(terms, results):
+            matching = bisect.bisect_left(ordered, prefix_range(term)[1]) - bisect.bisect_left(ordered, term)
+            ok &= total == min(matching, MAX_ROWS + 1) and len(rows) == min(matching, 30 if label == "popular" else 50)
+    return ok
+
+
+def fake_database(latency_ms):
+    db = FakeSupabase(latency_ms=latency_ms)
+    now = datetime.now(timezone.utc).isoformat()
+    db.generated["vocabulary_words"] = lambda row: {
+        "word_norm": " ".join(row["word"].split()).lower(),
+        # Column defaults
+        "created_at": row.get("created_at") or now,
+        "updated_at": row.get("updated_at") or now,
+    }
+    return db
+
+
+def legacy_route_add(db, word):
+    """The previous add_vocab_manually: ILIKE existence check, then insert"""
+    existing = db.table("vocabulary_words").select("id").eq("user_id", USER_ID).ilike("word", word).execute()
+    if existing.data:
+        raise HTTPException(status_code=409, detail="exists")
+    return db.table("vocabulary_words").insert({
+        "user_id": USER_ID, "word": word.strip().lower(), "definition": "d",
+        "source": "manual", "is_mastered": False
+    }).execute().data[0]
+
+
+def new_route_add(db, word):
+    request = AddVocabManualRequest(word=word, definition="d")
+    return asyncio.run(add_vocab_manually(request, user_id=USER_ID, db=db))
+
+
+def concurrent_adds(add, db, word, threads):
+    statuses = []
+
+    def run():
+        try:
+            add(db, word)
+            statuses.append(200)
+        except HTTPException as e:
+            statuses.append(e.status_code)
+
+    workers = [threading.Thread(target=run) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    rows = sum(1 for r in db.tables["vocabulary_words"] if r["word"] == word)
+    return sorted(statuses), rows
+
+
+def measure_routes(rng, latency_ms, list_size):
+    print(f"== Routes against the stand-in, {latency_ms:.0f}ms per request")
+    ok = True
+
+    for label, add in (("ILIKE check + insert", legacy_route_add), ("single upsert", new_route_add)):
+        db = fake_database(latency_ms)
+        start = time.perf_counter()
+        for word in make_words(random.Random(3), 50):
+            add(db, word)
+        elapsed = (time.perf_counter() - start) / 50
+        requests = db.round_trips / 50
+        # The stand-in has no unique index on inserts: duplicates show as extra rows
+        # (a unique violation, so a 500, in Postgres)
+        statuses, rows = concurrent_adds(add, db, "ephemeral", 8)
+        print(
+            f"  add, {label:<22} {requests:4.1f} requests  {elapsed * 1000:5.1f}ms   "
+            f"8 concurrent adds: {statuses.count(200)} added, {statuses.count(409)} conflicts, {rows} rows"
+        )
+        if add is new_route_add:
+            ok &= statuses.count(200) == 1 and statuses.count(409) == 7 and rows == 1
+
+    # A word list: a tenth already saved, a tenth without definitions (half on the popular list)
+    words = make_words(rng, list_size)
+    db = fake_database(latency_ms)
+    saved = set(words[:list_size // 10])
+    for word in saved:
+        db.table("vocabulary_words").insert({"user_id": USER_ID, "word": word, "definition": "d", "source": "manual", "is_mastered": False}).execute()
+    undefined = set(words[list_size // 10:list_size // 5])
+    popular = set(sorted(undefined)[::2])
+    db.tables["popular_sat_vocab"] = [
+        {"id": str(uuid.uuid4()), "word": w, "word_norm": w, "definition": "p", "example_usage": None}
+        for w in popular
+    ]
+    request = BulkAddVocabRequest(words=[
+        BulkVocabWord(word=w.upper(), definition=None if w in undefined else "d") for w in words
+    ])
+
+    db.round_trips = 0
+    start = time.perf_counter()
+    result = asyncio.run(add_vocab_bulk(request, user_id=USER_ID, db=db))
+    elapsed = time.perf_counter() - start
+    print(
+        f"  bulk import of {list_size} words     {db.round_trips} requests  {elapsed * 1000:5.0f}ms   "
+        f"added={len(result.added)} already_saved={len(result.already_saved)} missing_definition={len(result.missing_definition)}"
+    )
+    print(f"  (one at a time: {2 * list_size} requests, ~{2 * list_size * latency_ms / 1000:.0f}s before)")
+    ok &= set(result.already_saved) == saved
+    ok &= set(result.missing_definition) == undefined - popular
+    ok &= len(result.added) == list_size - len(saved) - len(undefined - popular)
+    ok &= len(db.tables["vocabulary_words"]) == list_size - len(undefined - popular)
+
+    listing = asyncio.run(get_user_vocabulary(
+        user_id=USER_ID, db=db, mastered=None, source=None, search=words[0][:2].upper(), limit=50, offset=0
+    ))
+    ok &= all(w.word.startswith(words[0][:2]) for w in listing.words) and listing.total >= 1
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--words", type=int, default=100000)
+    parser.add_argument("--samples", type=int, default=200)
+    parser.add_argument("--list-size", type=int, default=1000)
+    parser.add_argument("--latency-ms", type=float, default=10.0)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    ok = measure_indexes(rng, args.words, args.samples)
+    ok &= measure_routes(rng, args.latency_ms, args.list_size)
+    print("✅ Adds, conflicts, bulk import and searches are correct" if ok else "❌ Vocabulary results differ")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Regenerate app/data/scoring_tables.json and report how well the tables fit.
+
+Item parameters come from the question bank (calibrated values from
+question_difficulty_params, E/M/H label defaults otherwise). With --offline a
+synthetic bank is used instead, so tables can be built without a database.
+
+The fit report simulates full mock exam sections (random forms per simulee,
+module-1 routing, module 2 on the chosen route) and compares table scores
+with the scaled score of each simulee's true ability, next to the previous
+linear 200 + 600 * raw / total conversion.
+
+Usage:
+    python scripts/build_scoring_tables.py
+    python scripts/build_scoring_tables.py --offline
+    python scripts/build_scoring_tables.py --check-only --simulees 50000
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.adaptive_testing import DEFAULT_DISCRIMINATION, LABEL_DIFFICULTY
+from app.services.mock_exam_service import MockExamService
+from app.services.scoring_tables import (
+    ROUTES,
+    SECTIONS,
+    TABLES_PATH,
+    ScoringTables,
+    build_tables,
+    item_probabilities,
+    label_pools,
+    scale_theta,
+    simulate_section,
+)
+
+
+def load_pools(offline, rng):
+    """(a, b) arrays per E/M/H label for each section"""
+    pools = {}
+    for section in SECTIONS:
+        if offline:
+            labels = np.repeat(["E", "M", "H"], 300)
+            a = np.clip(rng.lognormal(0.0, 0.25, len(labels)), 0.3, 2.5)
+            b = np.clip(rng.normal([LABEL_DIFFICULTY[l] for l in labels], 0.5), -3, 3)
+        else:
+            from app.db import get_service_client
+            from app.services.adaptive_testing import get_item_index
+
+            index = get_item_index(get_service_client(), section)
+            labels, a, b = index.labels, index.discrimination, index.difficulty
+
+        pools[section] = label_pools(labels, a, b)
+        for label, center in LABEL_DIFFICULTY.items():
+            pools[section].setdefault(label, (np.array([DEFAULT_DISCRIMINATION]), np.array([center])))
+    return pools
+
+
+def write_tables(document):
+    text = json.dumps(document, indent=2)
+    # One line per array
+    text = re.sub(r"\[\s+([^\[\]{}]+?)\s+\]", lambda m: "[" + re.sub(r"\s+", " ", m.group(1)) + "]", text)
+    TABLES_PATH.parent.mkdir(parents=True, exist_ok=True)
+    TABLES_PATH.write_text(text + "\n")
+
+
+def report(tables, pools, distributions, route_for, simulees, rng):
+    n = tables.questions_per_module
+    for section in SECTIONS:
+        for route in ROUTES:
+            table = tables.raw_scores[(section, route)]
+            if any(later < earlier for earlier, later in zip(table, table[1:])):
+                print(f"❌ {section}/{route} table is not monotonic")
+
+        theta = rng.normal(0.0, 1.0, simulees)
+        result = simulate_section(tables, section, pools[section], distributions, route_for, theta, rng)
+        target = scale_theta(theta)
+        linear = (np.round((200 + 600 * result["raw"] / (2 * n)) / 10) * 10).clip(200, 800)
+
+        def fit(scores):
+            error = scores - target
+            return (
+                f"RMSE={np.sqrt((error ** 2).mean()):5.1f} bias={error.mean():+5.1f} "
+                f"within ±50={np.mean(np.abs(error) <= 50):.0%}"
+            )
+
+        shares = " ".join(f"{route}={np.mean(result['route'] == route):.0%}" for route in ROUTES)
+        print(f"{section}: routes {shares}")
+        print(f"  equated tables  {fit(result['score'])}")
+        print(f"  linear raw map  {fit(linear)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--offline", action="store_true", help="Use a synthetic item bank")
+    parser.add_argument("--check-only", action="store_true", help="Report on the current tables without rebuilding")
+    parser.add_argument("--simulees", type=int, default=20000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(7)
+    pools = load_pools(args.offline, rng)
+    distributions = {
+        "module_1": MockExamService.MEDIUM_DISTRIBUTION,
+        "easy": MockExamService.EASY_DISTRIBUTION,
+        "medium": MockExamService.MEDIUM_DISTRIBUTION,
+        "hard": MockExamService.HARD_DISTRIBUTION,
+    }
+    route_for = MockExamService(None)._next_module_difficulty
+    n = MockExamService.QUESTIONS_PER_MODULE
+
+    if args.check_only:
+        tables = ScoringTables(json.loads(TABLES_PATH.read_text()))
+    else:
+        label_probs = {
+            section: {label: item_probabilities(a, b).mean(axis=0) for label, (a, b) in section_pools.items()}
+            for section, section_pools in pools.items()
+        }
+        document = build_tables(
+            label_probs, distributions, route_for, n,
+            source="synthetic item bank" if args.offline else "question bank",
+        )
+        write_tables(document)
+        tables = ScoringTables(document)
+        print(f"✅ Wrote {TABLES_PATH}")
+
+    report(tables, pools, distributions, route_for, args.simulees, rng)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Calibrate 2PL IRT parameters into question_difficulty_params.
+
+Streams every scored response (practice sessions, mock exams, diagnostics),
+re-estimates items that received new responses since their last calibration
+and upserts them. Run from cron, or pass --enqueue to hand the work to the
+job workers (python -m app.worker) instead.
+
+Usage:
+    python scripts/calibrate_irt.py
+    python scripts/calibrate_irt.py --full
+    python scripts/calibrate_irt.py --enqueue
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.config import get_settings
+from app.db import get_service_client
+from app.services.irt_calibration_service import IRTCalibrationService
+from app.services.job_queue import JobQueue
+from app.services.job_handlers import IRT_CALIBRATE
+
+
+def main():
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--full", action="store_true", help="Re-estimate every item")
+    parser.add_argument("--min-responses", type=int, default=settings.irt_min_responses,
+                        help="Responses needed to mark an item calibrated")
+    parser.add_argument("--max-iter", type=int, default=50)
+    parser.add_argument("--enqueue", action="store_true", help="Queue a job for the workers instead")
+    args = parser.parse_args()
+
+    db = get_service_client()
+
+    if args.enqueue:
+        job = JobQueue(db).enqueue(
+            IRT_CALIBRATE, {"full": args.full, "min_responses": args.min_responses}, max_attempts=2
+        )
+        print(f"✅ Queued calibration job {job['id']}")
+        return
+
+    summary = asyncio.run(
+        IRTCalibrationService(db).calibrate(
+            full=args.full, min_responses=args.min_responses, max_iter=args.max_iter
+        )
+    )
+    print(
+        f"✅ {summary['items_updated']} of {summary['items']} items updated "
+        f"({summary['items_calibrated']} calibrated) from {summary['responses']} responses "
+        f"by {summary['users']} students"
+    )
+    print(
+        f"   load {summary['load_seconds']}s, fit {summary['fit_seconds']}s "
+        f"in {summary['iterations']} iterations"
+    )
+
+
+if __name__ == "__main__":
+    main()
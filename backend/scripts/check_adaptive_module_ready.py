@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Check that module 2 is ready as soon as module 1's completion call returns.
+
+Signs in as a test user, creates an exam, starts RW module 1 (which prepares
+module-2 candidates), answers it to land in the requested tier, completes it
+and immediately counts module 2's questions, after checking that the user
+can't commit module 2 through the RPC themselves. The exam is deleted afterwards.
+
+Usage:
+    python scripts/check_adaptive_module_ready.py --email test@example.com --password secret --correct 20
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from supabase import create_client
+
+from app.config import get_settings
+from app.services.mock_exam_service import MockExamService
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--correct", type=int, default=20, help="Module 1 questions to mark correct")
+    args = parser.parse_args()
+
+    settings = get_settings()
+    client = create_client(settings.supabase_url, settings.supabase_anon_key)
+    session = client.auth.sign_in_with_password({"email": args.email, "password": args.password})
+    client.postgrest.auth(session.session.access_token)
+    user_id = session.user.id
+
+    service = MockExamService(client)
+    exam = await service.create_mock_exam(user_id=user_id)
+    modules = {m["module_type"]: m for m in exam["modules"]}
+    module_1 = modules["rw_module_1"]
+    module_2 = modules["rw_module_2"]
+
+    try:
+        await service.start_module(module_1["id"], user_id)
+        missing = await service.prepare_next_module_candidates(module_1["id"], user_id)
+        print(f"Candidates prepared (assembled on demand: {missing or 'none'})")
+
+        questions = client.table("mock_exam_questions").select("id").eq(
+            "module_id", module_1["id"]
+        ).order("display_order").execute().data
+        for i, q in enumerate(questions):
+            client.table("mock_exam_questions").update(
+                {"is_correct": i < args.correct}
+            ).eq("id", q["id"]).execute()
+
+        # Users can't commit a tier of their choosing themselves
+        try:
+            client.rpc("commit_module_candidate", {"p_module_id": module_2["id"]}).execute()
+            user_commit_refused = False
+        except Exception as e:
+            user_commit_refused = "permission denied" in str(e)
+
+        expected = service._next_module_difficulty(args.correct)
+        start = time.perf_counter()
+        await service.complete_module(module_1["id"], user_id, finalize=False)
+        elapsed = (time.perf_counter() - start) * 1000
+
+        count = client.table("mock_exam_questions").select("id", count="exact").eq(
+            "module_id", module_2["id"]
+        ).execute().count
+        leftovers = client.table("mock_exam_module_candidates").select("id", count="exact").eq(
+            "module_id", module_2["id"]
+        ).execute().count
+
+        ok = count == service.QUESTIONS_PER_MODULE and leftovers == 0 and user_commit_refused
+        print(f"Completion returned in {elapsed:.0f}ms, expected tier: {expected}")
+        print(f"Module 2 questions: {count}, leftover candidates: {leftovers}, user commit refused: {user_commit_refused}")
+        print("✅ Module 2 ready" if ok else "❌ Module 2 not ready")
+        sys.exit(0 if ok else 1)
+    finally:
+        client.table("mock_exams").delete().eq("id", exam["exam"]["id"]).execute()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Correctness checks for the compiled answer matchers.
+
+Answer keys are produced the way the importer produces them, by running
+rationale text through scripts/import_questions.extract_answer_from_rationale,
+and each key is checked against entries that must and must not be accepted.
+Multiple-choice keys (labels and option ids) are checked against the previous
+exact-match rules.
+
+Usage:
+    python scripts/check_answer_matchers.py
+"""
+
+import argparse
+import os
+import sys
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# import_questions creates a client at import time; it is never used here
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "unused.unused.unused")
+
+from import_questions import extract_answer_from_rationale
+from app.services.answer_validation_service import AnswerValidationService, get_answer_matcher
+
+# (rationale, expected key, accepted entries, rejected entries)
+RATIONALE_CASES = [
+    (
+        "<p>The correct answer is 2.6. Subtracting 3 from both sides...</p>",
+        ["2.6"],
+        ["2.6", "2.60", "13/5", "26/10", " 2.6 "],
+        ["2.5", "2", "13/6", "2.6.1", "abc", ""],
+    ),
+    (
+        "<p>The correct answer is 28. The perimeter is...</p>",
+        ["28"],
+        ["28", "28.0", "56/2", "+28"],
+        ["27", "2.8", "28/10", "2.8e1"],
+    ),
+    (
+        "<p>The correct answer is .6. Note that 3/5 and 0.6 are also correct</p>",
+        [".6"],
+        [".6", "0.6", "3/5", "6/10", "0.60"],
+        [".06", "6", "5/3"],
+    ),
+    (
+        "<p>The correct answer is -1/2. The slope is...</p>",
+        ["-1/2"],
+        ["-1/2", "-.5", "-0.5", "−1/2", "-2/4"],
+        ["1/2", ".5", "-1/3"],
+    ),
+    (
+        "<p>The correct answer is 2/3. Either the fraction or its decimal...</p>",
+        ["2/3"],
+        ["2/3", "4/6", ".6666", ".6667", "0.666", "0.667"],
+        [".66", ".67", "0.66", "0.67", ".6", "0.7"],
+    ),
+    (
+        "<p>The correct answer is -2/3.</p>",
+        ["-2/3"],
+        ["-2/3", "-.6666", "-.6667", "-0.666", "-0.667"],
+        ["-.666", "-.667", "-0.67", "2/3"],
+    ),
+    (
+        "<p>The correct answer is either 0 or 3. Factoring gives...</p>",
+        ["0", "3."],  # the importer keeps the sentence's period on "either" keys
+        ["0", "3", "3.0", "0/5", "6/2"],
+        ["1", "-3", "03x"],
+    ),
+    (
+        "<p>The correct answer is either -1, 2, or 5.</p>",
+        ["-1", "2", "5."],
+        ["-1", "2", "5", "10/2", "-1.0"],
+        ["1", "-2", "0"],
+    ),
+    (
+        "<p>The correct answer is 1,000. Multiplying...</p>",
+        ["1,000"],
+        ["1000", "1,000", "1000.0"],
+        ["100", "1,00", "1.000"],
+    ),
+    (
+        "<p>The correct answer is 3. The value of x...</p>",
+        ["3"],
+        ["3", "3.", "9/3"],
+        ["3e0", "0x3", "30"],
+    ),
+]
+
+OPTION_A = "5e2f9d2c-1b7a-4f0e-9a1c-3d2b8e4f6a10"
+OPTION_B = "6a1c4e8f-2d3b-4c5a-8e7f-9b0a1c2d3e4f"
+
+# (correct_answer, acceptable_answers, accepted entries, rejected entries)
+CHOICE_CASES = [
+    (["A"], [OPTION_A], [["A"], ["a"], [OPTION_A], [OPTION_A.upper()]], [["B"], [OPTION_B], []]),
+    ([OPTION_A], None, [[OPTION_A]], [[OPTION_B], ["A"]]),
+    (["A", "C"], None, [["A", "C"], [" a ", "c"]], [["A"], ["C", "A"], ["C"]]),
+    ([], None, [[], None], [["A"]]),
+]
+
+
+def old_validate(user_answer, correct_answer, acceptable_answers):
+    """The exact-match rules in use before compiled matchers"""
+    def normalize(answers):
+        if not answers:
+            return []
+        if isinstance(answers, str):
+            return [answers.strip().lower()]
+        return [str(a).strip().lower() for a in answers]
+
+    user = normalize(user_answer)
+    acceptable = normalize(acceptable_answers)
+    return user == normalize(correct_answer) or (bool(acceptable) and bool(user) and user[0] in acceptable)
+
+
+def main():
+    argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    ).parse_args()
+
+    failures = []
+
+    def expect(key, acceptable, entry, expected):
+        result = get_answer_matcher(key, acceptable).matches(entry)
+        wrapper = AnswerValidationService.validate_answer(entry, key, acceptable)
+        if result != expected or wrapper != expected:
+            failures.append(f"key={key} acceptable={acceptable} entry={entry!r}: expected {expected}, got {result}")
+
+    checks = 0
+    for rationale, expected_key, accepted, rejected in RATIONALE_CASES:
+        key = extract_answer_from_rationale(rationale)
+        if key != expected_key:
+            failures.append(f"extract_answer_from_rationale({rationale!r}) = {key}, expected {expected_key}")
+            continue
+        for entry in accepted:
+            expect(key, None, [entry], True)
+            checks += 1
+        for entry in rejected:
+            expect(key, None, [entry], False)
+            checks += 1
+
+    for correct, acceptable, accepted, rejected in CHOICE_CASES:
+        for entry in accepted:
+            expect(correct, acceptable, entry, True)
+            checks += 1
+        for entry in rejected:
+            expect(correct, acceptable, entry, False)
+            checks += 1
+        # Multiple choice answers must be judged exactly as before
+        for entry in accepted + rejected:
+            if old_validate(entry, correct, acceptable) != get_answer_matcher(correct, acceptable).matches(entry):
+                failures.append(f"key={correct} entry={entry!r}: differs from exact-match rules")
+
+    if failures:
+        print(f"{len(failures)} of {checks} checks failed:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print(f"All {checks} answer matcher checks passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Check that per-request query counting survives sign-in on the shared client.
+
+supabase-py rebuilds its PostgREST client after SIGNED_IN / TOKEN_REFRESHED
+(app/api/auth.py signs users in on the shared client from get_db), which used
+to drop the counting hook so X-Query-Count read 0 from then on. Serves a stub
+of the auth and REST endpoints on localhost, counts queries through get_db()
+before and after a password sign-in, and after a token refresh.
+
+Usage:
+    python scripts/check_query_count.py
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+USER_ID = "00000000-0000-0000-0000-0000000000c1"
+# Unsigned JWT: header.payload.signature, as the clients only decode it
+TOKEN = "eyJhbGciOiJIUzI1NiJ9.eyJzdWIiOiIwMDAwMDAwMC0wMDAwLTAwMDAtMDAwMC0wMDAwMDAwMDAwYzEifQ.c2ln"
+
+
+class StubSupabase(BaseHTTPRequestHandler):
+    """GoTrue token endpoint and an empty PostgREST table"""
+
+    def _send(self, body):
+        data = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        self._send([])
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if self.path.startswith("/auth/v1/token"):
+            self._send({
+                "access_token": TOKEN,
+                "refresh_token": "refresh",
+                "token_type": "bearer",
+                "expires_in": 3600,
+                "expires_at": int(time.time()) + 3600,
+                "user": {
+                    "id": USER_ID,
+                    "aud": "authenticated",
+                    "role": "authenticated",
+                    "email": "student@example.com",
+                    "app_metadata": {},
+                    "user_metadata": {},
+                    "created_at": "2025-01-01T00:00:00Z",
+                },
+            })
+        else:
+            self._send([])
+
+    def log_message(self, *args):
+        pass
+
+
+def count_queries(get_db, n: int) -> int:
+    from app.core.query_count import start_counting, stop_counting
+
+    token = start_counting()
+    for _ in range(n):
+        get_db().table("users").select("id").execute()
+    return stop_counting(token)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubSupabase)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    os.environ["SUPABASE_URL"] = f"http://127.0.0.1:{server.server_port}"
+    os.environ["SUPABASE_ANON_KEY"] = TOKEN
+    os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", TOKEN)
+
+    from app.db import get_db
+
+    before = count_queries(get_db, 3)
+    client = get_db()
+    client.auth.sign_in_with_password({"email": "student@example.com", "password": "secret"})
+    after_sign_in = count_queries(get_db, 3)
+    client.auth.refresh_session()
+    after_refresh = count_queries(get_db, 3)
+    client.auth.sign_out()
+    server.shutdown()
+
+    print(f"queries counted: before sign-in={before}, after sign-in={after_sign_in}, after refresh={after_refresh}")
+    ok = before == after_sign_in == after_refresh == 3
+    print("✅ Query counting survives sign-in and token refresh" if ok else "❌ Queries went uncounted")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
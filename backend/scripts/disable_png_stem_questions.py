@@ -12,6 +12,7 @@ Usage:
     python scripts/disable_png_stem_questions.py --execute
 """
 
+import asyncio
 import os
 import sys
 from pathlib import Path
@@ -19,6 +20,11 @@ from supabase import create_client
 from dotenv import load_dotenv
 import argparse
 
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.question_bulk_update import QuestionBulkUpdater
+
 # Load environment variables
 load_dotenv('.env.local')
 
@@ -99,29 +105,21 @@ def disable_questions(question_ids, dry_run=True):
 
     print(f"\n🚫 Disabling {len(question_ids)} questions...")
 
-    success_count = 0
-    error_count = 0
-
-    for i, question_id in enumerate(question_ids, 1):
-        try:
-            supabase.table('questions').update({
-                'is_active': False
-            }).eq('id', question_id).execute()
+    def report(chunk):
+        if chunk['error']:
+            print(f"   ⚠️  Error disabling {chunk['requested']} questions: {chunk['error']}")
+        else:
+            print(f"   Progress: chunk {chunk['chunk'] + 1} disabled {chunk['updated']} questions")
 
-            success_count += 1
-
-            if i % 10 == 0:
-                print(f"   Progress: {i}/{len(question_ids)} questions disabled")
-
-        except Exception as e:
-            error_count += 1
-            print(f"   ⚠️  Error disabling question {question_id}: {e}")
+    summary = asyncio.run(
+        QuestionBulkUpdater(supabase, on_chunk=report).update_many(question_ids, {'is_active': False})
+    )
 
-    print(f"\n✅ Successfully disabled: {success_count}")
-    if error_count > 0:
-        print(f"❌ Errors: {error_count}")
+    print(f"\n✅ Successfully disabled: {summary['updated']}")
+    if summary['failed'] > 0:
+        print(f"❌ Errors: {summary['failed']}")
 
-    return success_count
+    return summary['updated']
 
 
 def main():
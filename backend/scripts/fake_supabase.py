@@ -0,0 +1,339 @@
+"""
+In-memory stand-in for the Supabase client, used by the benchmark scripts.
+
+Supports the subset of the postgrest query builder the services use on plain
+tables (select/eq/neq/gt/gte/in_/like/ilike/or_/order/limit/range, insert/update/
+upsert/delete, execute) and rpc() calls to functions registered in
+FakeSupabase.functions. Generated columns are computed by functions in
+FakeSupabase.generated on every write. Embedded resources such as "questions(topic_id)" are
+not resolved: seed rows with the nested dicts already in place. Filters on an
+embedded column ("study_plans.user_id") read the nested dict. Columns a table
+has been upserted on act as a unique index for later upserts and eq/in_
+lookups, so large tables aren't scanned per request. Like PostgREST's
+max-rows, a select returns at most `max_rows` rows (1000). Every execute()
+counts as one round trip and sleeps `latency_ms`, so timings reflect the
+number of requests a code path makes against a remote database; write
+statements are also counted.
+"""
+
+import copy
+import random
+import re
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+
+class FakeResponse:
+    def __init__(self, data: Any, count: Optional[int] = None):
+        self.data = data
+        self.count = count
+
+
+def _value(row: Dict, column: str) -> Any:
+    """A column, or an embedded resource's column ("study_plans.user_id")"""
+    for part in column.split("."):
+        row = row.get(part) if isinstance(row, dict) else None
+    return row
+
+
+def _like(pattern: str, case_sensitive: bool = False) -> "re.Pattern":
+    """ILIKE pattern (% or *, and _) as a case-insensitive regex; LIKE if case_sensitive"""
+    parts = [".*" if c in "%*" else "." if c == "_" else re.escape(c) for c in pattern]
+    return re.compile("".join(parts), re.DOTALL if case_sensitive else re.IGNORECASE | re.DOTALL)
+
+
+_COMPARISONS = {
+    "eq": lambda a, b: a == b,
+    "neq": lambda a, b: a != b,
+    "lt": lambda a, b: a is not None and a < b,
+    "lte": lambda a, b: a is not None and a <= b,
+    "gt": lambda a, b: a is not None and a > b,
+    "gte": lambda a, b: a is not None and a >= b,
+}
+
+
+def _split_terms(tree: str) -> List[str]:
+    """Split a logic tree's terms on top-level commas (outside parentheses and quotes)"""
+    terms, depth, quoted, escaped, current = [], 0, False, False, ""
+    for c in tree:
+        if escaped:
+            escaped = False
+        elif c == "\\":
+            escaped = True
+        elif c == '"':
+            quoted = not quoted
+        elif not quoted and c == "(":
+            depth += 1
+        elif not quoted and c == ")":
+            depth -= 1
+        elif not quoted and depth == 0 and c == ",":
+            terms.append(current)
+            current = ""
+            continue
+        current += c
+    return terms + [current]
+
+
+def _condition(term: str):
+    """Predicate for one term of an or=() tree: "col.op.value", "and(...)" or "or(...)" """
+    for name, combine in (("and(", all), ("or(", any)):
+        if term.startswith(name):
+            predicates = [_condition(t) for t in _split_terms(term[len(name):-1])]
+            return lambda row: combine(p(row) for p in predicates)
+
+    column, op, value = term.split(".", 2)
+    if value.startswith('"'):
+        value = re.sub(r"\\(.)", r"\1", value[1:-1])
+    if op == "ilike":
+        regex = _like(value)
+        return lambda row: isinstance(_value(row, column), str) and bool(regex.fullmatch(_value(row, column)))
+    if op == "is":
+        value = {"null": None, "true": True, "false": False}[value]
+        return lambda row: _value(row, column) is value
+    compare = _COMPARISONS[op]
+    return lambda row: compare(_value(row, column), value)
+
+
+class FakeQuery:
+    def __init__(self, db: "FakeSupabase", table: str):
+        self.db = db
+        self.table_name = table
+        self.op = "select"
+        self.payload: Any = None
+        self.on_conflict: Optional[str] = None
+        self.filters: List = []
+        self.lookups: Dict[str, set] = {}  # column -> values it must be one of (eq/in_)
+        self.want_count = False
+        self.returning = "representation"
+        self.ignore_duplicates = False
+        self.limit_n: Optional[int] = None
+        self.offset_n = 0
+        self.order_by: List[tuple] = []
+
+    # Query building
+    def select(self, columns: str = "*", count: Optional[str] = None):
+        self.want_count = count is not None
+        return self
+
+    def eq(self, column: str, value: Any):
+        self.filters.append(lambda row: _value(row, column) == value)
+        self.lookups.setdefault(column, {value})
+        return self
+
+    def neq(self, column: str, value: Any):
+        self.filters.append(lambda row: _value(row, column) != value)
+        return self
+
+    def gt(self, column: str, value: Any):
+        self.filters.append(lambda row: _value(row, column) is not None and _value(row, column) > value)
+        return self
+
+    def gte(self, column: str, value: Any):
+        self.filters.append(lambda row: _value(row, column) is not None and _value(row, column) >= value)
+        return self
+
+    def in_(self, column: str, values: List[Any]):
+        values = set(values)
+        self.filters.append(lambda row: _value(row, column) in values)
+        self.lookups.setdefault(column, values)
+        return self
+
+    def like(self, column: str, pattern: str):
+        regex = _like(pattern, case_sensitive=True)
+        self.filters.append(lambda row: isinstance(_value(row, column), str) and bool(regex.fullmatch(_value(row, column))))
+        return self
+
+    def ilike(self, column: str, pattern: str):
+        regex = _like(pattern)
+        self.filters.append(lambda row: isinstance(_value(row, column), str) and bool(regex.fullmatch(_value(row, column))))
+        return self
+
+    def or_(self, filters: str):
+        predicates = [_condition(t) for t in _split_terms(filters)]
+        self.filters.append(lambda row: any(p(row) for p in predicates))
+        return self
+
+    def order(self, column: str, desc: bool = False):
+        self.order_by.append((column, desc))
+        return self
+
+    def limit(self, n: int):
+        self.limit_n = n
+        return self
+
+    def range(self, start: int, end: int):
+        self.offset_n, self.limit_n = start, end - start + 1
+        return self
+
+    def insert(self, data):
+        self.op, self.payload = "insert", data
+        return self
+
+    def update(self, data, count: Optional[str] = None, returning: str = "representation"):
+        self.op, self.payload = "update", data
+        self.want_count, self.returning = count is not None, returning
+        return self
+
+    def upsert(
+        self,
+        data,
+        on_conflict: Optional[str] = None,
+        ignore_duplicates: bool = False,
+        count: Optional[str] = None,
+        returning: str = "representation",
+        **kwargs
+    ):
+        self.op, self.payload, self.on_conflict = "upsert", data, on_conflict
+        self.ignore_duplicates = ignore_duplicates
+        self.want_count, self.returning = count is not None, returning
+        return self
+
+    def delete(self):
+        self.op = "delete"
+        return self
+
+    # Execution
+    def _matches(self, row: Dict) -> bool:
+        return all(f(row) for f in self.filters)
+
+    def _generate(self, row: Dict) -> Dict:
+        generate = self.db.generated.get(self.table_name)
+        if generate:
+            row.update(generate(row))
+        return row
+
+    def execute(self) -> FakeResponse:
+        self.db.round_trips += 1
+        if self.db.latency_ms or self.db.jitter_ms:
+            jitter = random.expovariate(1 / self.db.jitter_ms) if self.db.jitter_ms else 0.0
+            time.sleep((self.db.latency_ms + jitter) / 1000)
+
+        # Statements from concurrent threads apply one at a time, as in a database
+        with self.db.lock:
+            return self._apply()
+
+    def _apply(self) -> FakeResponse:
+        rows = self.db.tables.setdefault(self.table_name, [])
+        if self.op != "select":
+            self.db.writes += 1
+
+        if self.op == "select":
+            # A column with a unique index (from an upsert on it) narrows the scan
+            column = next((c for c in self.lookups if (self.table_name, (c,)) in self.db.indexes), None)
+            if column is not None:
+                index = self.db._index(self.table_name, (column,))
+                candidates = [index[(v,)] for v in self.lookups[column] if (v,) in index]
+            else:
+                candidates = rows
+            result = [r for r in candidates if self._matches(r)]
+            # Stable sorts, last key first
+            for column, desc in reversed(self.order_by):
+                result.sort(key=lambda r: (r.get(column) is None, r.get(column)), reverse=desc)
+            # The count covers every matching row, not just the page
+            count = len(result) if self.want_count else None
+            # PostgREST's max-rows caps every select, limit or not
+            limit = self.limit_n
+            if self.db.max_rows is not None:
+                limit = self.db.max_rows if limit is None else min(limit, self.db.max_rows)
+            end = None if limit is None else self.offset_n + limit
+            return FakeResponse([copy.deepcopy(r) for r in result[self.offset_n:end]], count)
+
+        if self.op == "insert":
+            new_rows = self.payload if isinstance(self.payload, list) else [self.payload]
+            created = [self._generate({"id": str(uuid.uuid4()), **copy.deepcopy(r)}) for r in new_rows]
+            rows.extend(created)
+            return FakeResponse(created)
+
+        if self.op == "update":
+            # Key columns may change: indexes are rebuilt on next use
+            for key in [key for key in self.db.indexes if key[0] == self.table_name]:
+                del self.db.indexes[key]
+            updated = []
+            for row in rows:
+                if self._matches(row):
+                    row.update(copy.deepcopy(self.payload))
+                    self._generate(row)
+                    updated.append(copy.deepcopy(row))
+            count = len(updated) if self.want_count else None
+            return FakeResponse([] if self.returning == "minimal" else updated, count)
+
+        if self.op == "upsert":
+            keys = tuple((self.on_conflict or "id").split(","))
+            new_rows = self.payload if isinstance(self.payload, list) else [self.payload]
+            by_key = self.db._index(self.table_name, keys)
+            result = []
+            for new in new_rows:
+                new = self._generate(copy.deepcopy(new))
+                match = by_key.get(tuple(new.get(k) for k in keys))
+                if match is not None and self.ignore_duplicates:
+                    continue
+                if match is None:
+                    match = {"id": str(uuid.uuid4())}
+                    rows.append(match)
+                    by_key[tuple(new.get(k) for k in keys)] = match
+                match.update(copy.deepcopy(new))
+                result.append(copy.deepcopy(match))
+            self.db.indexes[(self.table_name, keys)] = (len(rows), by_key)
+            count = len(result) if self.want_count else None
+            return FakeResponse([] if self.returning == "minimal" else result, count)
+
+        if self.op == "delete":
+            kept = [r for r in rows if not self._matches(r)]
+            deleted = len(rows) - len(kept)
+            rows[:] = kept
+            return FakeResponse([None] * deleted)
+
+        raise ValueError(f"Unsupported operation {self.op}")
+
+
+class FakeRpc:
+    """A database function call; the function is a Python stand-in in FakeSupabase.functions"""
+
+    def __init__(self, db: "FakeSupabase", name: str, params: Optional[Dict]):
+        self.db = db
+        self.name = name
+        self.params = params or {}
+
+    def execute(self) -> FakeResponse:
+        self.db.round_trips += 1
+        if self.db.latency_ms:
+            time.sleep(self.db.latency_ms / 1000)
+        with self.db.lock:
+            return FakeResponse(self.db.functions[self.name](self.db, **self.params))
+
+
+class FakeSupabase:
+    """Dict-of-lists database with a fixed per-request latency"""
+
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, max_rows: Optional[int] = 1000):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms  # mean of an exponential extra delay, for tail latency
+        self.tables: Dict[str, List[Dict]] = {}
+        # Rows a select returns at most, as PostgREST's db-max-rows (None: no cap)
+        self.max_rows = max_rows
+        self.round_trips = 0
+        self.writes = 0  # insert/update/upsert/delete statements
+        self.lock = threading.Lock()
+        # (table, key columns) -> (row count when built, key -> row), the
+        # unique index an upsert conflicts on; rebuilt if the row count changed
+        self.indexes: Dict[tuple, tuple] = {}
+        # Database functions for rpc(): name -> fn(db, **params) returning rows
+        self.functions: Dict[str, Any] = {}
+        # Generated columns: table -> fn(row) returning the generated values
+        self.generated: Dict[str, Any] = {}
+
+    def table(self, name: str) -> FakeQuery:
+        return FakeQuery(self, name)
+
+    def rpc(self, name: str, params: Optional[Dict] = None) -> FakeRpc:
+        return FakeRpc(self, name, params)
+
+    def _index(self, table: str, keys: tuple) -> Dict[tuple, Dict]:
+        rows = self.tables.setdefault(table, [])
+        size, index = self.indexes.get((table, keys), (None, None))
+        if size != len(rows):
+            index = {tuple(r.get(k) for k in keys): r for r in rows}
+            self.indexes[(table, keys)] = (len(rows), index)
+        return index
@@ -11,6 +11,7 @@ Usage:
     python scripts/fix_and_disable_broken_questions.py --fix
 """
 
+import asyncio
 import json
 import re
 import sys
@@ -20,6 +21,11 @@ from supabase import create_client
 from dotenv import load_dotenv
 import argparse
 
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.question_bulk_update import QuestionBulkUpdater
+
 # Load environment variables
 load_dotenv('.env.local')
 
@@ -145,38 +151,25 @@ def fix_and_disable(dry_run=True):
         print("=" * 80)
 
         # Fix questions
+        def report(chunk):
+            if chunk['error']:
+                print(f"  ❌ Failed to update {chunk['requested']} questions: {chunk['error']}")
+
+        updater = QuestionBulkUpdater(supabase, on_chunk=report)
+
+        # Fix questions (questions with the same extracted answer share requests)
         if to_fix:
             print(f"\nFixing {len(to_fix)} questions...")
-            success_count = 0
-            for item in to_fix:
-                try:
-                    supabase.table('questions').update({
-                        'correct_answer': item['new_answer']
-                    }).eq('id', item['id']).execute()
-                    success_count += 1
-                    if success_count % 10 == 0:
-                        print(f"  Fixed {success_count}/{len(to_fix)}...")
-                except Exception as e:
-                    print(f"  ❌ Failed to fix {item['external_id']}: {e}")
-
-            print(f"✅ Fixed {success_count} questions!")
+            summary = asyncio.run(updater.update_each({
+                item['id']: {'correct_answer': item['new_answer']} for item in to_fix
+            }))
+            print(f"✅ Fixed {summary['updated']} questions!")
 
         # Disable unfixable questions
         if to_disable:
             print(f"\nDisabling {len(to_disable)} questions...")
-            success_count = 0
-            for item in to_disable:
-                try:
-                    supabase.table('questions').update({
-                        'is_active': False
-                    }).eq('id', item['id']).execute()
-                    success_count += 1
-                    if success_count % 10 == 0:
-                        print(f"  Disabled {success_count}/{len(to_disable)}...")
-                except Exception as e:
-                    print(f"  ❌ Failed to disable {item['external_id']}: {e}")
-
-            print(f"✅ Disabled {success_count} questions!")
+            summary = asyncio.run(updater.update_many([item['id'] for item in to_disable], {'is_active': False}))
+            print(f"✅ Disabled {summary['updated']} questions!")
 
         print(f"\n{'=' * 80}")
         print("COMPLETE")
@@ -11,6 +11,7 @@ Usage:
     python scripts/fix_missing_answers.py --fix
 """
 
+import asyncio
 import json
 import re
 import sys
@@ -20,6 +21,11 @@ from supabase import create_client
 from dotenv import load_dotenv
 import argparse
 
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.question_bulk_update import QuestionBulkUpdater
+
 # Load environment variables
 load_dotenv('.env.local')
 
@@ -207,19 +213,16 @@ def fix_missing_answers(dry_run=True):
         print("APPLYING FIXES")
         print("=" * 80)
 
-        success_count = 0
-        for fix in fixes:
-            try:
-                supabase.table('questions').update({
-                    'correct_answer': fix['new_answer']
-                }).eq('id', fix['id']).execute()
-                success_count += 1
-                if success_count % 10 == 0:
-                    print(f"Updated {success_count}/{len(fixes)} questions...")
-            except Exception as e:
-                print(f"❌ Failed to update {fix['external_id']}: {e}")
-
-        print(f"\n✅ Successfully updated {success_count} questions!")
+        def report(chunk):
+            if chunk['error']:
+                print(f"❌ Failed to update {chunk['requested']} questions: {chunk['error']}")
+
+        # Questions with the same new answer are updated together
+        summary = asyncio.run(QuestionBulkUpdater(supabase, on_chunk=report).update_each({
+            fix['id']: {'correct_answer': fix['new_answer']} for fix in fixes
+        }))
+
+        print(f"\n✅ Successfully updated {summary['updated']} questions!")
     elif not dry_run:
         print("\n⚠️  No fixes to apply")
     else:
@@ -2,6 +2,18 @@
 Question Bank Import Script
 Imports questions from question_bank.json into the database
 
+The file is read one question at a time, transformed and validated in a pool
+of worker processes, and written in batches that upsert on external_id, a few
+batches in flight at once. Questions already in the database are left as they
+are unless --update-existing is given, which rewrites their content but
+keeps their is_active flag, their answer option ids and any stored answer
+the file lacks.
+
+Progress is saved to a checkpoint file after every batch. An interrupted
+import started again with the same command resumes after the last batch
+written (re-sending a batch is harmless, since rows are upserted); the
+checkpoint is removed when an import finishes.
+
 Usage:
     # Test with 10 questions
     python scripts/import_questions.py --test
@@ -11,13 +23,26 @@ Usage:
 
     # Import specific number
     python scripts/import_questions.py --limit 100
+
+    # Show what a full import would add or change, without writing
+    python scripts/import_questions.py --full --dry-run
+
+    # Overwrite questions that already exist (option ids of questions imported
+    # before option ids were derived from the question will change)
+    python scripts/import_questions.py --full --update-existing
 """
 
 import json
 import sys
 import os
+import time
 import uuid
 import re
+from collections import deque
+from concurrent.futures import (
+    ALL_COMPLETED, FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+)
+from itertools import islice
 from pathlib import Path
 from supabase import create_client
 from dotenv import load_dotenv
@@ -36,6 +61,29 @@ supabase = create_client(
     os.getenv('SUPABASE_SERVICE_ROLE_KEY') or os.getenv('SUPABASE_ANON_KEY')
 )
 
+DEFAULT_QUESTION_BANK = Path(__file__).parent.parent / 'question_bank.json'
+
+# Questions per upsert request and per worker task
+BATCH_SIZE = 250
+# Upsert requests in flight at once
+WRITE_CONCURRENCY = 4
+# Attempts per batch before the import stops (waits 2s, 4s between them)
+MAX_ATTEMPTS = 3
+# Characters read from the file at a time
+READ_CHUNK_CHARS = 1 << 20
+
+# Namespace for answer option ids derived from question id and choice key
+OPTION_ID_NAMESPACE = uuid.UUID('6f1d2c4e-8a53-4b0e-9d7e-3c2a1b5f9e04')
+
+# Columns a dry run compares against the existing question
+DIFF_COLUMNS = (
+    'external_id', 'source_uid', 'topic_id', 'difficulty', 'difficulty_score', 'module',
+    'question_type', 'stimulus', 'stem', 'answer_options', 'correct_answer',
+    'acceptable_answers', 'rationale'
+)
+
+_WHITESPACE = re.compile(r'\s*')
+
 
 def extract_answer_from_rationale(rationale_html):
     """
@@ -117,13 +165,14 @@ def transform_question(q_id: str, q_data: dict) -> dict:
 
         # Convert choices dict to list format with generated UUIDs
         if choices:
-            # Generate UUIDs for each choice and create list format
+            # Derive each choice's UUID from the question and choice key, so
+            # re-importing a question gives its options the same ids
             choice_to_uuid = {}
             answer_options = []
 
             # Sort keys to ensure consistent order (a, b, c, d)
             for key in sorted(choices.keys()):
-                option_uuid = str(uuid.uuid4())
+                option_uuid = str(uuid.uuid5(OPTION_ID_NAMESPACE, f"{q_id}:{key.lower()}"))
                 choice_to_uuid[key.lower()] = option_uuid
                 answer_options.append({
                     'id': option_uuid,
@@ -195,58 +244,93 @@ def transform_question(q_id: str, q_data: dict) -> dict:
     return question
 
 
-def import_questions(limit=None, dry_run=False):
+def iter_question_bank(json_path):
     """
-    Import questions from JSON file into database.
+    Yield (question id, question data) pairs from the question bank's
+    top-level object one at a time, without loading the whole file.
 
     Args:
-        limit: Maximum number of questions to import (None = all)
-        dry_run: If True, don't actually insert, just validate
-    """
-    # Get existing external IDs to skip duplicates
-    print("📋 Checking for existing questions...")
-    existing_ids = set()
-    try:
-        result = supabase.table('questions').select('external_id').execute()
-        existing_ids = {q['external_id'] for q in result.data if q['external_id']}
-        print(f"   Found {len(existing_ids)} existing questions")
-    except Exception as e:
-        print(f"   Warning: Could not fetch existing questions: {e}")
-
-    # Load question bank
-    json_path = Path(__file__).parent.parent / 'question_bank.json'
+        json_path: Path to question_bank.json
 
-    print(f"📂 Loading questions from: {json_path}")
-    with open(json_path) as f:
-        data = json.load(f)
-
-    total_questions = len(data)
-    print(f"📊 Total questions in file: {total_questions}")
+    Raises:
+        ValueError: If the file is not a JSON object
+    """
+    decoder = json.JSONDecoder()
+
+    with open(json_path, encoding='utf-8') as f:
+        buf, pos, eof = '', 0, False
+
+        def read_more():
+            nonlocal buf, pos, eof
+            chunk = f.read(READ_CHUNK_CHARS)
+            buf, pos, eof = buf[pos:] + chunk, 0, not chunk
+
+        def peek():
+            # Next non-whitespace character ('' at the end of the file)
+            nonlocal pos
+            while True:
+                pos = _WHITESPACE.match(buf, pos).end()
+                if pos < len(buf) or eof:
+                    return buf[pos:pos + 1]
+                read_more()
+
+        def decode():
+            # A value is complete once something follows it (a number at the
+            # end of the buffer may continue in the next chunk)
+            nonlocal pos
+            while True:
+                try:
+                    value, end = decoder.raw_decode(buf, pos)
+                    if end < len(buf) or eof:
+                        pos = end
+                        return value
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                read_more()
+
+        def expect(char):
+            nonlocal pos
+            if peek() != char:
+                raise ValueError(f"Expected '{char}' at character {pos} of {json_path}")
+            pos += 1
+
+        expect('{')
+        if peek() == '}':
+            return
+        while True:
+            peek()
+            q_id = decode()
+            expect(':')
+            peek()
+            yield q_id, decode()
+            if peek() == '}':
+                return
+            expect(',')
+
+
+def transform_batch(entries):
+    """
+    Transform and validate a batch of questions (runs in a worker process).
 
-    if limit:
-        print(f"🔢 Limiting to first {limit} questions")
+    Args:
+        entries: (question id, question data) pairs
 
-    # Process questions
-    questions = []
+    Returns:
+        Tuple of (database rows, skipped questions with the reason)
+    """
+    rows = {}
     skipped = []
-    processed = 0
-    skipped_existing = 0
-
-    for q_id, q_data in data.items():
-        if limit and processed >= limit:
-            break
-
-        processed += 1
 
+    for q_id, q_data in entries:
         try:
             transformed = transform_question(q_id, q_data)
 
-            # Skip if already exists
-            if transformed['external_id'] in existing_ids:
-                skipped_existing += 1
+            # Validate required fields
+            if not transformed['external_id']:
+                skipped.append({'id': q_id, 'reason': 'No external ID'})
                 continue
 
-            # Validate required fields
             if not transformed['topic_id']:
                 skipped.append({
                     'id': q_id,
@@ -263,7 +347,8 @@ def import_questions(limit=None, dry_run=False):
                 })
                 continue
 
-            questions.append(transformed)
+            # One row per external_id: an upsert can't touch the same row twice
+            rows[transformed['external_id']] = transformed
 
         except Exception as e:
             skipped.append({
@@ -271,10 +356,417 @@ def import_questions(limit=None, dry_run=False):
                 'error': str(e)
             })
 
-    print(f"\n✅ Transformed: {len(questions)} questions")
-    print(f"⏭️  Skipped existing: {skipped_existing} questions")
-    print(f"⚠️  Skipped invalid: {len(skipped)} questions")
+    return list(rows.values()), skipped
+
+
+def upsert_rows(db, rows, ignore_duplicates):
+    """
+    Upsert questions on external_id, retrying network errors.
+
+    Returns:
+        Number of rows written
+    """
+    for attempt in range(MAX_ATTEMPTS):
+        try:
+            response = db.table('questions').upsert(
+                rows,
+                on_conflict='external_id',
+                ignore_duplicates=ignore_duplicates,
+                count='exact',
+                returning='minimal'
+            ).execute()
+            return response.count or 0
+        except Exception as e:
+            if attempt == MAX_ATTEMPTS - 1:
+                raise
+            print(f"  ⚠️  Retry {attempt + 1}/{MAX_ATTEMPTS - 1} for batch of {len(rows)} questions: {e}")
+            time.sleep(2 ** (attempt + 1))
+
 
+def fetch_existing(db, external_ids):
+    """
+    Look up which questions already exist, retrying network errors.
+
+    Returns:
+        Dict of external ID to the stored correct_answer, answer_options and
+        acceptable_answers
+    """
+    for attempt in range(MAX_ATTEMPTS):
+        try:
+            existing = db.table('questions').select(
+                'external_id, correct_answer, answer_options, acceptable_answers'
+            ).in_('external_id', external_ids).execute().data or []
+            return {row['external_id']: row for row in existing}
+        except Exception as e:
+            if attempt == MAX_ATTEMPTS - 1:
+                raise
+            print(f"  ⚠️  Retry {attempt + 1}/{MAX_ATTEMPTS - 1} for lookup of {len(external_ids)} questions: {e}")
+            time.sleep(2 ** (attempt + 1))
+
+
+def keep_option_ids(row, stored):
+    """
+    Give an existing question's answer options the ids it already has.
+
+    IBN option ids used to be random, so a re-import derives other ids than
+    the stored options (and the answers saved against them) use. Options are
+    matched by position, which follows the choice keys in both. If the number
+    of options changed, the stored options and acceptable answers are kept.
+
+    Returns:
+        The row with answer_options and acceptable_answers using stored ids
+    """
+    options = row.get('answer_options')
+    stored_options = stored.get('answer_options')
+    if not isinstance(options, list) or not isinstance(stored_options, list) or not stored_options:
+        return row
+
+    ids = [option.get('id') for option in options]
+    stored_ids = [option.get('id') for option in stored_options]
+    if ids == stored_ids:
+        return row
+    if len(ids) != len(stored_ids):
+        return {
+            **row,
+            'answer_options': stored_options,
+            'acceptable_answers': stored.get('acceptable_answers'),
+        }
+
+    id_map = dict(zip(ids, stored_ids))
+    acceptable = row.get('acceptable_answers')
+    return {
+        **row,
+        'answer_options': [{**option, 'id': id_map[option.get('id')]} for option in options],
+        'acceptable_answers': [id_map.get(answer, answer) for answer in acceptable] if acceptable else acceptable,
+    }
+
+
+def write_batch(db, rows, update_existing):
+    """
+    Write a batch of questions on external_id.
+
+    New questions are inserted. With update_existing, questions already in
+    the database get the file's content but keep their is_active flag (a
+    question disabled by hand or by fix_and_disable_broken_questions.py
+    stays disabled), keep a stored correct_answer where the file has none
+    (answers repaired by fix_missing_answers.py are not reset) and keep
+    their answer option ids (see keep_option_ids).
+
+    Returns:
+        Number of rows written (new questions only, unless update_existing)
+    """
+    if not update_existing:
+        return upsert_rows(db, rows, ignore_duplicates=True)
+
+    existing = fetch_existing(db, [row['external_id'] for row in rows])
+    new_rows, updated_rows = [], []
+    for row in rows:
+        if row['external_id'] not in existing:
+            new_rows.append(row)
+            continue
+        # Every row of one upsert must carry the same columns: PostgREST
+        # writes a column missing from some rows as NULL
+        stored = existing[row['external_id']]
+        row = keep_option_ids({key: value for key, value in row.items() if key != 'is_active'}, stored)
+        if not row['correct_answer'] and stored['correct_answer']:
+            row['correct_answer'] = stored['correct_answer']
+        updated_rows.append(row)
+
+    written = 0
+    if new_rows:
+        written += upsert_rows(db, new_rows, ignore_duplicates=True)
+    if updated_rows:
+        written += upsert_rows(db, updated_rows, ignore_duplicates=False)
+    return written
+
+
+def diff_batch(db, rows):
+    """
+    Compare a batch of questions with what the database has (dry run).
+
+    Returns:
+        Tuple of (new external IDs, {external ID: changed columns}, unchanged count)
+    """
+    existing = db.table('questions').select(', '.join(DIFF_COLUMNS)).in_(
+        'external_id', [row['external_id'] for row in rows]
+    ).execute().data or []
+    existing = {row['external_id']: row for row in existing}
+
+    new, changed, unchanged = [], {}, 0
+    for row in rows:
+        current = existing.get(row['external_id'])
+        if current is None:
+            new.append(row['external_id'])
+            continue
+        row = keep_option_ids(row, current)
+        columns = [c for c in DIFF_COLUMNS if row.get(c) != current.get(c)]
+        if columns:
+            changed[row['external_id']] = columns
+        else:
+            unchanged += 1
+    return new, changed, unchanged
+
+
+def _batches(entries, size):
+    while True:
+        batch = list(islice(entries, size))
+        if not batch:
+            return
+        yield batch
+
+
+def load_checkpoint(checkpoint_path, json_path):
+    """Saved progress for this file, or None (also if the file changed since)"""
+    try:
+        with open(checkpoint_path) as f:
+            checkpoint = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    stat = Path(json_path).stat()
+    if checkpoint.get('source') != [str(Path(json_path).resolve()), stat.st_size, stat.st_mtime_ns]:
+        print(f"   Ignoring checkpoint {checkpoint_path}: {json_path} changed since it was written")
+        return None
+    return checkpoint
+
+
+def save_checkpoint(checkpoint_path, json_path, entries_done, totals):
+    """Record that the first entries_done questions of the file are imported"""
+    stat = Path(json_path).stat()
+    tmp_path = f"{checkpoint_path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump({
+            'source': [str(Path(json_path).resolve()), stat.st_size, stat.st_mtime_ns],
+            'entries_done': entries_done,
+            'totals': totals
+        }, f)
+    os.replace(tmp_path, checkpoint_path)
+
+
+class QuestionImport:
+    """One run of the import pipeline: read -> transform (processes) -> write (threads)"""
+
+    def __init__(
+        self,
+        db,
+        json_path=DEFAULT_QUESTION_BANK,
+        batch_size=BATCH_SIZE,
+        workers=None,
+        concurrency=WRITE_CONCURRENCY,
+        update_existing=False,
+        dry_run=False,
+        checkpoint_path=None,
+        verbose=True
+    ):
+        """
+        Args:
+            db: Supabase client allowed to write questions
+            json_path: Question bank file
+            batch_size: Questions per worker task and upsert request
+            workers: Transform processes (0 = transform in this process;
+                default: one per CPU but one)
+            concurrency: Upsert (or dry-run lookup) requests in flight at once
+            update_existing: Overwrite questions that already exist
+            dry_run: Compare with the database instead of writing
+            checkpoint_path: Progress file (None = no checkpoint)
+            verbose: Print progress
+        """
+        self.db = db
+        self.json_path = json_path
+        self.batch_size = batch_size
+        # One CPU is left to reading and writing; on a single CPU, transform in-process
+        self.workers = max((os.cpu_count() or 1) - 1, 0) if workers is None else workers
+        self.concurrency = concurrency
+        self.update_existing = update_existing
+        self.dry_run = dry_run
+        self.checkpoint_path = None if dry_run else checkpoint_path
+        self.verbose = verbose
+
+        # Totals across resumed runs, up to the checkpoint
+        self.totals = {'read': 0, 'transformed': 0, 'written': 0, 'invalid': 0}
+        self.skipped = []
+        self.by_module = {}
+        self.by_difficulty = {}
+        self.diff = {'new': [], 'changed': {}, 'unchanged': 0}
+        self.error = None
+
+        # Batches finished out of order, by first entry, with their counts:
+        # entries done (and totals) stop at the first batch still in flight
+        self._entries_done = 0
+        self._finished = {}
+        self._batches_done = 0
+
+    def run(self, limit=None, restart=False):
+        """
+        Import the file (or its first `limit` questions).
+
+        Args:
+            limit: Maximum number of questions to read from the start of the file
+            restart: Ignore any checkpoint and start from the first question
+
+        Returns:
+            Totals for the whole import (including resumed runs), plus rows
+            and rows_per_sec for this run and error if a batch failed
+        """
+        if self.checkpoint_path and not restart:
+            checkpoint = load_checkpoint(self.checkpoint_path, self.json_path)
+            if checkpoint:
+                self._entries_done = checkpoint['entries_done']
+                self.totals.update(checkpoint['totals'])
+                self._log(f"⏩ Resuming after {self._entries_done} questions ({self.checkpoint_path})")
+
+        start_time = time.perf_counter()
+        written_before = self.totals['written']
+        entries = islice(iter_question_bank(self.json_path), self._entries_done, limit)
+
+        pool = ProcessPoolExecutor(self.workers) if self.workers else None
+        with ThreadPoolExecutor(self.concurrency) as io:
+            transforms = deque()
+            requests = {}
+            offset = self._entries_done
+
+            try:
+                for batch in _batches(entries, self.batch_size):
+                    if self.error:
+                        break
+                    if pool:
+                        task = pool.submit(transform_batch, batch)
+                    else:
+                        task = Future()
+                        task.set_result(transform_batch(batch))
+                    transforms.append((offset, len(batch), task))
+                    offset += len(batch)
+                    # Keep every worker busy without reading far ahead
+                    while len(transforms) > max(self.workers, 1) * 2:
+                        self._send(io, requests, *transforms.popleft())
+
+                while transforms and not self.error:
+                    self._send(io, requests, *transforms.popleft())
+                self._settle(requests, wait_all=True)
+            finally:
+                if pool:
+                    pool.shutdown(cancel_futures=True)
+
+        if self.checkpoint_path and not self.error:
+            Path(self.checkpoint_path).unlink(missing_ok=True)
+
+        elapsed = time.perf_counter() - start_time
+        rows = self.totals['transformed'] if self.dry_run else self.totals['written'] - written_before
+        return {
+            **self.totals,
+            'entries_done': self._entries_done,
+            'rows': rows,
+            'seconds': elapsed,
+            'rows_per_sec': rows / elapsed if elapsed > 0 else 0.0,
+            'error': self.error
+        }
+
+    def _send(self, io, requests, offset, count, transformed):
+        """Hand a transformed batch to the writers, waiting while too many are in flight"""
+        rows, skipped = transformed.result()
+        self.skipped.extend(skipped)
+        batch = {'offset': offset, 'read': count, 'transformed': len(rows), 'invalid': len(skipped), 'written': 0}
+
+        while len(requests) >= self.concurrency:
+            self._settle(requests)
+        if self.error:
+            return
+
+        if self.dry_run:
+            future = io.submit(diff_batch, self.db, rows) if rows else None
+        else:
+            future = io.submit(write_batch, self.db, rows, self.update_existing) if rows else None
+            for q in rows:
+                self.by_module[q['module']] = self.by_module.get(q['module'], 0) + 1
+                self.by_difficulty[q['difficulty']] = self.by_difficulty.get(q['difficulty'], 0) + 1
+
+        if future is None:
+            self._finish(batch)
+        else:
+            requests[future] = batch
+
+    def _settle(self, requests, wait_all=False):
+        """Record requests that completed (all of them if wait_all)"""
+        if not requests:
+            return
+        done, _ = wait(list(requests), return_when=ALL_COMPLETED if wait_all else FIRST_COMPLETED)
+        for future in done:
+            batch = requests.pop(future)
+            try:
+                result = future.result()
+            except Exception as e:
+                first = batch['offset'] + 1
+                print(f"  ❌ Batch of questions {first}-{first + batch['read'] - 1} failed: {e}")
+                self.error = self.error or str(e)
+                continue
+
+            if self.dry_run:
+                new, changed, unchanged = result
+                self.diff['new'].extend(new)
+                self.diff['changed'].update(changed)
+                self.diff['unchanged'] += unchanged
+            else:
+                batch['written'] = result
+            self._finish(batch)
+
+    def _finish(self, batch):
+        """Mark a batch done and move the checkpoint past every finished batch in order"""
+        self._finished[batch.pop('offset')] = batch
+        if self._entries_done not in self._finished:
+            return
+
+        while self._entries_done in self._finished:
+            done = self._finished.pop(self._entries_done)
+            self._entries_done += done['read']
+            for key in self.totals:
+                self.totals[key] += done[key]
+            self._batches_done += 1
+            if self._batches_done % 20 == 0:
+                self._log(f"  ✅ {self._entries_done} questions processed (written: {self.totals['written']})")
+
+        if self.checkpoint_path:
+            save_checkpoint(self.checkpoint_path, self.json_path, self._entries_done, self.totals)
+
+    def _log(self, message):
+        if self.verbose:
+            print(message)
+
+
+def import_questions(limit=None, dry_run=False, json_path=DEFAULT_QUESTION_BANK, update_existing=False,
+                     batch_size=BATCH_SIZE, workers=None, concurrency=WRITE_CONCURRENCY, restart=False):
+    """
+    Import questions from JSON file into database.
+
+    Args:
+        limit: Maximum number of questions to import (None = all)
+        dry_run: If True, don't insert, report what would be added or changed
+        json_path: Question bank file
+        update_existing: Overwrite questions that already exist
+        batch_size: Questions per upsert request
+        workers: Transform processes (None = one per CPU but one)
+        concurrency: Upsert requests in flight at once
+        restart: Ignore the checkpoint of an interrupted import
+    """
+    print(f"📂 Streaming questions from: {json_path}")
+    if limit:
+        print(f"🔢 Limiting to first {limit} questions")
+
+    importer = QuestionImport(
+        supabase,
+        json_path=json_path,
+        batch_size=batch_size,
+        workers=workers,
+        concurrency=concurrency,
+        update_existing=update_existing,
+        dry_run=dry_run,
+        checkpoint_path=f"{json_path}.checkpoint.json"
+    )
+    result = importer.run(limit=limit, restart=restart)
+
+    print(f"\n✅ Transformed: {result['transformed']} questions")
+    print(f"⚠️  Skipped invalid: {result['invalid']} questions")
+
+    skipped = importer.skipped
     if skipped:
         print("\n⚠️  Skipped questions:")
         for s in skipped[:5]:  # Show first 5
@@ -282,82 +774,65 @@ def import_questions(limit=None, dry_run=False):
         if len(skipped) > 5:
             print(f"  ... and {len(skipped) - 5} more")
 
-    # Dry run - just show what would be imported
+    # Dry run - show what would change
     if dry_run:
-        print("\n🔍 DRY RUN - Not inserting into database")
-        print(f"\nSample question:")
-        if questions:
-            sample = questions[0]
-            print(f"  External ID: {sample['external_id']}")
-            print(f"  Topic ID: {sample['topic_id']}")
-            print(f"  Difficulty: {sample['difficulty']}")
-            print(f"  Type: {sample['question_type']}")
-            print(f"  Stem: {sample['stem'][:100]}...")
+        diff = importer.diff
+        print("\n🔍 DRY RUN - Not writing to database")
+        print(f"  New: {len(diff['new'])}")
+        print(f"  Changed: {len(diff['changed'])}")
+        print(f"  Unchanged: {diff['unchanged']}")
+
+        by_column = {}
+        for columns in diff['changed'].values():
+            for column in columns:
+                by_column[column] = by_column.get(column, 0) + 1
+        if by_column:
+            print("\n  Changed columns:")
+            for column, count in sorted(by_column.items(), key=lambda item: -item[1]):
+                print(f"    {column}: {count}")
+            print("\n  Examples:")
+            for external_id, columns in list(diff['changed'].items())[:5]:
+                print(f"    {external_id}: {', '.join(columns)}")
+        if diff['new']:
+            print(f"\n  First new: {', '.join(diff['new'][:5])}")
+        if not update_existing and diff['changed']:
+            print("\n  Changed questions are only written with --update-existing")
         return
 
-    # Insert into database
-    if not questions:
-        print("\n❌ No questions to import!")
-        return
-
-    print(f"\n💾 Inserting {len(questions)} questions into database...")
-
-    try:
-        # Insert in batches of 50 to avoid timeout and connection issues
-        batch_size = 50
-        inserted_count = 0
-
-        for i in range(0, len(questions), batch_size):
-            batch = questions[i:i + batch_size]
-
-            # Retry logic for network errors
-            max_retries = 3
-            for attempt in range(max_retries):
-                try:
-                    result = supabase.table('questions').insert(batch).execute()
-                    inserted_count += len(batch)
-                    print(f"  ✅ Inserted batch {i // batch_size + 1}: {len(batch)} questions (Total: {inserted_count})")
-                    break
-                except Exception as e:
-                    if attempt < max_retries - 1:
-                        print(f"  ⚠️  Retry {attempt + 1}/{max_retries} for batch {i // batch_size + 1}")
-                        import time
-                        time.sleep(2)  # Wait 2 seconds before retry
-                    else:
-                        raise
-
-        print(f"\n🎉 SUCCESS! Imported {inserted_count} questions")
-
-        # Show summary statistics
-        print("\n📊 Import Summary:")
-        by_module = {}
-        by_difficulty = {}
+    if result['error']:
+        print(f"\n❌ ERROR during import: {result['error']}")
+        print(f"   {result['entries_done']} questions are imported; run the same command again to resume")
+        sys.exit(1)
 
-        for q in questions:
-            module = q['module']
-            difficulty = q['difficulty']
-            by_module[module] = by_module.get(module, 0) + 1
-            by_difficulty[difficulty] = by_difficulty.get(difficulty, 0) + 1
+    label = 'Written' if update_existing else 'Inserted'
+    print(f"⏭️  Skipped existing: {result['transformed'] - result['written'] if not update_existing else 0} questions")
+    print(f"\n🎉 SUCCESS! {label} {result['written']} questions")
+    print(f"⏱️  {result['rows']} rows in {result['seconds']:.1f}s ({result['rows_per_sec']:.0f} rows/sec)")
 
-        print(f"\n  By Module:")
-        for module, count in sorted(by_module.items()):
-            print(f"    {module}: {count}")
+    # Show summary statistics
+    print("\n📊 Import Summary:")
 
-        print(f"\n  By Difficulty:")
-        for diff, count in sorted(by_difficulty.items()):
-            print(f"    {diff}: {count}")
+    print(f"\n  By Module:")
+    for module, count in sorted(importer.by_module.items(), key=lambda item: str(item[0])):
+        print(f"    {module}: {count}")
 
-    except Exception as e:
-        print(f"\n❌ ERROR during import: {e}")
-        raise
+    print(f"\n  By Difficulty:")
+    for diff, count in sorted(importer.by_difficulty.items(), key=lambda item: str(item[0])):
+        print(f"    {diff}: {count}")
 
 
 def main():
-    parser = argparse.ArgumentParser(description='Import questions from JSON to database')
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
     parser.add_argument('--test', action='store_true', help='Test mode: import only 10 questions')
     parser.add_argument('--full', action='store_true', help='Import all questions')
     parser.add_argument('--limit', type=int, help='Import specific number of questions')
-    parser.add_argument('--dry-run', action='store_true', help='Validate only, don\'t insert')
+    parser.add_argument('--dry-run', action='store_true', help='Show new and changed questions, don\'t write')
+    parser.add_argument('--file', type=Path, default=DEFAULT_QUESTION_BANK, help='Question bank JSON file')
+    parser.add_argument('--update-existing', action='store_true', help='Overwrite questions that already exist')
+    parser.add_argument('--restart', action='store_true', help='Ignore the checkpoint of an interrupted import')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='Questions per upsert request')
+    parser.add_argument('--workers', type=int, help='Transform processes (default: one per CPU but one, 0 = none)')
+    parser.add_argument('--concurrency', type=int, default=WRITE_CONCURRENCY, help='Upsert requests in flight')
 
     args = parser.parse_args()
 
@@ -378,7 +853,16 @@ def main():
         print("   Use --full to import all, or --limit N for specific number\n")
 
     # Run import
-    import_questions(limit=limit, dry_run=args.dry_run)
+    import_questions(
+        limit=limit,
+        dry_run=args.dry_run,
+        json_path=args.file,
+        update_existing=args.update_existing,
+        batch_size=args.batch_size,
+        workers=args.workers,
+        concurrency=args.concurrency,
+        restart=args.restart
+    )
 
 
 if __name__ == '__main__':
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Rebuild the population percentile digests in population_percentiles.
+
+Reads every student's latest predicted scores, mean mastery and learning
+velocity from the user_population_metrics view and stores one t-digest per
+metric and section. API processes pick the new digests up within
+POPULATION_INDEX_REFRESH_SECONDS. Run from cron (nightly is plenty), or pass
+--enqueue to hand the work to the job workers (python -m app.worker) instead.
+
+Usage:
+    python scripts/rebuild_population_index.py
+    python scripts/rebuild_population_index.py --enqueue
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.db import get_service_client
+from app.services.job_queue import JobQueue
+from app.services.job_handlers import POPULATION_REBUILD
+from app.services.population_index import DEFAULT_COMPRESSION, PopulationIndexService
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--compression", type=float, default=DEFAULT_COMPRESSION,
+                        help="t-digest compression (about half as many centroids per metric)")
+    parser.add_argument("--page-size", type=int, default=1000, help="Rows per request when reading the view")
+    parser.add_argument("--enqueue", action="store_true", help="Queue a job for the workers instead")
+    args = parser.parse_args()
+
+    db = get_service_client()
+
+    if args.enqueue:
+        job = JobQueue(db).enqueue(POPULATION_REBUILD, {}, max_attempts=2)
+        print(f"✅ Queued population percentile rebuild job {job['id']}")
+        return
+
+    summary = asyncio.run(
+        PopulationIndexService(db, page_size=args.page_size).rebuild(compression=args.compression)
+    )
+    print(f"✅ Rebuilt population percentiles from {summary['students']} students")
+    for key, population in summary["population"].items():
+        print(f"   {key}: {population}")
+    print(f"   load {summary['load_seconds']}s, build {summary['build_seconds']}s")
+
+
+if __name__ == "__main__":
+    main()
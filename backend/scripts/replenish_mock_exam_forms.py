@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Top up the pool of pre-assembled mock exam module forms.
+
+Exam creation also schedules a refill in the background; run this from cron
+(or once after applying migration 034 / importing questions) to keep every
+section and difficulty tier stocked.
+
+Usage:
+    python scripts/replenish_mock_exam_forms.py
+    python scripts/replenish_mock_exam_forms.py --target 50 --low-water 50
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.config import get_settings
+from app.db import get_service_client
+from app.services.mock_exam_service import MockExamService
+
+
+def main():
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", type=int, default=settings.mock_exam_form_pool_target,
+                        help="Unclaimed forms to keep per section and tier")
+    parser.add_argument("--low-water", type=int, default=settings.mock_exam_form_pool_low_water,
+                        help="Refill a tier when it has fewer unclaimed forms than this")
+    args = parser.parse_args()
+
+    service = MockExamService(get_service_client())
+    added = asyncio.run(service.replenish_form_pool(args.target, args.low_water))
+
+    if added is None:
+        print("⏭️  Another refill is running")
+        return
+    if not added:
+        print("✅ Form pool already stocked")
+    for tier, count in added.items():
+        print(f"  {tier}: +{count} forms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Simulate diagnostic test sections: the current fixed form (one mostly-medium
+question per sampled topic, topped up across E/M/H) vs. the adaptive engine
+in app/services/adaptive_testing.py.
+
+Students with known abilities answer items from a synthetic bank according to
+the 2PL model; both designs are scored with the same EAP estimator. Reports
+test length, estimation error (RMSE/bias, overall and by ability band) and
+the exposure rate of the most used item.
+
+Usage:
+    python scripts/simulate_diagnostic_cat.py --students 2000
+    python scripts/simulate_diagnostic_cat.py --se-threshold 0.4 --min-items 8
+"""
+
+import argparse
+import os
+import random
+import sys
+from collections import Counter
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.config import get_settings
+from app.services.adaptive_testing import ItemIndex, estimate_ability, select_item, should_stop
+from app.services.diagnostic_test_service import DiagnosticTestService
+
+LABELS = ("E", "M", "H")
+LABEL_CENTER = {"E": -1.0, "M": 0.0, "H": 1.0}
+
+
+def build_bank(n_items, n_topics, rng):
+    rows = []
+    for i in range(n_items):
+        label = LABELS[i % 3]
+        rows.append({
+            "id": f"q{i}",
+            "topic_id": f"t{i % n_topics}",
+            "difficulty": label,
+            "question_difficulty_params": {
+                "is_calibrated": True,
+                "difficulty_param": float(np.clip(rng.normal(LABEL_CENTER[label], 0.5), -3, 3)),
+                "discrimination_param": float(np.clip(rng.lognormal(0.1, 0.3), 0.3, 2.5)),
+            },
+        })
+    return rows, ItemIndex.from_rows(rows)
+
+
+def fixed_form(rows, length, rng):
+    """Mirror DiagnosticTestService._generate_test_questions"""
+    by_topic = {}
+    for q in rows:
+        by_topic.setdefault(q["topic_id"], []).append(q)
+
+    selected = []
+    for topic_id in rng.sample(sorted(by_topic), min(len(by_topic), length)):
+        medium = [q for q in by_topic[topic_id] if q["difficulty"] == "M"]
+        selected.append(rng.choice(medium or by_topic[topic_id]))
+
+    remaining_needed = length - len(selected)
+    chosen = {q["id"] for q in selected}
+    pool = [q for q in rows if q["id"] not in chosen]
+    for label, ratio in DiagnosticTestService.DIFFICULTY_DISTRIBUTION.items():
+        candidates = [q for q in pool if q["difficulty"] == label]
+        selected.extend(rng.sample(candidates, min(int(remaining_needed * ratio), len(candidates))))
+    chosen = {q["id"] for q in selected}
+    pool = [q for q in pool if q["id"] not in chosen]
+    if len(selected) < length:
+        selected.extend(rng.sample(pool, length - len(selected)))
+    return [q["id"] for q in selected[:length]]
+
+
+def answer(index, question_id, theta, np_rng):
+    a, b = index.params([question_id])
+    p = 1.0 / (1.0 + np.exp(-a[0] * (theta - b[0])))
+    return bool(np_rng.random() < p)
+
+
+def run_fixed(rows, index, theta, length, rng, np_rng):
+    items = fixed_form(rows, length, rng)
+    correct = [answer(index, qid, theta, np_rng) for qid in items]
+    a, b = index.params(items)
+    estimate, _ = estimate_ability(a, b, np.array(correct))
+    return estimate, items
+
+
+def run_adaptive(index, theta, args, rng, np_rng):
+    items, correct = [], []
+    estimate, se = 0.0, 1.0
+    while not should_stop(se, len(items), args.se_threshold, args.min_items, args.length):
+        qid = select_item(index, estimate, set(items), args.top_k, rng)
+        if qid is None:
+            break
+        items.append(qid)
+        correct.append(answer(index, qid, theta, np_rng))
+        a, b = index.params(items)
+        estimate, se = estimate_ability(a, b, np.array(correct))
+    return estimate, items
+
+
+def report(label, thetas, estimates, lengths, exposure, students):
+    error = np.array(estimates) - thetas
+    bands = [("θ<-1", thetas < -1), ("-1≤θ≤1", np.abs(thetas) <= 1), ("θ>1", thetas > 1)]
+    band_text = " ".join(f"{name}={np.sqrt((error[mask] ** 2).mean()):.3f}" for name, mask in bands if mask.any())
+    print(
+        f"{label:<9} length={np.mean(lengths):5.1f} (max {max(lengths)}) "
+        f"RMSE={np.sqrt((error ** 2).mean()):.3f} bias={error.mean():+.3f} "
+        f"max exposure={max(exposure.values()) / students:.0%}"
+    )
+    print(f"          RMSE by band: {band_text}")
+
+
+def main():
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=2000)
+    parser.add_argument("--items", type=int, default=450, help="Items in the section bank")
+    parser.add_argument("--topics", type=int, default=10)
+    parser.add_argument("--length", type=int, default=DiagnosticTestService.MATH_QUESTIONS,
+                        help="Fixed form length, also the adaptive maximum")
+    parser.add_argument("--se-threshold", type=float, default=settings.diagnostic_cat_se_threshold)
+    parser.add_argument("--min-items", type=int, default=settings.diagnostic_cat_min_items)
+    parser.add_argument("--top-k", type=int, default=settings.diagnostic_cat_top_k)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    np_rng = np.random.default_rng(7)
+    rows, index = build_bank(args.items, args.topics, np_rng)
+    thetas = np_rng.normal(0.0, 1.0, args.students)
+
+    results = {"fixed": ([], [], Counter()), "adaptive": ([], [], Counter())}
+    for theta in thetas:
+        for label in results:
+            if label == "fixed":
+                estimate, items = run_fixed(rows, index, theta, args.length, rng, np_rng)
+            else:
+                estimate, items = run_adaptive(index, theta, args, rng, np_rng)
+            estimates, lengths, exposure = results[label]
+            estimates.append(estimate)
+            lengths.append(len(items))
+            exposure.update(items)
+
+    print(f"{args.students} students, {args.items}-item section bank, {args.topics} topics")
+    for label, (estimates, lengths, exposure) in results.items():
+        report(label, thetas, estimates, lengths, exposure, args.students)
+
+
+if __name__ == "__main__":
+    main()
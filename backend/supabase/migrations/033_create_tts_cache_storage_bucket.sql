@@ -0,0 +1,13 @@
+-- Private storage bucket for the shared TTS audio cache (optional bucket tier)
+-- Enable by setting TTS_CACHE_BUCKET=tts-cache. Only the service role reads
+-- and writes here, so no storage.objects policies are needed.
+
+INSERT INTO storage.buckets (id, name, public, file_size_limit, allowed_mime_types)
+VALUES (
+    'tts-cache',
+    'tts-cache',
+    false,
+    10485760, -- 10MB limit per narration line
+    ARRAY['audio/mpeg']
+)
+ON CONFLICT (id) DO NOTHING;
@@ -0,0 +1,192 @@
+-- Pool of pre-assembled mock exam module forms
+-- A form is a validated set of question IDs for one section and difficulty
+-- tier (category weights and E/M/H distribution already applied). Forms are
+-- built ahead of time by the replenish job (MockExamService.replenish_form_pool,
+-- scripts/replenish_mock_exam_forms.py) so creating an exam only has to claim
+-- them instead of sampling the whole question bank.
+
+CREATE TABLE mock_exam_forms (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    section VARCHAR(20) NOT NULL CHECK (section IN ('math', 'reading_writing')),
+    difficulty_level VARCHAR(10) NOT NULL CHECK (difficulty_level IN ('easy', 'medium', 'hard')),
+    question_ids UUID[] NOT NULL,
+    claimed_at TIMESTAMPTZ,
+    claimed_module_id UUID REFERENCES mock_exam_modules(id) ON DELETE SET NULL,
+    created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- Claims always look for the oldest unclaimed form of a tier
+CREATE INDEX idx_mock_exam_forms_available
+    ON mock_exam_forms(section, difficulty_level, created_at)
+    WHERE claimed_at IS NULL;
+
+-- Only the service role (replenish job) and the SECURITY DEFINER functions
+-- below touch this table, so RLS is enabled without user policies.
+ALTER TABLE mock_exam_forms ENABLE ROW LEVEL SECURITY;
+
+COMMENT ON TABLE mock_exam_forms IS 'Pre-assembled mock exam module forms, claimed once per module';
+
+
+-- Claim one form and copy its questions into a module
+-- Returns FALSE when the pool has no form for that tier (caller falls back
+-- to sampling) or the module already has questions.
+CREATE OR REPLACE FUNCTION assign_mock_exam_form(
+    p_module_id UUID,
+    p_difficulty_level TEXT
+)
+RETURNS BOOLEAN AS $$
+DECLARE
+    v_module RECORD;
+    v_section TEXT;
+    v_form_id UUID;
+    v_question_ids UUID[];
+BEGIN
+    SELECT mem.id, mem.module_type
+    INTO v_module
+    FROM mock_exam_modules mem
+    JOIN mock_exams me ON me.id = mem.exam_id
+    WHERE mem.id = p_module_id
+      AND (auth.uid() IS NULL OR me.user_id = auth.uid())
+    FOR UPDATE OF mem;
+
+    IF NOT FOUND THEN
+        RAISE EXCEPTION 'Module not found';
+    END IF;
+
+    IF EXISTS (SELECT 1 FROM mock_exam_questions WHERE module_id = p_module_id) THEN
+        RETURN FALSE;
+    END IF;
+
+    v_section := CASE WHEN v_module.module_type::TEXT LIKE 'math%' THEN 'math' ELSE 'reading_writing' END;
+
+    SELECT id, question_ids
+    INTO v_form_id, v_question_ids
+    FROM mock_exam_forms
+    WHERE section = v_section
+      AND difficulty_level = p_difficulty_level
+      AND claimed_at IS NULL
+    ORDER BY created_at
+    LIMIT 1
+    FOR UPDATE SKIP LOCKED;
+
+    IF v_form_id IS NULL THEN
+        RETURN FALSE;
+    END IF;
+
+    UPDATE mock_exam_forms
+    SET claimed_at = NOW(), claimed_module_id = p_module_id
+    WHERE id = v_form_id;
+
+    INSERT INTO mock_exam_questions (module_id, question_id, display_order, status, is_marked_for_review)
+    SELECT p_module_id, q.question_id, q.display_order, 'not_started', FALSE
+    FROM unnest(v_question_ids) WITH ORDINALITY AS q(question_id, display_order);
+
+    RETURN TRUE;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+COMMENT ON FUNCTION assign_mock_exam_form IS 'Claim a pooled form for a module and insert its questions';
+
+
+-- Create an exam, its 4 modules and module-1 questions in one transaction
+-- Claims a medium form for each section's module 1. Returns NULL without
+-- creating anything when either section has no form available.
+CREATE OR REPLACE FUNCTION create_mock_exam_from_forms(
+    p_exam_type TEXT DEFAULT 'full_length',
+    p_time_limit_minutes INTEGER DEFAULT 32
+)
+RETURNS JSONB AS $$
+DECLARE
+    v_user_id UUID := auth.uid();
+    v_rw_form mock_exam_forms%ROWTYPE;
+    v_math_form mock_exam_forms%ROWTYPE;
+    v_exam mock_exams%ROWTYPE;
+    v_rw_module_id UUID;
+    v_math_module_id UUID;
+BEGIN
+    IF v_user_id IS NULL THEN
+        RAISE EXCEPTION 'Not authenticated';
+    END IF;
+
+    SELECT * INTO v_rw_form
+    FROM mock_exam_forms
+    WHERE section = 'reading_writing' AND difficulty_level = 'medium' AND claimed_at IS NULL
+    ORDER BY created_at
+    LIMIT 1
+    FOR UPDATE SKIP LOCKED;
+
+    SELECT * INTO v_math_form
+    FROM mock_exam_forms
+    WHERE section = 'math' AND difficulty_level = 'medium' AND claimed_at IS NULL
+    ORDER BY created_at
+    LIMIT 1
+    FOR UPDATE SKIP LOCKED;
+
+    IF v_rw_form.id IS NULL OR v_math_form.id IS NULL THEN
+        RETURN NULL;
+    END IF;
+
+    INSERT INTO mock_exams (user_id, exam_type, status)
+    VALUES (v_user_id, p_exam_type, 'not_started')
+    RETURNING * INTO v_exam;
+
+    -- Reading/Writing first, as per SAT format
+    INSERT INTO mock_exam_modules (exam_id, module_type, module_number, time_limit_minutes, status)
+    VALUES (v_exam.id, 'rw_module_1', 1, p_time_limit_minutes, 'not_started')
+    RETURNING id INTO v_rw_module_id;
+
+    INSERT INTO mock_exam_modules (exam_id, module_type, module_number, time_limit_minutes, status)
+    VALUES (v_exam.id, 'rw_module_2', 2, p_time_limit_minutes, 'not_started');
+
+    INSERT INTO mock_exam_modules (exam_id, module_type, module_number, time_limit_minutes, status)
+    VALUES (v_exam.id, 'math_module_1', 1, p_time_limit_minutes, 'not_started')
+    RETURNING id INTO v_math_module_id;
+
+    INSERT INTO mock_exam_modules (exam_id, module_type, module_number, time_limit_minutes, status)
+    VALUES (v_exam.id, 'math_module_2', 2, p_time_limit_minutes, 'not_started');
+
+    UPDATE mock_exam_forms SET claimed_at = NOW(), claimed_module_id = v_rw_module_id
+    WHERE id = v_rw_form.id;
+    UPDATE mock_exam_forms SET claimed_at = NOW(), claimed_module_id = v_math_module_id
+    WHERE id = v_math_form.id;
+
+    INSERT INTO mock_exam_questions (module_id, question_id, display_order, status, is_marked_for_review)
+    SELECT v_rw_module_id, q.question_id, q.display_order, 'not_started', FALSE
+    FROM unnest(v_rw_form.question_ids) WITH ORDINALITY AS q(question_id, display_order);
+
+    INSERT INTO mock_exam_questions (module_id, question_id, display_order, status, is_marked_for_review)
+    SELECT v_math_module_id, q.question_id, q.display_order, 'not_started', FALSE
+    FROM unnest(v_math_form.question_ids) WITH ORDINALITY AS q(question_id, display_order);
+
+    RETURN jsonb_build_object(
+        'exam', to_jsonb(v_exam),
+        'modules', (
+            SELECT jsonb_agg(to_jsonb(mem) ORDER BY
+                CASE mem.module_type
+                    WHEN 'rw_module_1' THEN 1
+                    WHEN 'rw_module_2' THEN 2
+                    WHEN 'math_module_1' THEN 3
+                    ELSE 4
+                END)
+            FROM mock_exam_modules mem
+            WHERE mem.exam_id = v_exam.id
+        )
+    );
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+COMMENT ON FUNCTION create_mock_exam_from_forms IS 'Create a mock exam for auth.uid() from pooled module-1 forms';
+
+-- Per-tier counts of unclaimed forms, used by the replenish job
+CREATE OR REPLACE VIEW mock_exam_form_pool_levels AS
+SELECT section, difficulty_level, COUNT(*) AS available
+FROM mock_exam_forms
+WHERE claimed_at IS NULL
+GROUP BY section, difficulty_level;
+
+-- The functions run as owner, so keep them away from anonymous callers
+REVOKE EXECUTE ON FUNCTION assign_mock_exam_form(UUID, TEXT) FROM PUBLIC, anon;
+REVOKE EXECUTE ON FUNCTION create_mock_exam_from_forms(TEXT, INTEGER) FROM PUBLIC, anon;
+GRANT EXECUTE ON FUNCTION assign_mock_exam_form(UUID, TEXT) TO authenticated, service_role;
+GRANT EXECUTE ON FUNCTION create_mock_exam_from_forms(TEXT, INTEGER) TO authenticated, service_role;
+REVOKE ALL ON mock_exam_form_pool_levels FROM anon, authenticated;
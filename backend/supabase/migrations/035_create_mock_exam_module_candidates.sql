@@ -0,0 +1,168 @@
+-- Speculative module-2 candidates
+-- While a student works on module 1, an easy, medium and hard form for the
+-- section's module 2 are prepared here. Completing module 1 commits the tier
+-- picked by the score thresholds into mock_exam_questions and discards the rest,
+-- so module 2 is ready as soon as the completion call returns.
+
+CREATE TABLE mock_exam_module_candidates (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    module_id UUID NOT NULL REFERENCES mock_exam_modules(id) ON DELETE CASCADE,
+    difficulty_level VARCHAR(10) NOT NULL CHECK (difficulty_level IN ('easy', 'medium', 'hard')),
+    question_ids UUID[] NOT NULL,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    UNIQUE(module_id, difficulty_level)
+);
+
+CREATE INDEX idx_mock_exam_module_candidates_module_id ON mock_exam_module_candidates(module_id);
+
+ALTER TABLE mock_exam_module_candidates ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view own module candidates" ON mock_exam_module_candidates
+    FOR SELECT USING (
+        EXISTS (
+            SELECT 1 FROM mock_exam_modules mem
+            JOIN mock_exams me ON me.id = mem.exam_id
+            WHERE mem.id = mock_exam_module_candidates.module_id
+            AND me.user_id = auth.uid()
+        )
+    );
+
+CREATE POLICY "Users can insert own module candidates" ON mock_exam_module_candidates
+    FOR INSERT WITH CHECK (
+        EXISTS (
+            SELECT 1 FROM mock_exam_modules mem
+            JOIN mock_exams me ON me.id = mem.exam_id
+            WHERE mem.id = mock_exam_module_candidates.module_id
+            AND me.user_id = auth.uid()
+        )
+    );
+
+CREATE POLICY "Users can delete own module candidates" ON mock_exam_module_candidates
+    FOR DELETE USING (
+        EXISTS (
+            SELECT 1 FROM mock_exam_modules mem
+            JOIN mock_exams me ON me.id = mem.exam_id
+            WHERE mem.id = mock_exam_module_candidates.module_id
+            AND me.user_id = auth.uid()
+        )
+    );
+
+COMMENT ON TABLE mock_exam_module_candidates IS 'Speculatively prepared module-2 forms, one per difficulty tier';
+
+
+-- Move pooled forms into a module's candidates
+-- Claims one unclaimed form per tier that has no candidate yet and returns
+-- the tiers that are still missing (the caller assembles those itself).
+CREATE OR REPLACE FUNCTION reserve_module_candidates(p_module_id UUID)
+RETURNS TEXT[] AS $$
+DECLARE
+    v_module RECORD;
+    v_section TEXT;
+    v_difficulty TEXT;
+    v_form mock_exam_forms%ROWTYPE;
+    v_missing TEXT[] := ARRAY[]::TEXT[];
+BEGIN
+    SELECT mem.id, mem.module_type
+    INTO v_module
+    FROM mock_exam_modules mem
+    JOIN mock_exams me ON me.id = mem.exam_id
+    WHERE mem.id = p_module_id
+      AND (auth.uid() IS NULL OR me.user_id = auth.uid());
+
+    IF NOT FOUND THEN
+        RAISE EXCEPTION 'Module not found';
+    END IF;
+
+    -- Questions already committed: nothing left to speculate on
+    IF EXISTS (SELECT 1 FROM mock_exam_questions WHERE module_id = p_module_id) THEN
+        RETURN v_missing;
+    END IF;
+
+    v_section := CASE WHEN v_module.module_type::TEXT LIKE 'math%' THEN 'math' ELSE 'reading_writing' END;
+
+    FOREACH v_difficulty IN ARRAY ARRAY['easy', 'medium', 'hard'] LOOP
+        CONTINUE WHEN EXISTS (
+            SELECT 1 FROM mock_exam_module_candidates
+            WHERE module_id = p_module_id AND difficulty_level = v_difficulty
+        );
+
+        SELECT * INTO v_form
+        FROM mock_exam_forms
+        WHERE section = v_section
+          AND difficulty_level = v_difficulty
+          AND claimed_at IS NULL
+        ORDER BY created_at
+        LIMIT 1
+        FOR UPDATE SKIP LOCKED;
+
+        IF v_form.id IS NULL THEN
+            v_missing := array_append(v_missing, v_difficulty);
+            CONTINUE;
+        END IF;
+
+        UPDATE mock_exam_forms SET claimed_at = NOW(), claimed_module_id = p_module_id
+        WHERE id = v_form.id;
+
+        INSERT INTO mock_exam_module_candidates (module_id, difficulty_level, question_ids)
+        VALUES (p_module_id, v_difficulty, v_form.question_ids)
+        ON CONFLICT (module_id, difficulty_level) DO NOTHING;
+    END LOOP;
+
+    RETURN v_missing;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+COMMENT ON FUNCTION reserve_module_candidates IS 'Reserve pooled easy/medium/hard forms as module-2 candidates';
+
+
+-- Commit one candidate as the module's questions and discard the others
+-- Returns FALSE when there is no candidate for that tier (caller falls back
+-- to generating the module) or the module already has questions.
+CREATE OR REPLACE FUNCTION commit_module_candidate(
+    p_module_id UUID,
+    p_difficulty_level TEXT
+)
+RETURNS BOOLEAN AS $$
+DECLARE
+    v_question_ids UUID[];
+BEGIN
+    PERFORM 1
+    FROM mock_exam_modules mem
+    JOIN mock_exams me ON me.id = mem.exam_id
+    WHERE mem.id = p_module_id
+      AND (auth.uid() IS NULL OR me.user_id = auth.uid())
+    FOR UPDATE OF mem;
+
+    IF NOT FOUND THEN
+        RAISE EXCEPTION 'Module not found';
+    END IF;
+
+    IF EXISTS (SELECT 1 FROM mock_exam_questions WHERE module_id = p_module_id) THEN
+        DELETE FROM mock_exam_module_candidates WHERE module_id = p_module_id;
+        RETURN FALSE;
+    END IF;
+
+    SELECT question_ids INTO v_question_ids
+    FROM mock_exam_module_candidates
+    WHERE module_id = p_module_id AND difficulty_level = p_difficulty_level;
+
+    IF v_question_ids IS NULL THEN
+        RETURN FALSE;
+    END IF;
+
+    INSERT INTO mock_exam_questions (module_id, question_id, display_order, status, is_marked_for_review)
+    SELECT p_module_id, q.question_id, q.display_order, 'not_started', FALSE
+    FROM unnest(v_question_ids) WITH ORDINALITY AS q(question_id, display_order);
+
+    DELETE FROM mock_exam_module_candidates WHERE module_id = p_module_id;
+
+    RETURN TRUE;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+COMMENT ON FUNCTION commit_module_candidate IS 'Commit the chosen module-2 candidate and discard the rest';
+
+REVOKE EXECUTE ON FUNCTION reserve_module_candidates(UUID) FROM PUBLIC, anon;
+REVOKE EXECUTE ON FUNCTION commit_module_candidate(UUID, TEXT) FROM PUBLIC, anon;
+GRANT EXECUTE ON FUNCTION reserve_module_candidates(UUID) TO authenticated, service_role;
+GRANT EXECUTE ON FUNCTION commit_module_candidate(UUID, TEXT) TO authenticated, service_role;
@@ -0,0 +1,135 @@
+-- Durable background jobs
+-- Work that used to run in FastAPI BackgroundTasks (lost on restart, no
+-- retries) is queued here instead. Workers claim due jobs with
+-- FOR UPDATE SKIP LOCKED so any number of them can poll concurrently without
+-- handing the same job out twice. See app/services/job_queue.py.
+
+CREATE TABLE background_jobs (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    job_type VARCHAR(100) NOT NULL,
+    -- Idempotency key: enqueueing the same key again returns the existing job
+    job_key TEXT UNIQUE,
+    payload JSONB NOT NULL DEFAULT '{}'::jsonb,
+    user_id UUID REFERENCES users(id) ON DELETE CASCADE,
+    status VARCHAR(20) NOT NULL DEFAULT 'queued'
+        CHECK (status IN ('queued', 'running', 'succeeded', 'failed')),
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 5,
+    run_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    locked_by TEXT,
+    locked_at TIMESTAMPTZ,
+    last_error TEXT,
+    result JSONB,
+    completed_at TIMESTAMPTZ,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- Claim scans: due queued jobs, and running jobs whose lease expired
+CREATE INDEX idx_background_jobs_due ON background_jobs(run_at) WHERE status = 'queued';
+CREATE INDEX idx_background_jobs_running ON background_jobs(locked_at) WHERE status = 'running';
+CREATE INDEX idx_background_jobs_user ON background_jobs(user_id, created_at DESC);
+
+CREATE TRIGGER update_background_jobs_updated_at BEFORE UPDATE ON background_jobs
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+ALTER TABLE background_jobs ENABLE ROW LEVEL SECURITY;
+
+-- Users can follow their own jobs; workers use the service role
+CREATE POLICY "Users can view own jobs" ON background_jobs
+    FOR SELECT USING (auth.uid() = user_id);
+
+COMMENT ON TABLE background_jobs IS 'Durable job queue claimed with SKIP LOCKED by app.worker';
+
+
+-- Enqueue a job, or return the existing one with the same job_key
+CREATE OR REPLACE FUNCTION enqueue_job(
+    p_job_type TEXT,
+    p_payload JSONB DEFAULT '{}'::jsonb,
+    p_job_key TEXT DEFAULT NULL,
+    p_user_id UUID DEFAULT NULL,
+    p_max_attempts INTEGER DEFAULT 5,
+    p_delay_seconds INTEGER DEFAULT 0
+)
+RETURNS background_jobs AS $$
+DECLARE
+    v_job background_jobs;
+BEGIN
+    IF auth.uid() IS NOT NULL AND p_user_id IS DISTINCT FROM auth.uid() THEN
+        RAISE EXCEPTION 'Cannot enqueue jobs for another user';
+    END IF;
+
+    INSERT INTO background_jobs (job_type, payload, job_key, user_id, max_attempts, run_at)
+    VALUES (
+        p_job_type,
+        p_payload,
+        p_job_key,
+        p_user_id,
+        p_max_attempts,
+        NOW() + make_interval(secs => p_delay_seconds)
+    )
+    ON CONFLICT (job_key) DO NOTHING
+    RETURNING * INTO v_job;
+
+    IF v_job.id IS NULL THEN
+        SELECT * INTO v_job FROM background_jobs WHERE job_key = p_job_key;
+    END IF;
+
+    RETURN v_job;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+COMMENT ON FUNCTION enqueue_job IS 'Idempotently enqueue a background job (dedup on job_key)';
+
+
+-- Claim up to p_limit due jobs for a worker
+-- Also reclaims running jobs whose lease (p_lease_seconds since they were
+-- claimed) expired because the worker crashed or restarted mid-job; those
+-- that already used up their attempts are marked failed instead.
+CREATE OR REPLACE FUNCTION claim_jobs(
+    p_worker_id TEXT,
+    p_limit INTEGER DEFAULT 1,
+    p_job_types TEXT[] DEFAULT NULL,
+    p_job_id UUID DEFAULT NULL,
+    p_lease_seconds INTEGER DEFAULT 300
+)
+RETURNS SETOF background_jobs AS $$
+BEGIN
+    UPDATE background_jobs
+    SET status = 'failed',
+        last_error = COALESCE(last_error, 'Worker lease expired'),
+        completed_at = NOW()
+    WHERE status = 'running'
+      AND locked_at < NOW() - make_interval(secs => p_lease_seconds)
+      AND attempts >= max_attempts;
+
+    RETURN QUERY
+    UPDATE background_jobs bj
+    SET status = 'running',
+        locked_by = p_worker_id,
+        locked_at = NOW(),
+        attempts = bj.attempts + 1
+    WHERE bj.id IN (
+        SELECT id
+        FROM background_jobs
+        WHERE (
+                (status = 'queued' AND run_at <= NOW())
+                OR (status = 'running' AND locked_at < NOW() - make_interval(secs => p_lease_seconds))
+            )
+          AND (p_job_types IS NULL OR job_type = ANY(p_job_types))
+          AND (p_job_id IS NULL OR id = p_job_id)
+        ORDER BY run_at
+        LIMIT p_limit
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING bj.*;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+COMMENT ON FUNCTION claim_jobs IS 'Claim due jobs with FOR UPDATE SKIP LOCKED';
+
+-- Workers run with the service role; users only enqueue their own jobs
+REVOKE EXECUTE ON FUNCTION enqueue_job(TEXT, JSONB, TEXT, UUID, INTEGER, INTEGER) FROM PUBLIC, anon;
+REVOKE EXECUTE ON FUNCTION claim_jobs(TEXT, INTEGER, TEXT[], UUID, INTEGER) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION enqueue_job(TEXT, JSONB, TEXT, UUID, INTEGER, INTEGER) TO authenticated, service_role;
+GRANT EXECUTE ON FUNCTION claim_jobs(TEXT, INTEGER, TEXT[], UUID, INTEGER) TO service_role;
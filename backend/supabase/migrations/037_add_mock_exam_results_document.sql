@@ -0,0 +1,9 @@
+-- Cached results document for completed mock exams
+-- Written by MockExamService._finalize_exam (per-module question breakdown,
+-- category performance, totals). Completed exams never change, so reading
+-- results is a single row fetch instead of one nested query per module.
+-- Exams completed before this migration are backfilled on their first read.
+
+ALTER TABLE mock_exams ADD COLUMN IF NOT EXISTS results JSONB;
+
+COMMENT ON COLUMN mock_exams.results IS 'Finalized results document served by GET /mock-exams/{id}/results';
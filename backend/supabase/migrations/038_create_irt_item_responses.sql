@@ -0,0 +1,47 @@
+-- Scored responses for IRT calibration
+-- One row per answered question across practice sessions, mock exams and
+-- diagnostic tests, with the responding user resolved. Read page by page
+-- (per source, keyset on response_id) by IRTCalibrationService, which fits
+-- 2PL parameters into question_difficulty_params.
+
+CREATE OR REPLACE VIEW irt_item_responses AS
+SELECT
+    'session'::TEXT AS source,
+    sq.id AS response_id,
+    sp.user_id,
+    sq.question_id,
+    sq.is_correct
+FROM session_questions sq
+JOIN practice_sessions ps ON ps.id = sq.session_id
+JOIN study_plans sp ON sp.id = ps.study_plan_id
+WHERE sq.is_correct IS NOT NULL
+UNION ALL
+SELECT
+    'mock_exam'::TEXT,
+    meq.id,
+    me.user_id,
+    meq.question_id,
+    meq.is_correct
+FROM mock_exam_questions meq
+JOIN mock_exam_modules mem ON mem.id = meq.module_id
+JOIN mock_exams me ON me.id = mem.exam_id
+WHERE meq.is_correct IS NOT NULL
+UNION ALL
+SELECT
+    'diagnostic'::TEXT,
+    dtq.id,
+    dt.user_id,
+    dtq.question_id,
+    dtq.is_correct
+FROM diagnostic_test_questions dtq
+JOIN diagnostic_tests dt ON dt.id = dtq.test_id
+WHERE dtq.is_correct IS NOT NULL;
+
+COMMENT ON VIEW irt_item_responses IS 'Scored responses from all sources, read by the IRT calibration job';
+
+-- The view runs as its owner and spans every user's answers: service role only
+REVOKE ALL ON irt_item_responses FROM anon, authenticated;
+GRANT SELECT ON irt_item_responses TO service_role;
+
+-- When each item's parameters were last estimated
+ALTER TABLE question_difficulty_params ADD COLUMN IF NOT EXISTS calibrated_at TIMESTAMPTZ;
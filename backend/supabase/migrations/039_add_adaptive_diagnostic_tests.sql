@@ -0,0 +1,15 @@
+-- Adaptive (CAT) diagnostic tests
+-- Adaptive tests add questions one at a time (POST /diagnostic-test/{id}/next-question)
+-- instead of assigning a fixed form at creation, and keep a running ability
+-- estimate per section. See app/services/adaptive_testing.py.
+
+ALTER TABLE diagnostic_tests
+    ADD COLUMN IF NOT EXISTS mode VARCHAR(10) NOT NULL DEFAULT 'fixed'
+        CHECK (mode IN ('fixed', 'adaptive')),
+    -- IRT ability (theta) and its standard error per section
+    ADD COLUMN IF NOT EXISTS math_ability DECIMAL(5,3),
+    ADD COLUMN IF NOT EXISTS math_ability_se DECIMAL(5,3),
+    ADD COLUMN IF NOT EXISTS rw_ability DECIMAL(5,3),
+    ADD COLUMN IF NOT EXISTS rw_ability_se DECIMAL(5,3);
+
+COMMENT ON COLUMN diagnostic_tests.mode IS 'fixed: form assigned at creation; adaptive: items selected one at a time';
@@ -0,0 +1,40 @@
+-- Mean skill mastery per performance snapshot
+-- The growth curve plots the mean of skills_snapshot for every snapshot.
+-- Keeping it in its own column lets the snapshot time series (see
+-- app/services/snapshot_series.py) select a few narrow columns instead of
+-- every snapshot's full skills JSON. NULL when the snapshot has no skills.
+
+ALTER TABLE user_performance_snapshots
+    ADD COLUMN IF NOT EXISTS mean_mastery DOUBLE PRECISION;
+
+CREATE OR REPLACE FUNCTION set_snapshot_mean_mastery()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF jsonb_typeof(NEW.skills_snapshot) = 'object' THEN
+        NEW.mean_mastery := (
+            SELECT AVG(value::DOUBLE PRECISION) FROM jsonb_each_text(NEW.skills_snapshot)
+        );
+    ELSE
+        NEW.mean_mastery := NULL;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_snapshot_mean_mastery ON user_performance_snapshots;
+CREATE TRIGGER trg_snapshot_mean_mastery
+    BEFORE INSERT OR UPDATE OF skills_snapshot ON user_performance_snapshots
+    FOR EACH ROW EXECUTE FUNCTION set_snapshot_mean_mastery();
+
+-- Backfill existing snapshots
+UPDATE user_performance_snapshots s
+SET mean_mastery = m.mean_mastery
+FROM (
+    SELECT id, AVG(kv.value::DOUBLE PRECISION) AS mean_mastery
+    FROM user_performance_snapshots, jsonb_each_text(skills_snapshot) AS kv
+    WHERE jsonb_typeof(skills_snapshot) = 'object'
+    GROUP BY id
+) m
+WHERE s.id = m.id AND s.mean_mastery IS NULL;
+
+COMMENT ON COLUMN user_performance_snapshots.mean_mastery IS 'Mean of skills_snapshot values, maintained by trigger';
@@ -0,0 +1,65 @@
+-- Population percentiles
+-- Where a student's predicted score, learning velocity and mastery rank
+-- among all students. PopulationIndexService (app/services/population_index.py)
+-- reads one row per student from user_population_metrics, keyset-paginated on
+-- user_id, and stores a t-digest (a compact quantile sketch) per metric and
+-- section in population_percentiles. The API loads those digests into memory
+-- and answers percentile queries from them.
+
+-- Each student's latest snapshot values and velocity over their last 20
+-- snapshots (points per week between the oldest and newest, counting whole
+-- days, as VelocityService does)
+CREATE OR REPLACE VIEW user_population_metrics AS
+SELECT
+    user_id,
+    (ARRAY_AGG(predicted_sat_math ORDER BY created_at DESC))[1] AS predicted_sat_math,
+    (ARRAY_AGG(predicted_sat_rw ORDER BY created_at DESC))[1] AS predicted_sat_rw,
+    (ARRAY_AGG(mean_mastery ORDER BY created_at DESC))[1] AS mean_mastery,
+    CASE
+        WHEN FLOOR(EXTRACT(EPOCH FROM MAX(created_at) - MIN(created_at)) / 86400) > 0 THEN
+            ROUND((
+                (ARRAY_AGG(predicted_total ORDER BY created_at DESC))[1]
+                - (ARRAY_AGG(predicted_total ORDER BY created_at))[1]
+            ) / (FLOOR(EXTRACT(EPOCH FROM MAX(created_at) - MIN(created_at)) / 86400) / 7.0), 1)
+    END AS velocity
+FROM (
+    SELECT
+        user_id,
+        created_at,
+        predicted_sat_math,
+        predicted_sat_rw,
+        mean_mastery,
+        COALESCE(predicted_sat_math, 0) + COALESCE(predicted_sat_rw, 0) AS predicted_total,
+        ROW_NUMBER() OVER (PARTITION BY user_id ORDER BY created_at DESC) AS recency
+    FROM user_performance_snapshots
+) recent
+WHERE recency <= 20
+GROUP BY user_id;
+
+COMMENT ON VIEW user_population_metrics IS 'Per-student metrics for population percentiles, read by the percentile rebuild job';
+
+-- The view runs as its owner and spans every user's snapshots: service role only
+REVOKE ALL ON user_population_metrics FROM anon, authenticated;
+GRANT SELECT ON user_population_metrics TO service_role;
+
+CREATE TABLE IF NOT EXISTS population_percentiles (
+    metric VARCHAR(20) NOT NULL,   -- score, velocity, mastery
+    section VARCHAR(10) NOT NULL,  -- math, rw, total
+    -- t-digest centroids: {"means": [...], "weights": [...], "min": x, "max": y}
+    digest JSONB NOT NULL,
+    population INTEGER NOT NULL,
+    built_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (metric, section)
+);
+
+COMMENT ON TABLE population_percentiles IS 'Quantile sketches of student metrics, rebuilt periodically';
+
+ALTER TABLE population_percentiles ENABLE ROW LEVEL SECURITY;
+
+-- Aggregates only (no per-student data): readable by any signed-in user,
+-- written by the rebuild job with the service role
+CREATE POLICY "Population percentiles are viewable by signed-in users"
+    ON population_percentiles
+    FOR SELECT
+    TO authenticated
+    USING (true);
@@ -0,0 +1,43 @@
+-- Admin question browser: filter and page in the database
+-- The browser's quality filters (PNG images in the stem or answer options,
+-- empty correct answers) used to run in Python on each fetched page, so pages
+-- came back short and page boundaries shifted. They are now generated columns
+-- the page query filters on. Pages are keyset-paginated on (created_at, id),
+-- and stem / external_id substring search is backed by trigram indexes.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+ALTER TABLE questions
+    ADD COLUMN IF NOT EXISTS has_png_in_stem BOOLEAN
+        GENERATED ALWAYS AS (stem LIKE '%data:image/png%') STORED,
+    ADD COLUMN IF NOT EXISTS has_png_in_options BOOLEAN
+        GENERATED ALWAYS AS (COALESCE(answer_options::TEXT LIKE '%data:image/png%', FALSE)) STORED,
+    ADD COLUMN IF NOT EXISTS has_empty_answers BOOLEAN
+        GENERATED ALWAYS AS (
+            CASE jsonb_typeof(correct_answer)
+                WHEN 'array' THEN jsonb_array_length(correct_answer) = 0
+                WHEN 'object' THEN correct_answer = '{}'::JSONB
+                WHEN 'string' THEN correct_answer #>> '{}' = ''
+                WHEN 'null' THEN TRUE
+                ELSE FALSE
+            END
+        ) STORED;
+
+COMMENT ON COLUMN questions.has_png_in_stem IS 'Stem embeds a base64 PNG image (generated)';
+COMMENT ON COLUMN questions.has_png_in_options IS 'Answer options embed a base64 PNG image (generated)';
+COMMENT ON COLUMN questions.has_empty_answers IS 'correct_answer is empty (generated)';
+
+-- Keyset pagination needs a total order: newest first, ties broken by id
+UPDATE questions SET created_at = NOW() WHERE created_at IS NULL;
+ALTER TABLE questions ALTER COLUMN created_at SET NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_questions_created_id ON questions(created_at DESC, id DESC);
+
+-- Problem questions are few: partial indexes keep "show only broken" fast
+CREATE INDEX IF NOT EXISTS idx_questions_png_stem ON questions(created_at DESC, id DESC) WHERE has_png_in_stem;
+CREATE INDEX IF NOT EXISTS idx_questions_png_options ON questions(created_at DESC, id DESC) WHERE has_png_in_options;
+CREATE INDEX IF NOT EXISTS idx_questions_empty_answers ON questions(created_at DESC, id DESC) WHERE has_empty_answers;
+
+-- ILIKE '%term%' on stem or external_id
+CREATE INDEX IF NOT EXISTS idx_questions_stem_trgm ON questions USING gin(stem gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_questions_external_id_trgm ON questions USING gin(external_id gin_trgm_ops);
@@ -0,0 +1,190 @@
+-- Question pool search
+-- The question pool browser searched with stem ILIKE '%term%' twice (page and
+-- exact count), matching inside HTML tags and MathML markup and scanning the
+-- whole table. Questions now carry their stem, stimulus and rationale as
+-- plain text and as a weighted tsvector, both generated, with GIN indexes.
+-- search_questions ranks full-text matches (every word, the last one as a
+-- prefix so partly typed words match), falls back to trigram word similarity
+-- when nothing matches (typos), and returns a highlighted snippet per result
+-- with the page. At most p_max_matches matches are ranked and counted, so a
+-- query that matches much of the bank (a common word) costs the same however
+-- large the bank grows. QuestionSearchService (app/services/question_search.py)
+-- calls it and caches the top results of recent queries.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- HTML -> text: drop tags (including embedded images) and entities, collapse whitespace
+CREATE OR REPLACE FUNCTION question_plain_text(p_html TEXT)
+RETURNS TEXT AS $$
+    SELECT btrim(regexp_replace(
+        regexp_replace(
+            regexp_replace(COALESCE(p_html, ''), '<[^>]*>', ' ', 'g'),
+            '&(#[0-9]+|#x[0-9a-fA-F]+|[a-zA-Z]+);', ' ', 'g'
+        ),
+        '\s+', ' ', 'g'
+    ))
+$$ LANGUAGE sql IMMUTABLE PARALLEL SAFE;
+
+COMMENT ON FUNCTION question_plain_text IS 'Plain text of question HTML, for search columns';
+
+ALTER TABLE questions
+    ADD COLUMN IF NOT EXISTS search_text TEXT
+        GENERATED ALWAYS AS (
+            question_plain_text(stem) || ' ' || question_plain_text(stimulus) || ' ' || question_plain_text(rationale)
+        ) STORED,
+    ADD COLUMN IF NOT EXISTS search_vector TSVECTOR
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', question_plain_text(stem)), 'A')
+            || setweight(to_tsvector('english', question_plain_text(stimulus)), 'B')
+            || setweight(to_tsvector('english', question_plain_text(rationale)), 'C')
+        ) STORED;
+
+COMMENT ON COLUMN questions.search_text IS 'Stem, stimulus and rationale as plain text (generated)';
+COMMENT ON COLUMN questions.search_vector IS 'Weighted full-text vector: stem A, stimulus B, rationale C (generated)';
+
+CREATE INDEX IF NOT EXISTS idx_questions_search_vector ON questions USING gin(search_vector);
+CREATE INDEX IF NOT EXISTS idx_questions_search_text_trgm ON questions USING gin(search_text gin_trgm_ops);
+
+
+-- One page of active questions matching p_query, best first, with the filters
+-- of the question pool browser. Every row carries the number of matches (at
+-- most p_max_matches: the first that many found are ranked) and whether they
+-- are full-text ('exact') or similarity ('fuzzy') matches.
+CREATE OR REPLACE FUNCTION search_questions(
+    p_query TEXT,
+    p_section TEXT DEFAULT NULL,
+    p_difficulty TEXT DEFAULT NULL,
+    p_topic_id UUID DEFAULT NULL,
+    p_category_id UUID DEFAULT NULL,
+    p_limit INTEGER DEFAULT 20,
+    p_offset INTEGER DEFAULT 0,
+    p_max_matches INTEGER DEFAULT 1000
+)
+RETURNS TABLE (
+    id UUID,
+    stem TEXT,
+    stimulus TEXT,
+    difficulty VARCHAR,
+    question_type VARCHAR,
+    answer_options JSONB,
+    correct_answer JSONB,
+    rationale TEXT,
+    topic_id UUID,
+    topic_name TEXT,
+    category_id UUID,
+    category_name TEXT,
+    section TEXT,
+    rank REAL,
+    snippet TEXT,
+    match_type TEXT,
+    total_count BIGINT
+) AS $$
+#variable_conflict use_column
+DECLARE
+    v_words TEXT[];
+    v_tsquery TSQUERY;
+    v_plain TEXT;
+BEGIN
+    -- Words only; each must match, the last one as a prefix ("quadr" -> quadratic)
+    v_plain := btrim(regexp_replace(lower(COALESCE(p_query, '')), '[^[:alnum:]]+', ' ', 'g'));
+    IF v_plain = '' THEN
+        RETURN;
+    END IF;
+    v_words := regexp_split_to_array(v_plain, ' ');
+    v_tsquery := to_tsquery('english', array_to_string(v_words[1:array_length(v_words, 1) - 1], ' & ')
+        || CASE WHEN array_length(v_words, 1) > 1 THEN ' & ' ELSE '' END
+        || v_words[array_length(v_words, 1)] || ':*');
+
+    IF numnode(v_tsquery) > 0 AND EXISTS (
+        SELECT 1
+        FROM questions q
+        JOIN topics t ON t.id = q.topic_id
+        JOIN categories c ON c.id = t.category_id
+        WHERE q.is_active
+          AND q.search_vector @@ v_tsquery
+          AND (p_section IS NULL OR c.section = p_section)
+          AND (p_difficulty IS NULL OR q.difficulty = p_difficulty)
+          AND (p_topic_id IS NULL OR q.topic_id = p_topic_id)
+          AND (p_category_id IS NULL OR t.category_id = p_category_id)
+    ) THEN
+        RETURN QUERY
+        SELECT
+            page.id, page.stem, page.stimulus, page.difficulty, page.question_type,
+            page.answer_options, page.correct_answer, page.rationale, page.topic_id,
+            page.topic_name, page.category_id, page.category_name, page.section,
+            page.rank,
+            -- Highlighting is the expensive part: only for the page
+            ts_headline(
+                'english', page.search_text, v_tsquery,
+                'StartSel=<mark>, StopSel=</mark>, MaxFragments=2, MaxWords=18, MinWords=6, FragmentDelimiter=" … "'
+            ),
+            'exact'::TEXT,
+            page.total_count
+        FROM (
+            SELECT
+                m.*,
+                ts_rank_cd(m.search_vector, v_tsquery, 32) AS rank,
+                COUNT(*) OVER () AS total_count
+            FROM (
+                SELECT
+                    q.id, q.stem, q.stimulus, q.difficulty, q.question_type, q.answer_options,
+                    q.correct_answer, q.rationale, q.topic_id, t.name::TEXT AS topic_name,
+                    t.category_id, c.name::TEXT AS category_name, c.section::TEXT AS section,
+                    q.search_text, q.search_vector
+                FROM questions q
+                JOIN topics t ON t.id = q.topic_id
+                JOIN categories c ON c.id = t.category_id
+                WHERE q.is_active
+                  AND q.search_vector @@ v_tsquery
+                  AND (p_section IS NULL OR c.section = p_section)
+                  AND (p_difficulty IS NULL OR q.difficulty = p_difficulty)
+                  AND (p_topic_id IS NULL OR q.topic_id = p_topic_id)
+                  AND (p_category_id IS NULL OR t.category_id = p_category_id)
+                LIMIT p_max_matches
+            ) m
+            ORDER BY rank DESC, m.id
+            LIMIT p_limit OFFSET p_offset
+        ) page
+        ORDER BY page.rank DESC, page.id;
+        RETURN;
+    END IF;
+
+    -- Nothing matches every word: questions containing words similar to the
+    -- query (misspellings), by trigram word similarity
+    RETURN QUERY
+    SELECT
+        m.id, m.stem, m.stimulus, m.difficulty, m.question_type, m.answer_options,
+        m.correct_answer, m.rationale, m.topic_id, m.topic_name, m.category_id,
+        m.category_name, m.section,
+        word_similarity(v_plain, m.search_text) AS rank,
+        left(m.search_text, 200),
+        'fuzzy'::TEXT,
+        COUNT(*) OVER ()
+    FROM (
+        SELECT
+            q.id, q.stem, q.stimulus, q.difficulty, q.question_type, q.answer_options,
+            q.correct_answer, q.rationale, q.topic_id, t.name::TEXT AS topic_name,
+            t.category_id, c.name::TEXT AS category_name, c.section::TEXT AS section,
+            q.search_text
+        FROM questions q
+        JOIN topics t ON t.id = q.topic_id
+        JOIN categories c ON c.id = t.category_id
+        WHERE q.is_active
+          AND v_plain <% q.search_text
+          AND (p_section IS NULL OR c.section = p_section)
+          AND (p_difficulty IS NULL OR q.difficulty = p_difficulty)
+          AND (p_topic_id IS NULL OR q.topic_id = p_topic_id)
+          AND (p_category_id IS NULL OR t.category_id = p_category_id)
+        LIMIT p_max_matches
+    ) m
+    ORDER BY rank DESC, m.id
+    LIMIT p_limit OFFSET p_offset;
+END;
+$$ LANGUAGE plpgsql STABLE
+SET pg_trgm.word_similarity_threshold = 0.5;
+
+COMMENT ON FUNCTION search_questions IS 'Ranked question pool search with snippets and a typo-tolerant fallback';
+
+-- Runs as the caller, so questions' row level security applies
+REVOKE EXECUTE ON FUNCTION search_questions(TEXT, TEXT, TEXT, UUID, UUID, INTEGER, INTEGER, INTEGER) FROM PUBLIC, anon;
+GRANT EXECUTE ON FUNCTION search_questions(TEXT, TEXT, TEXT, UUID, UUID, INTEGER, INTEGER, INTEGER) TO authenticated, service_role;
@@ -0,0 +1,37 @@
+-- Vocabulary: normalized word for dedup and search
+-- Adding a word looked it up with word ILIKE '...' first (a scan of the
+-- user's words that the LOWER(word) unique index cannot serve) and then
+-- inserted it: two requests, and concurrent adds of the same word raised a
+-- unique violation instead of a conflict. Lists were searched with
+-- word ILIKE '%term%' and an exact count. Words now carry a generated
+-- normalized form with a unique (user_id, word_norm) index: an add is one
+-- INSERT ... ON CONFLICT DO NOTHING, and searches are prefix range scans on
+-- the same index.
+
+-- lower case, whitespace trimmed and collapsed (matches _normalize_word in app/api/vocabulary.py)
+ALTER TABLE vocabulary_words
+    ADD COLUMN IF NOT EXISTS word_norm TEXT
+        GENERATED ALWAYS AS (lower(btrim(regexp_replace(word, '\s+', ' ', 'g')))) STORED;
+
+ALTER TABLE popular_sat_vocab
+    ADD COLUMN IF NOT EXISTS word_norm TEXT
+        GENERATED ALWAYS AS (lower(btrim(regexp_replace(word, '\s+', ' ', 'g')))) STORED;
+
+COMMENT ON COLUMN vocabulary_words.word_norm IS 'Normalized word: lower case, whitespace collapsed (generated)';
+COMMENT ON COLUMN popular_sat_vocab.word_norm IS 'Normalized word: lower case, whitespace collapsed (generated)';
+
+-- Words that only differed in whitespace: keep the oldest
+DELETE FROM vocabulary_words v
+USING vocabulary_words older
+WHERE v.user_id = older.user_id
+  AND v.word_norm = older.word_norm
+  AND (v.created_at, v.id) > (older.created_at, older.id);
+
+-- The upsert conflict target and, with text_pattern_ops, the index for
+-- word_norm LIKE 'prefix%' (a range scan in any collation)
+CREATE UNIQUE INDEX IF NOT EXISTS idx_vocabulary_words_user_word_norm
+    ON vocabulary_words(user_id, word_norm text_pattern_ops);
+DROP INDEX IF EXISTS idx_vocabulary_words_user_word_unique;
+
+CREATE INDEX IF NOT EXISTS idx_popular_vocab_word_norm
+    ON popular_sat_vocab(word_norm text_pattern_ops);
@@ -0,0 +1,9 @@
+-- Only the service role enqueues background jobs
+-- enqueue_job is SECURITY DEFINER and workers run jobs with the service role,
+-- so letting authenticated users call it let any user queue any job type with
+-- any payload (finalizing someone else's exam, full IRT calibrations) or
+-- claim job_keys before the API used them. The API enqueues through the
+-- service-role client after checking ownership, so users need no access.
+
+REVOKE EXECUTE ON FUNCTION enqueue_job(TEXT, JSONB, TEXT, UUID, INTEGER, INTEGER) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION enqueue_job(TEXT, JSONB, TEXT, UUID, INTEGER, INTEGER) TO service_role;
@@ -0,0 +1,84 @@
+-- Module-2 candidates are written and committed by the service role only
+-- Users could insert candidate rows with question_ids of their choosing and
+-- call commit_module_candidate (SECURITY DEFINER) directly with any tier,
+-- before or regardless of their module-1 score. The API now reserves and
+-- commits candidates through the service-role client after checking
+-- ownership, and the commit picks the tier from module 1's stored raw score.
+
+DROP POLICY IF EXISTS "Users can insert own module candidates" ON mock_exam_module_candidates;
+DROP POLICY IF EXISTS "Users can delete own module candidates" ON mock_exam_module_candidates;
+
+DROP FUNCTION IF EXISTS commit_module_candidate(UUID, TEXT);
+
+-- Commit module 2's candidate for the tier earned in module 1, discard the others
+-- Returns FALSE when there is no candidate for that tier (caller falls back
+-- to generating the module) or the module already has questions. Raises if
+-- module 1 of the section is not completed.
+CREATE OR REPLACE FUNCTION commit_module_candidate(p_module_id UUID)
+RETURNS BOOLEAN AS $$
+DECLARE
+    v_module RECORD;
+    v_raw_score INTEGER;
+    v_difficulty TEXT;
+    v_question_ids UUID[];
+BEGIN
+    SELECT mem.exam_id, mem.module_type
+    INTO v_module
+    FROM mock_exam_modules mem
+    JOIN mock_exams me ON me.id = mem.exam_id
+    WHERE mem.id = p_module_id
+      AND mem.module_number = 2
+      AND (auth.uid() IS NULL OR me.user_id = auth.uid())
+    FOR UPDATE OF mem;
+
+    IF NOT FOUND THEN
+        RAISE EXCEPTION 'Module not found';
+    END IF;
+
+    SELECT raw_score INTO v_raw_score
+    FROM mock_exam_modules
+    WHERE exam_id = v_module.exam_id
+      AND module_number = 1
+      AND module_type::TEXT = replace(v_module.module_type::TEXT, '_module_2', '_module_1')
+      AND status = 'completed';
+
+    IF NOT FOUND THEN
+        RAISE EXCEPTION 'Module 1 not completed';
+    END IF;
+
+    IF EXISTS (SELECT 1 FROM mock_exam_questions WHERE module_id = p_module_id) THEN
+        DELETE FROM mock_exam_module_candidates WHERE module_id = p_module_id;
+        RETURN FALSE;
+    END IF;
+
+    -- Same thresholds as MockExamService._next_module_difficulty (27 questions per module)
+    v_difficulty := CASE
+        WHEN COALESCE(v_raw_score, 0) / 27.0 >= 0.7 THEN 'hard'
+        WHEN COALESCE(v_raw_score, 0) / 27.0 >= 0.4 THEN 'medium'
+        ELSE 'easy'
+    END;
+
+    SELECT question_ids INTO v_question_ids
+    FROM mock_exam_module_candidates
+    WHERE module_id = p_module_id AND difficulty_level = v_difficulty;
+
+    IF v_question_ids IS NULL THEN
+        RETURN FALSE;
+    END IF;
+
+    INSERT INTO mock_exam_questions (module_id, question_id, display_order, status, is_marked_for_review)
+    SELECT p_module_id, q.question_id, q.display_order, 'not_started', FALSE
+    FROM unnest(v_question_ids) WITH ORDINALITY AS q(question_id, display_order);
+
+    DELETE FROM mock_exam_module_candidates WHERE module_id = p_module_id;
+
+    RETURN TRUE;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+COMMENT ON FUNCTION commit_module_candidate IS 'Commit the module-2 candidate for the tier earned in module 1 and discard the rest';
+
+REVOKE EXECUTE ON FUNCTION reserve_module_candidates(UUID) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION commit_module_candidate(UUID) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION reserve_module_candidates(UUID) TO service_role;
+GRANT EXECUTE ON FUNCTION commit_module_candidate(UUID) TO service_role;
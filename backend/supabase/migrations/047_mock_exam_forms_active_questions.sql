@@ -0,0 +1,368 @@
+-- Pooled mock exam forms: skip inactive questions, delete claimed forms and
+-- serialize refills
+-- Forms kept the question ids they were built with, so a question
+-- deactivated afterwards (admin toggle, bulk disable) could still be served
+-- in new exams. Claiming a form now checks its questions against
+-- questions.is_active and discards forms that fail, as does committing a
+-- module-2 candidate. Claimed forms are deleted instead of being kept with
+-- claimed_at set, and the replenish job takes a lease so concurrent refills
+-- (one is scheduled after every exam create) don't overfill the pool.
+
+-- Claimed forms are no longer kept
+DELETE FROM mock_exam_forms WHERE claimed_at IS NOT NULL;
+
+COMMENT ON COLUMN mock_exam_forms.claimed_at IS 'Unused: claimed forms are deleted (migration 047)';
+COMMENT ON COLUMN mock_exam_forms.claimed_module_id IS 'Unused: claimed forms are deleted (migration 047)';
+
+
+-- Whether every question of a form still exists and is active
+CREATE OR REPLACE FUNCTION mock_exam_questions_active(p_question_ids UUID[])
+RETURNS BOOLEAN AS $$
+    SELECT NOT EXISTS (
+        SELECT 1
+        FROM unnest(p_question_ids) AS f(question_id)
+        LEFT JOIN questions q ON q.id = f.question_id
+        WHERE q.is_active IS NOT TRUE
+    );
+$$ LANGUAGE sql STABLE;
+
+
+-- Take the oldest pooled form of a tier out of the pool
+-- Forms with an inactive question are deleted and skipped. Returns the
+-- form's question ids, or NULL when the pool has no usable form.
+CREATE OR REPLACE FUNCTION claim_mock_exam_form(
+    p_section TEXT,
+    p_difficulty_level TEXT
+)
+RETURNS UUID[] AS $$
+DECLARE
+    v_form_id UUID;
+    v_question_ids UUID[];
+BEGIN
+    LOOP
+        SELECT id, question_ids
+        INTO v_form_id, v_question_ids
+        FROM mock_exam_forms
+        WHERE section = p_section
+          AND difficulty_level = p_difficulty_level
+          AND claimed_at IS NULL
+        ORDER BY created_at
+        LIMIT 1
+        FOR UPDATE SKIP LOCKED;
+
+        IF v_form_id IS NULL THEN
+            RETURN NULL;
+        END IF;
+
+        DELETE FROM mock_exam_forms WHERE id = v_form_id;
+
+        IF mock_exam_questions_active(v_question_ids) THEN
+            RETURN v_question_ids;
+        END IF;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION claim_mock_exam_form IS 'Remove and return the oldest pooled form of a tier whose questions are all active';
+
+
+-- Claim one form and copy its questions into a module
+-- Returns FALSE when the pool has no usable form for that tier (caller falls
+-- back to sampling) or the module already has questions.
+CREATE OR REPLACE FUNCTION assign_mock_exam_form(
+    p_module_id UUID,
+    p_difficulty_level TEXT
+)
+RETURNS BOOLEAN AS $$
+DECLARE
+    v_module RECORD;
+    v_section TEXT;
+    v_question_ids UUID[];
+BEGIN
+    SELECT mem.id, mem.module_type
+    INTO v_module
+    FROM mock_exam_modules mem
+    JOIN mock_exams me ON me.id = mem.exam_id
+    WHERE mem.id = p_module_id
+      AND (auth.uid() IS NULL OR me.user_id = auth.uid())
+    FOR UPDATE OF mem;
+
+    IF NOT FOUND THEN
+        RAISE EXCEPTION 'Module not found';
+    END IF;
+
+    IF EXISTS (SELECT 1 FROM mock_exam_questions WHERE module_id = p_module_id) THEN
+        RETURN FALSE;
+    END IF;
+
+    v_section := CASE WHEN v_module.module_type::TEXT LIKE 'math%' THEN 'math' ELSE 'reading_writing' END;
+    v_question_ids := claim_mock_exam_form(v_section, p_difficulty_level);
+
+    IF v_question_ids IS NULL THEN
+        RETURN FALSE;
+    END IF;
+
+    INSERT INTO mock_exam_questions (module_id, question_id, display_order, status, is_marked_for_review)
+    SELECT p_module_id, q.question_id, q.display_order, 'not_started', FALSE
+    FROM unnest(v_question_ids) WITH ORDINALITY AS q(question_id, display_order);
+
+    RETURN TRUE;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+
+-- Create an exam, its 4 modules and module-1 questions in one transaction
+-- Claims a medium form for each section's module 1. Returns NULL without
+-- creating anything (or using up a form) when either section has no usable
+-- form.
+CREATE OR REPLACE FUNCTION create_mock_exam_from_forms(
+    p_exam_type TEXT DEFAULT 'full_length',
+    p_time_limit_minutes INTEGER DEFAULT 32
+)
+RETURNS JSONB AS $$
+DECLARE
+    v_user_id UUID := auth.uid();
+    v_rw_question_ids UUID[];
+    v_math_question_ids UUID[];
+    v_exam mock_exams%ROWTYPE;
+    v_rw_module_id UUID;
+    v_math_module_id UUID;
+BEGIN
+    IF v_user_id IS NULL THEN
+        RAISE EXCEPTION 'Not authenticated';
+    END IF;
+
+    -- A subtransaction, so a form claimed for one section goes back to the
+    -- pool when the other section has none
+    BEGIN
+        v_rw_question_ids := claim_mock_exam_form('reading_writing', 'medium');
+        v_math_question_ids := claim_mock_exam_form('math', 'medium');
+
+        IF v_rw_question_ids IS NULL OR v_math_question_ids IS NULL THEN
+            RAISE EXCEPTION 'Form pool empty' USING ERRCODE = 'no_data_found';
+        END IF;
+    EXCEPTION WHEN no_data_found THEN
+        RETURN NULL;
+    END;
+
+    INSERT INTO mock_exams (user_id, exam_type, status)
+    VALUES (v_user_id, p_exam_type, 'not_started')
+    RETURNING * INTO v_exam;
+
+    -- Reading/Writing first, as per SAT format
+    INSERT INTO mock_exam_modules (exam_id, module_type, module_number, time_limit_minutes, status)
+    VALUES (v_exam.id, 'rw_module_1', 1, p_time_limit_minutes, 'not_started')
+    RETURNING id INTO v_rw_module_id;
+
+    INSERT INTO mock_exam_modules (exam_id, module_type, module_number, time_limit_minutes, status)
+    VALUES (v_exam.id, 'rw_module_2', 2, p_time_limit_minutes, 'not_started');
+
+    INSERT INTO mock_exam_modules (exam_id, module_type, module_number, time_limit_minutes, status)
+    VALUES (v_exam.id, 'math_module_1', 1, p_time_limit_minutes, 'not_started')
+    RETURNING id INTO v_math_module_id;
+
+    INSERT INTO mock_exam_modules (exam_id, module_type, module_number, time_limit_minutes, status)
+    VALUES (v_exam.id, 'math_module_2', 2, p_time_limit_minutes, 'not_started');
+
+    INSERT INTO mock_exam_questions (module_id, question_id, display_order, status, is_marked_for_review)
+    SELECT v_rw_module_id, q.question_id, q.display_order, 'not_started', FALSE
+    FROM unnest(v_rw_question_ids) WITH ORDINALITY AS q(question_id, display_order);
+
+    INSERT INTO mock_exam_questions (module_id, question_id, display_order, status, is_marked_for_review)
+    SELECT v_math_module_id, q.question_id, q.display_order, 'not_started', FALSE
+    FROM unnest(v_math_question_ids) WITH ORDINALITY AS q(question_id, display_order);
+
+    RETURN jsonb_build_object(
+        'exam', to_jsonb(v_exam),
+        'modules', (
+            SELECT jsonb_agg(to_jsonb(mem) ORDER BY
+                CASE mem.module_type
+                    WHEN 'rw_module_1' THEN 1
+                    WHEN 'rw_module_2' THEN 2
+                    WHEN 'math_module_1' THEN 3
+                    ELSE 4
+                END)
+            FROM mock_exam_modules mem
+            WHERE mem.exam_id = v_exam.id
+        )
+    );
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+
+-- Move pooled forms into a module's candidates
+-- Claims one usable form per tier that has no candidate yet and returns the
+-- tiers that are still missing (the caller assembles those itself).
+CREATE OR REPLACE FUNCTION reserve_module_candidates(p_module_id UUID)
+RETURNS TEXT[] AS $$
+DECLARE
+    v_module RECORD;
+    v_section TEXT;
+    v_difficulty TEXT;
+    v_question_ids UUID[];
+    v_missing TEXT[] := ARRAY[]::TEXT[];
+BEGIN
+    SELECT mem.id, mem.module_type
+    INTO v_module
+    FROM mock_exam_modules mem
+    JOIN mock_exams me ON me.id = mem.exam_id
+    WHERE mem.id = p_module_id
+      AND (auth.uid() IS NULL OR me.user_id = auth.uid());
+
+    IF NOT FOUND THEN
+        RAISE EXCEPTION 'Module not found';
+    END IF;
+
+    -- Questions already committed: nothing left to speculate on
+    IF EXISTS (SELECT 1 FROM mock_exam_questions WHERE module_id = p_module_id) THEN
+        RETURN v_missing;
+    END IF;
+
+    v_section := CASE WHEN v_module.module_type::TEXT LIKE 'math%' THEN 'math' ELSE 'reading_writing' END;
+
+    FOREACH v_difficulty IN ARRAY ARRAY['easy', 'medium', 'hard'] LOOP
+        CONTINUE WHEN EXISTS (
+            SELECT 1 FROM mock_exam_module_candidates
+            WHERE module_id = p_module_id AND difficulty_level = v_difficulty
+        );
+
+        v_question_ids := claim_mock_exam_form(v_section, v_difficulty);
+
+        IF v_question_ids IS NULL THEN
+            v_missing := array_append(v_missing, v_difficulty);
+            CONTINUE;
+        END IF;
+
+        INSERT INTO mock_exam_module_candidates (module_id, difficulty_level, question_ids)
+        VALUES (p_module_id, v_difficulty, v_question_ids)
+        ON CONFLICT (module_id, difficulty_level) DO NOTHING;
+    END LOOP;
+
+    RETURN v_missing;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+
+-- Commit module 2's candidate for the tier earned in module 1, discard the others
+-- Returns FALSE when there is no candidate for that tier or one of its
+-- questions was deactivated since it was prepared (caller falls back to
+-- generating the module), or the module already has questions. Raises if
+-- module 1 of the section is not completed.
+CREATE OR REPLACE FUNCTION commit_module_candidate(p_module_id UUID)
+RETURNS BOOLEAN AS $$
+DECLARE
+    v_module RECORD;
+    v_raw_score INTEGER;
+    v_difficulty TEXT;
+    v_question_ids UUID[];
+BEGIN
+    SELECT mem.exam_id, mem.module_type
+    INTO v_module
+    FROM mock_exam_modules mem
+    JOIN mock_exams me ON me.id = mem.exam_id
+    WHERE mem.id = p_module_id
+      AND mem.module_number = 2
+      AND (auth.uid() IS NULL OR me.user_id = auth.uid())
+    FOR UPDATE OF mem;
+
+    IF NOT FOUND THEN
+        RAISE EXCEPTION 'Module not found';
+    END IF;
+
+    SELECT raw_score INTO v_raw_score
+    FROM mock_exam_modules
+    WHERE exam_id = v_module.exam_id
+      AND module_number = 1
+      AND module_type::TEXT = replace(v_module.module_type::TEXT, '_module_2', '_module_1')
+      AND status = 'completed';
+
+    IF NOT FOUND THEN
+        RAISE EXCEPTION 'Module 1 not completed';
+    END IF;
+
+    IF EXISTS (SELECT 1 FROM mock_exam_questions WHERE module_id = p_module_id) THEN
+        DELETE FROM mock_exam_module_candidates WHERE module_id = p_module_id;
+        RETURN FALSE;
+    END IF;
+
+    -- Same thresholds as MockExamService._next_module_difficulty (27 questions per module)
+    v_difficulty := CASE
+        WHEN COALESCE(v_raw_score, 0) / 27.0 >= 0.7 THEN 'hard'
+        WHEN COALESCE(v_raw_score, 0) / 27.0 >= 0.4 THEN 'medium'
+        ELSE 'easy'
+    END;
+
+    SELECT question_ids INTO v_question_ids
+    FROM mock_exam_module_candidates
+    WHERE module_id = p_module_id AND difficulty_level = v_difficulty;
+
+    IF v_question_ids IS NULL OR NOT mock_exam_questions_active(v_question_ids) THEN
+        DELETE FROM mock_exam_module_candidates WHERE module_id = p_module_id;
+        RETURN FALSE;
+    END IF;
+
+    INSERT INTO mock_exam_questions (module_id, question_id, display_order, status, is_marked_for_review)
+    SELECT p_module_id, q.question_id, q.display_order, 'not_started', FALSE
+    FROM unnest(v_question_ids) WITH ORDINALITY AS q(question_id, display_order);
+
+    DELETE FROM mock_exam_module_candidates WHERE module_id = p_module_id;
+
+    RETURN TRUE;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+
+-- Drop pooled forms with an inactive question, so pool levels count usable
+-- forms only. Returns the number of forms deleted.
+CREATE OR REPLACE FUNCTION discard_inactive_mock_exam_forms()
+RETURNS INTEGER AS $$
+DECLARE
+    v_deleted INTEGER;
+BEGIN
+    DELETE FROM mock_exam_forms
+    WHERE NOT mock_exam_questions_active(question_ids);
+
+    GET DIAGNOSTICS v_deleted = ROW_COUNT;
+    RETURN v_deleted;
+END;
+$$ LANGUAGE plpgsql;
+
+
+-- Lease for the replenish job: one refill at a time
+CREATE TABLE mock_exam_form_pool_refill (
+    id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+    locked_until TIMESTAMPTZ NOT NULL DEFAULT '-infinity'
+);
+
+INSERT INTO mock_exam_form_pool_refill DEFAULT VALUES;
+
+ALTER TABLE mock_exam_form_pool_refill ENABLE ROW LEVEL SECURITY;
+
+COMMENT ON TABLE mock_exam_form_pool_refill IS 'Single-row lease held by the running form pool refill';
+
+-- Take the refill lease if no other refill holds it. Returns FALSE if one does.
+CREATE OR REPLACE FUNCTION claim_mock_exam_form_pool_refill(p_lease_seconds INTEGER DEFAULT 300)
+RETURNS BOOLEAN AS $$
+BEGIN
+    UPDATE mock_exam_form_pool_refill
+    SET locked_until = NOW() + make_interval(secs => p_lease_seconds)
+    WHERE locked_until < NOW();
+
+    RETURN FOUND;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION release_mock_exam_form_pool_refill()
+RETURNS VOID AS $$
+    UPDATE mock_exam_form_pool_refill SET locked_until = '-infinity';
+$$ LANGUAGE sql;
+
+REVOKE EXECUTE ON FUNCTION mock_exam_questions_active(UUID[]) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION claim_mock_exam_form(TEXT, TEXT) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION discard_inactive_mock_exam_forms() FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION claim_mock_exam_form_pool_refill(INTEGER) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION release_mock_exam_form_pool_refill() FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION mock_exam_questions_active(UUID[]) TO service_role;
+GRANT EXECUTE ON FUNCTION discard_inactive_mock_exam_forms() TO service_role;
+GRANT EXECUTE ON FUNCTION claim_mock_exam_form_pool_refill(INTEGER) TO service_role;
+GRANT EXECUTE ON FUNCTION release_mock_exam_form_pool_refill() TO service_role;